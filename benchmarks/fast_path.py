@@ -0,0 +1,99 @@
+"""
+激活接口：常规 FastAPI 路由 vs 纯 ASGI 快速路径（``[server] fast_path``）。
+
+两项对比，均为进程内 ASGI 直调（不含网络与 HTTP 解析）：
+
+* **分发开销**：空请求体 ``POST``（读包后即 ``400``，不触发 RSA / 查库），反复调用，
+  得到中间件栈 + 路由 + 依赖解析本身的每请求耗时；
+* **端到端**：``sealium.scripts.bench`` 进程内压测（默认混合场景、2048 位临时密钥），
+  对比吞吐与分位数。
+
+    python benchmarks/fast_path.py
+    python benchmarks/fast_path.py --requests 2000 --key-bits 4096
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from sealium.common.crypto import RSAEncryptor
+from sealium.scripts.bench import DEFAULT_MIX, _asgi_post, parse_mix, run_in_process
+from sealium.server.config import PathsModel, ServerConfig
+
+
+def _config(tmp: Path, fast_path: bool) -> ServerConfig:
+    cfg = ServerConfig(paths=PathsModel(database=tmp / "d.db", private_key=tmp / "p.pem"))
+    cfg.server.fast_path = fast_path
+    cfg.rate_limit.enabled = False
+    cfg.logging.level = "WARNING"
+    return cfg
+
+
+def dispatch_overhead(encryptor: RSAEncryptor, fast_path: bool, iterations: int) -> float:
+    """空包 400 的每请求耗时（微秒），取 5 轮最小值。"""
+    from sealium.server.app import create_app  # 延迟导入：模块级 app 会加载配置
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cfg = _config(Path(tmp), fast_path)
+        app = create_app(config=cfg, encryptor=encryptor)
+        path = cfg.activation_route()
+
+        async def run() -> float:
+            best = float("inf")
+            async with app.router.lifespan_context(app):
+                for _ in range(5):
+                    t0 = time.perf_counter()
+                    for _ in range(iterations):
+                        await _asgi_post(app, path, b"", ("127.0.0.1", 1))
+                    best = min(best, (time.perf_counter() - t0) / iterations)
+            return best * 1e6
+
+        return asyncio.run(run())
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="激活路由 vs 纯 ASGI 快速路径")
+    parser.add_argument("--iterations", type=int, default=5000, help="分发开销每轮调用次数")
+    parser.add_argument("--requests", type=int, default=600, help="端到端请求数")
+    parser.add_argument("--concurrency", type=int, default=8, help="端到端并发数")
+    parser.add_argument("--key-bits", type=int, default=2048, help="临时密钥位数（默认 2048）")
+    args = parser.parse_args(argv)
+
+    encryptor = RSAEncryptor.generate(args.key_bits)
+    print("分发开销（空包 400，每请求）：")
+    overhead = {}
+    for label, fast in (("route", False), ("fast_path", True)):
+        overhead[label] = dispatch_overhead(encryptor, fast, args.iterations)
+        print(f"  {label:<10} {overhead[label]:8.1f} µs")
+    print(f"  快速路径节省 {1 - overhead['fast_path'] / overhead['route']:.0%}")
+
+    print(f"端到端（{args.requests} 请求，并发 {args.concurrency}，{args.key_bits} 位密钥）：")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, fast in (("route", False), ("fast_path", True)):
+            report = run_in_process(
+                codes=args.requests,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                mix=parse_mix(DEFAULT_MIX),
+                config=_config(Path(tmp), fast),
+                encryptor=encryptor,
+                fast_path=fast,
+            )
+            scenarios = report["scenarios"].values()
+            print(
+                f"  {label:<10} {report['throughput_rps']:7.1f} rps  "
+                f"p50 {max(s['p50_ms'] for s in scenarios):6.2f} ms  "
+                f"p99 {max(s['p99_ms'] for s in scenarios):6.2f} ms  "
+                f"非预期 {sum(s['unexpected'] for s in scenarios)}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
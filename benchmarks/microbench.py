@@ -0,0 +1,370 @@
+"""
+热路径原语微基准 + 回归预算。
+
+覆盖激活链路上每请求必经的原语（解包 / 解密 / 加密响应、模型与指纹反序列化、
+``matches``、防重放 / 限流、存储查询与绑定）以及客户端采集侧的 ``scrub_and_score``
+与 ``_parse_smbios``。每个用例以 ``timeit`` 自动定次数、重复取最小值得到单次耗时。
+
+基线存于 ``benchmarks/baseline.json``（随仓库提交）。为降低跨机器差异，每次运行先测
+一段固定的纯 Python 校准负载，基线与比较都用「单次耗时 / 校准耗时」的相对值；
+相对值超出基线 ``(1 + 预算)`` 倍即判回归，``--compare`` 以退出码 1 失败。
+
+    python benchmarks/microbench.py                    # 运行并打印
+    python benchmarks/microbench.py --compare          # 对比基线，超预算退出码 1
+    python benchmarks/microbench.py --update-baseline  # 刷新基线（有意的性能变化后）
+    python benchmarks/microbench.py --only matches --only replay
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import platform
+import sys
+import tempfile
+import timeit
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+from sealium.client.key_manager import ClientKeyManager
+from sealium.common.crypto import RSAEncryptor
+from sealium.common.fingerprint import Component, MachineFingerprint, MachineIdPolicy, matches, to_storage
+from sealium.common.hardware.cross_validate import scrub_and_score
+from sealium.common.hardware.native_surfaces import _parse_smbios
+from sealium.common.hardware.types import RawSurface
+from sealium.common.models import ActivationCode, ActivationRequest, ActivationStatus
+from sealium.server.crypto_transport import decrypt_request, encrypt_response, parse_encrypted_request
+from sealium.server.database import ActivationCodeStorage, SQLiteDatabase
+from sealium.server.rate_limit import InMemoryRateLimiter
+from sealium.server.replay_guard import InMemoryReplayStore
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+# 默认回归预算：相对基线变慢超过 30% 即失败
+DEFAULT_BUDGET = 0.30
+REPEAT = 5
+MIN_SECONDS = 0.2
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    budget: float = DEFAULT_BUDGET
+    # 固定调用次数（每次调用消耗一次性资源的用例，如绑定未使用码）；None 为自动定次数
+    number: Optional[int] = None
+
+
+# ---------------------------------------------------------------- fixtures
+
+
+def _fingerprint(seed: str) -> MachineFingerprint:
+    h = lambda tag: uuid.uuid5(uuid.NAMESPACE_OID, f"{seed}-{tag}").hex * 2  # noqa: E731
+    return MachineFingerprint(
+        components=(
+            Component("cpu", h("cpu"), True),
+            Component("board", h("board"), True),
+            Component("bios", h("bios"), True),
+            Component("system_uuid", h("uuid"), True),
+            Component("disk", h("disk0"), False),
+            Component("disk", h("disk1"), False),
+            Component("mac", h("mac0"), False),
+            Component("mac", h("mac1"), False),
+            Component("memory", h("mem"), False),
+        ),
+    )
+
+
+def _request_dict(code: str = "a" * 32) -> dict:
+    return ActivationRequest(
+        activation_code=code,
+        machine_code=_fingerprint("m"),
+        timestamp=1_767_225_600,
+        nonce="0" * 32,
+    ).to_dict()
+
+
+_KEYPAIR: Optional[RSAEncryptor] = None
+
+
+def _keypair() -> RSAEncryptor:
+    global _KEYPAIR
+    if _KEYPAIR is None:
+        _KEYPAIR = RSAEncryptor.generate()  # 4096，与生产默认一致
+    return _KEYPAIR
+
+
+def _packet() -> bytes:
+    km = ClientKeyManager(_keypair().export_public_key())
+    return km.build_encrypted_request(json.dumps(_request_dict()).encode("utf-8"))
+
+
+def _storage(codes: int, *, bound: bool) -> tuple[ActivationCodeStorage, list[str]]:
+    tmp = Path(tempfile.mkdtemp(prefix="sealium-microbench-"))
+    db = SQLiteDatabase(tmp / "bench.db")
+    db.connect()
+    db.init_tables()
+    storage = ActivationCodeStorage(db)
+    fp = _fingerprint("m")
+    names = [f"{i:032x}" for i in range(codes)]
+    for code in names:
+        storage.create(
+            ActivationCode(
+                activation_code=code,
+                status=ActivationStatus.USED if bound else ActivationStatus.UNUSED,
+                bound_machine_code=fp if bound else None,
+            )
+        )
+    return storage, names
+
+
+def _smbios_table() -> bytes:
+    def block(stype: int, formatted_tail: bytes, strings: list[bytes]) -> bytes:
+        formatted = bytes([stype, 4 + len(formatted_tail), 0, 0]) + formatted_tail
+        blob = b"".join(s + b"\x00" for s in strings) or b"\x00"
+        return formatted + blob + b"\x00"
+
+    sys_uuid = uuid.UUID("12345678-1234-5678-1234-567812345678").bytes_le
+    table = (
+        block(0, bytes([1, 2, 0, 0]), [b"American Megatrends Inc.", b"5.17"])
+        + block(1, bytes([1, 2, 3, 4]) + sys_uuid, [b"Vendor", b"Product", b"1.0", b"SN123"])
+        + block(2, bytes([1, 2, 3, 4]), [b"ASUSTeK", b"PRIME B550", b"Rev X.0x", b"MB-SERIAL-0001"])
+        + block(3, bytes([1, 3, 2, 3]), [b"Default", b"1.0", b"CHASSIS-0001"])
+        + block(4, bytes([1, 3, 2]) + bytes([0x12, 0x0F, 0xA2, 0x00, 0xFF, 0xFB, 0x8B, 0x17]),
+                [b"CPU0", b"AMD", b"Ryzen"])
+    )
+    # 内存条 / 插槽等与指纹无关的结构，真实固件表中占多数
+    for i in range(16):
+        table += block(17, bytes(24), [f"DIMM{i}".encode(), b"Samsung", f"SN{i:04d}".encode()])
+    return table + block(127, b"", [])
+
+
+def _surfaces() -> list[RawSurface]:
+    return [
+        RawSurface("cpu", "178BFBFF00A20F12", "smbios"),
+        RawSurface("cpu", "178BFBFF00A20F12", "wmi"),
+        RawSurface("board", "MB-SERIAL-0001 PRIME B550", "smbios"),
+        RawSurface("board", "MB-SERIAL-0001PRIME B550", "wmi"),
+        RawSurface("bios", "American Megatrends Inc.5.17", "smbios"),
+        RawSurface("system_uuid", "12345678-1234-5678-1234-567812345678", "smbios"),
+        RawSurface("system_uuid", "12345678-1234-5678-1234-567812345678", "wmi"),
+        RawSurface("chassis", "Default string", "smbios"),
+        RawSurface("disk", "WD-WCAY12345678", "storage_ioctl", "0"),
+        RawSurface("disk", "W D - W C A Y 1 2 3 4 5 6 7 8", "wmi", "0"),
+        RawSurface("disk", "S4EWNX0R123456", "storage_ioctl", "1"),
+        RawSurface("mac", "00:11:22:33:44:55", "wmi", "0"),
+        RawSurface("mac", "00:00:00:00:00:00", "wmi", "1"),
+        RawSurface("memory", "SN0001", "wmi", "0"),
+        RawSurface("tpm", "To be filled by O.E.M.", "tpm"),
+    ]
+
+
+# ---------------------------------------------------------------- cases
+
+
+def _case_parse():
+    raw = _packet()
+    return lambda: parse_encrypted_request(raw)
+
+
+def _case_decrypt():
+    enc = _keypair()
+    parts = parse_encrypted_request(_packet())
+    return lambda: decrypt_request(enc, *parts)
+
+
+def _case_encrypt():
+    key = bytes(32)
+    body = {"result": "success", "authorized_until": "永久", "features": ["pro"], "nonce": "0" * 32}
+    return lambda: encrypt_response(body, key)
+
+
+def _case_request_from_dict():
+    data = _request_dict()
+    return lambda: ActivationRequest.from_dict(data)
+
+
+def _case_fingerprint_from_dict():
+    data = _fingerprint("m").to_dict()
+    return lambda: MachineFingerprint.from_dict(data)
+
+
+def _case_matches():
+    bound = _fingerprint("m")
+    incoming = MachineFingerprint(
+        components=bound.components[:-2] + (Component("mac", "ff" * 32, False),)
+    )
+    policy = MachineIdPolicy.default()
+    return lambda: matches(bound, incoming, policy)
+
+
+def _case_replay_seen():
+    store = InMemoryReplayStore(max_size=10_000)
+    counter = itertools.count()
+    return lambda: store.seen(("a" * 32, f"{next(counter):032x}"))
+
+
+def _case_rate_limit_allow():
+    limiter = InMemoryRateLimiter(60, 60)
+    keys = [f"198.51.{i >> 8}.{i & 0xFF}" for i in range(10_000)]
+    cycle = itertools.cycle(keys)
+    return lambda: limiter.allow(next(cycle))
+
+
+def _case_get_by_code():
+    storage, names = _storage(1_000, bound=True)
+    cycle = itertools.cycle(names)
+    return lambda: storage.get_by_code(next(cycle))
+
+
+_BIND_NUMBER = 50
+
+
+def _case_bind():
+    storage, names = _storage(_BIND_NUMBER * (REPEAT + 1), bound=False)
+    codes = iter(names)
+    machine = to_storage(_fingerprint("m"))
+    now = datetime(2026, 1, 1)
+    return lambda: storage.bind_machine_code(next(codes), machine, now)
+
+
+def _case_scrub():
+    surfaces = _surfaces()
+    return lambda: scrub_and_score(surfaces)
+
+
+def _case_smbios():
+    table = _smbios_table()
+    return lambda: _parse_smbios(table)
+
+
+CASES = [
+    Case("parse_encrypted_request", _case_parse),
+    Case("decrypt_request", _case_decrypt, budget=0.20),
+    Case("encrypt_response", _case_encrypt),
+    Case("ActivationRequest.from_dict", _case_request_from_dict),
+    Case("MachineFingerprint.from_dict", _case_fingerprint_from_dict),
+    Case("matches", _case_matches),
+    Case("InMemoryReplayStore.seen", _case_replay_seen),
+    Case("InMemoryRateLimiter.allow", _case_rate_limit_allow),
+    # SQLite 受磁盘 / 页缓存影响抖动大，预算放宽
+    Case("ActivationCodeStorage.get_by_code", _case_get_by_code, budget=0.50),
+    Case("ActivationCodeStorage.bind_machine_code", _case_bind, budget=1.00, number=_BIND_NUMBER),
+    Case("scrub_and_score", _case_scrub),
+    Case("_parse_smbios", _case_smbios),
+]
+
+
+# ---------------------------------------------------------------- runner
+
+
+def _calibration() -> None:
+    table: dict[int, int] = {}
+    for i in range(200):
+        table[i] = table.get(i - 1, 0) + i * 3
+    "".join(str(v) for v in table.values())
+
+
+def measure(func: Callable[[], object], number: Optional[int] = None) -> float:
+    """单次调用耗时（纳秒）：重复 ``REPEAT`` 轮取最小值。"""
+    timer = timeit.Timer(func)
+    if number is None:
+        number, elapsed = timer.autorange()
+        if elapsed < MIN_SECONDS:
+            number = max(1, int(number * MIN_SECONDS / max(elapsed, 1e-9)))
+    best = min(timer.repeat(repeat=REPEAT, number=number))
+    return best / number * 1e9
+
+
+def run(only: Optional[list[str]] = None) -> dict:
+    # 校准在每个用例前重测、全程取最小值：单次校准受瞬时负载干扰会带偏所有相对值
+    calibration = measure(_calibration)
+    raw = {}
+    for case in CASES:
+        if only and not any(pattern in case.name for pattern in only):
+            continue
+        calibration = min(calibration, measure(_calibration))
+        raw[case.name] = measure(case.setup(), case.number)
+    cases = {
+        name: {"ns_per_op": round(ns, 1), "relative": round(ns / calibration, 6)}
+        for name, ns in raw.items()
+    }
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "calibration_ns": round(calibration, 1),
+        "cases": cases,
+    }
+
+
+def compare(result: dict, baseline: dict) -> dict[str, tuple[float, float]]:
+    """超预算的用例 ``{name: (相对基线比值, 预算)}``；空字典表示全部在预算内。"""
+    budgets = {case.name: case.budget for case in CASES}
+    failures = {}
+    for name, current in result["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is None:
+            continue
+        ratio = current["relative"] / base["relative"]
+        budget = budgets.get(name, DEFAULT_BUDGET)
+        if ratio > 1 + budget:
+            failures[name] = (ratio, budget)
+    return failures
+
+
+def _print_table(result: dict, baseline: Optional[dict]) -> None:
+    print(f"Python {result['python']} / 校准 {result['calibration_ns']:.0f} ns")
+    for name, current in result["cases"].items():
+        line = f"  {name:<42} {current['ns_per_op']:>14,.1f} ns/op"
+        base = (baseline or {}).get("cases", {}).get(name)
+        if base is not None:
+            line += f"  {current['relative'] / base['relative'] - 1:+7.1%}"
+        print(line)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="热路径原语微基准（含回归预算）")
+    parser.add_argument("--compare", action="store_true", help="对比基线，超预算退出码 1")
+    parser.add_argument("--update-baseline", action="store_true", help="把本次结果写为基线")
+    parser.add_argument("--only", action="append", help="只运行名称包含该子串的用例（可多次）")
+    parser.add_argument("--json", action="store_true", help="输出 JSON")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(BASELINE.read_text(encoding="utf-8")) if BASELINE.exists() else None
+    result = run(args.only)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        _print_table(result, baseline)
+
+    if args.update_baseline:
+        BASELINE.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+        print(f"基线已写入 {BASELINE}")
+        return 0
+    if args.compare:
+        if baseline is None:
+            print("缺少基线文件，先运行 --update-baseline", file=sys.stderr)
+            return 1
+        if baseline.get("python") != result["python"]:
+            print(f"⚠️ 基线 Python {baseline.get('python')} 与当前 {result['python']} 不同，"
+                  "结果仅供参考", file=sys.stderr)
+        failures = compare(result, baseline)
+        if failures:
+            # 共享 / 虚拟化机器上单次抖动可达 ±20%：超预算的用例重测一次，取较好值再判
+            rerun = run(list(failures))
+            for name, current in rerun["cases"].items():
+                current["relative"] = min(current["relative"], result["cases"][name]["relative"])
+                result["cases"][name] = current
+            failures = compare(result, baseline)
+        for name, (ratio, budget) in failures.items():
+            print(f"❌ 回归 {name}: {ratio - 1:+.0%}（预算 +{budget:.0%}）", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
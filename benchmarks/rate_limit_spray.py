@@ -0,0 +1,74 @@
+"""
+限流器宽范围 IP 喷洒基准。
+
+模拟攻击者以 N 个互不相同的 key（默认 100 万）轮番请求：统计 ``allow`` 的吞吐、
+单次调用的最坏耗时（暴露持锁 O(n) 停顿）与峰值 / 回收后的 key 数。时钟可注入，
+按 ``--rate`` 每秒请求数推进模拟时间，使时间轮过期路径真实参与。
+
+    python benchmarks/rate_limit_spray.py
+    python benchmarks/rate_limit_spray.py --keys 1000000 --rate 50000 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from sealium.server.rate_limit import InMemoryRateLimiter
+
+
+def run(keys: int, rate: float, max_requests: int, window_seconds: int) -> dict:
+    clock = [0.0]
+    limiter = InMemoryRateLimiter(
+        max_requests, window_seconds, now_provider=lambda: clock[0]
+    )
+    step = 1.0 / rate
+    worst = 0.0
+    peak = 0
+    perf = time.perf_counter
+    started = perf()
+    for i in range(keys):
+        clock[0] += step
+        t0 = perf()
+        limiter.allow(f"198.51.{i >> 16}.{i & 0xFFFF}")
+        dt = perf() - t0
+        if dt > worst:
+            worst = dt
+        if i & 0x3FFF == 0:
+            peak = max(peak, len(limiter))
+    elapsed = perf() - started
+    peak = max(peak, len(limiter))
+    # 模拟时间越过一个窗口后再触达各分片，验证过期回收
+    clock[0] += window_seconds + 2
+    for i in range(1024):
+        limiter.allow(f"probe-{i}")
+    return {
+        "keys": keys,
+        "ops_per_sec": round(keys / elapsed),
+        "mean_us": round(elapsed / keys * 1e6, 3),
+        "worst_us": round(worst * 1e6, 1),
+        "peak_tracked_keys": peak,
+        "tracked_keys_after_window": len(limiter),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="InMemoryRateLimiter 宽范围喷洒基准")
+    parser.add_argument("--keys", type=int, default=1_000_000, help="互不相同的 key 数")
+    parser.add_argument("--rate", type=float, default=20_000.0, help="模拟请求速率（次/秒）")
+    parser.add_argument("--max-requests", type=int, default=60)
+    parser.add_argument("--window", type=int, default=60)
+    parser.add_argument("--json", action="store_true", help="输出 JSON")
+    args = parser.parse_args()
+
+    result = run(args.keys, args.rate, args.max_requests, args.window)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for k, v in result.items():
+            print(f"{k:>28}: {v}")
+
+
+if __name__ == "__main__":
+    main()
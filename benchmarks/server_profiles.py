@@ -0,0 +1,168 @@
+"""
+``[server.performance]`` 各预设的端到端对比。
+
+对每个预设：在临时目录生成密钥、以该预设启动 ``python -m sealium.server.run``（单进程、
+关闭限流），再用 ``sealium.scripts.bench`` 的 HTTP 模式在若干并发下压测激活接口。
+
+每轮分开报告**被接受**请求的速率与 p50 / p99，以及被 ``limit_concurrency`` 立即 ``503``
+的**卸载**速率与数量：带并发上限的预设在过载时总吞吐里大半可能是 503，只看总吞吐会误判。
+
+    python benchmarks/server_profiles.py                       # 全部预设，并发 4 与 32
+    python benchmarks/server_profiles.py --profile latency --concurrency 64
+    python benchmarks/server_profiles.py --output profiles.json
+
+结果随目标机器的核数、密钥位数与负载而变，仓库不附带数据：请在与生产相当的多核机器上
+运行。压测客户端与服务端同机运行、争用 CPU；结果用于预设间相对比较，不代表绝对容量。
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from sealium.common.crypto import RSAEncryptor
+from sealium.common.constants import RSA_KEY_SIZE
+from sealium.scripts.bench import DEFAULT_MIX, parse_mix, run_http
+from sealium.server.performance import PROFILES
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_healthy(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("服务端未在限定时间内就绪")
+
+
+def _summarize(report: dict) -> dict:
+    return {
+        "accepted_rps": report["accepted_rps"],
+        "accepted_p50_ms": report["accepted_p50_ms"],
+        "accepted_p99_ms": report["accepted_p99_ms"],
+        # 超出 limit_concurrency 被 uvicorn 直接 503 的请求
+        "shed_rps": report["shed_rps"],
+        "shed": report["status_counts"].get("503", 0),
+        "status_counts": report["status_counts"],
+    }
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value:>8.1f} ms" if value is not None else f"{'-':>8} ms"
+
+
+def run_profile(
+    profile: str, concurrency: int, *, requests: int, key_bits: int, workdir: Path
+) -> dict:
+    data = workdir / profile / str(concurrency)
+    data.mkdir(parents=True)
+    encryptor = RSAEncryptor.generate(key_bits)
+    (data / "server_private.pem").write_bytes(encryptor.export_private_key())
+    public_pem = encryptor.export_public_key().decode("utf-8")
+    port = _free_port()
+    env = {
+        **os.environ,
+        "SEALIUM_CONFIG": str(data / "absent.toml"),
+        "SEALIUM_SERVER__PORT": str(port),
+        "SEALIUM_PATHS__DATABASE": str(data / "database.db"),
+        "SEALIUM_PATHS__PRIVATE_KEY": str(data / "server_private.pem"),
+        "SEALIUM_RATE_LIMIT__ENABLED": "false",
+        "SEALIUM_LOGGING__LEVEL": "WARNING",
+        "SEALIUM_SERVER__PERFORMANCE__PROFILE": profile,
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "sealium.server.run"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_healthy(port)
+        report = run_http(
+            url=f"http://127.0.0.1:{port}/v1/activation",
+            public_key_pem=public_pem,
+            db_path=data / "database.db",
+            codes=requests,
+            requests=requests,
+            concurrency=concurrency,
+            mix=parse_mix(DEFAULT_MIX),
+        )
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return _summarize(report)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="[server.performance] 预设端到端对比")
+    parser.add_argument("--profile", action="append", choices=sorted(PROFILES), help="只测指定预设（可多次）")
+    parser.add_argument("--concurrency", action="append", type=int, help="并发数（可多次；默认 4 与 32）")
+    parser.add_argument("--requests", type=int, default=600, help="每轮请求数（默认 600）")
+    parser.add_argument("--key-bits", type=int, default=RSA_KEY_SIZE, help="临时密钥位数（默认 4096）")
+    parser.add_argument("--output", type=Path, help="另把结果写入该 JSON 文件")
+    args = parser.parse_args(argv)
+
+    if (os.cpu_count() or 1) < 2:
+        print(
+            "⚠️  WARNING: 单核机器上 RSA 解密独占 CPU，各预设的差异主要是过载时的卸载行为，"
+            "不能作为选型依据；请在与生产相当的多核机器上运行。",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    profiles = args.profile or list(PROFILES)
+    levels = args.concurrency or [4, 32]
+    results: dict[str, dict[str, dict]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in profiles:
+            for concurrency in levels:
+                summary = run_profile(
+                    profile, concurrency, requests=args.requests, key_bits=args.key_bits, workdir=Path(tmp)
+                )
+                results.setdefault(profile, {})[str(concurrency)] = summary
+                print(
+                    f"{profile:<12} c={concurrency:<3} 接受 {summary['accepted_rps']:>7.1f} rps  "
+                    f"p50 {_ms(summary['accepted_p50_ms'])}  p99 {_ms(summary['accepted_p99_ms'])}  "
+                    f"卸载 {summary['shed_rps']:>7.1f} rps（503 × {summary['shed']}）"
+                )
+
+    payload = {
+        "recorded": datetime.now().strftime("%Y-%m-%d"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        # 可选实现是否安装（default 预设的 auto 会随之选择 uvloop / httptools）
+        "extras": {m: importlib.util.find_spec(m) is not None for m in ("uvloop", "httptools")},
+        "requests": args.requests,
+        "key_bits": args.key_bits,
+        "mix": DEFAULT_MIX,
+        "profiles": {name: PROFILES[name] for name in profiles},
+        "results": results,
+    }
+    if args.output is not None:
+        args.output.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"结果已写入 {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+SMBIOS 解析：对 ``tests/unit/hardware/smbios_corpus`` 中的每份转储计时。
+
+每份转储报告两项每次耗时：
+
+* **解析**：``_parse_raw_smbios``，即客户端实际路径（只解码 Type0–4）；
+* **全表遍历**：遍历所有结构并解码全部字符串，作为「逐结构切片 + 全量解码」的参照。
+
+两者之差即类型过滤与惰性 string-set 省下的开销；同时校验解析结果与语料期望一致。
+
+    python benchmarks/smbios_parse.py
+    python benchmarks/smbios_parse.py --number 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import Optional
+
+from sealium.common.hardware.native_surfaces import _iter_smbios_structures, _parse_raw_smbios
+
+CORPUS = Path(__file__).resolve().parents[1] / "tests" / "unit" / "hardware" / "smbios_corpus"
+
+
+def _full_walk(table: bytes) -> int:
+    decoded = 0
+    for _, _, strings in _iter_smbios_structures(table):
+        decoded += sum(len(strings[i]) for i in range(len(strings)))
+    return decoded
+
+
+def _per_call_us(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SMBIOS 解析耗时（语料）")
+    parser.add_argument("--number", type=int, default=500, help="每轮调用次数（默认 500）")
+    args = parser.parse_args(argv)
+
+    dumps = sorted(CORPUS.glob("*.bin"))
+    if not dumps:
+        print(f"未找到语料: {CORPUS}", file=sys.stderr)
+        return 1
+    print(f"{'转储':<20}{'字节':>8}{'结构':>6}{'解析 µs':>12}{'全表遍历 µs':>14}")
+    for dump in dumps:
+        raw = dump.read_bytes()
+        expected = json.loads(dump.with_suffix(".json").read_text(encoding="utf-8"))
+        if [[s.category, s.raw] for s in _parse_raw_smbios(raw)] != expected["surfaces"]:
+            print(f"{dump.stem}: 解析结果与语料期望不一致", file=sys.stderr)
+            return 1
+        table = raw[8:]
+        parse_us = _per_call_us(lambda: _parse_raw_smbios(raw), args.number)
+        walk_us = _per_call_us(lambda: _full_walk(table), args.number)
+        print(f"{dump.stem:<20}{len(raw):>8}{expected['structures']:>6}{parse_us:>12.1f}{walk_us:>14.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+同机调用：Unix 域套接字 vs 回环 TCP。
+
+在临时目录生成密钥，分别以 ``--unix-socket`` 与回环 TCP 端口启动
+``python -m sealium.server.run``（单进程、关闭限流），对比：
+
+* **往返延迟**：空请求体 ``POST``（读包后即 ``400``，不触发 RSA / 查库），串行发送，
+  度量传输 + HTTP 本身的开销。TCP 分三种客户端：默认发送器（``requests.post``，每次
+  新建连接，即 ``Activator`` 默认行为）、``requests.Session`` 长连接，以及与 Unix 侧
+  同为 ``http.client`` 的长连接（只差传输层，二者之差即 TCP 栈本身的开销）；Unix
+  套接字用 :class:`~sealium.client.transport.UnixSocketPoster`（长连接）；
+* **端到端**：``sealium.scripts.bench`` HTTP 模式（默认混合场景）分别经 TCP 长连接与
+  Unix 套接字压测激活接口。
+
+    python benchmarks/unix_socket.py
+    python benchmarks/unix_socket.py --probes 5000 --key-bits 4096
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Callable, Optional
+
+import requests
+
+from sealium.client.transport import UnixSocketPoster
+from sealium.common.crypto import RSAEncryptor
+from sealium.scripts.bench import DEFAULT_MIX, parse_mix, run_http
+
+_PATH = "/v1/activation"
+_HEADERS = {"Content-Type": "application/octet-stream"}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start(workdir: Path, encryptor: RSAEncryptor, *, port: int = 0, unix_socket: Optional[Path] = None):
+    workdir.mkdir(parents=True)
+    (workdir / "server_private.pem").write_bytes(encryptor.export_private_key())
+    env = {
+        **os.environ,
+        "SEALIUM_CONFIG": str(workdir / "absent.toml"),
+        "SEALIUM_SERVER__PORT": str(port or 8000),
+        "SEALIUM_PATHS__DATABASE": str(workdir / "database.db"),
+        "SEALIUM_PATHS__PRIVATE_KEY": str(workdir / "server_private.pem"),
+        "SEALIUM_RATE_LIMIT__ENABLED": "false",
+        "SEALIUM_LOGGING__LEVEL": "WARNING",
+    }
+    cmd = [sys.executable, "-m", "sealium.server.run"]
+    if unix_socket is not None:
+        cmd += ["--unix-socket", str(unix_socket)]
+    return subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _wait(probe: Callable[[], object], timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            probe()
+            return
+        except (OSError, requests.RequestException):
+            time.sleep(0.2)
+    raise RuntimeError("服务端未在限定时间内就绪")
+
+
+def _latency(send: Callable[[], object], probes: int) -> dict:
+    for _ in range(min(probes // 10, 200)):  # 预热
+        send()
+    samples = []
+    for _ in range(probes):
+        t0 = time.perf_counter_ns()
+        send()
+        samples.append((time.perf_counter_ns() - t0) / 1000)
+    samples.sort()
+    return {
+        "mean_us": statistics.fmean(samples),
+        "p50_us": samples[len(samples) // 2],
+        "p99_us": samples[int(len(samples) * 0.99)],
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Unix 域套接字 vs 回环 TCP")
+    parser.add_argument("--probes", type=int, default=2000, help="往返延迟采样次数")
+    parser.add_argument("--requests", type=int, default=600, help="端到端请求数")
+    parser.add_argument("--concurrency", type=int, default=4, help="端到端并发数")
+    parser.add_argument("--key-bits", type=int, default=2048, help="临时密钥位数（默认 2048）")
+    args = parser.parse_args(argv)
+
+    encryptor = RSAEncryptor.generate(args.key_bits)
+    public_pem = encryptor.export_public_key().decode("utf-8")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        port = _free_port()
+        sock_path = tmp / "uds" / "activation.sock"
+        servers = [
+            _start(tmp / "tcp", encryptor, port=port),
+            _start(tmp / "uds", encryptor, unix_socket=sock_path),
+        ]
+        try:
+            tcp_url = f"http://127.0.0.1:{port}{_PATH}"
+            uds_url = f"http://localhost{_PATH}"
+            _wait(lambda: urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1))
+            uds = UnixSocketPoster(str(sock_path))
+            _wait(lambda: uds(uds_url, b"", _HEADERS, 1))
+            session = requests.Session()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+
+            def tcp_raw() -> bytes:
+                conn.request("POST", _PATH, body=b"", headers=_HEADERS)
+                return conn.getresponse().read()
+
+            print(f"往返延迟（空包 400，串行 {args.probes} 次）：")
+            rows = {
+                "tcp 新连接": lambda: requests.post(tcp_url, data=b"", headers=_HEADERS, timeout=5),
+                "tcp 长连接": lambda: session.post(tcp_url, data=b"", headers=_HEADERS, timeout=5),
+                "tcp http.client": tcp_raw,
+                "unix 长连接": lambda: uds(uds_url, b"", _HEADERS, 5),
+            }
+            for label, send in rows.items():
+                r = _latency(send, args.probes)
+                print(
+                    f"  {label:<16} 平均 {r['mean_us']:7.0f} µs  p50 {r['p50_us']:7.0f} µs  "
+                    f"p99 {r['p99_us']:7.0f} µs"
+                )
+
+            print(f"端到端（{args.requests} 请求，并发 {args.concurrency}，{args.key_bits} 位密钥）：")
+            for label, url, db, unix in (
+                ("tcp", tcp_url, tmp / "tcp" / "database.db", None),
+                ("unix", uds_url, tmp / "uds" / "database.db", sock_path),
+            ):
+                report = run_http(
+                    url=url,
+                    public_key_pem=public_pem,
+                    db_path=db,
+                    codes=args.requests,
+                    requests=args.requests,
+                    concurrency=args.concurrency,
+                    mix=parse_mix(DEFAULT_MIX),
+                    unix_socket=unix,
+                )
+                scenarios = report["scenarios"].values()
+                print(
+                    f"  {label:<5} {report['throughput_rps']:7.1f} rps  "
+                    f"p50 {max(s['p50_ms'] for s in scenarios):6.2f} ms  "
+                    f"p99 {max(s['p99_ms'] for s in scenarios):6.2f} ms  "
+                    f"非预期 {sum(s['unexpected'] for s in scenarios)}"
+                )
+        finally:
+            for server in servers:
+                server.terminate()
+                server.wait(timeout=30)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,16 @@
 """客户端：激活器与密钥管理。"""
 
 from sealium.client.activator import Activator, ActivationError
+from sealium.client.fingerprint_cache import FingerprintCache
 from sealium.client.key_manager import ClientKeyManager
+from sealium.client.license_store import LicenseStore
+from sealium.client.transport import UnixSocketPoster
 
-__all__ = ["Activator", "ActivationError", "ClientKeyManager"]
+__all__ = [
+    "Activator",
+    "ActivationError",
+    "ClientKeyManager",
+    "FingerprintCache",
+    "LicenseStore",
+    "UnixSocketPoster",
+]
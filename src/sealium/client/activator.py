@@ -4,23 +4,36 @@
 
 每次启动时调用，与服务器验证激活码。对外只暴露 ``Activator`` 与
 ``ActivationError``；时间源、机器码、HTTP 传输均可注入，便于测试。
+
+配置离线令牌（``license_verifier`` + ``license_store``）后，启动时改用
+:meth:`Activator.check`：本地令牌验签通过、未临近到期且指纹仍匹配即直接返回，
+不访问网络；否则回到在线激活，在线失败时仍沿用未过期的令牌。
 """
 
 from __future__ import annotations
 
 import json
 import secrets
+import time
 from typing import Callable, Optional
 
 import requests
 
 from sealium.common import constants
 from sealium.common.exceptions import ActivationError  # 重新导出，保持导入路径兼容
-from sealium.common.fingerprint import MachineFingerprint
+from sealium.common.exceptions import CryptoError
+from sealium.common.fingerprint import MachineFingerprint, MachineIdPolicy, matches
+from sealium.common.license_token import LicenseToken, LicenseVerifier
 from sealium.common.machine_code import generate_machine_code
-from sealium.common.models import ActivationRequest, ActivationResponse
+from sealium.common.models import (
+    ActivationRequest,
+    ActivationResponse,
+    BatchActivationRequest,
+    BatchActivationResponse,
+)
 from sealium.common.time_source import get_timestamp_from_api
 from sealium.client.key_manager import ClientKeyManager
+from sealium.client.license_store import LicenseStore
 
 __all__ = ["Activator", "ActivationError"]
 
@@ -46,15 +59,27 @@ class Activator:
         http_poster: HttpPoster = _default_post,
         key_manager: Optional[ClientKeyManager] = None,
         request_timeout: int = constants.REQUEST_TIMEOUT_SECONDS,
+        license_verifier: Optional[LicenseVerifier] = None,
+        license_store: Optional[LicenseStore] = None,
+        machine_id_policy: Optional[MachineIdPolicy] = None,
+        refresh_before_seconds: int = constants.LICENSE_TOKEN_REFRESH_SECONDS,
+        clock: Callable[[], float] = time.time,
     ) -> None:
         """
         :param server_url: 服务器激活接口 URL。
         :param server_public_key_pem: 服务端公钥 PEM 字符串。
         :param timestamp_provider: 时间戳来源（默认远程权威 API）。
         :param machine_code_provider: 机器码来源（默认硬件分量指纹）。
-        :param http_poster: HTTP 发送器（默认 requests）。
+        :param http_poster: HTTP 发送器（默认 requests；同机部署可用
+            :class:`~sealium.client.transport.UnixSocketPoster`）。
         :param key_manager: 自定义密钥管理器；为 ``None`` 时按公钥新建。
         :param request_timeout: HTTP 超时（秒）。
+        :param license_verifier: 离线令牌验签器（服务端令牌公钥）；与 ``license_store``
+            同时提供才启用离线令牌。
+        :param license_store: 离线令牌的本地存储。
+        :param machine_id_policy: 本地比对令牌指纹的同机策略（默认与服务端默认一致）。
+        :param refresh_before_seconds: 令牌到期前该时长内即尝试在线续期。
+        :param clock: 本地时钟（判定令牌到期；离线校验不访问权威时间源）。
         """
         self.server_url = server_url
         self.key_manager = key_manager or ClientKeyManager(server_public_key_pem)
@@ -62,6 +87,48 @@ class Activator:
         self._get_machine_code = machine_code_provider
         self._post = http_poster
         self._timeout = request_timeout
+        self._verifier = license_verifier
+        self._store = license_store
+        self._policy = machine_id_policy or MachineIdPolicy.default()
+        self._refresh_before = refresh_before_seconds
+        self._clock = clock
+
+    def check(self, activation_code: str) -> ActivationResponse:
+        """
+        启动时的授权检查：优先用本地离线令牌，必要时才在线激活。
+
+        * 令牌有效、距到期超过 ``refresh_before_seconds`` 且本机指纹仍匹配 → 直接返回，
+          不访问网络（返回的响应 ``nonce`` 为 ``None``，``token`` 为所用令牌）；
+        * 临近到期 → 在线激活续期；网络 / 服务端不可用（``ActivationError``）时沿用令牌；
+        * 无令牌、已过期、验签失败或指纹不匹配 → 等同 :meth:`activate`。
+
+        未配置离线令牌时等同 :meth:`activate`。
+
+        :raises ActivationError: 需要在线激活而激活流程出错时抛出。
+        """
+        cached = self._cached_token(activation_code)
+        if cached is None:
+            return self.activate(activation_code)
+        raw, token = cached
+        try:
+            machine_code = self._get_machine_code()
+        except Exception as e:
+            raise ActivationError(f"获取机器码失败: {e}") from e
+        if not matches(token.machine_code, machine_code, self._policy):
+            return self._activate(activation_code, machine_code)
+
+        offline = ActivationResponse.success(
+            token.authorized_until,
+            list(token.features),
+            None,
+            raw,
+        )
+        if token.expires_at - self._clock() > self._refresh_before:
+            return offline
+        try:
+            return self._activate(activation_code, machine_code)
+        except ActivationError:
+            return offline  # 续期失败：令牌尚未过期，照常放行
 
     def activate(self, activation_code: str) -> ActivationResponse:
         """
@@ -70,11 +137,122 @@ class Activator:
         :return: ``ActivationResponse`` 对象。
         :raises ActivationError: 激活过程中发生错误。
         """
-        # 1. 获取机器码
+        return self._activate(activation_code)
+
+    def _activate(
+        self, activation_code: str, machine_code: Optional[MachineFingerprint] = None
+    ) -> ActivationResponse:
+        response_dict, nonce_c = self._round_trip(
+            lambda machine_code, timestamp, nonce: ActivationRequest(
+                activation_code=activation_code,
+                machine_code=machine_code,
+                timestamp=timestamp,
+                nonce=nonce,
+            ).to_dict(),
+            machine_code,
+        )
+
+        # 9. 构造响应对象
+        activation_response = ActivationResponse.from_dict(response_dict)
+
+        # 10. 校验回显 nonce（防篡改 / 防重放）
+        if activation_response.result == "success":
+            if activation_response.nonce != nonce_c:
+                raise ActivationError("响应 nonce 不匹配，可能是重放攻击")
+
+        # 11. 保存离线令牌（已配置时）
+        self._remember(activation_code, activation_response)
+        return activation_response
+
+    def activate_many(self, activation_codes: list[str]) -> list[ActivationResponse]:
+        """
+        一次往返激活多个码（主码 + 附加组件码）：同一份机器码 / 时间戳 / nonce，
+        整包一次 RSA 加密，服务端逐码给出结果。
+
+        :return: 与 ``activation_codes`` 一一对应的 ``ActivationResponse`` 列表；
+            单项失败体现在对应项的 ``result`` 上，不抛异常。
+        :raises ActivationError: 参数非法、传输 / 解密失败，或整包被服务端拒绝。
+        """
+        codes = list(activation_codes)
+        if not 1 <= len(codes) <= constants.MAX_BATCH_CODES:
+            raise ActivationError(f"一次最多激活 {constants.MAX_BATCH_CODES} 个激活码")
+        if len(set(codes)) != len(codes):
+            raise ActivationError("激活码列表中有重复项")
+
+        response_dict, nonce_c = self._round_trip(
+            lambda machine_code, timestamp, nonce: BatchActivationRequest(
+                activation_codes=codes,
+                machine_code=machine_code,
+                timestamp=timestamp,
+                nonce=nonce,
+            ).to_dict()
+        )
+
+        # 整包级错误（格式 / 处理异常）以单个错误响应返回，没有逐码结果
+        if "results" not in response_dict:
+            error = ActivationResponse.from_dict(response_dict)
+            raise ActivationError(f"批量激活失败: {error.error_msg}")
+        batch_response = BatchActivationResponse.from_dict(response_dict)
+        if len(batch_response.results) != len(codes):
+            raise ActivationError("批量响应条目数与请求不符")
+
+        # 整包与每个成功项都须回显本次 nonce（防篡改 / 防重放）
+        if batch_response.nonce != nonce_c or any(
+            item.result == "success" and item.nonce != nonce_c
+            for item in batch_response.results
+        ):
+            raise ActivationError("响应 nonce 不匹配，可能是重放攻击")
+
+        for code, item in zip(codes, batch_response.results):
+            self._remember(code, item)
+        return batch_response.results
+
+    def _cached_token(self, activation_code: str) -> Optional[tuple[str, LicenseToken]]:
+        """取本地令牌 ``(原文, 解析结果)``：须验签通过、签发给该码且按本地时钟未过期。"""
+        if self._verifier is None or self._store is None:
+            return None
+        raw = self._store.get(activation_code)
+        if raw is None:
+            return None
         try:
-            machine_code = self._get_machine_code()
-        except Exception as e:
-            raise ActivationError(f"获取机器码失败: {e}") from e
+            token = self._verifier.verify(raw)
+        except CryptoError:
+            return None
+        if not token.covers(activation_code) or token.expires_at <= self._clock():
+            return None
+        return raw, token
+
+    def _remember(self, activation_code: str, response: ActivationResponse) -> None:
+        """成功响应附带的令牌验签通过且签发给该码时才落盘（验签失败不影响在线结果）。"""
+        if self._verifier is None or self._store is None:
+            return
+        if response.result != "success" or response.token is None:
+            return
+        try:
+            token = self._verifier.verify(response.token)
+        except CryptoError:
+            return
+        if token.covers(activation_code):
+            self._store.put(activation_code, response.token)
+
+    def _round_trip(
+        self,
+        build_request: Callable[[MachineFingerprint, int, str], dict],
+        machine_code: Optional[MachineFingerprint] = None,
+    ) -> tuple[dict, str]:
+        """
+        单码 / 批量共用的一次往返：取机器码与时间戳、加密发送、解密解析。
+
+        :param build_request: ``(机器码, 时间戳, nonce) -> 请求明文字典``。
+        :param machine_code: 调用方已采集的机器码（:meth:`check` 比对令牌时已采集过）。
+        :return: ``(响应明文字典, 本次 nonce)``。
+        """
+        # 1. 获取机器码
+        if machine_code is None:
+            try:
+                machine_code = self._get_machine_code()
+            except Exception as e:
+                raise ActivationError(f"获取机器码失败: {e}") from e
 
         # 2. 生成随机 nonce（16 字节 -> 32 个十六进制字符）
         nonce_c = secrets.token_hex(16)
@@ -86,13 +264,7 @@ class Activator:
             raise ActivationError(f"获取时间戳失败: {e}") from e
 
         # 4. 构造请求明文（不含任何密钥）
-        request_obj = ActivationRequest(
-            activation_code=activation_code,
-            machine_code=machine_code,
-            timestamp=timestamp,
-            nonce=nonce_c,
-        )
-        request_plain = json.dumps(request_obj.to_dict()).encode("utf-8")
+        request_plain = json.dumps(build_request(machine_code, timestamp, nonce_c)).encode("utf-8")
 
         # 5. 双层加密请求（自动生成临时 AES 密钥）
         try:
@@ -125,15 +297,6 @@ class Activator:
                 response_dict = json.loads(decrypted_data.decode("utf-8"))
             except (json.JSONDecodeError, UnicodeDecodeError) as e:
                 raise ActivationError(f"解析响应失败: {e}") from e
-
-            # 9. 构造响应对象
-            activation_response = ActivationResponse.from_dict(response_dict)
-
-            # 10. 校验回显 nonce（防篡改 / 防重放）
-            if activation_response.result == "success":
-                if activation_response.nonce != nonce_c:
-                    raise ActivationError("响应 nonce 不匹配，可能是重放攻击")
-
-            return activation_response
+            return response_dict, nonce_c
         finally:
             self.key_manager.clear_aes_key()
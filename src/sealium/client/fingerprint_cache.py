@@ -0,0 +1,202 @@
+# src/sealium/client/fingerprint_cache.py
+"""
+客户端机器指纹缓存：进程内记忆 + 本机加密的磁盘缓存。
+
+:func:`~sealium.common.machine_code.generate_machine_code` 每次都完整采集（SMBIOS、逐盘
+IOCTL、十余次 WMI 查询），慢机器上可达数秒。:class:`FingerprintCache` 可直接作为
+``Activator(machine_code_provider=...)`` 注入：
+
+* 同一进程内只采集一次；
+* 磁盘缓存记录采集时的**变更指示**（默认为本次开机标识：硬件变动几乎总伴随重启），
+  指示未变时直接复用，启动只需一次文件读 + AES-GCM 解密；
+* 指示变化时先返回缓存的指纹（匹配是加权模糊比对，重启后通常仍然成立），同时在后台线程
+  重新采集并回写；``background=False`` 时改为同步重采。
+
+缓存密钥由指纹 pepper 与本机标识（Windows ``MachineGuid`` / Linux ``/etc/machine-id``）
+派生，文件拷到别的机器或换了 pepper 都无法解密，按无缓存处理。缓存只省采集时间，
+不改变指纹本身：服务端照常做 :func:`~sealium.common.fingerprint.matches` 比对。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Optional, Union
+
+from cryptography.exceptions import InvalidTag
+
+from sealium.common.constants import AES_GCM_NONCE_SIZE, AES_GCM_TAG_SIZE
+from sealium.common.crypto import AESEncryptor
+from sealium.common.exceptions import CryptoError
+from sealium.common.fingerprint import MachineFingerprint, hash_component
+from sealium.common.machine_code import generate_machine_code
+
+__all__ = ["FingerprintCache", "boot_indicator", "machine_salt"]
+
+_MAGIC = b"SFC1"
+_HEADER = struct.Struct("<4sH")  # magic + 指示长度
+
+
+def boot_indicator() -> str:
+    """
+    本次开机的标识（开机后不变，重启即变）；平台不支持时返回空串（只做进程内记忆）。
+
+    Linux 读 ``/proc/sys/kernel/random/boot_id``；Windows 由 ``GetTickCount64`` 推算开机
+    时刻并取整到分钟（跨整分钟边界的抖动只会多一次后台重采）。
+    """
+    if sys.platform == "win32":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        # 默认 restype 为 32 位 int：开机约 24.8 天后毫秒数溢出为负
+        kernel32.GetTickCount64.restype = ctypes.c_ulonglong
+        uptime = kernel32.GetTickCount64() / 1000
+        return f"boot:{int((time.time() - uptime) // 60)}"
+    try:
+        with open("/proc/sys/kernel/random/boot_id", encoding="ascii") as f:
+            return f"boot:{f.read().strip()}"
+    except OSError:
+        return ""
+
+
+def machine_salt() -> str:
+    """本机稳定标识（装系统时生成），用于把缓存密钥绑定到本机；取不到时返回空串。"""
+    if sys.platform == "win32":
+        try:
+            import winreg
+
+            with winreg.OpenKey(
+                winreg.HKEY_LOCAL_MACHINE,
+                r"SOFTWARE\Microsoft\Cryptography",
+                0,
+                winreg.KEY_READ | winreg.KEY_WOW64_64KEY,
+            ) as key:
+                return str(winreg.QueryValueEx(key, "MachineGuid")[0])
+        except OSError:
+            return ""
+    for path in ("/etc/machine-id", "/var/lib/dbus/machine-id"):
+        try:
+            with open(path, encoding="ascii") as f:
+                return f.read().strip()
+        except OSError:
+            continue
+    return ""
+
+
+class FingerprintCache:
+    """可调用的指纹来源：``cache()`` 返回 :class:`MachineFingerprint`（线程安全）。"""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        collect: Callable[[], MachineFingerprint] = generate_machine_code,
+        indicator: Callable[[], str] = boot_indicator,
+        salt: Callable[[], str] = machine_salt,
+        background: bool = True,
+    ) -> None:
+        """
+        :param path: 磁盘缓存文件路径（建议放在应用的用户数据目录）。
+        :param collect: 实际采集函数（默认完整硬件采集）。
+        :param indicator: 变更指示；返回空串表示不可用，此时不读写磁盘缓存。
+        :param salt: 本机标识（参与派生缓存密钥）。
+        :param background: 指示变化时是否先返回旧指纹并在后台重采。
+        """
+        self.path = Path(path)
+        self._collect = collect
+        self._indicator = indicator
+        self._salt = salt
+        self._background = background
+        self._lock = threading.Lock()
+        self._memo: Optional[MachineFingerprint] = None
+        self._refresh: Optional[threading.Thread] = None
+
+    def __call__(self) -> MachineFingerprint:
+        with self._lock:
+            if self._memo is not None:
+                return self._memo
+            indicator = self._indicator()
+            cached, cached_indicator = self._load() if indicator else (None, None)
+            if cached is not None and cached_indicator == indicator:
+                self._memo = cached
+                return cached
+            if cached is not None and self._background:
+                # 先用旧指纹放行，后台重采并回写
+                self._memo = cached
+                self._refresh = threading.Thread(
+                    target=self._refresh_in_background,
+                    args=(indicator,),
+                    name="sealium-fingerprint-refresh",
+                    daemon=True,
+                )
+                self._refresh.start()
+                return cached
+            fingerprint = self._collect()
+            self._memo = fingerprint
+            if indicator:
+                self._store(fingerprint, indicator)
+            return fingerprint
+
+    def invalidate(self) -> None:
+        """丢弃进程内记忆与磁盘缓存（下次调用重新采集）。"""
+        with self._lock:
+            self._memo = None
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """等待进行中的后台重采结束（退出前或测试时调用）。"""
+        refresh = self._refresh
+        if refresh is not None:
+            refresh.join(timeout)
+
+    def _refresh_in_background(self, indicator: str) -> None:
+        try:
+            fingerprint = self._collect()
+        except Exception:
+            return  # 采集失败：继续使用旧指纹，下次启动再试
+        with self._lock:
+            self._memo = fingerprint
+            self._store(fingerprint, indicator)
+
+    def _key(self) -> bytes:
+        # hash_component 已含指纹 pepper：换 pepper 或换机器都派生出不同密钥
+        return bytes.fromhex(hash_component("fingerprint_cache", self._salt()))
+
+    def _load(self) -> tuple[Optional[MachineFingerprint], Optional[str]]:
+        try:
+            data = self.path.read_bytes()
+            magic, length = _HEADER.unpack_from(data)
+            if magic != _MAGIC:
+                return None, None
+            header_end = _HEADER.size + length
+            indicator = data[_HEADER.size:header_end].decode("utf-8")
+            body_start = header_end + AES_GCM_NONCE_SIZE
+            nonce = data[header_end:body_start]
+            ciphertext, tag = data[body_start:-AES_GCM_TAG_SIZE], data[-AES_GCM_TAG_SIZE:]
+            plaintext = AESEncryptor.decrypt(self._key(), nonce, ciphertext, tag, data[:header_end])
+            return MachineFingerprint.from_dict(json.loads(plaintext)), indicator
+        except (OSError, struct.error, UnicodeError, ValueError, InvalidTag, CryptoError):
+            return None, None
+
+    def _store(self, fingerprint: MachineFingerprint, indicator: str) -> None:
+        encoded = indicator.encode("utf-8")
+        header = _HEADER.pack(_MAGIC, len(encoded)) + encoded
+        try:
+            nonce, ciphertext, tag = AESEncryptor.encrypt(
+                self._key(), fingerprint.canonical().encode("utf-8"), header
+            )
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(header + nonce + ciphertext + tag)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # 缓存写不进去只影响下次启动速度
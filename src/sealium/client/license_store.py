@@ -0,0 +1,61 @@
+# src/sealium/client/license_store.py
+"""
+离线授权令牌的本地存储。
+
+一个 JSON 文件，键为激活码摘要（:func:`~sealium.common.license_token.code_digest`，
+不落明文码）、值为服务端签发的令牌字符串；同一文件可存主码与多个附加组件码的令牌。
+令牌本身带 Ed25519 签名，篡改即验签失败，故文件只需防意外损坏：写入走临时文件 +
+``os.replace`` 原子替换，读到损坏的文件按空处理（下次在线激活时重写）。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+from sealium.common.license_token import code_digest
+
+__all__ = ["LicenseStore"]
+
+
+class LicenseStore:
+    """按激活码存取离线令牌（线程安全；跨进程以最后一次原子写入为准）。"""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def get(self, activation_code: str) -> Optional[str]:
+        """取该激活码的令牌；无记录或文件不可读时返回 ``None``。"""
+        token = self._read().get(code_digest(activation_code))
+        return token if isinstance(token, str) else None
+
+    def put(self, activation_code: str, token: str) -> None:
+        """写入（覆盖）该激活码的令牌。"""
+        with self._lock:
+            entries = self._read()
+            entries[code_digest(activation_code)] = token
+            self._write(entries)
+
+    def discard(self, activation_code: str) -> None:
+        """删除该激活码的令牌（不存在时无操作）。"""
+        with self._lock:
+            entries = self._read()
+            if entries.pop(code_digest(activation_code), None) is not None:
+                self._write(entries)
+
+    def _read(self) -> dict:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, entries: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entries, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
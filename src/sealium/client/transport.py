@@ -0,0 +1,125 @@
+# src/sealium/client/transport.py
+"""
+``Activator`` 的可选 HTTP 传输。
+
+:class:`UnixSocketPoster` 经 Unix 域套接字向同机的激活服务（``[server] unix_socket``）
+发送请求，跳过 TCP 协议栈；作为 ``http_poster`` 注入即可，激活流程不变::
+
+    activator = Activator(
+        "http://localhost/v1/activation",        # 只取路径与 Host 头
+        server_public_key_pem,
+        http_poster=UnixSocketPoster("/run/sealium/activation.sock"),
+    )
+
+连接在调用之间保持复用（HTTP/1.1 keep-alive）；复用前探测空闲连接是否已被服务端
+关闭（keep-alive 超时），已关闭则重连，不对已发出的请求做重试（激活请求带一次性
+nonce，重发可能被防重放拒绝）。
+"""
+
+from __future__ import annotations
+
+import http.client
+import select
+import socket
+import threading
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+__all__ = ["UnixSocketPoster"]
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """连接到 Unix 域套接字的 ``HTTPConnection``（``host`` 仅用于 Host 头）。"""
+
+    def __init__(self, path: str, host: str, timeout: float) -> None:
+        super().__init__(host, timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self._path)
+        except BaseException:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+def _dropped(conn: http.client.HTTPConnection) -> bool:
+    """空闲连接可读即意味着对端已关闭（或发来了不该有的数据），不可复用。"""
+    if conn.sock is None:
+        return True
+    readable, _, _ = select.select([conn.sock], [], [], 0)
+    return bool(readable)
+
+
+class UnixSocketPoster:
+    """经 Unix 域套接字发送激活请求的 ``http_poster``（线程安全，串行复用一条连接）。"""
+
+    def __init__(self, socket_path: str) -> None:
+        """
+        :param socket_path: 服务端 ``[server] unix_socket`` 路径。
+        """
+        self.socket_path = str(socket_path)
+        self._conn: Optional[_UnixHTTPConnection] = None
+        self._conn_host: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def __call__(self, url: str, data: bytes, headers: dict, timeout: float) -> requests.Response:
+        """
+        发送 ``POST``，返回 ``requests.Response``（``content`` / ``raise_for_status`` 与默认
+        发送器一致）。
+
+        :raises requests.ConnectionError: 连接 / 收发失败（``Activator`` 收敛为 ``ActivationError``）。
+        """
+        parts = urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        host = parts.netloc or "localhost"
+        with self._lock:
+            conn = self._connection(host, timeout)
+            try:
+                conn.request("POST", target, body=data, headers=headers)
+                raw = conn.getresponse()
+                body = raw.read()
+            except (OSError, http.client.HTTPException) as e:
+                self._close()
+                raise requests.ConnectionError(f"Unix 套接字 {self.socket_path}: {e}") from e
+            if raw.will_close:
+                self._close()
+
+        response = requests.Response()
+        response.status_code = raw.status
+        response.reason = raw.reason
+        response.headers = CaseInsensitiveDict(raw.getheaders())
+        response._content = body
+        response.url = url
+        return response
+
+    def _connection(self, host: str, timeout: float) -> _UnixHTTPConnection:
+        conn = self._conn
+        if conn is not None and (host != self._conn_host or _dropped(conn)):
+            self._close()
+            conn = None
+        if conn is None:
+            conn = _UnixHTTPConnection(self.socket_path, host, timeout)
+            self._conn, self._conn_host = conn, host
+        else:
+            conn.timeout = timeout
+            conn.sock.settimeout(timeout)
+        return conn
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def close(self) -> None:
+        """关闭复用中的连接。"""
+        with self._lock:
+            self._close()
@@ -25,6 +25,24 @@ ACTIVATION_STATUS_USED: int = 1
 # 生产部署应经 SEALIUM_SECURITY__CODE_HASH_PEPPER 注入随机值以获得部署唯一性。
 # 与 fingerprint pepper 同理：激活码已 128 位高熵，pepper 公开亦不影响预像安全。
 CODE_HASH_PEPPER_DEFAULT: str = "sealium-v1-code-hash-pepper"
+# 批量激活单包激活码数上限（主码 + 附加组件码）：一次 RSA 解封，逐码查库 / 绑定
+MAX_BATCH_CODES: int = 32
+
+# ==================== 离线授权令牌 ====================
+# 客户端在令牌到期前该时长内即尝试在线续期（失败时仍沿用未过期的令牌）
+LICENSE_TOKEN_REFRESH_SECONDS: int = 3 * 24 * 3600
+
+# ==================== 客户端硬件采集 ====================
+# 各来源并行采集的默认截止时间（秒，自采集开始起算）与整体预算；超时来源丢弃、按缺失处理
+HARDWARE_COLLECT_DEADLINES: dict[str, float] = {
+    "smbios": 2.0,
+    "storage_ioctl": 3.0,
+    "wmi": 5.0,
+}
+HARDWARE_COLLECT_BUDGET_SECONDS: float = 6.0
+# 原生表面已覆盖这么多核心类（cpu/board/bios/system_uuid）时，WMI 交叉源只按抽样率执行
+HARDWARE_CORE_TARGET: int = 4
+HARDWARE_CROSS_CHECK_RATE: float = 0.1
 
 # ==================== 网络 / 权威时间源 ====================
 REQUEST_TIMEOUT_SECONDS: int = 10  # HTTP 请求超时（秒）
@@ -23,3 +23,7 @@ class ActivationError(SealiumError):
 
 class ConfigError(SealiumError):
     """配置无效（缺失文件、非法取值等）。"""
+
+
+class BackendError(SealiumError):
+    """共享后端（Redis 等）通信或协议错误。"""
@@ -6,36 +6,107 @@
 :class:`RawSurface` 列表（尚未清洗 / 交叉验证）。清洗、多源交叉验证、spoof 计分
 在 :func:`cross_validate.scrub_and_score`。
 
-采集器各自 fail-soft（任一来源失败只跳过该来源）；非 Windows 抛 ``RuntimeError``。
+各来源在 :mod:`~sealium.common.hardware.runner` 中并行采集、各有截止时间：超时或
+失败只丢弃该来源（fail-soft）；非 Windows 抛 ``RuntimeError``。原生表面已覆盖核心类时，
+WMI 只按抽样率执行交叉验证（见 :class:`~sealium.common.hardware.runner.CollectorRegistry`）。
 """
 
 from __future__ import annotations
 
-from collections.abc import Callable
+import logging
+import os
+from collections.abc import Callable, Mapping
+from typing import Optional
 
+from sealium.common.constants import (
+    HARDWARE_COLLECT_BUDGET_SECONDS,
+    HARDWARE_COLLECT_DEADLINES,
+    HARDWARE_CORE_TARGET,
+    HARDWARE_CROSS_CHECK_RATE,
+)
 from sealium.common.hardware.cross_validate import scrub_and_score
-from sealium.common.hardware.native_surfaces import collect_native_surfaces
+from sealium.common.hardware.native_surfaces import (
+    collect_disk_ioctl_surfaces,
+    collect_smbios_surfaces,
+)
+from sealium.common.hardware.runner import CollectionReport, CollectorRegistry, CollectorSpec
 from sealium.common.hardware.types import RawSurface
 from sealium.common.hardware.wmi_surfaces import collect_wmi_surfaces
 
-__all__ = ["RawSurface", "collect_surfaces", "scrub_and_score"]
+__all__ = [
+    "CollectionReport",
+    "RawSurface",
+    "collect_surfaces",
+    "collect_surfaces_report",
+    "scrub_and_score",
+]
+
+logger = logging.getLogger("sealium.common.hardware")
 
 SurfacesCollector = Callable[[], list[RawSurface]]
 
+# 默认来源（预估耗时为实测前的排序依据）：SMBIOS 与磁盘 IOCTL 互不依赖，拆开并行
+DEFAULT_COLLECTORS: tuple[CollectorSpec, ...] = (
+    CollectorSpec("smbios", collect_smbios_surfaces, HARDWARE_COLLECT_DEADLINES["smbios"], 0.05),
+    CollectorSpec(
+        "storage_ioctl",
+        collect_disk_ioctl_surfaces,
+        HARDWARE_COLLECT_DEADLINES["storage_ioctl"],
+        0.3,
+    ),
+    CollectorSpec("wmi", collect_wmi_surfaces, HARDWARE_COLLECT_DEADLINES["wmi"], 2.0),
+)
+
+# 进程级注册表：跨多次采集累积各来源实测耗时
+_registry = CollectorRegistry(DEFAULT_COLLECTORS)
+
+
+def collect_surfaces_report(
+    *,
+    deadlines: Optional[Mapping[str, float]] = None,
+    budget: float = HARDWARE_COLLECT_BUDGET_SECONDS,
+    core_target: int = HARDWARE_CORE_TARGET,
+    cross_check_rate: float = HARDWARE_CROSS_CHECK_RATE,
+) -> CollectionReport:
+    """
+    采集默认来源，返回表面与逐来源状态（``ok`` / ``timeout`` / ``error`` / ``skipped``）。
+
+    :param deadlines: 按来源名（``smbios`` / ``storage_ioctl`` / ``wmi``）覆盖截止时间（秒）。
+    :param budget: 整体预算（秒），总耗时不超过它。
+    :param core_target: 原生表面覆盖这么多核心类即视为满足。
+    :param cross_check_rate: 满足时仍执行 WMI 交叉验证的概率；``1.0`` 为总是全量采集。
+    :raises RuntimeError: 非 Windows 平台。
+    """
+    if os.name != "nt":
+        raise RuntimeError("原生硬件采集仅支持 Windows 平台")
+    report = _registry.collect(
+        budget=budget,
+        deadlines=deadlines,
+        core_target=core_target,
+        cross_check_rate=cross_check_rate,
+    )
+    if report.timed_out:
+        logger.warning("硬件采集来源超时，按缺失处理: %s", ", ".join(report.timed_out))
+    return report
+
 
-def collect_surfaces() -> list[RawSurface]:
+def collect_surfaces(
+    *,
+    deadlines: Optional[Mapping[str, float]] = None,
+    budget: float = HARDWARE_COLLECT_BUDGET_SECONDS,
+    core_target: int = HARDWARE_CORE_TARGET,
+    cross_check_rate: float = HARDWARE_CROSS_CHECK_RATE,
+) -> list[RawSurface]:
     """
-    汇总原生 + WMI 全部表面（原始、未清洗）。非 Windows 抛 ``RuntimeError``。
+    汇总原生 + WMI 表面（原始、未清洗）。非 Windows 抛 ``RuntimeError``。
 
-    每个采集器独立 fail-soft：原生表面失败（非平台原因）只跳过、不阻断 WMI；
-    WMI 失败只跳过、不阻断原生。
+    来源并行执行、各自 fail-soft：任一来源失败或超时只丢弃该来源，不阻断其余来源。
+    自定义参数可用 ``functools.partial(collect_surfaces, deadlines=...)`` 注入
+    :func:`~sealium.common.machine_code.generate_machine_code`。
     """
-    surfaces: list[RawSurface] = []
-    for collector in (collect_native_surfaces, collect_wmi_surfaces):
-        try:
-            surfaces.extend(collector())
-        except RuntimeError:
-            raise  # 平台错误向上传播
-        except Exception:
-            pass  # 单个采集器故障：fail-soft
-    return surfaces
+    return collect_surfaces_report(
+        deadlines=deadlines,
+        budget=budget,
+        core_target=core_target,
+        cross_check_rate=cross_check_rate,
+    ).surfaces
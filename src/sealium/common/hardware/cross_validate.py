@@ -96,6 +96,20 @@ def is_placeholder(raw: str) -> bool:
     return False
 
 
+def source_priority(source: str) -> int:
+    """来源优先级（数字越小越可信）；未知来源排最后。"""
+    return _SOURCE_PRIORITY.get(source, 99)
+
+
+def core_categories(surfaces: list[RawSurface]) -> frozenset[str]:
+    """被有效值（非占位符）覆盖的核心类。"""
+    return frozenset(
+        sf.category
+        for sf in surfaces
+        if sf.category in _CORE_CATEGORIES and not is_placeholder(sf.raw)
+    )
+
+
 def scrub_and_score(surfaces: list[RawSurface]) -> tuple[list[RawSurface], float]:
     """
     清洗原始表面值并计算 spoof 分。
@@ -125,7 +139,7 @@ def scrub_and_score(surfaces: list[RawSurface]) -> tuple[list[RawSurface], float
             # 多源不一致 → 强 spoof 信号
             spoof = min(spoof + 0.25, 1.0)
         # 选代表：来源优先级（原生优先）
-        entries.sort(key=lambda se: _SOURCE_PRIORITY.get(se[0], 99))
+        entries.sort(key=lambda se: source_priority(se[0]))
         rep_source, rep_raw = entries[0]
         result.append(
             RawSurface(category=category, raw=rep_raw, source=rep_source, slot=slot)
@@ -21,6 +21,7 @@ import os
 import struct
 import uuid as _uuid
 from ctypes import wintypes
+from typing import Protocol
 
 from sealium.common.hardware.types import RawSurface
 
@@ -75,37 +76,79 @@ def _get_raw_smbios() -> bytes:
     got = _kernel32.GetSystemFirmwareTable(_RSMB, 0, buf, size)
     if got <= 0:
         return b""
-    return bytes(buf[:got])
+    return ctypes.string_at(buf, min(got, size))
 
 
-def _iter_smbios_structures(table: bytes):
-    """遍历 SMBIOS 表，逐个 yield ``(type, formatted_bytes, strings_list)``。"""
+class _Strings(Protocol):
+    """结构的 string-set：按 0-based 下标取串（:class:`_StringSet` 或普通 ``list``）。"""
+
+    def __len__(self) -> int: ...
+
+    def __getitem__(self, i: int, /) -> str: ...
+
+
+class _StringSet:
+    """结构的 string-set 视图：按需定位与解码，未被引用的串不切片、不解码。"""
+
+    __slots__ = ("_data", "_start", "_end", "_bounds")
+
+    def __init__(self, data: bytes, start: int, end: int) -> None:
+        self._data = data
+        self._start = start
+        self._end = end
+        self._bounds: list[tuple[int, int]] | None = None
+
+    def _index(self) -> list[tuple[int, int]]:
+        if self._bounds is None:
+            bounds = []
+            data, pos, end = self._data, self._start, self._end
+            while pos < end:
+                nul = data.find(b"\x00", pos, end)
+                if nul < 0:
+                    nul = end
+                bounds.append((pos, nul))
+                pos = nul + 1
+            self._bounds = bounds
+        return self._bounds
+
+    def __len__(self) -> int:
+        return len(self._index())
+
+    def __getitem__(self, i: int) -> str:
+        start, end = self._index()[i]
+        return self._data[start:end].decode("latin-1")
+
+
+def _iter_smbios_structures(table: bytes, types: frozenset[int] | None = None):
+    """
+    单遍遍历 SMBIOS 表，逐个 yield ``(type, formatted, strings)``。
+
+    ``formatted`` 是原表上的 ``memoryview`` 切片（零拷贝），``strings`` 是惰性的
+    :class:`_StringSet`；string-set 终止符用 ``bytes.find`` 定位。给定 ``types`` 时
+    其余类型的结构只跳过、不构造任何对象。
+    """
+    data = table if isinstance(table, bytes) else bytes(table)
+    view = memoryview(data)
     i = 0
-    n = len(table)
+    n = len(data)
     while i + 4 <= n:
-        stype = table[i]
-        flen = table[i + 1]  # SMBIOS Length：formatted area 字节数（单字节，offset 1）
+        stype = data[i]
+        flen = data[i + 1]  # SMBIOS Length：formatted area 字节数（单字节，offset 1）
         if flen < 4:
             break
-        formatted = table[i : i + flen]
-        # string-set：从 i+flen 到 \x00\x00 终止符
+        # string-set：从 i+flen 到 \x00\x00 终止符；缺终止符（截断表）时取到表尾前一字节
         j = i + flen
-        end = j
-        while end + 1 < n:
-            if table[end] == 0 and table[end + 1] == 0:
-                break
-            end += 1
-        blob = table[j:end]
-        strings = (
-            [s.decode("latin-1") for s in blob.split(b"\x00")] if blob else []
-        )
-        yield stype, formatted, strings
+        end = data.find(b"\x00\x00", j) if j < n else -1
+        if end < 0:
+            end = max(n - 1, j)
+        if types is None or stype in types:
+            yield stype, view[i : i + flen], _StringSet(data, j, end)
         i = end + 2  # 跳过 \x00\x00
         if stype == 127:  # end-of-table marker
             break
 
 
-def _string_at(formatted: bytes, strings: list[str], offset: int) -> str | None:
+def _string_at(formatted: bytes | memoryview, strings: _Strings, offset: int) -> str | None:
     """``offset`` 处的 1-based 字符串索引 → 对应字符串；越界/空返回 None。"""
     if offset >= len(formatted):
         return None
@@ -116,7 +159,7 @@ def _string_at(formatted: bytes, strings: list[str], offset: int) -> str | None:
     return val or None
 
 
-def _uuid_from(formatted: bytes) -> str | None:
+def _uuid_from(formatted: bytes | memoryview) -> str | None:
     """Type1 UUID（offset 8, 16 bytes, mixed-endian）→ 标准字符串。全0/全F 视无效。"""
     if len(formatted) < 24:
         return None
@@ -129,7 +172,7 @@ def _uuid_from(formatted: bytes) -> str | None:
         return None
 
 
-def _processor_id(formatted: bytes) -> str | None:
+def _processor_id(formatted: bytes | memoryview) -> str | None:
     """Type4 ProcessorID（offset 8, 8 bytes）→ 大写 hex，与 WMI Win32_Processor.ProcessorId 一致。
 
     SMBIOS 存为 QWORD：低 DWORD = EAX、高 DWORD = EDX（均 little-endian）；而 WMI
@@ -137,17 +180,20 @@ def _processor_id(formatted: bytes) -> str | None:
     """
     if len(formatted) < 16:
         return None
-    eax = int.from_bytes(bytes(formatted[8:12]), "little")
-    edx = int.from_bytes(bytes(formatted[12:16]), "little")
+    eax, edx = struct.unpack_from("<II", formatted, 8)
     if eax == 0 and edx == 0:
         return None
     return f"{edx:08X}{eax:08X}"
 
 
+# 指纹用到的结构类型（其余如 Type17 内存条、Type9 插槽占表的大多数，直接跳过）
+_SMBIOS_TYPES = frozenset({0, 1, 2, 3, 4})
+
+
 def _parse_smbios(table: bytes) -> list[RawSurface]:
     """解析 SMBIOS 表，产出 bios/system_uuid/board/chassis/cpu 原生表面。"""
     surfaces: list[RawSurface] = []
-    for stype, formatted, strings in _iter_smbios_structures(table):
+    for stype, formatted, strings in _iter_smbios_structures(table, _SMBIOS_TYPES):
         try:
             if stype == 0:  # BIOS Information（bios 由原生独占）
                 vendor = _string_at(formatted, strings, 4) or ""
@@ -184,12 +230,16 @@ def collect_smbios_surfaces() -> list[RawSurface]:
         raw = _get_raw_smbios()
     except Exception:
         return []
+    return _parse_raw_smbios(raw)
+
+
+def _parse_raw_smbios(raw: bytes) -> list[RawSurface]:
+    """解析 ``GetSystemFirmwareTable('RSMB')`` 的完整返回（RawSMBIOSData 头 + 表）。"""
     if len(raw) < 8:
         return []
     # RawSMBIOSData 头 8 字节（Used/Major/Minor/Rev/Length(DWORD)），其后是表数据
     length = struct.unpack_from("<I", raw, 4)[0]
-    table = raw[8 : 8 + length]
-    return _parse_smbios(table)
+    return _parse_smbios(raw[8 : 8 + length])
 
 
 # ===========================================================================
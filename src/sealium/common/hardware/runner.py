@@ -0,0 +1,215 @@
+# src/sealium/common/hardware/runner.py
+"""
+采集器并行调度：每个来源一个守护线程，各自有截止时间，整体受预算封顶。
+
+串行执行时总耗时是各来源之和，且任一来源挂起（如 WMI provider 无响应）会让客户端
+启动永远卡住。这里把采集器同时启动，按「自采集开始起算」的截止时间逐个等待：
+
+* 总耗时 = 最慢的按时来源，且不超过 ``budget``；
+* 超时的来源标记为 ``timeout``、其结果丢弃（线程是守护线程，挂死也不阻塞进程退出）；
+* 抛异常的来源标记为 ``error``（fail-soft），但 ``RuntimeError``（平台不支持）照旧上抛。
+
+按时返回的部分结果照常交给 :func:`~sealium.common.hardware.cross_validate.scrub_and_score`：
+缺一个来源只是少了交叉验证，不计 spoof 分。
+
+:class:`CollectorRegistry` 在此之上做自适应调度：先并行跑高优先级来源（原生表面），
+核心类已被覆盖时跳过最慢、最不可信的交叉源（WMI），只按 ``cross_check_rate`` 抽样执行
+交叉验证；未覆盖时再补跑。各来源的实测耗时（指数滑动平均）决定同层内的启动顺序。
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sealium.common.hardware.cross_validate import core_categories, source_priority
+from sealium.common.hardware.types import RawSurface
+
+STATUS_OK = "ok"
+STATUS_TIMEOUT = "timeout"
+STATUS_ERROR = "error"
+STATUS_SKIPPED = "skipped"
+
+# 可信度不高于 WMI 的来源视为交叉源：核心类已覆盖时可按抽样率跳过
+_CROSS_CHECK_PRIORITY = source_priority("wmi")
+# 实测耗时的指数滑动平均系数
+_EWMA_ALPHA = 0.3
+
+
+@dataclass(frozen=True)
+class CollectorSpec:
+    """一个采集来源。
+
+    :param name: 来源名（与 :class:`RawSurface` 的 ``source`` 对应，用于报告）。
+    :param collect: 采集函数；非 Windows 等平台错误抛 ``RuntimeError``。
+    :param deadline: 截止时间（秒，自本轮采集开始起算）。
+    :param cost: 预估耗时（秒）；尚无实测时的排序依据。
+    """
+
+    name: str
+    collect: Callable[[], list[RawSurface]]
+    deadline: float
+    cost: float = 0.0
+
+
+@dataclass(frozen=True)
+class CollectionReport:
+    """一轮采集的结果：按时来源的表面 + 每个来源的状态与耗时。"""
+
+    surfaces: list[RawSurface]
+    status: dict[str, str] = field(default_factory=dict)
+    elapsed: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def timed_out(self) -> tuple[str, ...]:
+        """超时被丢弃的来源。"""
+        return tuple(name for name, st in self.status.items() if st == STATUS_TIMEOUT)
+
+
+class _Outcome:
+    __slots__ = ("surfaces", "error", "elapsed")
+
+    def __init__(self) -> None:
+        self.surfaces: list[RawSurface] = []
+        self.error: Optional[BaseException] = None
+        self.elapsed = 0.0
+
+
+def _run(spec: CollectorSpec, outcome: _Outcome) -> None:
+    start = time.perf_counter()
+    try:
+        outcome.surfaces = list(spec.collect())
+    except BaseException as e:  # noqa: BLE001 - 由调度方按类型处理
+        outcome.error = e
+    outcome.elapsed = time.perf_counter() - start
+
+
+def run_collectors(
+    specs: Iterable[CollectorSpec],
+    *,
+    budget: float,
+    deadlines: Optional[Mapping[str, float]] = None,
+) -> CollectionReport:
+    """
+    并行运行采集器并收集按时返回的结果。
+
+    :param specs: 采集来源。
+    :param budget: 整体预算（秒）；任何来源的等待都不超过它。
+    :param deadlines: 按来源名覆盖 ``spec.deadline``。
+    :raises RuntimeError: 任一按时返回的来源报告平台不支持。
+    """
+    overrides = deadlines or {}
+    start = time.monotonic()
+    running: list[tuple[CollectorSpec, threading.Thread, _Outcome]] = []
+    for spec in specs:
+        outcome = _Outcome()
+        thread = threading.Thread(
+            target=_run,
+            args=(spec, outcome),
+            name=f"sealium-collect-{spec.name}",
+            daemon=True,
+        )
+        thread.start()
+        running.append((spec, thread, outcome))
+
+    surfaces: list[RawSurface] = []
+    status: dict[str, str] = {}
+    elapsed: dict[str, float] = {}
+    for spec, thread, outcome in running:
+        deadline = min(overrides.get(spec.name, spec.deadline), budget)
+        thread.join(max(deadline - (time.monotonic() - start), 0.0))
+        if thread.is_alive():
+            status[spec.name] = STATUS_TIMEOUT
+            elapsed[spec.name] = time.monotonic() - start
+            continue
+        elapsed[spec.name] = outcome.elapsed
+        if isinstance(outcome.error, RuntimeError):
+            raise outcome.error  # 平台错误向上传播
+        if outcome.error is not None:
+            status[spec.name] = STATUS_ERROR
+            continue
+        status[spec.name] = STATUS_OK
+        surfaces.extend(outcome.surfaces)
+    return CollectionReport(surfaces=surfaces, status=status, elapsed=elapsed)
+
+
+def _merge(reports: Iterable[CollectionReport]) -> CollectionReport:
+    merged = CollectionReport(surfaces=[])
+    for report in reports:
+        merged.surfaces.extend(report.surfaces)
+        merged.status.update(report.status)
+        merged.elapsed.update(report.elapsed)
+    return merged
+
+
+class CollectorRegistry:
+    """带代价元数据与实测耗时的来源注册表（线程安全）。"""
+
+    def __init__(self, specs: Iterable[CollectorSpec]) -> None:
+        self._specs = {spec.name: spec for spec in specs}
+        self._lock = threading.Lock()
+        self._timings: dict[str, float] = {}
+
+    def timings(self) -> dict[str, float]:
+        """各来源的实测耗时（秒，指数滑动平均；未跑过的来源取预估 ``cost``）。"""
+        with self._lock:
+            return {name: self._timings.get(name, spec.cost) for name, spec in self._specs.items()}
+
+    def ordered(self) -> list[CollectorSpec]:
+        """按（来源优先级，实测耗时）排序：可信且便宜的先启动。"""
+        timings = self.timings()
+        return sorted(
+            self._specs.values(), key=lambda spec: (source_priority(spec.name), timings[spec.name])
+        )
+
+    def record(self, report: CollectionReport) -> None:
+        """把一轮采集的耗时计入滑动平均（超时来源按已等待时长计）。"""
+        with self._lock:
+            for name, elapsed in report.elapsed.items():
+                if name not in self._specs:
+                    continue
+                previous = self._timings.get(name)
+                self._timings[name] = (
+                    elapsed if previous is None else _EWMA_ALPHA * elapsed + (1 - _EWMA_ALPHA) * previous
+                )
+
+    def collect(
+        self,
+        *,
+        budget: float,
+        deadlines: Optional[Mapping[str, float]] = None,
+        core_target: int,
+        cross_check_rate: float,
+        rng: Callable[[], float] = random.random,
+    ) -> CollectionReport:
+        """
+        自适应采集：高优先级来源覆盖了 ``core_target`` 个核心类时，交叉源只按
+        ``cross_check_rate`` 的概率执行，其余标记为 ``skipped``。
+
+        :param budget: 整体预算（秒），两阶段共享。
+        :param deadlines: 按来源名覆盖截止时间（自各阶段开始起算）。
+        :param core_target: 视为「已满足」的核心类数量。
+        :param cross_check_rate: 满足时仍执行交叉验证的概率（``1.0`` 即总是全量采集）。
+        :param rng: ``[0, 1)`` 随机数来源（测试可注入）。
+        """
+        specs = self.ordered()
+        primary = [spec for spec in specs if source_priority(spec.name) < _CROSS_CHECK_PRIORITY]
+        cross = [spec for spec in specs if source_priority(spec.name) >= _CROSS_CHECK_PRIORITY]
+        start = time.monotonic()
+        first = run_collectors(primary, budget=budget, deadlines=deadlines)
+        reports = [first]
+        satisfied = len(core_categories(first.surfaces)) >= core_target
+        if cross and satisfied and rng() >= cross_check_rate:
+            reports.append(
+                CollectionReport(surfaces=[], status={spec.name: STATUS_SKIPPED for spec in cross})
+            )
+        elif cross:
+            remaining = max(budget - (time.monotonic() - start), 0.0)
+            reports.append(run_collectors(cross, budget=remaining, deadlines=deadlines))
+        report = _merge(reports)
+        self.record(report)
+        return report
@@ -29,12 +29,22 @@ def _digits(value: str) -> str:
 
 
 def collect_wmi_surfaces() -> list[RawSurface]:
-    """通过 WMI 采集多表面硬件标识符（仅 Windows）。"""
+    """通过 WMI 采集多表面硬件标识符（仅 Windows；可在任意线程调用）。"""
     if os.name != "nt":
         raise RuntimeError("WMI 采集仅支持 Windows 平台")
 
+    import pythoncom  # 随 pywin32（wmi 的依赖）安装
     import wmi  # 惰性导入，避免在非 Windows / 测试环境顶层失败
 
+    # 并行采集时运行在工作线程：COM 须按线程初始化
+    pythoncom.CoInitialize()
+    try:
+        return _query_surfaces(wmi)
+    finally:
+        pythoncom.CoUninitialize()
+
+
+def _query_surfaces(wmi) -> list[RawSurface]:
     c = wmi.WMI()
     surfaces: list[RawSurface] = []
 
@@ -0,0 +1,198 @@
+# src/sealium/common/license_token.py
+"""
+离线授权令牌：服务端 Ed25519 签发、客户端本地验签。
+
+激活成功时服务端附带一枚令牌，绑定激活码摘要、机器指纹、功能列表与有效期；客户端
+持久化后，启动时只需本地验签 + :func:`~sealium.common.fingerprint.matches` 比对即可
+确认授权，无需访问时间戳 API 与激活服务，令牌临近到期或指纹不再匹配时才回到在线激活。
+
+令牌格式（ASCII，紧凑）::
+
+    slt1.<base64url(payload JSON)>.<base64url(Ed25519 签名)>
+
+签名覆盖 ``slt1.<payload>`` 整段（含版本前缀）。payload 为确定性 JSON：
+
+* ``c``：激活码摘要（SHA-256 前 16 字节十六进制，客户端可据明文码自行计算比对）；
+* ``m``：机器指纹（逐分量哈希，与 wire 格式相同——本地比对是模糊匹配，单一摘要不够）；
+* ``f`` / ``u``：功能列表 / 授权截止日期（与 :class:`ActivationResponse` 同义）；
+* ``iat`` / ``exp``：签发 / 令牌到期的 Unix 时间戳（秒）。
+
+签名私钥只在服务端；客户端随发行包分发公钥（与 RSA 公钥同理）。
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+
+from sealium.common.exceptions import CryptoError
+from sealium.common.fingerprint import MachineFingerprint
+
+_PREFIX = "slt1"
+
+
+def code_digest(activation_code: str) -> str:
+    """激活码摘要：SHA-256 前 16 字节的十六进制（令牌与本地存储的查找键）。"""
+    return hashlib.sha256(activation_code.encode("utf-8")).hexdigest()[:32]
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+@dataclass(frozen=True)
+class LicenseToken:
+    """令牌载荷（验签通过后才构造）。"""
+
+    code_digest: str
+    machine_code: MachineFingerprint
+    features: tuple[str, ...]
+    authorized_until: str
+    issued_at: int
+    expires_at: int
+
+    def covers(self, activation_code: str) -> bool:
+        """令牌是否签发给该激活码。"""
+        return self.code_digest == code_digest(activation_code)
+
+    def to_payload(self) -> bytes:
+        return json.dumps(
+            {
+                "c": self.code_digest,
+                "m": self.machine_code.to_dict(),
+                "f": list(self.features),
+                "u": self.authorized_until,
+                "iat": self.issued_at,
+                "exp": self.expires_at,
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    @classmethod
+    def from_payload(cls, payload: bytes) -> LicenseToken:
+        """
+        解析 payload，严格校验字段类型。
+
+        :raises ValueError: 非法 JSON / 缺字段 / 类型不符。
+        """
+        data = json.loads(payload.decode("utf-8"))
+        if not isinstance(data, dict):
+            raise ValueError("令牌载荷必须是 JSON 对象")
+        try:
+            digest, machine, features = data["c"], data["m"], data["f"]
+            until, issued_at, expires_at = data["u"], data["iat"], data["exp"]
+        except KeyError as exc:
+            raise ValueError(f"令牌缺少字段: {exc.args[0]}") from exc
+        if not (isinstance(digest, str) and isinstance(until, str)):
+            raise ValueError("令牌字段类型非法")
+        if not (isinstance(features, list) and all(isinstance(f, str) for f in features)):
+            raise ValueError("令牌 features 必须是字符串数组")
+        if not all(type(v) is int for v in (issued_at, expires_at)):
+            raise ValueError("令牌时间戳必须为整数")
+        return cls(
+            code_digest=digest,
+            machine_code=MachineFingerprint.from_dict(machine),
+            features=tuple(features),
+            authorized_until=until,
+            issued_at=issued_at,
+            expires_at=expires_at,
+        )
+
+
+class LicenseVerifier:
+    """令牌验签器（仅持公钥，客户端使用）。"""
+
+    def __init__(self, public_key: ed25519.Ed25519PublicKey) -> None:
+        self._public_key = public_key
+
+    @classmethod
+    def from_public_key_pem(cls, pem_data: Union[bytes, str]) -> LicenseVerifier:
+        """从 PEM 数据加载 Ed25519 公钥。"""
+        if isinstance(pem_data, str):
+            pem_data = pem_data.encode("utf-8")
+        public_key = serialization.load_pem_public_key(pem_data)
+        if not isinstance(public_key, ed25519.Ed25519PublicKey):
+            raise CryptoError("提供的 PEM 数据不是 Ed25519 公钥")
+        return cls(public_key)
+
+    def verify(self, token: str) -> LicenseToken:
+        """
+        验签并解析令牌（不判断是否过期，到期由调用方按自己的时钟判定）。
+
+        :raises CryptoError: 格式错误或签名无效。
+        """
+        try:
+            prefix, payload_b64, signature_b64 = token.split(".")
+            if prefix != _PREFIX:
+                raise ValueError(f"不支持的令牌版本: {prefix!r}")
+            signature = _b64decode(signature_b64)
+            self._public_key.verify(signature, f"{prefix}.{payload_b64}".encode("ascii"))
+            return LicenseToken.from_payload(_b64decode(payload_b64))
+        except InvalidSignature as e:
+            raise CryptoError("令牌签名无效") from e
+        except (ValueError, UnicodeError, binascii.Error, AttributeError) as e:
+            raise CryptoError(f"令牌格式无效: {e}") from e
+
+    def export_public_key(self) -> bytes:
+        """导出公钥（PEM）。"""
+        return self._public_key.public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+
+
+class LicenseSigner(LicenseVerifier):
+    """令牌签发器（持私钥，服务端使用；同时可验签）。"""
+
+    def __init__(self, private_key: ed25519.Ed25519PrivateKey) -> None:
+        super().__init__(private_key.public_key())
+        self._private_key = private_key
+
+    @classmethod
+    def generate(cls) -> LicenseSigner:
+        """生成新的 Ed25519 签名密钥。"""
+        return cls(ed25519.Ed25519PrivateKey.generate())
+
+    @classmethod
+    def from_private_key_pem(
+        cls, pem_data: Union[bytes, str], password: Optional[bytes] = None
+    ) -> LicenseSigner:
+        """从 PEM 数据加载 Ed25519 私钥（可选口令加密）。"""
+        if isinstance(pem_data, str):
+            pem_data = pem_data.encode("utf-8")
+        private_key = serialization.load_pem_private_key(pem_data, password=password)
+        if not isinstance(private_key, ed25519.Ed25519PrivateKey):
+            raise CryptoError("提供的 PEM 数据不是 Ed25519 私钥")
+        return cls(private_key)
+
+    def sign(self, token: LicenseToken) -> str:
+        """签发令牌字符串。"""
+        signed = f"{_PREFIX}.{_b64encode(token.to_payload())}"
+        signature = self._private_key.sign(signed.encode("ascii"))
+        return f"{signed}.{_b64encode(signature)}"
+
+    def export_private_key(
+        self,
+        encryption_algorithm: Optional[serialization.KeySerializationEncryption] = None,
+    ) -> bytes:
+        """导出私钥（PKCS8 PEM，可选加密）。"""
+        if encryption_algorithm is None:
+            encryption_algorithm = serialization.NoEncryption()
+        return self._private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=encryption_algorithm,
+        )
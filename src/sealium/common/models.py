@@ -9,6 +9,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from enum import IntEnum
 
+from sealium.common.constants import MAX_BATCH_CODES
 from sealium.common.fingerprint import MachineFingerprint
 
 
@@ -118,33 +119,11 @@ class ActivationRequest:
 
         try:
             code = data["activation_code"]
-            machine_raw = data["machine_code"]
-            timestamp = data["timestamp"]
-            nonce = data["nonce"]
         except KeyError as exc:
             raise ValueError(f"缺少必填字段: {exc.args[0]}") from exc
-
         if not (isinstance(code, str) and code):
             raise ValueError("activation_code 必须为非空字符串")
-        if not isinstance(machine_raw, dict):
-            raise ValueError("machine_code 必须是指纹对象")
-        try:
-            machine = MachineFingerprint.from_dict(machine_raw)
-        except ValueError as e:
-            raise ValueError(f"machine_code 非法: {e}") from e
-        if not (isinstance(nonce, str) and nonce):
-            raise ValueError("nonce 必须为非空字符串")
-
-        # timestamp 必须为整数；兼容纯数字字符串（防御性转换），排除 bool。
-        if isinstance(timestamp, bool):
-            raise ValueError("timestamp 必须为整数")
-        if isinstance(timestamp, int):
-            pass
-        elif isinstance(timestamp, str) and timestamp.lstrip("-").isdigit():
-            timestamp = int(timestamp)
-        else:
-            raise ValueError("timestamp 必须为整数")
-
+        machine, timestamp, nonce = _parse_envelope(data)
         return cls(
             activation_code=code,
             machine_code=machine,
@@ -153,6 +132,104 @@ class ActivationRequest:
         )
 
 
+def _parse_envelope(data: dict) -> tuple[MachineFingerprint, int, str]:
+    """校验单码 / 批量请求共有的 ``machine_code`` / ``timestamp`` / ``nonce``。"""
+    try:
+        machine_raw = data["machine_code"]
+        timestamp = data["timestamp"]
+        nonce = data["nonce"]
+    except KeyError as exc:
+        raise ValueError(f"缺少必填字段: {exc.args[0]}") from exc
+
+    if not isinstance(machine_raw, dict):
+        raise ValueError("machine_code 必须是指纹对象")
+    try:
+        machine = MachineFingerprint.from_dict(machine_raw)
+    except ValueError as e:
+        raise ValueError(f"machine_code 非法: {e}") from e
+    if not (isinstance(nonce, str) and nonce):
+        raise ValueError("nonce 必须为非空字符串")
+
+    # timestamp 必须为整数；兼容纯数字字符串（防御性转换），排除 bool。
+    if isinstance(timestamp, bool):
+        raise ValueError("timestamp 必须为整数")
+    if isinstance(timestamp, int):
+        pass
+    elif isinstance(timestamp, str) and timestamp.lstrip("-").isdigit():
+        timestamp = int(timestamp)
+    else:
+        raise ValueError("timestamp 必须为整数")
+
+    return machine, timestamp, nonce
+
+
+@dataclass
+class BatchActivationRequest:
+    """
+    批量激活请求（解密后的明文）：同一台机器一次激活多个码（主码 + 附加组件码）。
+
+    所有码共享一份 ``machine_code`` / ``timestamp`` / ``nonce``，整包只做一次 RSA 解封；
+    服务端逐码给出结果，顺序与 ``activation_codes`` 一致。
+    """
+
+    activation_codes: list[str]
+    machine_code: MachineFingerprint
+    timestamp: int
+    nonce: str
+
+    def items(self) -> list[ActivationRequest]:
+        """拆成逐码的单码请求（共享 nonce / 时间戳 / 指纹），供服务端逐项判定。"""
+        return [
+            ActivationRequest(
+                activation_code=code,
+                machine_code=self.machine_code,
+                timestamp=self.timestamp,
+                nonce=self.nonce,
+            )
+            for code in self.activation_codes
+        ]
+
+    def to_dict(self) -> dict:
+        return {
+            "activation_codes": list(self.activation_codes),
+            "machine_code": _machine_id_to_wire(self.machine_code),
+            "timestamp": self.timestamp,
+            "nonce": self.nonce,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> BatchActivationRequest:
+        """
+        从字典创建实例，校验规则与 :meth:`ActivationRequest.from_dict` 一致。
+
+        ``activation_codes`` 须为 1..``MAX_BATCH_CODES`` 个互不重复的非空字符串。
+
+        :raises ValueError: 字段缺失、类型非法或格式不合法时抛出。
+        """
+        if not isinstance(data, dict):
+            raise ValueError("请求体必须是 JSON 对象")
+
+        try:
+            codes = data["activation_codes"]
+        except KeyError as exc:
+            raise ValueError(f"缺少必填字段: {exc.args[0]}") from exc
+        if not isinstance(codes, list) or not codes:
+            raise ValueError("activation_codes 必须为非空数组")
+        if len(codes) > MAX_BATCH_CODES:
+            raise ValueError(f"activation_codes 最多 {MAX_BATCH_CODES} 个")
+        if not all(isinstance(code, str) and code for code in codes):
+            raise ValueError("activation_codes 的每一项必须为非空字符串")
+        if len(set(codes)) != len(codes):
+            raise ValueError("activation_codes 不能包含重复的激活码")
+        machine, timestamp, nonce = _parse_envelope(data)
+        return cls(
+            activation_codes=codes,
+            machine_code=machine,
+            timestamp=timestamp,
+            nonce=nonce,
+        )
+
+
 @dataclass
 class ActivationResponse:
     """服务端返回的激活响应（加密前的明文）。"""
@@ -162,10 +239,15 @@ class ActivationResponse:
     features: list[str] | None = None  # 授权功能列表
     nonce: str | None = None  # 回显客户端 nonce（防篡改）
     error_msg: str | None = None  # 错误信息（result 为 error 时）
+    token: str | None = None  # 离线授权令牌（服务端启用 [license_token] 时随成功响应下发）
 
     @classmethod
     def success(
-        cls, authorized_until: str, features: list[str], nonce: str
+        cls,
+        authorized_until: str,
+        features: list[str],
+        nonce: str | None,
+        token: str | None = None,
     ) -> ActivationResponse:
         """创建成功响应。"""
         return cls(
@@ -173,6 +255,7 @@ class ActivationResponse:
             authorized_until=authorized_until,
             features=features,
             nonce=nonce,
+            token=token,
         )
 
     @classmethod
@@ -190,6 +273,8 @@ class ActivationResponse:
             data["nonce"] = self.nonce
         if self.error_msg is not None:
             data["error_msg"] = self.error_msg
+        if self.token is not None:
+            data["token"] = self.token
         return data
 
     @classmethod
@@ -200,4 +285,31 @@ class ActivationResponse:
             features=data.get("features"),
             nonce=data.get("nonce"),
             error_msg=data.get("error_msg"),
+            token=data.get("token"),
+        )
+
+
+@dataclass
+class BatchActivationResponse:
+    """批量激活响应（加密前的明文）：``results`` 与请求中的 ``activation_codes`` 一一对应。"""
+
+    results: list[ActivationResponse]
+    nonce: str | None = None  # 回显客户端 nonce（整包防篡改）
+
+    @property
+    def succeeded(self) -> bool:
+        """是否每一项都激活成功。"""
+        return all(item.result == "success" for item in self.results)
+
+    def to_dict(self) -> dict:
+        data: dict = {"results": [item.to_dict() for item in self.results]}
+        if self.nonce is not None:
+            data["nonce"] = self.nonce
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> BatchActivationResponse:
+        return cls(
+            results=[ActivationResponse.from_dict(item) for item in data["results"]],
+            nonce=data.get("nonce"),
         )
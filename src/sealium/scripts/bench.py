@@ -0,0 +1,490 @@
+# src/sealium/scripts/bench.py
+"""
+激活服务端到端压测工具：给定配置下的吞吐与尾延迟，可跨版本对比。
+
+流程：
+
+1. 在临时库（进程内模式）或 ``--db`` 指定的服务端库（HTTP 模式）中写入 ``--codes`` 个
+   激活码，其中 ``--bound-ratio`` 比例预先绑定到合成指纹；
+2. 用 :class:`~sealium.client.key_manager.ClientKeyManager` **离线**预构建全部加密请求包
+   （RSA 公钥加密不计入压测时间）；
+3. 按 ``--mix`` 比例混合四类场景，以 ``--concurrency`` 并发驱动：
+
+   * ``new``        未使用码首次绑定（成功）；
+   * ``reactivate`` 已绑定码同机重激活（幂等成功，走 ``matches``）；
+   * ``unknown``    不存在的随机码（业务错误）；
+   * ``replay``     逐字节重放已发送过的包（RSA 前重复包过滤，400）；
+
+4. 输出 JSON：总吞吐、各场景请求数 / 不符合预期数 / p50 / p99 / p999（毫秒）；另按状态码
+   计数，并把被过载保护直接拒绝（``503``）的请求与被接受的请求分开统计速率与延迟。
+
+进程内模式直接以 ASGI 调用 :func:`~sealium.server.app.create_app`（不经网络栈，度量应用
+自身开销，沿用当前 ``sealium.toml`` / ``SEALIUM_*`` 配置，限流默认关闭）；``--url`` 时经
+HTTP 打到运行中的服务端（线程池 + ``requests``；加 ``--unix-socket`` 则经 Unix 域套接字）。
+
+    python -m sealium.scripts.bench --codes 2000 --requests 5000 --concurrency 16
+    python -m sealium.scripts.bench --mix new=1 --key-bits 2048 --output bench.json
+    python -m sealium.scripts.bench --url http://127.0.0.1:8000/v1/activation \\
+        --public-key keys/server_public.pem --db data/activation.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from sealium import __version__
+from sealium.client.key_manager import ClientKeyManager
+from sealium.client.transport import UnixSocketPoster
+from sealium.common.constants import CODE_HASH_PEPPER_DEFAULT, RSA_KEY_SIZE
+from sealium.common.crypto import RSAEncryptor, hash_activation_code
+from sealium.common.fingerprint import Component, MachineFingerprint
+from sealium.common.models import ActivationCode, ActivationRequest, ActivationStatus
+from sealium.scripts.generate_activation_codes import generate_activation_code
+from sealium.server.config import ServerConfig, get_config
+from sealium.server.database import ActivationCodeStorage, SQLiteDatabase
+from sealium.server.metrics import LatencyHistogram
+
+SCENARIOS = ("new", "reactivate", "unknown", "replay")
+DEFAULT_MIX = "new=0.3,reactivate=0.4,unknown=0.2,replay=0.1"
+
+
+@dataclass
+class _Packet:
+    scenario: str
+    body: bytes
+    key_manager: ClientKeyManager
+    nonce: str
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """解析 ``new=0.3,reactivate=0.4,...``；权重归一化，未列出的场景为 0。"""
+    mix: dict[str, float] = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"未知场景: {name}（可选 {', '.join(SCENARIOS)}）")
+        mix[name] = float(weight) if weight else 1.0
+    total = sum(mix.values())
+    if total <= 0 or any(w < 0 for w in mix.values()):
+        raise ValueError("场景权重必须非负且不全为 0")
+    return {name: mix.get(name, 0.0) / total for name in SCENARIOS}
+
+
+def _fingerprint(seed: str) -> MachineFingerprint:
+    """合成指纹：核心分量由 ``seed`` 决定，可复现。"""
+    value = f"bench-{seed}"
+    return MachineFingerprint(
+        components=tuple(
+            Component(name, value, True) for name in ("cpu", "board", "bios", "system_uuid")
+        )
+    )
+
+
+def seed_codes(
+    storage: ActivationCodeStorage, count: int, bound_ratio: float
+) -> tuple[list[str], list[tuple[str, MachineFingerprint]]]:
+    """写入 ``count`` 个激活码；返回 ``(未使用码, [(已绑定码, 指纹)])``。"""
+    bound_count = int(count * bound_ratio)
+    unused: list[str] = []
+    bound: list[tuple[str, MachineFingerprint]] = []
+    for i in range(count):
+        code = generate_activation_code()
+        if i < bound_count:
+            fp = _fingerprint(code)
+            storage.create(
+                ActivationCode(
+                    activation_code=code,
+                    status=ActivationStatus.USED,
+                    bound_machine_code=fp,
+                )
+            )
+            bound.append((code, fp))
+        else:
+            storage.create(ActivationCode(activation_code=code, status=ActivationStatus.UNUSED))
+            unused.append(code)
+    return unused, bound
+
+
+def _build(public_pem: str, scenario: str, code: str, fp: MachineFingerprint) -> _Packet:
+    nonce = secrets.token_hex(16)
+    request = ActivationRequest(
+        activation_code=code, machine_code=fp, timestamp=int(time.time()), nonce=nonce
+    )
+    km = ClientKeyManager(public_pem)
+    body = km.build_encrypted_request(json.dumps(request.to_dict()).encode("utf-8"))
+    return _Packet(scenario, body, km, nonce)
+
+
+def build_packets(
+    public_pem: str,
+    counts: dict[str, int],
+    unused: list[str],
+    bound: list[tuple[str, MachineFingerprint]],
+    rng: random.Random,
+) -> tuple[list[_Packet], list[_Packet]]:
+    """
+    离线预构建请求包，返回 ``(预热包, 压测包)``（压测包已按场景打散）。
+
+    预热包为 ``replay`` 场景的原始包：压测开始前先各发送一次，压测中再逐字节重放。
+    """
+    if counts["new"] > len(unused):
+        raise ValueError(f"new 场景需要 {counts['new']} 个未使用码，仅有 {len(unused)} 个")
+    if (counts["reactivate"] or counts["replay"]) and not bound:
+        raise ValueError("reactivate / replay 场景需要预绑定码（--bound-ratio > 0）")
+    packets: list[_Packet] = []
+    for code in unused[: counts["new"]]:
+        packets.append(_build(public_pem, "new", code, _fingerprint(code)))
+    for i in range(counts["reactivate"]):
+        code, fp = bound[i % len(bound)]
+        packets.append(_build(public_pem, "reactivate", code, fp))
+    for _ in range(counts["unknown"]):
+        packets.append(_build(public_pem, "unknown", generate_activation_code(), _fingerprint("x")))
+    warmup = [
+        _build(public_pem, "reactivate", *bound[i % len(bound)])
+        for i in range(min(counts["replay"], len(bound)))
+    ]
+    for i in range(counts["replay"]):
+        original = warmup[i % len(warmup)]
+        packets.append(_Packet("replay", original.body, original.key_manager, original.nonce))
+    rng.shuffle(packets)
+    return warmup, packets
+
+
+def _expected(packet: _Packet, status: int, body: bytes) -> bool:
+    """响应是否符合场景预期（压测结束后校验，不计入延迟）。"""
+    if packet.scenario == "replay":
+        return status == 400
+    if status != 200:
+        return False
+    try:
+        result = json.loads(packet.key_manager.decrypt_response(body))
+    except Exception:
+        return False
+    if packet.scenario == "unknown":
+        return result.get("result") == "error"
+    return result.get("result") == "success" and result.get("nonce") == packet.nonce
+
+
+def _report(
+    packets: list[_Packet],
+    results: list[tuple[int, int, bytes]],
+    elapsed: float,
+    settings: dict,
+) -> dict:
+    hists = {s: LatencyHistogram() for s in SCENARIOS}
+    errors = dict.fromkeys(SCENARIOS, 0)
+    statuses: Counter[int] = Counter()
+    accepted = LatencyHistogram()  # 不含 503：过载保护（limit_concurrency）立即拒绝的请求
+    for packet, (latency_us, status, body) in zip(packets, results):
+        hists[packet.scenario].record(latency_us)
+        statuses[status] += 1
+        if status != 503:
+            accepted.record(latency_us)
+        if not _expected(packet, status, body):
+            errors[packet.scenario] += 1
+    scenarios = {
+        name: {
+            "requests": hist.count,
+            "unexpected": errors[name],
+            "p50_ms": hist.percentile(50) / 1000,
+            "p99_ms": hist.percentile(99) / 1000,
+            "p999_ms": hist.percentile(99.9) / 1000,
+        }
+        for name, hist in hists.items()
+        if hist.count
+    }
+    return {
+        "version": __version__,
+        **settings,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(packets) / elapsed, 1) if elapsed else 0.0,
+        "accepted_rps": round(accepted.count / elapsed, 1) if elapsed else 0.0,
+        "shed_rps": round(statuses[503] / elapsed, 1) if elapsed else 0.0,
+        "accepted_p50_ms": accepted.percentile(50) / 1000 if accepted.count else None,
+        "accepted_p99_ms": accepted.percentile(99) / 1000 if accepted.count else None,
+        "status_counts": {str(code): n for code, n in sorted(statuses.items())},
+        "scenarios": scenarios,
+    }
+
+
+# ---------------------------------------------------------------- 进程内（ASGI）
+
+
+async def _asgi_post(app, path: str, body: bytes, client: tuple[str, int]) -> tuple[int, bytes]:
+    delivered = False
+    status = 0
+    chunks: list[bytes] = []
+
+    async def receive():
+        nonlocal delivered
+        if delivered:
+            return {"type": "http.disconnect"}
+        delivered = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"bench"),
+            (b"content-type", b"application/octet-stream"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": client,
+        "server": ("bench", 80),
+        "state": {},
+    }
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+async def _drive_asgi(app, path: str, warmup, packets, concurrency: int):
+    results: list = [None] * len(packets)
+    async with app.router.lifespan_context(app):
+        for packet in warmup:
+            await _asgi_post(app, path, packet.body, ("127.0.0.1", 1))
+        cursor = iter(range(len(packets)))
+        perf = time.perf_counter_ns
+
+        async def worker(n: int) -> None:
+            client = ("127.0.0.1", 10000 + n)
+            for i in cursor:
+                t0 = perf()
+                status, body = await _asgi_post(app, path, packets[i].body, client)
+                results[i] = ((perf() - t0) // 1000, status, body)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return results, elapsed
+
+
+def run_in_process(
+    *,
+    codes: int,
+    requests: int,
+    concurrency: int,
+    mix: dict[str, float],
+    bound_ratio: float = 0.5,
+    key_bits: int = RSA_KEY_SIZE,
+    config: Optional[ServerConfig] = None,
+    encryptor: Optional[RSAEncryptor] = None,
+    rate_limit: bool = False,
+    fast_path: Optional[bool] = None,
+    seed: int = 0,
+) -> dict:
+    """进程内压测：临时库 + 注入私钥，直接以 ASGI 调用应用。
+
+    :param fast_path: 覆盖 ``[server] fast_path``（纯 ASGI 快速路径）；``None`` 沿用配置。
+    """
+    from sealium.server.app import create_app  # 延迟导入：模块级 app 会加载配置
+
+    encryptor = encryptor or RSAEncryptor.generate(key_bits)
+    public_pem = encryptor.export_public_key()
+    with tempfile.TemporaryDirectory(prefix="sealium-bench-") as tmp:
+        cfg = (config or get_config()).model_copy(deep=True)
+        cfg.paths.database = Path(tmp) / "bench.db"
+        cfg.paths.private_key = Path(tmp) / "unused.pem"
+        cfg.rate_limit.enabled = rate_limit
+        if fast_path is not None:
+            cfg.server.fast_path = fast_path
+        cfg.logging.level = "WARNING"
+        db = SQLiteDatabase(cfg.paths.database)
+        db.connect()
+        db.init_tables()
+        try:
+            storage = ActivationCodeStorage(db)
+            unused, bound = seed_codes(storage, codes, bound_ratio)
+            counts = _split(requests, mix)
+            warmup, packets = build_packets(public_pem, counts, unused, bound, random.Random(seed))
+            app = create_app(config=cfg, encryptor=encryptor, storage=storage)
+            results, elapsed = asyncio.run(
+                _drive_asgi(app, cfg.activation_route(), warmup, packets, concurrency)
+            )
+        finally:
+            db.close()
+    settings = _settings("in-process", codes, requests, concurrency, mix, encryptor.key_size)
+    settings["fast_path"] = cfg.server.fast_path
+    return _report(packets, results, elapsed, settings)
+
+
+# ---------------------------------------------------------------- HTTP
+
+
+def run_http(
+    *,
+    url: str,
+    public_key_pem: str,
+    db_path: Path,
+    codes: int,
+    requests: int,
+    concurrency: int,
+    mix: dict[str, float],
+    bound_ratio: float = 0.5,
+    timeout: float = 30.0,
+    seed: int = 0,
+    unix_socket: Optional[Path] = None,
+) -> dict:
+    """
+    HTTP 压测：激活码写入服务端库（与服务端同 pepper），经网络打到 ``url``。
+
+    :param unix_socket: 经该 Unix 域套接字发送（``UnixSocketPoster``），``url`` 只取路径与 Host。
+    """
+    import requests as http
+
+    cfg = get_config()
+    pepper = cfg.code_hash_pepper_secret or CODE_HASH_PEPPER_DEFAULT
+    db = SQLiteDatabase(db_path)
+    db.connect()
+    db.init_tables()
+    try:
+        storage = ActivationCodeStorage(db, code_hasher=lambda c: hash_activation_code(c, pepper))
+        unused, bound = seed_codes(storage, codes, bound_ratio)
+    finally:
+        db.close()
+    counts = _split(requests, mix)
+    warmup, packets = build_packets(public_key_pem, counts, unused, bound, random.Random(seed))
+    headers = {"Content-Type": "application/octet-stream"}
+    local = threading.local()
+
+    def post(body: bytes) -> tuple[int, int, bytes]:
+        sender = getattr(local, "sender", None)
+        if sender is None:
+            if unix_socket is not None:
+                sender = local.sender = UnixSocketPoster(str(unix_socket))
+            else:
+                session = http.Session()
+                sender = local.sender = lambda u, d, h, t: session.post(u, data=d, headers=h, timeout=t)
+        t0 = time.perf_counter_ns()
+        resp = sender(url, body, headers, timeout)
+        return (time.perf_counter_ns() - t0) // 1000, resp.status_code, resp.content
+
+    for packet in warmup:
+        post(packet.body)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(post, (p.body for p in packets)))
+    elapsed = time.perf_counter() - started
+    key_bits = RSAEncryptor.from_public_key_pem(public_key_pem).key_size
+    settings = _settings("http", codes, requests, concurrency, mix, key_bits)
+    settings["unix_socket"] = str(unix_socket) if unix_socket is not None else None
+    return _report(packets, results, elapsed, settings)
+
+
+def _split(requests: int, mix: dict[str, float]) -> dict[str, int]:
+    """按比例拆分请求数（最大余数法，总数恰为 ``requests``）。"""
+    exact = {s: requests * w for s, w in mix.items()}
+    counts = {s: int(v) for s, v in exact.items()}
+    rest = requests - sum(counts.values())
+    for s in sorted(exact, key=lambda s: exact[s] - counts[s], reverse=True)[:rest]:
+        counts[s] += 1
+    return counts
+
+
+def _settings(mode, codes, requests, concurrency, mix, key_bits) -> dict:
+    return {
+        "mode": mode,
+        "codes": codes,
+        "requests": requests,
+        "concurrency": concurrency,
+        "key_bits": key_bits,
+        "mix": {s: round(w, 4) for s, w in mix.items() if w},
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Sealium 激活服务端到端压测")
+    parser.add_argument("--codes", type=int, default=1000, help="写入的激活码数（默认 1000）")
+    parser.add_argument("--bound-ratio", type=float, default=0.5, help="预绑定比例（默认 0.5）")
+    parser.add_argument("--requests", type=int, default=1000, help="压测请求总数（默认 1000）")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发数（默认 8）")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"场景比例（默认 {DEFAULT_MIX}）")
+    parser.add_argument(
+        "--key-bits", type=int, default=RSA_KEY_SIZE, help="进程内模式临时密钥位数（默认 4096）"
+    )
+    parser.add_argument("--rate-limit", action="store_true", help="进程内模式保留配置中的限流")
+    parser.add_argument("--fast-path", action="store_true", help="进程内模式启用纯 ASGI 快速路径")
+    parser.add_argument("--url", help="HTTP 模式：激活接口完整 URL")
+    parser.add_argument("--public-key", help="HTTP 模式：服务端公钥 PEM 文件")
+    parser.add_argument("--db", help="HTTP 模式：服务端数据库路径（写入压测激活码）")
+    parser.add_argument("--unix-socket", help="HTTP 模式：经该 Unix 域套接字发送（--url 只取路径）")
+    parser.add_argument("--seed", type=int, default=0, help="场景打散随机种子")
+    parser.add_argument("--output", help="JSON 结果另存到文件")
+    args = parser.parse_args(argv)
+
+    if not 0.0 <= args.bound_ratio <= 1.0:
+        parser.error("--bound-ratio 须在 0–1 之间")
+    if args.concurrency < 1 or args.requests < 1 or args.codes < 0:
+        parser.error("--concurrency / --requests 须为正，--codes 不得为负")
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    common = dict(
+        codes=args.codes,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        mix=mix,
+        bound_ratio=args.bound_ratio,
+        seed=args.seed,
+    )
+    try:
+        if args.url:
+            if not (args.public_key and args.db):
+                parser.error("--url 需同时指定 --public-key 与 --db")
+            report = run_http(
+                url=args.url,
+                public_key_pem=Path(args.public_key).read_text(encoding="utf-8"),
+                db_path=Path(args.db),
+                unix_socket=Path(args.unix_socket) if args.unix_socket else None,
+                **common,
+            )
+        else:
+            report = run_in_process(
+                key_bits=args.key_bits,
+                rate_limit=args.rate_limit,
+                fast_path=args.fast_path or None,
+                **common,
+            )
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
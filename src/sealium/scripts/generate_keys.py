@@ -1,9 +1,10 @@
 # src/sealium/scripts/generate_keys.py
 """
-生成服务端 RSA 密钥对。
+生成服务端 RSA 密钥对（``--license`` 时改为离线令牌的 Ed25519 签名密钥对）。
 
 默认输出到服务端配置指定的路径（``[paths] private_key`` 与同目录
-``server_public.pem``）。客户端只需分发公钥。
+``server_public.pem``；离线令牌为 ``[paths] license_signing_key`` 与同目录
+``license_public.pem``）。客户端只需分发公钥。
 """
 
 from __future__ import annotations
@@ -17,6 +18,7 @@ from cryptography.hazmat.primitives import serialization
 
 from sealium.common.constants import RSA_KEY_SIZE
 from sealium.common.crypto import RSAEncryptor
+from sealium.common.license_token import LicenseSigner
 from sealium.server.config import get_config
 
 
@@ -73,8 +75,45 @@ def generate_key_pair(
     return priv_path, pub_path
 
 
+def generate_license_key_pair(
+    private_key_path: Optional[Union[str, Path]] = None,
+    public_key_path: Optional[Union[str, Path]] = None,
+    passphrase: Optional[str] = None,
+) -> Tuple[Path, Path]:
+    """
+    生成离线令牌的 Ed25519 签名密钥对并写入文件。
+
+    :param passphrase: 非空时私钥以该口令加密落盘；服务端与 RSA 私钥共用
+                       ``SEALIUM_SECURITY__PRIVATE_KEY_PASSPHRASE`` 解密。
+    :return: (私钥路径, 公钥路径)。
+    """
+    priv_path = (
+        Path(private_key_path) if private_key_path else get_config().paths.license_signing_key
+    )
+    pub_path = Path(public_key_path) if public_key_path else priv_path.parent / "license_public.pem"
+    priv_path.parent.mkdir(parents=True, exist_ok=True)
+    pub_path.parent.mkdir(parents=True, exist_ok=True)
+
+    signer = LicenseSigner.generate()
+    encryption_algorithm = (
+        serialization.BestAvailableEncryption(passphrase.encode("utf-8"))
+        if passphrase
+        else serialization.NoEncryption()
+    )
+    priv_path.write_bytes(signer.export_private_key(encryption_algorithm=encryption_algorithm))
+    pub_path.write_bytes(signer.export_public_key())
+    try:
+        os.chmod(priv_path, 0o600)
+    except OSError:
+        pass
+    return priv_path, pub_path
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="生成服务端 RSA 密钥对")
+    parser.add_argument(
+        "--license", action="store_true", help="改为生成离线令牌的 Ed25519 签名密钥对"
+    )
     parser.add_argument("--private-key", type=str, help="私钥输出路径")
     parser.add_argument("--public-key", type=str, help="公钥输出路径")
     parser.add_argument("--key-size", type=int, default=RSA_KEY_SIZE, help="密钥位数")
@@ -88,9 +127,14 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
-    priv, pub = generate_key_pair(
-        args.private_key, args.public_key, args.key_size, passphrase=args.passphrase
-    )
+    if args.license:
+        priv, pub = generate_license_key_pair(
+            args.private_key, args.public_key, passphrase=args.passphrase
+        )
+    else:
+        priv, pub = generate_key_pair(
+            args.private_key, args.public_key, args.key_size, passphrase=args.passphrase
+        )
     print(f"✅ 私钥已生成: {priv}（{'口令加密' if args.passphrase else '明文'}）")
     print(f"✅ 公钥已生成: {pub}")
     print("\n请妥善保管私钥，仅将公钥分发给客户端。")
@@ -0,0 +1,184 @@
+# src/sealium/server/abuse_tracker.py
+"""
+激活失败滥用追踪（固定内存）。
+
+暴力枚举激活码、共享 / 转卖激活码等行为此前只体现为 ``ActivationService`` 的
+``logger.info`` 拒绝日志。按 IP / 激活码用 dict 计数会随攻击者基数无界增长，本身
+就是内存放大面。本模块用 **Count-Min Sketch** 估计失败次数：
+
+* **固定内存**：每个维度 ``depth × width`` 个计数器 + 至多 ``top_k`` 条热点项，与
+  攻击者使用多少 IP / 多少随机码无关；
+* **保守更新**（conservative update）：每次只抬升等于当前最小值的计数器，显著降低
+  哈希碰撞带来的高估；
+* **热点（heavy hitter）**：维护估计值最高的 ``top_k`` 个 key，供 :meth:`report`
+  输出 Top-K 报告；
+* **衰减**：每 ``decay_seconds`` 全体计数减半，旧失败逐渐淡出，不会永久累积；
+* **临时封禁（可选）**：某客户端（限流键）的失败估计达到 ``block_threshold`` 时
+  进入封禁表 ``block_seconds`` 秒，由早拒绝中间件在限流步骤直接 429。
+
+输入来自服务层的拒绝原因（不存在 / 他机占用 / 过期 / 重放）。激活码维度只接收
+服务层的短哈希，追踪器从不接触明文激活码。行 hash 用进程内随机化的 ``hash()``
+（``PYTHONHASHSEED``），攻击者无法离线构造碰撞 key 污染他人计数。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# 服务层上报的拒绝原因
+REJECT_REASONS = ("nonexistent", "other_machine", "expired", "replay")
+
+# 封禁表容量上限：仅估计值超阈值的客户端才会进入，此上限兜底防极端碰撞。
+_MAX_BLOCKED = 4096
+# 空闲跨过超过这么多个衰减周期时直接清零（计数已衰减殆尽），不再逐次减半
+_MAX_HALVINGS = 32
+
+
+class CountMinSketch:
+    """带保守更新、热点表与减半衰减的 Count-Min Sketch（非线程安全，由调用方加锁）。"""
+
+    def __init__(self, width: int = 2048, depth: int = 4, top_k: int = 32) -> None:
+        if width <= 0 or depth <= 0 or top_k <= 0:
+            raise ValueError("width / depth / top_k 必须为正整数")
+        self._width = width
+        self._rows = [[0] * width for _ in range(depth)]
+        self._top_k = top_k
+        self._top: dict[str, int] = {}
+
+    def _indexes(self, key: str) -> list[int]:
+        return [hash((row, key)) % self._width for row in range(len(self._rows))]
+
+    def add(self, key: str, count: int = 1) -> int:
+        """计数并返回 key 的新估计值。"""
+        idx = self._indexes(key)
+        rows = self._rows
+        estimate = min(rows[r][i] for r, i in enumerate(idx)) + count
+        for r, i in enumerate(idx):
+            if rows[r][i] < estimate:
+                rows[r][i] = estimate
+        self._offer(key, estimate)
+        return estimate
+
+    def estimate(self, key: str) -> int:
+        return min(self._rows[r][i] for r, i in enumerate(self._indexes(key)))
+
+    def _offer(self, key: str, estimate: int) -> None:
+        top = self._top
+        if key in top or len(top) < self._top_k:
+            top[key] = estimate
+            return
+        weakest = min(top, key=top.__getitem__)
+        if estimate > top[weakest]:
+            del top[weakest]
+            top[key] = estimate
+
+    def top(self, n: Optional[int] = None) -> list[tuple[str, int]]:
+        """估计值最高的热点项（降序）。"""
+        items = sorted(self._top.items(), key=lambda kv: kv[1], reverse=True)
+        return items if n is None else items[:n]
+
+    def halve(self, times: int = 1) -> None:
+        """全体计数减半 ``times`` 次（时间衰减，单遍完成）；归零的热点项移出热点表。"""
+        for row in self._rows:
+            for i, v in enumerate(row):
+                if v:
+                    row[i] = v >> times
+        self._top = {k: v >> times for k, v in self._top.items() if v >> times}
+
+    def clear(self) -> None:
+        """清空全部计数与热点表。"""
+        for row in self._rows:
+            row[:] = [0] * self._width
+        self._top = {}
+
+
+class AbuseTracker:
+    """
+    按客户端（限流键）与激活码短哈希两个维度追踪失败激活（线程安全）。
+
+    :param block_threshold: 客户端失败估计达到该值即临时封禁；``0`` 关闭自动封禁。
+    """
+
+    def __init__(
+        self,
+        *,
+        width: int = 2048,
+        depth: int = 4,
+        top_k: int = 32,
+        decay_seconds: float = 600.0,
+        block_threshold: int = 0,
+        block_seconds: float = 600.0,
+        now_provider: Optional[Callable[[], float]] = None,
+    ) -> None:
+        if decay_seconds <= 0 or block_seconds <= 0 or block_threshold < 0:
+            raise ValueError("decay_seconds / block_seconds 必须为正，block_threshold 不得为负")
+        self._clients = CountMinSketch(width, depth, top_k)
+        self._codes = CountMinSketch(width, depth, top_k)
+        self._reasons: dict[str, int] = dict.fromkeys(REJECT_REASONS, 0)
+        self._decay = decay_seconds
+        self._threshold = block_threshold
+        self._block_seconds = block_seconds
+        self._blocked: OrderedDict[str, float] = OrderedDict()
+        self._now = now_provider or time.monotonic
+        self._next_decay = self._now() + decay_seconds
+        self._lock = threading.Lock()
+
+    def _maybe_decay(self, now: float) -> None:
+        if now < self._next_decay:
+            return
+        # 长时间空闲后可能跨过许多周期：按周期数一次性衰减，而不是逐周期全表遍历
+        periods = int((now - self._next_decay) // self._decay) + 1
+        if periods > _MAX_HALVINGS:
+            self._clients.clear()  # 减半这么多次后已无残余计数
+            self._codes.clear()
+        else:
+            self._clients.halve(periods)
+            self._codes.halve(periods)
+        self._next_decay += periods * self._decay
+
+    def record(self, reason: str, *, client: Optional[str] = None, code: Optional[str] = None) -> None:
+        """记录一次失败激活。``code`` 须为短哈希（不传明文激活码）。"""
+        if reason not in self._reasons:
+            raise ValueError(f"未知拒绝原因: {reason}")
+        now = self._now()
+        with self._lock:
+            self._maybe_decay(now)
+            self._reasons[reason] += 1
+            if code is not None:
+                self._codes.add(code)
+            if client is not None:
+                estimate = self._clients.add(client)
+                if self._threshold and estimate >= self._threshold:
+                    self._blocked[client] = now + self._block_seconds
+                    self._blocked.move_to_end(client)
+                    if len(self._blocked) > _MAX_BLOCKED:
+                        self._blocked.popitem(last=False)
+
+    def blocked_for(self, client: str) -> float:
+        """``client`` 剩余封禁秒数；未封禁返回 ``0``。"""
+        if not self._blocked:
+            return 0.0
+        with self._lock:
+            until = self._blocked.get(client)
+            if until is None:
+                return 0.0
+            remaining = until - self._now()
+            if remaining <= 0:
+                del self._blocked[client]
+                return 0.0
+            return remaining
+
+    def report(self, n: Optional[int] = None) -> dict:
+        """Top-K 报告：失败最多的客户端 / 激活码短哈希、各原因累计次数与当前封禁数。"""
+        now = self._now()
+        with self._lock:
+            self._maybe_decay(now)
+            return {
+                "clients": self._clients.top(n),
+                "codes": self._codes.top(n),
+                "reasons": dict(self._reasons),
+                "blocked": sum(1 for until in self._blocked.values() if until > now),
+            }
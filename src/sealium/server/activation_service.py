@@ -13,12 +13,21 @@ HTTP 或加密细节，全部依赖（存储、防重放、时间）均可注入
 * 错误信息不泄漏（GRAY-001）：对外将“码不存在”与“已被他机占用”合并为同一
   条通用提示，关闭激活码存在性枚举；具体原因写入服务端审计日志。
 * 不回显原始敏感值（A09）：日志只记录激活码 / 机器码的短哈希。
+* 审计：每个结果经 :meth:`ActivationService._audit` 记为一条定长事件；注入
+  :class:`AuditLog` 时仅入队（短哈希与落盘在后台线程），否则回退为同步日志。
+* 滥用追踪：各拒绝原因连同客户端标识计入 :class:`AbuseTracker`（固定内存），
+  供 Top-K 报告与可选的临时封禁。
+* 可观测性：查库 / 防重放 / 机器码比对 / 绑定各阶段耗时与拒绝原因计入
+  :class:`ActivationMetrics`（可选注入）。
+* 离线令牌：注入 :class:`LicenseSigner` 时，每个成功响应附带 Ed25519 令牌，绑定
+  已绑定的指纹与功能，有效期取配置 TTL 与激活码到期时间的较早者。
 """
 
 from __future__ import annotations
 
-import hashlib
+import asyncio
 import logging
+import time
 from datetime import datetime
 from typing import Callable, Optional
 
@@ -28,8 +37,18 @@ from sealium.common.fingerprint import (
     matches,
     to_storage,
 )
-from sealium.common.models import ActivationCode, ActivationRequest, ActivationResponse
+from sealium.common.license_token import LicenseSigner, LicenseToken, code_digest
+from sealium.common.models import (
+    ActivationCode,
+    ActivationRequest,
+    ActivationResponse,
+    BatchActivationRequest,
+)
+from sealium.server.abuse_tracker import REJECT_REASONS, AbuseTracker
+from sealium.server.audit_log import AuditLog, short_digest
 from sealium.server.database import ActivationCodeStorage
+from sealium.server.metrics import ActivationMetrics
+from sealium.server.rate_limit import RequestCost
 from sealium.server.replay_guard import ReplayGuard
 
 NowProvider = Callable[[], datetime]
@@ -40,10 +59,20 @@ logger = logging.getLogger("sealium.server.activation")
 _CODE_UNAVAILABLE_MSG = "激活码无效或已被使用"
 
 
-def _short_hash(value: str | MachineFingerprint) -> str:
-    """用于日志的短哈希（截断），不记录原始激活码 / 机器码。"""
-    s = value.canonical() if isinstance(value, MachineFingerprint) else str(value)
-    return hashlib.sha256(s.encode("utf-8")).hexdigest()[:12]
+# 用于日志的短哈希（截断），不记录原始激活码 / 机器码。
+_short_hash = short_digest
+
+# 审计原因码 → 同步日志中的中文标签（与历史日志文本保持一致）
+_REASON_LABELS = {
+    "timestamp": "时间戳",
+    "nonexistent": "不存在",
+    "replay": "重放",
+    "idempotent": "幂等",
+    "other_machine": "他机",
+    "expired": "过期",
+    "new_bind": "新绑定",
+    "race_lost": "竞争落败",
+}
 
 
 class ActivationService:
@@ -57,105 +86,337 @@ class ActivationService:
         *,
         now_provider: Optional[NowProvider] = None,
         machine_id_policy: Optional[MachineIdPolicy] = None,
+        abuse_tracker: Optional[AbuseTracker] = None,
+        metrics: Optional[ActivationMetrics] = None,
+        audit_log: Optional[AuditLog] = None,
+        license_signer: Optional[LicenseSigner] = None,
+        license_ttl_seconds: int = 30 * 24 * 3600,
     ) -> None:
         self._storage = storage
         self._replay_guard = replay_guard
         self._tolerance = timestamp_tolerance_seconds
         self._now: NowProvider = now_provider or datetime.now
         self._policy = machine_id_policy or MachineIdPolicy.default()
+        self._abuse = abuse_tracker
+        self._metrics = metrics
+        self._audit_log = audit_log
+        self._signer = license_signer
+        self._token_ttl = license_ttl_seconds
+
+    def process(
+        self,
+        request: ActivationRequest,
+        cost: Optional[RequestCost] = None,
+        *,
+        client: Optional[str] = None,
+    ) -> ActivationResponse:
+        """处理一次激活请求，返回（成功或错误的）响应。
+
+        :param cost: 可选；记录本请求实际触达的存储阶段（查库 / 绑定），供路由按代价限流。
+        :param client: 可选；客户端标识（限流键），拒绝时连同原因计入滥用追踪。
+        """
+        now = self._now()
+        rejected = self._screen(request, now, client)
+        if rejected is not None:
+            return rejected
+        record = self._lookup(request.activation_code, cost)
+        present = [request.activation_code] if record is not None else []
+        replay = any(self._check_replays(present, request.nonce))
+        return self._decide(request, record, replay, now, cost, client)
+
+    async def aprocess(
+        self,
+        request: ActivationRequest,
+        cost: Optional[RequestCost] = None,
+        *,
+        client: Optional[str] = None,
+    ) -> ActivationResponse:
+        """:meth:`process` 的协程版本（路由使用）：防重放存储为阻塞式共享后端时，
+        其网络往返在线程池中执行，不占用事件循环；其余步骤与指标仍在事件循环线程。"""
+        now = self._now()
+        rejected = self._screen(request, now, client)
+        if rejected is not None:
+            return rejected
+        record = self._lookup(request.activation_code, cost)
+        present = [request.activation_code] if record is not None else []
+        replay = any(await self._acheck_replays(present, request.nonce))
+        return self._decide(request, record, replay, now, cost, client)
+
+    def process_many(
+        self,
+        batch: BatchActivationRequest,
+        cost: Optional[RequestCost] = None,
+        *,
+        client: Optional[str] = None,
+    ) -> list[ActivationResponse]:
+        """处理一次批量激活，返回与 ``batch.activation_codes`` 一一对应的响应。
+
+        时间戳只校验一次；全部码用一次批量查询取回，存在的码再用一次批量防重放检查
+        （共享后端为单次管道往返），之后逐码走与 :meth:`process` 相同的判定（幂等、
+        过期、原子绑定）——每个码的绑定仍是独立的条件 UPDATE，某一项失败不影响其余各项。
+        """
+        items = batch.items()
+        now = self._now()
+        rejected = self._screen_batch(batch, items, now, client)
+        if rejected is not None:
+            return rejected
+        records = self._lookup_many(batch.activation_codes, cost)
+        present = [item.activation_code for item in items if item.activation_code in records]
+        replays = self._check_replays(present, batch.nonce)
+        return self._decide_many(items, records, replays, now, cost, client)
+
+    async def aprocess_many(
+        self,
+        batch: BatchActivationRequest,
+        cost: Optional[RequestCost] = None,
+        *,
+        client: Optional[str] = None,
+    ) -> list[ActivationResponse]:
+        """:meth:`process_many` 的协程版本，防重放往返的处理同 :meth:`aprocess`。"""
+        items = batch.items()
+        now = self._now()
+        rejected = self._screen_batch(batch, items, now, client)
+        if rejected is not None:
+            return rejected
+        records = self._lookup_many(batch.activation_codes, cost)
+        present = [item.activation_code for item in items if item.activation_code in records]
+        replays = await self._acheck_replays(present, batch.nonce)
+        return self._decide_many(items, records, replays, now, cost, client)
 
-    def process(self, request: ActivationRequest) -> ActivationResponse:
-        """处理一次激活请求，返回（成功或错误的）响应。"""
+    def _screen(
+        self, request: ActivationRequest, now: datetime, client: Optional[str]
+    ) -> Optional[ActivationResponse]:
+        """查库前的校验（步骤 1–2）；通过返回 ``None``。"""
         code = request.activation_code
-        machine = request.machine_code
-        nonce = request.nonce
 
         # 1. 激活码格式校验（非空字符串）
         if not (isinstance(code, str) and code):
-            return ActivationResponse.error("激活码格式无效", nonce)
-
-        now = self._now()
+            return ActivationResponse.error("激活码格式无效", request.nonce)
 
         # 2. 时间戳校验（防伪造 / 过期请求）
         if abs(int(now.timestamp()) - request.timestamp) > self._tolerance:
-            logger.info("激活拒绝(时间戳) code=%s", _short_hash(code))
-            return ActivationResponse.error("请求时间戳无效，请同步时间", nonce)
+            self._audit("reject", "timestamp", code, client=client)
+            self._note_reject("timestamp", code, client)
+            return ActivationResponse.error("请求时间戳无效，请同步时间", request.nonce)
+        return None
+
+    def _screen_batch(
+        self,
+        batch: BatchActivationRequest,
+        items: list[ActivationRequest],
+        now: datetime,
+        client: Optional[str],
+    ) -> Optional[list[ActivationResponse]]:
+        """批量的时间戳校验（只做一次）；通过返回 ``None``。"""
+        if abs(int(now.timestamp()) - batch.timestamp) <= self._tolerance:
+            return None
+        for item in items:
+            self._audit("reject", "timestamp", item.activation_code, client=client)
+            self._note_reject("timestamp", item.activation_code, client)
+        return [ActivationResponse.error("请求时间戳无效，请同步时间", batch.nonce) for _ in items]
 
+    def _lookup(self, code: str, cost: Optional[RequestCost]) -> Optional[ActivationCode]:
         # 3. 查询激活码（提前到防重放之前：不存在的码直接返回、不进重放缓存，
         #    杜绝攻击者用随机码灌满 LRU 驱逐合法 nonce 的冲刷攻击，MEDIUM-006）
+        if cost is not None:
+            cost.add("db")
+        t = time.perf_counter_ns()
         record = self._storage.get_by_code(code)
-        if record is None:
-            logger.info("激活拒绝(不存在) code=%s", _short_hash(code))
-            return ActivationResponse.error(_CODE_UNAVAILABLE_MSG, nonce)
+        self._observe("get_by_code", t)
+        return record
 
+    def _lookup_many(
+        self, codes: list[str], cost: Optional[RequestCost]
+    ) -> dict[str, ActivationCode]:
+        if cost is not None:
+            cost.add("db")
+        t = time.perf_counter_ns()
+        records = self._storage.get_by_codes(codes)
+        self._observe("get_by_code", t)
+        return records
+
+    def _check_replays(self, codes: list[str], nonce: str) -> list[bool]:
         # 4. 防重放检查（仅对已存在的码记录 nonce，缓存冲刷面被压缩到"已知存在的
         #    码"，而码为 128 位高熵随机、不可枚举，故实际不可冲刷）
-        if self._replay_guard.is_replay(code, request.nonce):
-            logger.info("激活拒绝(重放) code=%s", _short_hash(code))
+        if not codes:
+            return []
+        t = time.perf_counter_ns()
+        replays = self._replay_guard.is_replay_many(codes, nonce)
+        self._observe("replay_check", t)
+        return replays
+
+    async def _acheck_replays(self, codes: list[str], nonce: str) -> list[bool]:
+        if not codes or not self._replay_guard.blocking:
+            return self._check_replays(codes, nonce)
+        t = time.perf_counter_ns()
+        replays = await asyncio.to_thread(self._replay_guard.is_replay_many, codes, nonce)
+        self._observe("replay_check", t)
+        return replays
+
+    def _decide_many(
+        self,
+        items: list[ActivationRequest],
+        records: dict[str, ActivationCode],
+        replays: list[bool],
+        now: datetime,
+        cost: Optional[RequestCost],
+        client: Optional[str],
+    ) -> list[ActivationResponse]:
+        """逐码判定；``replays`` 与 ``items`` 中已存在的码按序对应。"""
+        flags = iter(replays)
+        results = []
+        for item in items:
+            record = records.get(item.activation_code)
+            replay = next(flags) if record is not None else False
+            results.append(self._decide(item, record, replay, now, cost, client))
+        return results
+
+    def _decide(
+        self,
+        request: ActivationRequest,
+        record: Optional[ActivationCode],
+        replay: bool,
+        now: datetime,
+        cost: Optional[RequestCost],
+        client: Optional[str],
+    ) -> ActivationResponse:
+        """查库与防重放检查之后的判定：单码与批量共用。"""
+        code = request.activation_code
+        machine = request.machine_code
+        nonce = request.nonce
+
+        if record is None:
+            self._audit("reject", "nonexistent", code, client=client)
+            self._note_reject("nonexistent", code, client)
+            return ActivationResponse.error(_CODE_UNAVAILABLE_MSG, nonce)
+
+        if replay:
+            self._audit("reject", "replay", code, client=client)
+            self._note_reject("replay", code, client)
             return ActivationResponse.error("请求已被使用，请勿重复发送", nonce)
 
         # 5. 已使用：同机幂等成功，异机拒绝（与“不存在”对外不可区分）
         if record.is_used():
-            if record.bound_machine_code is not None and matches(
-                record.bound_machine_code, machine, self._policy
+            if record.bound_machine_code is not None and self._matches(
+                record.bound_machine_code, machine
             ):
-                logger.info(
-                    "激活成功(幂等) code=%s machine=%s",
-                    _short_hash(code),
-                    _short_hash(machine),
-                )
-                return ActivationResponse.success(
-                    self._authorized_until(record), record.features, nonce
-                )
-            logger.info(
-                "激活拒绝(他机) code=%s machine=%s",
-                _short_hash(code),
-                _short_hash(machine),
-            )
+                self._audit("success", "idempotent", code, machine, client)
+                return self._success(code, record, record.bound_machine_code, nonce, now)
+            self._audit("reject", "other_machine", code, machine, client)
+            self._note_reject("other_machine", code, client)
             return ActivationResponse.error(_CODE_UNAVAILABLE_MSG, nonce)
 
         # 6. 过期检查（LOW-001）：对外与「不存在/他机占用」合并为同一通用提示，
         #    关闭「该码存在但已过期」的存在性枚举；真实原因写入审计日志。
         if record.is_expired(now=now):
-            logger.info("激活拒绝(过期) code=%s", _short_hash(code))
+            self._audit("reject", "expired", code, client=client)
+            self._note_reject("expired", code, client)
             return ActivationResponse.error(_CODE_UNAVAILABLE_MSG, nonce)
 
         # 7. 原子绑定：条件 UPDATE 保证仅一台机器能赢得绑定（HIGH-001）
+        if cost is not None:
+            cost.add("bind")
+        t = time.perf_counter_ns()
         try:
             won = self._storage.bind_machine_code(code, to_storage(machine), now)
         except Exception:
             # 数据库异常：对外通用提示，不回显原始异常（LOW-003），内部记录详情
             logger.exception("绑定数据库异常 code=%s", _short_hash(code))
             return ActivationResponse.error("激活失败，请稍后重试", nonce)
+        self._observe("bind", t)
 
         if won:
-            logger.info(
-                "激活成功(新绑定) code=%s machine=%s",
-                _short_hash(code),
-                _short_hash(machine),
-            )
-            return ActivationResponse.success(
-                self._authorized_until(record), record.features, nonce
-            )
+            self._audit("success", "new_bind", code, machine, client)
+            return self._success(code, record, machine, nonce, now)
 
         # 8. 绑定竞争失败：检查与抢绑之间被他人抢先。重读后判定。
+        if cost is not None:
+            cost.add("db")
         fresh = self._storage.get_by_code(code)
         if (
             fresh is not None
             and fresh.bound_machine_code is not None
-            and matches(fresh.bound_machine_code, machine, self._policy)
+            and self._matches(fresh.bound_machine_code, machine)
         ):
             # 极端时序：恰好是本机抢到（同机并发重试），按幂等成功
-            return ActivationResponse.success(
-                self._authorized_until(record), record.features, nonce
-            )
-        logger.info(
-            "激活拒绝(竞争落败) code=%s machine=%s",
-            _short_hash(code),
-            _short_hash(machine),
-        )
+            return self._success(code, record, fresh.bound_machine_code, nonce, now)
+        self._audit("reject", "race_lost", code, machine, client)
+        self._note_reject("other_machine", code, client)
         return ActivationResponse.error(_CODE_UNAVAILABLE_MSG, nonce)
 
+    def _success(
+        self,
+        code: str,
+        record: ActivationCode,
+        bound: MachineFingerprint,
+        nonce: str,
+        now: datetime,
+    ) -> ActivationResponse:
+        """成功响应；配置了签发器时附带绑定已绑定指纹的离线令牌。"""
+        authorized_until = self._authorized_until(record)
+        token = None
+        if self._signer is not None:
+            issued_at = int(now.timestamp())
+            expires_at = issued_at + self._token_ttl
+            if record.expires_at is not None:
+                expires_at = min(expires_at, int(record.expires_at.timestamp()))
+            t = time.perf_counter_ns()
+            token = self._signer.sign(
+                LicenseToken(
+                    code_digest=code_digest(code),
+                    machine_code=bound,
+                    features=tuple(record.features),
+                    authorized_until=authorized_until,
+                    issued_at=issued_at,
+                    expires_at=expires_at,
+                )
+            )
+            self._observe("sign", t)
+        return ActivationResponse.success(authorized_until, record.features, nonce, token)
+
+    def _matches(self, bound: MachineFingerprint, machine: MachineFingerprint) -> bool:
+        t = time.perf_counter_ns()
+        result = matches(bound, machine, self._policy)
+        self._observe("matches", t)
+        return result
+
+    def _observe(self, stage: str, start_ns: int) -> None:
+        if self._metrics is not None:
+            self._metrics.observe(stage, start_ns)
+
+    def _audit(
+        self,
+        outcome: str,
+        reason: str,
+        code: str,
+        machine: Optional[MachineFingerprint] = None,
+        client: Optional[str] = None,
+    ) -> None:
+        """记录一条审计事件：有审计日志则入队（常数开销），否则同步写日志。"""
+        if self._audit_log is not None:
+            self._audit_log.emit(outcome, reason, code, machine, client)
+            return
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        label = "激活成功" if outcome == "success" else "激活拒绝"
+        if machine is None:
+            logger.info("%s(%s) code=%s", label, _REASON_LABELS[reason], _short_hash(code))
+        else:
+            logger.info(
+                "%s(%s) code=%s machine=%s",
+                label,
+                _REASON_LABELS[reason],
+                _short_hash(code),
+                _short_hash(machine),
+            )
+
+    def _note_reject(self, reason: str, code: str, client: Optional[str]) -> None:
+        """拒绝原因计入指标与滥用追踪（激活码只传短哈希；时间戳偏差不算滥用）。"""
+        if self._metrics is not None:
+            self._metrics.reject(reason)
+        if self._abuse is not None and reason in REJECT_REASONS:
+            self._abuse.record(reason, client=client, code=_short_hash(code))
+
     @staticmethod
     def _authorized_until(record: ActivationCode) -> str:
         return record.expires_at.strftime("%Y-%m-%d") if record.expires_at else "永久"
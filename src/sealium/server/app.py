@@ -17,28 +17,49 @@ from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Callable, Optional
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 
 from sealium import __version__
 from sealium.common.crypto import RSAEncryptor, hash_activation_code
 from sealium.common.constants import CODE_HASH_PEPPER_DEFAULT
 from sealium.common.exceptions import ConfigError
+from sealium.common.license_token import LicenseSigner
+from sealium.server.abuse_tracker import AbuseTracker
 from sealium.server.activation_service import ActivationService
+from sealium.server.audit_log import AuditLog, NdjsonSink, SQLiteSink
+from sealium.server.client_identity import UNIX_PEER, TrustedProxies
+from sealium.server.cluster import ClusterRouter
 from sealium.server.config import ServerConfig, get_config
 from sealium.server.database import ActivationCodeStorage, SQLiteDatabase
+from sealium.server.duplicate_filter import DuplicateFilter, InMemoryDuplicateFilter
+from sealium.server.early_reject import EarlyRejectMiddleware
+from sealium.server.metrics import ActivationMetrics
+from sealium.server.profiler import MAX_SECONDS, ProfilerBusy, profile
 from sealium.server.rate_limit import InMemoryRateLimiter, NullRateLimiter, RateLimiter
+from sealium.server.redis_backend import RedisClient, RedisRateLimiter, RedisReplayStore
 from sealium.server.replay_guard import ReplayGuard
 from sealium.server.routes.activation import create_router
+from sealium.server.routes.cluster import create_cluster_router
+from sealium.server.routes.fast_activation import ActivationEndpoint
+from sealium.server.snapshot import EdgeRouter, SnapshotStorage
 
 logger = logging.getLogger("sealium.server")
 
-# 视为回环的 host：/debug/config 仅允许这些来源访问（LOW-004），与 run.py._LOOPBACK_HOSTS 一致。
+# 视为回环的 host：/debug/config 等运维端点仅允许这些来源访问（LOW-004），与 run.py._LOOPBACK_HOSTS 一致。
 _LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
 
 
-def _load_server_encryptor(cfg: ServerConfig) -> RSAEncryptor:
+def _require_loopback(request: Request) -> None:
+    """运维端点仅允许本机回环来源，否则 403。"""
+    peer = request.client.host if request.client else None
+    if peer not in _LOOPBACK_HOSTS:
+        raise HTTPException(status_code=403, detail="该端点仅限本机回环访问")
+
+
+def load_server_encryptor(cfg: ServerConfig) -> RSAEncryptor:
     """从文件加载服务端私钥（可选口令解密，LOW-001）。"""
     if not cfg.paths.private_key.exists():
         raise ConfigError(f"服务端私钥文件不存在: {cfg.paths.private_key}")
@@ -49,18 +70,106 @@ def _load_server_encryptor(cfg: ServerConfig) -> RSAEncryptor:
         return RSAEncryptor.from_private_key_pem(f.read(), password=password)
 
 
+def load_license_signer(cfg: ServerConfig) -> LicenseSigner:
+    """从文件加载离线令牌签名私钥（与 RSA 私钥共用口令）。"""
+    if not cfg.paths.license_signing_key.exists():
+        raise ConfigError(f"离线令牌签名私钥不存在: {cfg.paths.license_signing_key}")
+    password = (
+        cfg.passphrase_secret.encode("utf-8") if cfg.passphrase_secret else None
+    )
+    with open(cfg.paths.license_signing_key, "rb") as f:
+        return LicenseSigner.from_private_key_pem(f.read(), password=password)
+
+
+def _code_hasher(cfg: ServerConfig) -> Callable[[str], str]:
+    """激活码 → ``code_hash``：HMAC-SHA256(code, pepper)（MEDIUM-002）。
+
+    pepper 取自配置，未设时回退到 ``CODE_HASH_PEPPER_DEFAULT``。
+    """
+    pepper = cfg.code_hash_pepper_secret or CODE_HASH_PEPPER_DEFAULT
+    return lambda c: hash_activation_code(c, pepper)
+
+
 def _open_storage(cfg: ServerConfig) -> tuple[SQLiteDatabase, ActivationCodeStorage]:
     """打开数据库并初始化表结构，返回 (db, storage)。
 
-    激活码以 HMAC-SHA256(code, pepper) 哈希存储（MEDIUM-002）：pepper 取自配置，
-    未设时回退到 ``CODE_HASH_PEPPER_DEFAULT``。明文 code 仅生成时颁发，绝不入库。
+    激活码以哈希存储（见 :func:`_code_hasher`），明文 code 仅生成时颁发，绝不入库。
     """
     db = SQLiteDatabase(cfg.paths.database)
     db.connect()
     db.init_tables()
-    pepper = cfg.code_hash_pepper_secret or CODE_HASH_PEPPER_DEFAULT
-    return db, ActivationCodeStorage(
-        db, code_hasher=lambda c: hash_activation_code(c, pepper)
+    return db, ActivationCodeStorage(db, code_hasher=_code_hasher(cfg))
+
+
+def _open_redis(cfg: ServerConfig) -> Optional[RedisClient]:
+    """配置了 ``[redis] url`` 时建立共享后端客户端（连接惰性建立，不在此处 I/O）。"""
+    url = cfg.redis_url_secret
+    if not url:
+        return None
+    return RedisClient.from_url(
+        url,
+        pool_size=cfg.redis.pool_size,
+        timeout=cfg.redis.timeout_seconds,
+        breaker_seconds=cfg.redis.breaker_seconds,
+    )
+
+
+def _open_audit_log(cfg: ServerConfig) -> Optional[AuditLog]:
+    """按 [audit] 配置创建并启动审计日志写线程；未启用返回 ``None``（回退同步日志）。"""
+    if not cfg.audit.enabled:
+        return None
+    if cfg.audit.sink == "sqlite":
+        sink = SQLiteSink(cfg.paths.audit_log)
+    else:
+        sink = NdjsonSink(
+            cfg.paths.audit_log, max_bytes=cfg.audit.max_bytes, backups=cfg.audit.backups
+        )
+    audit = AuditLog(
+        sink,
+        queue_size=cfg.audit.queue_size,
+        batch_size=cfg.audit.batch_size,
+        flush_interval=cfg.audit.flush_interval_seconds,
+    )
+    audit.start()
+    return audit
+
+
+def _render_metrics(state) -> str:
+    """抓取时采集各组件状态量，连同直方图 / 计数器渲染为 Prometheus 文本。"""
+    limiter = state.rate_limiter
+    dup = getattr(state.duplicate_filter, "stats", None)
+    dup_stats = dup() if dup is not None else {}
+    audit = state.audit_log.stats() if state.audit_log is not None else {}
+    cluster = state.cluster.stats() if state.cluster is not None else {}
+    return state.metrics.render(
+        [
+            ("sealium_replay_cache_entries", "gauge", "防重放缓存条目数",
+             state.replay_guard.size()),
+            ("sealium_rate_limiter_buckets", "gauge", "进程内限流桶数",
+             len(limiter) if hasattr(limiter, "__len__") else None),
+            ("sealium_duplicate_filter_entries", "gauge", "RSA 前重复包过滤条目数",
+             dup_stats.get("size")),
+            ("sealium_duplicate_filter_hits_total", "counter", "重复包过滤命中（RSA 前丢弃）次数",
+             dup_stats.get("hits")),
+            ("sealium_abuse_blocked_clients", "gauge", "当前临时封禁的客户端数",
+             state.abuse_tracker.report(0)["blocked"]),
+            ("sealium_audit_queue_entries", "gauge", "审计日志待写入事件数",
+             audit.get("queued")),
+            ("sealium_audit_written_total", "counter", "审计日志已写入事件数",
+             audit.get("written")),
+            ("sealium_audit_dropped_total", "counter", "审计队列满而丢弃的事件数",
+             audit.get("dropped")),
+            ("sealium_audit_failed_total", "counter", "审计落盘失败而丢弃的事件数",
+             audit.get("failed")),
+            ("sealium_cluster_forwarded_total", "counter", "转发至属主节点处理的激活请求数",
+             cluster.get("forwarded")),
+            ("sealium_cluster_forward_failures_total", "counter", "节点间调用失败次数",
+             cluster.get("failures")),
+            ("sealium_snapshot_records", "gauge", "边缘节点当前快照的记录数",
+             cluster.get("snapshot_records")),
+            ("sealium_snapshot_reloads_total", "counter", "边缘节点切换到新快照的次数",
+             cluster.get("snapshot_reloads")),
+        ]
     )
 
 
@@ -71,12 +180,16 @@ def create_app(
     storage: Optional[ActivationCodeStorage] = None,
     replay_guard: Optional[ReplayGuard] = None,
     rate_limiter: Optional[RateLimiter] = None,
+    duplicate_filter: Optional[DuplicateFilter] = None,
+    abuse_tracker: Optional[AbuseTracker] = None,
+    metrics: Optional[ActivationMetrics] = None,
     now_provider: Optional[Callable[[], datetime]] = None,
+    license_signer: Optional[LicenseSigner] = None,
 ) -> FastAPI:
     """
     创建 FastAPI 应用。
 
-    所有运行时依赖（加密器、存储、防重放、限流、时间）均可注入；为 ``None`` 时从
+    所有运行时依赖（加密器、存储、防重放、重复包过滤、限流、滥用追踪、指标、时间、离线令牌签发器）均可注入；为 ``None`` 时从
     配置加载真实资源（私钥文件、SQLite）。测试时注入临时依赖即可完全离线运行。
     """
     cfg = config or get_config()
@@ -89,30 +202,96 @@ def create_app(
         )
         logger.info("启动 Sealium 激活服务...")
         cfg.ensure_directories()
-        # 真实资源模式才校验私钥文件；注入加密器时跳过文件校验
+        # 真实资源模式才校验私钥文件；注入加密器时跳过文件校验（预派生由主进程在 fork 前校验）
         if encryptor is None:
             cfg.validate()
-        server_encryptor = encryptor or _load_server_encryptor(cfg)
+        server_encryptor = encryptor or load_server_encryptor(cfg)
 
         own_db = storage is None
         db_handle: Optional[SQLiteDatabase] = None
+        edge = cfg.cluster.enabled and cfg.cluster.role == "edge"
         if storage is not None:
             activation_storage = storage
+        elif edge:
+            # 边缘节点：不开 SQLite，只读内存映射快照应答
+            activation_storage = SnapshotStorage(
+                cfg.paths.snapshot,
+                _code_hasher(cfg),
+                reload_seconds=cfg.cluster.snapshot_reload_seconds,
+            )
         else:
             db_handle, activation_storage = _open_storage(cfg)
 
+        # 共享后端（多 worker / 多节点）：配置了 [redis] url 时，未注入的限流与防重放改用 Redis
+        redis_client = _open_redis(cfg)
+        if replay_guard is not None:
+            guard = replay_guard
+        elif redis_client is not None:
+            guard = ReplayGuard(
+                store=RedisReplayStore(redis_client, key_prefix=cfg.redis.key_prefix)
+            )
+        else:
+            guard = ReplayGuard(max_size=cfg.security.replay_cache_size)
+
+        # 失败激活滥用追踪：固定内存 Count-Min Sketch，可选临时封禁（早拒绝 429）
+        tracker = abuse_tracker if abuse_tracker is not None else AbuseTracker(
+            width=cfg.abuse.sketch_width,
+            depth=cfg.abuse.sketch_depth,
+            top_k=cfg.abuse.top_k,
+            decay_seconds=cfg.abuse.decay_seconds,
+            block_threshold=cfg.abuse.block_threshold,
+            block_seconds=cfg.abuse.block_seconds,
+        )
+
+        # 分阶段延迟直方图与计数器（/metrics 导出）
+        activation_metrics = metrics if metrics is not None else ActivationMetrics()
+        # 审计日志：启用时请求路径只入队，后台线程批量落盘
+        audit_log = _open_audit_log(cfg)
+
+        # 集群：按 code_hash 一致性哈希分片，非本节点的码解密后转发给属主；
+        # 边缘节点只把快照中未使用的码（首次绑定）转发给属主
+        cluster = (
+            ClusterRouter.from_config(cfg, activation_storage.hash_code)
+            if cfg.cluster.enabled
+            else None
+        )
+        if edge:
+            cluster = EdgeRouter(cluster, activation_storage)
+
         app.state.config = cfg
         app.state.server_encryptor = server_encryptor
+        app.state.storage = activation_storage
+        app.state.cluster = cluster
+        app.state.abuse_tracker = tracker
+        app.state.metrics = activation_metrics
+        app.state.replay_guard = guard
+        app.state.audit_log = audit_log
+        # 离线令牌：注入优先；否则 [license_token] 启用时从文件加载签名私钥
+        signer = license_signer
+        if signer is None and cfg.license_token.enabled:
+            signer = load_license_signer(cfg)
         app.state.activation_service = ActivationService(
             activation_storage,
-            replay_guard if replay_guard is not None else ReplayGuard(max_size=cfg.security.replay_cache_size),
+            guard,
             cfg.security.timestamp_tolerance_seconds,
             now_provider=now_provider,
             machine_id_policy=cfg.machine_id_policy(),
+            abuse_tracker=tracker,
+            metrics=activation_metrics,
+            audit_log=audit_log,
+            license_signer=signer,
+            license_ttl_seconds=cfg.license_token.ttl_days * 24 * 3600,
         )
-        # 限流器：注入优先；否则按配置启用进程内固定窗口限流（MEDIUM-002）
+        # 限流器：注入优先；否则按配置启用令牌桶限流（MEDIUM-002），有共享后端时走 Redis
         if rate_limiter is not None:
             limiter = rate_limiter
+        elif cfg.rate_limit.enabled and redis_client is not None:
+            limiter = RedisRateLimiter(
+                redis_client,
+                cfg.rate_limit.max_requests,
+                cfg.rate_limit.window_seconds,
+                key_prefix=cfg.redis.key_prefix,
+            )
         elif cfg.rate_limit.enabled:
             limiter = InMemoryRateLimiter(
                 cfg.rate_limit.max_requests, cfg.rate_limit.window_seconds
@@ -120,10 +299,32 @@ def create_app(
         else:
             limiter = NullRateLimiter()
         app.state.rate_limiter = limiter
+        # RSA 前重复包过滤：逐字节回放在私钥解密前即被丢弃
+        app.state.duplicate_filter = (
+            duplicate_filter
+            if duplicate_filter is not None
+            else InMemoryDuplicateFilter(max_size=cfg.security.duplicate_filter_size)
+        )
+        # 纯 ASGI 快速路径：组件直接注入，由早拒绝中间件放行后直接调用
+        app.state.activation_endpoint = (
+            ActivationEndpoint(
+                server_encryptor,
+                app.state.activation_service,
+                limiter,
+                app.state.duplicate_filter,
+                activation_metrics,
+                body_read_timeout=cfg.server.body_read_timeout_seconds,
+                cost_weighted=cfg.rate_limit.cost_weighted,
+                allowed_hosts=cfg.server.allowed_hosts,
+                cluster=cluster,
+            )
+            if cfg.server.fast_path
+            else None
+        )
 
         if cfg.server.debug:
             logger.warning(
-                "⚠️ DEBUG 模式已开启：/docs、/redoc、/openapi.json、/debug/config 均暴露。"
+                "⚠️ DEBUG 模式已开启：/docs、/redoc、/openapi.json、/debug/config、/debug/profile 均暴露。"
                 "生产环境必须 [server] debug=false。/debug/config 仅限本机回环访问（LOW-004）。"
             )
             logger.debug("生效配置（脱敏）: %s", cfg.safe_dump())
@@ -131,8 +332,16 @@ def create_app(
         try:
             yield
         finally:
+            if cluster is not None:
+                cluster.close()
+            if audit_log is not None:
+                audit_log.close()
             if own_db and db_handle is not None:
                 db_handle.close()
+            if own_db and edge:
+                activation_storage.close()
+            if redis_client is not None:
+                redis_client.close()
             logger.info("关闭 Sealium 激活服务...")
 
     app = FastAPI(
@@ -147,6 +356,11 @@ def create_app(
         openapi_url="/openapi.json" if cfg.server.debug else None,
     )
     app.state.config = cfg
+    # 受信代理一次性解析为前缀树（支持 CIDR），每请求不再重建集合
+    trusted = list(cfg.server.trusted_proxies)
+    if cfg.server.unix_socket is not None:
+        trusted.append(UNIX_PEER)  # 套接字由文件权限限定为本机受信调用方
+    app.state.trusted_proxies = TrustedProxies(trusted)
 
     # CORS：本接口由原生客户端（application/octet-stream）调用，无需浏览器凭据；
     # 关闭 allow_credentials 以避免 “* + credentials” 误配（MEDIUM-001）。
@@ -162,13 +376,59 @@ def create_app(
     # Starlette 直接放行（零配置开箱不破坏）；生产配具体域名即启用校验。注册在 CORS
     # 之后（栈中外层），使 Host 校验先于 CORS 执行。
     app.add_middleware(TrustedHostMiddleware, allowed_hosts=cfg.server.allowed_hosts)
+    # 早拒绝（最外层）：激活路由的限流 429 / Content-Length 413 直接在 ASGI 层回写，
+    # 洪泛下被拒请求不构造 Request、不经过 Host / CORS 中间件与依赖注入。
+    # fast_path 开启时放行的激活请求也由它直接交给 ActivationEndpoint。
+    app.add_middleware(EarlyRejectMiddleware, path=cfg.activation_route())
     app.include_router(create_router(cfg.server.activation_path), prefix=cfg.server.api_prefix)
+    if cfg.cluster.enabled and cfg.cluster.role == "member":
+        app.include_router(create_cluster_router())
 
     @app.get("/health", tags=["health"])
     async def health_check() -> dict:
         """健康检查端点。"""
         return {"status": "ok", "service": "activation"}
 
+    @app.get("/internal/abuse", tags=["internal"], include_in_schema=False)
+    async def abuse_report(request: Request) -> dict:
+        """失败激活 Top-K 报告（客户端 / 激活码短哈希 / 原因计数）。仅限本机回环访问。"""
+        _require_loopback(request)
+        return request.app.state.abuse_tracker.report()
+
+    @app.get("/metrics", tags=["internal"], include_in_schema=False)
+    async def metrics_endpoint(request: Request) -> PlainTextResponse:
+        """Prometheus 文本格式指标（分阶段延迟、拒绝原因、缓存状态）。仅限本机回环访问。"""
+        _require_loopback(request)
+        return PlainTextResponse(
+            _render_metrics(request.app.state),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    if cfg.server.debug or cfg.server.profiling:
+
+        @app.get("/debug/profile", tags=["debug"])
+        async def debug_profile(
+            request: Request,
+            seconds: float = Query(10.0, gt=0, le=MAX_SECONDS),
+            interval_ms: float = Query(5.0, ge=1.0),
+            allocations: bool = False,
+            format: str = Query("json", pattern="^(json|collapsed)$"),
+        ):
+            """采样剖析本进程 ``seconds`` 秒，返回折叠栈（火焰图输入）与可选的分配 Top-N。
+
+            仅限本机回环访问；同一时刻只允许一次剖析（409）。剖析期间服务照常处理请求。
+            """
+            _require_loopback(request)
+            try:
+                result = await profile(
+                    seconds, interval=interval_ms / 1000, allocations=allocations
+                )
+            except ProfilerBusy:
+                raise HTTPException(status_code=409, detail="已有剖析在进行")
+            if format == "collapsed":
+                return PlainTextResponse("\n".join(result["collapsed"]) + "\n")
+            return result
+
     if cfg.server.debug:
 
         @app.get("/debug/config", tags=["debug"])
@@ -178,9 +438,7 @@ def create_app(
             debug 模式下此端点暴露绝对路径、限流参数、判定阈值等细节；若生产误开
             debug 又暴露公网，远程攻击者可借此定位高价值文件。故强制仅本机回环可读。
             """
-            peer = request.client.host if request.client else None
-            if peer not in _LOOPBACK_HOSTS:
-                raise HTTPException(status_code=403, detail="debug 端点仅限本机回环访问")
+            _require_loopback(request)
             return cfg.safe_dump()
 
     return app
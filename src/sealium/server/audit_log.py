@@ -0,0 +1,231 @@
+# src/sealium/server/audit_log.py
+"""
+结构化审计日志：请求路径只入队，后台线程批量落盘。
+
+``ActivationService`` 原先对每个结果同步 ``logger.info``，参数里的 ``_short_hash``
+对指纹要先构造完整 ``canonical()`` JSON 再做 SHA-256 —— 这些都计入请求延迟，且随
+日志 handler（文件 / 网络）的 I/O 抖动。本模块把审计拆成两段：
+
+* **请求路径**：:meth:`AuditLog.emit` 只构造一个定长元组（时间戳、结果、原因码、
+  激活码、指纹、客户端）并 ``deque.append``。``deque`` 的 append / popleft 在 CPython
+  中是原子操作，无需加锁；队列有界，满时**丢弃新事件并计数**（背压不反噬请求）；
+* **后台写线程**：按 ``batch_size`` 或 ``flush_interval`` 批量取出，在此计算激活码 /
+  指纹短哈希（原始值从不落盘），写入 NDJSON（按大小轮转）或 SQLite（每批一个事务）。
+
+:meth:`AuditLog.stats` 给出已入队 / 已写入 / 丢弃 / 写失败计数，供 ``/metrics`` 导出。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional, Protocol, Union
+
+from sealium.common.fingerprint import MachineFingerprint
+
+logger = logging.getLogger("sealium.server.audit")
+
+# 入队的定长事件：(ts, outcome, reason, code, machine, client)
+AuditEvent = tuple[float, str, str, str, Optional[MachineFingerprint], Optional[str]]
+# 落盘的定长记录：(ts, outcome, reason, code_digest, machine_digest, client)
+AuditRecord = tuple[float, str, str, str, Optional[str], Optional[str]]
+
+
+def short_digest(value: Union[str, MachineFingerprint]) -> str:
+    """短哈希（截断 SHA-256），不记录原始激活码 / 机器码。"""
+    s = value.canonical() if isinstance(value, MachineFingerprint) else str(value)
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()[:12]
+
+
+class AuditSink(Protocol):
+    """审计落盘目标（仅由写线程调用）。"""
+
+    def write(self, records: list[AuditRecord]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class NdjsonSink:
+    """按大小轮转的 NDJSON 文件：``audit.ndjson`` → ``audit.ndjson.1`` → … ``.{backups}``。"""
+
+    def __init__(self, path: Path, *, max_bytes: int = 50 * 1024 * 1024, backups: int = 5) -> None:
+        self._path = Path(path)
+        self._max_bytes = max_bytes
+        self._backups = backups
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self._path.open("a", encoding="utf-8")
+
+    def write(self, records: list[AuditRecord]) -> None:
+        lines = "".join(
+            json.dumps(
+                {"ts": ts, "outcome": outcome, "reason": reason, "code": code,
+                 "machine": machine, "client": client},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+            + "\n"
+            for ts, outcome, reason, code, machine, client in records
+        )
+        self._file.write(lines)
+        self._file.flush()
+        if self._file.tell() >= self._max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        if self._backups > 0:
+            for i in range(self._backups - 1, 0, -1):
+                src = self._path.with_name(f"{self._path.name}.{i}")
+                if src.exists():
+                    os.replace(src, self._path.with_name(f"{self._path.name}.{i + 1}"))
+            os.replace(self._path, self._path.with_name(f"{self._path.name}.1"))
+        else:
+            self._path.unlink()
+        self._file = self._path.open("a", encoding="utf-8")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class SQLiteSink:
+    """独立 SQLite 文件中的 ``audit_events`` 表，每批一个事务。"""
+
+    def __init__(self, path: Path) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # 访问天然串行：运行期仅写线程使用，close 时写线程已 join，故允许跨线程
+        if self._conn is None:
+            self._conn = sqlite3.connect(str(self._path), check_same_thread=False)
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS audit_events (
+                    ts REAL NOT NULL,
+                    outcome TEXT NOT NULL,
+                    reason TEXT NOT NULL,
+                    code TEXT NOT NULL,
+                    machine TEXT,
+                    client TEXT
+                )"""
+            )
+            self._conn.commit()
+        return self._conn
+
+    def write(self, records: list[AuditRecord]) -> None:
+        conn = self._connect()
+        with conn:
+            conn.executemany("INSERT INTO audit_events VALUES (?, ?, ?, ?, ?, ?)", records)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class AuditLog:
+    """有界无锁入队 + 后台批量写入的审计日志。"""
+
+    def __init__(
+        self,
+        sink: AuditSink,
+        *,
+        queue_size: int = 10_000,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+    ) -> None:
+        if queue_size <= 0 or batch_size <= 0 or flush_interval <= 0:
+            raise ValueError("queue_size / batch_size / flush_interval 必须为正")
+        self._sink = sink
+        self._queue: deque[AuditEvent] = deque()
+        self._capacity = queue_size
+        self._batch = batch_size
+        self._interval = flush_interval
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    # ---------- 请求路径 ----------
+    def emit(
+        self,
+        outcome: str,
+        reason: str,
+        code: str,
+        machine: Optional[MachineFingerprint] = None,
+        client: Optional[str] = None,
+    ) -> None:
+        """入队一条审计事件；队列满则丢弃并计数，绝不阻塞调用方。"""
+        queue = self._queue
+        if len(queue) >= self._capacity:
+            self.dropped += 1
+            return
+        queue.append((time.time(), outcome, reason, code, machine, client))
+        self.enqueued += 1
+        if len(queue) >= self._batch:
+            self._wake.set()
+
+    # ---------- 生命周期 ----------
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="sealium-audit", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """停止写线程，落盘队列剩余事件后关闭 sink。"""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._drain()
+        self._sink.close()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": len(self._queue),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    # ---------- 写线程 ----------
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            self._drain()
+
+    def _drain(self) -> None:
+        queue = self._queue
+        while queue:
+            batch: list[AuditRecord] = []
+            while queue and len(batch) < self._batch:
+                ts, outcome, reason, code, machine, client = queue.popleft()
+                batch.append(
+                    (
+                        ts,
+                        outcome,
+                        reason,
+                        short_digest(code),
+                        short_digest(machine) if machine is not None else None,
+                        client,
+                    )
+                )
+            try:
+                self._sink.write(batch)
+                self.written += len(batch)
+            except Exception:
+                # 落盘失败不影响服务：计数并记录一次异常，丢弃该批
+                self.failed += len(batch)
+                logger.exception("审计日志写入失败，丢弃 %d 条", len(batch))
@@ -0,0 +1,89 @@
+# src/sealium/server/body_reader.py
+"""
+有界、限时的请求体读取（激活路由专用）。
+
+``await request.body()`` 会先把整个请求体缓冲进内存再交给路由判长度：缺失
+``Content-Length`` 的 chunked 上传、或逐字节慢速发送（slowloris）的客户端，都能
+在被拒之前占住内存与 worker。本模块直接消费 ASGI ``receive`` 通道：
+
+* **边读边判长**：累计长度一旦超过上限立即中止（413），不再继续接收；
+* **整体读取截止时间**：从开始读到读完不得超过 ``timeout`` 秒（408），慢速客户端
+  无法无限期占用连接；
+* **预分配缓冲**：按 ``Content-Length``（可信范围内）或 RSA+AES 包的典型大小一次性
+  分配 ``bytearray``，分块写入，避免逐块拼接。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+from starlette.types import Receive
+
+from sealium.common.constants import AES_GCM_NONCE_SIZE, AES_GCM_TAG_SIZE
+
+# 典型激活明文（激活码 + 机器码 JSON + 时间戳 / nonce）加密后的密文长度余量。
+_TYPICAL_CIPHERTEXT_BYTES = 2048
+
+
+class BodyReadError(ValueError):
+    """请求体读取被中止；``status_code`` 为应回给客户端的 HTTP 状态码。"""
+
+    def __init__(self, status_code: int, message: str) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def request_capacity(rsa_key_size: int, content_length: Optional[str], limit: int) -> int:
+    """预分配容量：可信的 ``Content-Length`` 优先，否则取 RSA+AES 包的典型大小。"""
+    if content_length is not None:
+        try:
+            declared = int(content_length)
+        except ValueError:
+            declared = -1
+        if 0 <= declared <= limit:
+            return declared
+    typical = rsa_key_size // 8 + AES_GCM_NONCE_SIZE + _TYPICAL_CIPHERTEXT_BYTES + AES_GCM_TAG_SIZE
+    return min(typical, limit)
+
+
+async def read_bounded_body(
+    receive: Receive,
+    *,
+    limit: int,
+    timeout: float,
+    capacity: int = 0,
+) -> bytes:
+    """
+    从 ASGI ``receive`` 读取完整请求体。
+
+    :param limit: 请求体字节上限，超过即中止。
+    :param timeout: 整体读取截止时间（秒）。
+    :param capacity: 预分配缓冲大小（见 :func:`request_capacity`）。
+    :raises BodyReadError: 超限（413）、超时（408）或客户端中途断开（400）。
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    buf = bytearray(capacity)
+    size = 0
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise BodyReadError(408, "请求体读取超时")
+        try:
+            message = await asyncio.wait_for(receive(), remaining)
+        except asyncio.TimeoutError:
+            raise BodyReadError(408, "请求体读取超时") from None
+        if message["type"] == "http.disconnect":
+            raise BodyReadError(400, "客户端在请求体读完前断开")
+        chunk = message.get("body", b"")
+        if chunk:
+            end = size + len(chunk)
+            if end > limit:
+                raise BodyReadError(413, "请求体超过上限")
+            buf[size:end] = chunk  # 容量内原地写入；超出预分配时自动扩容
+            size = end
+        if not message.get("more_body", False):
+            break
+    del buf[size:]
+    return bytes(buf)
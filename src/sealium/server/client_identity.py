@@ -23,22 +23,147 @@
 XFF 一律被忽略，伪造面消失。
 
 默认 ``trusted_proxies`` 仅回环，覆盖「同机反代」这一默认推荐部署；跨机/容器
-反代需在配置中显式加入反代所在 IP。
+反代需在配置中显式加入反代所在 IP 或网段（CIDR，如 ``10.0.0.0/8``）。
+
+受信代理在启动时一次性解析为前缀树（:class:`TrustedProxies`），每请求只做一次
+地址解析 + 至多 32/128 步的位遍历，不再每请求重建集合。
+
+限流键聚合
+----------
+单个 IPv6 用户通常分得 /56 或 /64 整段，逐地址分桶时轮换源地址即可无限生成新桶。
+:func:`rate_limit_key` 把客户端 IP 归并到可配置前缀（``[rate_limit] ipv4_prefix``
+/ ``ipv6_prefix``），同一前缀共享一个桶。
 """
 
 from __future__ import annotations
 
-from typing import Sequence
+import ipaddress
+import socket
+from functools import lru_cache
+from typing import Iterable, Optional, Sequence, Union
 
 from fastapi import Request
 
 # 与 ServerModel.trusted_proxies 默认值保持一致（同机反代场景）。
 _DEFAULT_TRUSTED_PROXIES: tuple[str, ...] = ("127.0.0.1", "::1")
 
+# Unix 域套接字连接的对端名（ASGI client 为 None；见 unix_socket）
+UNIX_PEER = "unix"
+
+_V4_MAPPED_PREFIX = b"\x00" * 10 + b"\xff\xff"
+_FAMILY = {4: socket.AF_INET, 6: socket.AF_INET6}
+_BITS = {4: 32, 6: 128}
+
+
+def _parse_ip(value: str) -> Optional[tuple[int, int]]:
+    """解析地址为 ``(版本, 整数值)``；IPv4 映射的 IPv6（``::ffff:a.b.c.d``）归一为 IPv4。
+
+    每请求热路径：先走 C 实现的 ``inet_pton``（比 ``ipaddress`` 快一个数量级），
+    带 zone 的 IPv6（``fe80::1%eth0``）等少见形式再回退 ``ipaddress``。非法返回 ``None``。
+    """
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, value), "big")
+    except OSError:
+        pass
+    try:
+        packed = socket.inet_pton(socket.AF_INET6, value)
+    except OSError:
+        try:
+            packed = ipaddress.ip_address(value).packed
+        except ValueError:
+            return None
+        if len(packed) == 4:
+            return 4, int.from_bytes(packed, "big")
+    if packed[:12] == _V4_MAPPED_PREFIX:
+        return 4, int.from_bytes(packed[12:], "big")
+    return 6, int.from_bytes(packed, "big")
+
+
+def _format_ip(version: int, value: int) -> str:
+    return socket.inet_ntop(_FAMILY[version], value.to_bytes(_BITS[version] // 8, "big"))
+
+
+class _PrefixTrie:
+    """二进制前缀树：节点为 ``[child0, child1, terminal]``，路径上遇到终止节点即命中。"""
+
+    __slots__ = ("_root", "_bits")
+
+    def __init__(self, bits: int) -> None:
+        self._root: list = [None, None, False]
+        self._bits = bits
+
+    def insert(self, value: int, prefixlen: int) -> None:
+        node = self._root
+        for i in range(prefixlen):
+            bit = (value >> (self._bits - 1 - i)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, False]
+            node = node[bit]
+        node[2] = True
+
+    def contains(self, value: int) -> bool:
+        node = self._root
+        shift = self._bits - 1
+        while node is not None:
+            if node[2]:
+                return True
+            if shift < 0:
+                return False
+            node = node[(value >> shift) & 1]
+            shift -= 1
+        return False
+
+
+class TrustedProxies:
+    """受信代理集合（IP 或 CIDR 网段），构造时解析为按地址族分开的前缀树。
+
+    非 IP 的条目（如 ASGI 服务器报告的非网络对端名）按字面精确匹配，与旧行为一致。
+
+    :raises ValueError: 含 ``/`` 的条目不是合法网段。
+    """
+
+    def __init__(self, entries: Iterable[str]) -> None:
+        self._tries = {4: _PrefixTrie(32), 6: _PrefixTrie(128)}
+        self._literals: set[str] = set()
+        self.entries: tuple[str, ...] = tuple(entries)
+        for entry in self.entries:
+            entry = entry.strip()
+            if "/" not in entry and _parse_ip(entry) is None:
+                self._literals.add(entry)
+                continue
+            net = ipaddress.ip_network(entry, strict=False)
+            mapped = net.network_address.ipv4_mapped if net.version == 6 else None
+            if mapped is not None and net.prefixlen >= 96:
+                # ::ffff:a.b.c.d/N 与地址侧归一保持一致，按 IPv4 登记
+                net = ipaddress.ip_network((mapped, net.prefixlen - 96), strict=False)
+            self._tries[net.version].insert(int(net.network_address), net.prefixlen)
+
+    def __contains__(self, addr: object) -> bool:
+        if not isinstance(addr, str):
+            return False
+        ip = _parse_ip(addr)
+        if ip is None:
+            return addr in self._literals
+        return self._tries[ip[0]].contains(ip[1])
+
+    def __repr__(self) -> str:
+        return f"TrustedProxies({list(self.entries)!r})"
+
+
+@lru_cache(maxsize=16)
+def _trusted_from_tuple(entries: tuple[str, ...]) -> TrustedProxies:
+    return TrustedProxies(entries)
+
+
+def _as_trusted(trusted_proxies: Union[TrustedProxies, Sequence[str]]) -> TrustedProxies:
+    if isinstance(trusted_proxies, TrustedProxies):
+        return trusted_proxies
+    return _trusted_from_tuple(tuple(trusted_proxies))
+
 
 def resolve_client_ip(
     request: Request,
-    trusted_proxies: Sequence[str] = _DEFAULT_TRUSTED_PROXIES,
+    trusted_proxies: Union[TrustedProxies, Sequence[str]] = _DEFAULT_TRUSTED_PROXIES,
 ) -> str:
     """返回用于限流分桶的真实客户端 IP。
 
@@ -51,21 +176,50 @@ def resolve_client_ip(
        兼容多层受信代理链）；头缺失或全为受信段时回退 TCP 对端。
 
     :param request: FastAPI/Starlette 请求对象。
-    :param trusted_proxies: 受信任代理 IP 集合（默认仅回环）。
+    :param trusted_proxies: 受信任代理（IP / CIDR 列表或预解析的 :class:`TrustedProxies`，
+        默认仅回环）。传列表时按内容缓存解析结果。
     :return: 客户端 IP 字符串；无法确定时返回 ``"unknown"``。
     """
     peer = request.client.host if request.client else None
+    return resolve_peer_ip(peer, request.headers.get("x-forwarded-for", ""), trusted_proxies)
+
+
+def resolve_peer_ip(
+    peer: Optional[str],
+    xff: str,
+    trusted_proxies: Union[TrustedProxies, Sequence[str]] = _DEFAULT_TRUSTED_PROXIES,
+) -> str:
+    """:func:`resolve_client_ip` 的无 Request 版本：直接给出 TCP 对端与 XFF 头值。
+
+    供纯 ASGI 层（``early_reject``）使用，避免为被拒请求构造 Request 对象。
+    """
     if not peer:
         return "unknown"
 
-    trusted = set(trusted_proxies)
+    trusted = _as_trusted(trusted_proxies)
     if peer not in trusted:
         return peer  # 直连 / 不受信来源：用 TCP 对端，忽略可能伪造的 XFF
 
     # 受信代理：从 XFF 头链右侧向左剥离受信段，第一个非受信即真实客户端
-    xff = request.headers.get("x-forwarded-for", "")
     candidates = [part.strip() for part in xff.split(",") if part.strip()]
     for addr in reversed(candidates):
         if addr not in trusted:
             return addr
     return peer  # 受信代理但 XFF 缺失 / 全为受信段：回退对端
+
+
+def rate_limit_key(client_ip: str, ipv4_prefix: int = 32, ipv6_prefix: int = 128) -> str:
+    """把客户端 IP 归并为限流键：按前缀截断为网段（如 ``203.0.113.0/24``）。
+
+    前缀取满长（32 / 128）时原样返回地址；无法解析（如 ``"unknown"``）时原样返回。
+    """
+    ip = _parse_ip(client_ip)
+    if ip is None:
+        return client_ip
+    version, value = ip
+    bits = _BITS[version]
+    prefix = ipv4_prefix if version == 4 else ipv6_prefix
+    if prefix >= bits:
+        return _format_ip(version, value)
+    host_bits = bits - prefix
+    return f"{_format_ip(version, value >> host_bits << host_bits)}/{prefix}"
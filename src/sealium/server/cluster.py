@@ -0,0 +1,483 @@
+# src/sealium/server/cluster.py
+"""
+多节点集群：按 ``code_hash`` 一致性哈希分片激活码目录（``[cluster]``）。
+
+单个 SQLite 节点是容量上限。集群模式下每个节点只持有环上归属自己的那部分激活码：
+
+* **分片键**：``code_hash = HMAC-SHA256(code, pepper)``（即 DB 主键）。请求一经解密即可
+  算出，无需查库；全部节点须配置相同的 pepper；
+* **一致性哈希**：每节点 ``vnodes`` 个虚拟点（BLAKE2b），``code_hash`` 顺时针落到的第一个
+  点即属主。增删一个节点只迁移约 ``1/N`` 的码；
+* **转发而非重做 RSA**：入口节点照常完成读包 / 重复包过滤 / RSA 解密；属主不是自己时，
+  把**已解密**的 :class:`ActivationRequest` 用节点间密钥（AES-256-GCM，由 ``secret``
+  派生）重新封装，经 keep-alive 连接池发给属主的 ``/cluster/v1/activate``。属主执行
+  ``ActivationService.process`` 后把响应封装回传，入口节点再用客户端会话密钥加密返回。
+  客户端会话密钥不出入口节点，属主也不再付 RSA；
+* **迁移（rebalance）**：成员变更后各节点运行
+  ``python -m sealium.server.cluster rebalance``，把本地不再归属自己的行推给新属主
+  （``/cluster/v1/import``，已绑定优先合并），确认后删除本地副本。新生成的激活码可写入
+  任一节点再 rebalance 分发。
+
+封装消息以用途串作 AEAD 关联数据、载荷带目标节点 id，不同接口 / 不同节点之间的消息
+不可互换。每次调用另带随机请求 id，回复回显该 id 与收发节点 id，入口节点不接受任何
+与本次请求不匹配的回复（截获的旧回复不能冒充另一个请求的结果）。防重放、时间戳校验、审计与滥用追踪都在属主节点的 ``ActivationService`` 中
+完成；限流与重复包过滤在入口节点完成。
+
+属主不可达时入口节点返回通用的"稍后重试"业务错误（不回退为本地处理，避免同一个码在
+两个节点各绑一次）。
+
+``role = "edge"`` 的节点不在成员列表中、不持有目录：本地只读快照（见 ``snapshot``）
+回答重激活与未知码，首次绑定按同一个环转发给属主。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import sys
+from bisect import bisect_right
+from collections import deque
+from typing import Any, Callable, Iterable, Optional, Protocol
+from urllib.parse import urlparse
+
+from sealium.common.constants import AES_GCM_NONCE_SIZE, AES_GCM_TAG_SIZE
+from sealium.common.crypto import AESEncryptor
+from sealium.common.exceptions import BackendError
+from sealium.common.models import ActivationRequest, ActivationResponse
+from sealium.server.rate_limit import STAGE_COSTS, RequestCost
+
+logger = logging.getLogger("sealium.server.cluster")
+
+ACTIVATE_PATH = "/cluster/v1/activate"
+IMPORT_PATH = "/cluster/v1/import"
+
+# AEAD 关联数据：同一密钥下不同用途的消息互不可替换
+PURPOSE_ACTIVATE = b"sealium-cluster/activate"
+PURPOSE_ACTIVATE_REPLY = b"sealium-cluster/activate-reply"
+PURPOSE_IMPORT = b"sealium-cluster/import"
+PURPOSE_IMPORT_REPLY = b"sealium-cluster/import-reply"
+
+# 内部接口请求体上限：单次转发为一个激活请求；迁移按批推送原始行
+MAX_ACTIVATE_BYTES = 64 * 1024
+MAX_IMPORT_BYTES = 8 * 1024 * 1024
+
+_KEY_LABEL = b"sealium-cluster-v1"
+
+
+# ---------------------------------------------------------------------------
+# 一致性哈希环
+# ---------------------------------------------------------------------------
+def _point(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """一致性哈希环：``code_hash`` 顺时针落到的第一个虚拟点所属节点即属主。"""
+
+    def __init__(self, nodes: Iterable[str], vnodes: int = 128) -> None:
+        self.nodes: tuple[str, ...] = tuple(sorted(set(nodes)))
+        if not self.nodes:
+            raise ValueError("哈希环至少需要一个节点")
+        if vnodes < 1:
+            raise ValueError("vnodes 必须为正整数")
+        points = sorted(
+            (_point(f"{node}#{i}".encode("utf-8")), node) for node in self.nodes for i in range(vnodes)
+        )
+        self._points = [p for p, _ in points]
+        self._owners = [node for _, node in points]
+
+    def owner(self, code_hash: str) -> str:
+        """``code_hash``（十六进制摘要）的属主节点 id。"""
+        i = bisect_right(self._points, int(code_hash[:16], 16))
+        return self._owners[i % len(self._owners)]
+
+
+# ---------------------------------------------------------------------------
+# 节点间封装
+# ---------------------------------------------------------------------------
+def derive_key(secret: str) -> bytes:
+    """由配置的 ``secret`` 派生节点间 AES-256 密钥。"""
+    return hmac.new(secret.encode("utf-8"), _KEY_LABEL, hashlib.sha256).digest()
+
+
+def seal(key: bytes, purpose: bytes, payload: dict) -> bytes:
+    """JSON 载荷 → ``nonce + ciphertext + tag``（用途串作关联数据）。"""
+    nonce, ciphertext, tag = AESEncryptor.encrypt(
+        key, json.dumps(payload, separators=(",", ":")).encode("utf-8"), purpose
+    )
+    return nonce + ciphertext + tag
+
+
+def unseal(key: bytes, purpose: bytes, data: bytes) -> dict:
+    """:func:`seal` 的逆操作。
+
+    :raises ValueError: 包过短、认证失败（密钥 / 用途不符或被篡改）或载荷不是 JSON 对象。
+    """
+    if len(data) < AES_GCM_NONCE_SIZE + AES_GCM_TAG_SIZE:
+        raise ValueError("封装消息过短")
+    try:
+        plaintext = AESEncryptor.decrypt(
+            key,
+            data[:AES_GCM_NONCE_SIZE],
+            data[AES_GCM_NONCE_SIZE:-AES_GCM_TAG_SIZE],
+            data[-AES_GCM_TAG_SIZE:],
+            purpose,
+        )
+    except Exception as e:  # InvalidTag / CryptoError：密钥、用途不符或被篡改
+        raise ValueError("封装消息认证失败") from e
+    payload = json.loads(plaintext.decode("utf-8"))
+    if not isinstance(payload, dict):
+        raise ValueError("封装载荷必须是 JSON 对象")
+    return payload
+
+
+# ---------------------------------------------------------------------------
+# 对端连接池
+# ---------------------------------------------------------------------------
+class _StaleConnection(Exception):
+    """复用的空闲连接在收到任何响应前被对端关闭（keep-alive 超时）。"""
+
+
+class _PeerPool:
+    """到单个对端的 asyncio HTTP/1.1 keep-alive 连接池（仅用于节点间内部接口）。"""
+
+    def __init__(self, url: str, pool_size: int, timeout: float) -> None:
+        parsed = urlparse(url)
+        self._host = parsed.hostname
+        self._port = parsed.port or 80
+        self._authority = parsed.netloc
+        self._timeout = timeout
+        self._pool_size = pool_size
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._idle: deque[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = deque()
+
+    async def post(self, path: str, body: bytes) -> tuple[int, bytes]:
+        """发送 ``POST``，返回 ``(状态码, 响应体)``。
+
+        :raises BackendError: 连接 / 收发失败或超时。
+        """
+        if self._slots is None:  # 惰性创建：绑定到实际运行的事件循环（每个 worker 各一个）
+            self._slots = asyncio.Semaphore(self._pool_size)
+        try:
+            async with self._slots:
+                return await asyncio.wait_for(self._post(path, body), self._timeout)
+        except asyncio.TimeoutError as e:
+            raise BackendError(f"节点 {self._authority} 响应超时") from e
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            raise BackendError(f"节点 {self._authority} 通信失败: {e}") from e
+
+    async def _post(self, path: str, body: bytes) -> tuple[int, bytes]:
+        while self._idle:
+            conn = self._idle.pop()
+            if conn[0].at_eof() or conn[1].is_closing():
+                conn[1].close()
+                continue
+            try:
+                return await self._exchange(conn, path, body)
+            except (_StaleConnection, ConnectionError):
+                break  # 对端已关闭空闲连接、未作任何响应：换新连接重发一次
+        conn = await asyncio.open_connection(self._host, self._port)
+        try:
+            return await self._exchange(conn, path, body)
+        except _StaleConnection as e:
+            raise OSError("对端在响应前关闭连接") from e
+
+    async def _exchange(
+        self, conn: tuple[asyncio.StreamReader, asyncio.StreamWriter], path: str, body: bytes
+    ) -> tuple[int, bytes]:
+        reader, writer = conn
+        keep = False
+        try:
+            writer.write(
+                (
+                    f"POST {path} HTTP/1.1\r\nHost: {self._authority}\r\n"
+                    f"Content-Type: application/octet-stream\r\nContent-Length: {len(body)}\r\n\r\n"
+                ).encode("latin-1")
+                + body
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            if not status_line:
+                raise _StaleConnection()
+            status = int(status_line.split(b" ", 2)[1])
+            length: Optional[int] = None
+            keep = True
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.partition(b":")
+                name = name.strip().lower()
+                if name == b"content-length":
+                    length = int(value)
+                elif name == b"connection" and value.strip().lower() == b"close":
+                    keep = False
+            if length is None:
+                keep = False
+                raise ValueError("响应缺少 Content-Length")
+            data = await reader.readexactly(length)
+            return status, data
+        except BaseException:
+            keep = False
+            raise
+        finally:
+            if keep:
+                self._idle.append(conn)
+            else:
+                writer.close()
+
+    def close(self) -> None:
+        while self._idle:
+            self._idle.pop()[1].close()
+
+
+# ---------------------------------------------------------------------------
+# 路由器
+# ---------------------------------------------------------------------------
+class Forwarder(Protocol):
+    """激活链路的转发钩子（:class:`ClusterRouter`，或边缘节点的 ``snapshot.EdgeRouter``）。"""
+
+    def owner_of(self, code: str) -> Optional[str]: ...
+
+    async def forward(
+        self, owner: str, request: ActivationRequest, cost: RequestCost, *, client: Optional[str] = None
+    ) -> ActivationResponse: ...
+
+    def stats(self) -> dict[str, int]: ...
+
+    def close(self) -> None: ...
+
+
+class ClusterRouter:
+    """
+    集群路由：判定激活码属主，转发非本节点的请求，迁移原始行。
+
+    :param node_id: 本节点 id。
+    :param nodes: 全部成员 ``{id: url}``（含本节点）。
+    :param secret: 节点间共享密钥（派生 AES-256-GCM 密钥）。
+    :param code_hasher: 激活码 → ``code_hash``（与存储层同一 pepper）。
+    :param edge: 本节点为边缘节点（不在 ``nodes`` 中，所有码都有远端属主）。
+    """
+
+    def __init__(
+        self,
+        node_id: str,
+        nodes: dict[str, str],
+        secret: str,
+        code_hasher: Callable[[str], str],
+        *,
+        vnodes: int = 128,
+        pool_size: int = 8,
+        timeout: float = 5.0,
+        edge: bool = False,
+    ) -> None:
+        if (node_id in nodes) == edge:
+            raise ValueError(
+                f"边缘节点 {node_id!r} 不能是成员" if edge else f"本节点 {node_id!r} 不在成员列表中"
+            )
+        self.node_id = node_id
+        self.ring = HashRing(nodes, vnodes)
+        self._key = derive_key(secret)
+        self._hash = code_hasher
+        self._peers = {
+            peer: _PeerPool(url, pool_size, timeout) for peer, url in nodes.items() if peer != node_id
+        }
+        self.forwarded: dict[str, int] = {peer: 0 for peer in self._peers}
+        self.failures: dict[str, int] = {peer: 0 for peer in self._peers}
+
+    @classmethod
+    def from_config(cls, cfg, code_hasher: Callable[[str], str]) -> "ClusterRouter":
+        """由 :class:`~sealium.server.config.ServerConfig` 的 ``[cluster]`` 构建。"""
+        cluster = cfg.cluster
+        return cls(
+            cluster.node_id,
+            {node.id: node.url for node in cluster.nodes},
+            cfg.cluster_secret,
+            code_hasher,
+            vnodes=cluster.vnodes,
+            pool_size=cluster.pool_size,
+            timeout=cluster.timeout_seconds,
+            edge=cluster.role == "edge",
+        )
+
+    # ---------- 路由 ----------
+    def owner_of(self, code: str) -> Optional[str]:
+        """激活码的属主节点 id；属于本节点时返回 ``None``。"""
+        owner = self.ring.owner(self._hash(code))
+        return None if owner == self.node_id else owner
+
+    async def forward(
+        self,
+        owner: str,
+        request: ActivationRequest,
+        cost: RequestCost,
+        *,
+        client: Optional[str] = None,
+    ) -> ActivationResponse:
+        """
+        把已解密的请求转发给属主处理；属主触达的阶段计入 ``cost``（入口节点按代价扣费）。
+
+        :raises BackendError: 属主不可达、拒绝或回复无法认证。
+        """
+        reply = await self._call(
+            owner,
+            ACTIVATE_PATH,
+            PURPOSE_ACTIVATE,
+            {"request": request.to_dict(), "client": client},
+            PURPOSE_ACTIVATE_REPLY,
+        )
+        for stage in reply.get("stages", ()):
+            if stage in STAGE_COSTS:
+                cost.add(stage)
+        self.forwarded[owner] += 1
+        return ActivationResponse.from_dict(reply["response"])
+
+    async def push_rows(self, owner: str, rows: list[dict[str, Any]]) -> list[str]:
+        """把原始行推给属主导入，返回属主**拒收**的 ``code_hash``（按其环不归它）。"""
+        reply = await self._call(owner, IMPORT_PATH, PURPOSE_IMPORT, {"rows": rows}, PURPOSE_IMPORT_REPLY)
+        return list(reply.get("rejected", ()))
+
+    async def _call(
+        self, owner: str, path: str, purpose: bytes, payload: dict, reply_purpose: bytes
+    ) -> dict:
+        """封装并发送 ``payload``，返回与本次请求匹配的回复。"""
+        request_id = secrets.token_hex(16)
+        body = seal(self._key, purpose, {**payload, "id": request_id, "to": owner, "from": self.node_id})
+        try:
+            status, data = await self._peers[owner].post(path, body)
+            if status != 200:
+                raise BackendError(f"节点 {owner} 返回 HTTP {status}")
+            try:
+                reply = unseal(self._key, reply_purpose, data)
+            except ValueError as e:
+                raise BackendError(f"节点 {owner} 的回复无法认证") from e
+            if (reply.get("id"), reply.get("from"), reply.get("to")) != (request_id, owner, self.node_id):
+                raise BackendError(f"节点 {owner} 的回复与请求不匹配")
+            return reply
+        except BackendError:
+            self.failures[owner] += 1
+            raise
+
+    # ---------- 属主侧 ----------
+    def open_request(self, data: bytes, purpose: bytes) -> dict:
+        """解封发给本节点的消息。
+
+        :raises ValueError: 认证失败，或消息的目标节点不是本节点。
+        """
+        payload = unseal(self._key, purpose, data)
+        if payload.get("to") != self.node_id:
+            raise ValueError("消息目标节点不是本节点")
+        return payload
+
+    def seal_reply(self, request: dict, payload: dict, purpose: bytes) -> bytes:
+        """封装对 ``request``（:meth:`open_request` 的结果）的回复：回显请求 id 与收发节点。"""
+        return seal(
+            self._key,
+            purpose,
+            {**payload, "id": request.get("id"), "to": request.get("from"), "from": self.node_id},
+        )
+
+    def owns_hash(self, code_hash: str) -> bool:
+        return self.ring.owner(code_hash) == self.node_id
+
+    # ---------- 生命周期 ----------
+    def stats(self) -> dict[str, int]:
+        return {"forwarded": sum(self.forwarded.values()), "failures": sum(self.failures.values())}
+
+    def close(self) -> None:
+        for pool in self._peers.values():
+            pool.close()
+
+
+# ---------------------------------------------------------------------------
+# 迁移
+# ---------------------------------------------------------------------------
+def plan(rows: Iterable[dict[str, Any]], ring: HashRing, node_id: str) -> dict[str, list[dict[str, Any]]]:
+    """按环把不归 ``node_id`` 的行分组到各自属主。"""
+    moves: dict[str, list[dict[str, Any]]] = {}
+    for row in rows:
+        owner = ring.owner(row["code_hash"])
+        if owner != node_id:
+            moves.setdefault(owner, []).append(row)
+    return moves
+
+
+async def rebalance(router: ClusterRouter, storage, *, batch_size: int = 500) -> dict[str, int]:
+    """
+    把本地不归本节点的行分批推给属主，属主确认后删除本地副本。
+
+    :return: 各属主实际迁入的行数。属主拒收（成员配置不一致）的行保留在本地并告警。
+    """
+    moved: dict[str, int] = {}
+    for owner, rows in plan(storage.export_rows(), router.ring, router.node_id).items():
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start : start + batch_size]
+            rejected = set(await router.push_rows(owner, chunk))
+            if rejected:
+                logger.warning("节点 %s 拒收 %d 行（成员配置不一致？），保留在本地", owner, len(rejected))
+            done = [row["code_hash"] for row in chunk if row["code_hash"] not in rejected]
+            storage.delete_hashes(done)
+            moved[owner] = moved.get(owner, 0) + len(done)
+    return moved
+
+
+async def _run_rebalance(router: ClusterRouter, storage, batch_size: int) -> dict[str, int]:
+    try:
+        return await rebalance(router, storage, batch_size=batch_size)
+    finally:
+        router.close()  # 连接须在事件循环关闭前释放
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from sealium.server.app import _open_storage
+    from sealium.server.config import get_config
+
+    parser = argparse.ArgumentParser(description="Sealium 集群运维")
+    parser.add_argument("command", choices=["status", "rebalance"], help="status：本地行的属主分布；rebalance：迁出不归本节点的行")
+    parser.add_argument("--batch-size", type=int, default=500, help="每批推送行数（默认 500）")
+    args = parser.parse_args(argv)
+
+    cfg = get_config()
+    if not cfg.cluster.enabled:
+        print("❌ 未启用 [cluster]", file=sys.stderr)
+        return 1
+    if cfg.cluster.role == "edge":
+        print("❌ 边缘节点不持有激活码目录，无需迁移", file=sys.stderr)
+        return 1
+    db, storage = _open_storage(cfg)
+    router = ClusterRouter.from_config(cfg, storage.hash_code)
+    try:
+        if args.command == "status":
+            rows = storage.export_rows()
+            moves = plan(rows, router.ring, router.node_id)
+            print(
+                json.dumps(
+                    {
+                        "node_id": router.node_id,
+                        "local_rows": len(rows),
+                        "owned": len(rows) - sum(len(r) for r in moves.values()),
+                        "to_move": {owner: len(r) for owner, r in sorted(moves.items())},
+                    },
+                    ensure_ascii=False,
+                    indent=2,
+                )
+            )
+            return 0
+        try:
+            moved = asyncio.run(_run_rebalance(router, storage, args.batch_size))
+        except BackendError as e:
+            print(f"❌ 迁移中断（已迁出的行已删除，可重跑续传）: {e}", file=sys.stderr)
+            return 1
+        print(json.dumps({"node_id": router.node_id, "moved": moved}, ensure_ascii=False, indent=2))
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -32,14 +32,15 @@ import os
 import sys
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Optional, Tuple
+from typing import Any, Literal, Optional, Tuple
+from urllib.parse import urlparse
 
 if sys.version_info >= (3, 11):
     import tomllib
 else:  # Python 3.9 / 3.10：tomllib 尚未进入标准库，用等价 API 的第三方 tomli
     import tomli as tomllib
 
-from pydantic import BaseModel, Field, SecretStr, model_validator
+from pydantic import BaseModel, Field, SecretStr, field_validator, model_validator
 from pydantic_settings import (
     BaseSettings,
     PydanticBaseSettingsSource,
@@ -47,6 +48,7 @@ from pydantic_settings import (
 )
 
 from sealium.common.fingerprint import MachineIdPolicy
+from sealium.server.client_identity import TrustedProxies
 
 # TOML 配置文件默认查找路径；可被 ``SEALIUM_CONFIG`` 环境变量覆盖。
 _DEFAULT_CONFIG_FILENAME = "sealium.toml"
@@ -66,6 +68,18 @@ def _config_base_dir() -> Path:
 # ---------------------------------------------------------------------------
 # 嵌套子模型
 # ---------------------------------------------------------------------------
+class PerformanceModel(BaseModel):
+    """uvicorn 运行时调优（见 performance）。未设置的键取 ``profile`` 预设。"""
+
+    profile: Literal["default", "throughput", "latency", "constrained"] = "default"
+    loop: Optional[Literal["auto", "asyncio", "uvloop"]] = None
+    http: Optional[Literal["auto", "h11", "httptools"]] = None
+    backlog: Optional[int] = Field(None, ge=1)
+    keep_alive_seconds: Optional[int] = Field(None, ge=1)
+    limit_concurrency: Optional[int] = Field(None, ge=0)  # 0 = 不限；超出返回 503
+    h11_max_incomplete_event_size: Optional[int] = Field(None, ge=1024)
+
+
 class ServerModel(BaseModel):
     """网络与路由。"""
 
@@ -77,14 +91,48 @@ class ServerModel(BaseModel):
     # 反向代理部署下受信任的代理 IP（HIGH-001）：仅当 TCP 对端 IP 在此列表内时，
     # 限流才采信其写入的 X-Forwarded-For 解析真实客户端 IP（见
     # client_identity.resolve_client_ip）。默认仅回环（覆盖「同机反代」这一默认
-    # 推荐部署）；反向代理跨机/容器时须显式加入反代所在 IP，否则限流仍按代理 IP
-    # 聚合退化为全局单桶。直接信任未经此列表约束的 XFF 会引入伪造绕过（HOTSPOT-005）。
+    # 推荐部署）；反向代理跨机/容器时须显式加入反代所在 IP 或网段（CIDR，如容器网络
+    # "172.16.0.0/12"、云负载均衡子网），否则限流仍按代理 IP 聚合退化为全局单桶。
+    # 直接信任未经此列表约束的 XFF 会引入伪造绕过（HOTSPOT-005）。
     trusted_proxies: list[str] = ["127.0.0.1", "::1"]
     # 受信任的 Host 头白名单（LOW-006）：注册 TrustedHostMiddleware 校验 Host 头，
     # 防裸暴露下的 Host 投毒 / 路由混淆；反代后通常由反代承担，此处为纵深防御。
     # 默认 ["*"] 不校验（保持零配置开箱），生产部署建议配具体域名（如
     # ["activation.example.com"]）。
     allowed_hosts: list[str] = ["*"]
+    # 激活请求体整体读取截止时间（秒）：慢速 / 滴灌式上传超时即 408，不长期占用连接。
+    body_read_timeout_seconds: float = Field(10.0, gt=0)
+    # 按需采样剖析端点 /debug/profile（仅本机回环）：线上原位定位延迟热点。
+    # debug 模式下自动开启；生产需要时单独打开，不必连带暴露 /docs 等。
+    profiling: bool = False
+    # 预派生 worker 数（见 prefork）：1 = 单进程；0 = 按 CPU 核数；仅 POSIX，debug 下忽略。
+    workers: int = Field(1, ge=0)
+    # worker 优雅退出（停止 / 滚动重启）与启动就绪的等待上限（秒）。
+    graceful_timeout_seconds: float = Field(30.0, gt=0)
+    # 激活接口纯 ASGI 快速路径（见 routes.fast_activation）：绕过 FastAPI 路由、依赖解析与
+    # TrustedHost / CORS 中间件（Host 白名单由快速路径自行校验），语义与常规路由一致。
+    fast_path: bool = False
+    # Unix 域套接字监听路径（见 unix_socket）：设置后不再监听 host:port，仅 POSIX。
+    # 访问由文件权限控制：mode 默认 0660（属主 + 属组），group 可设为网关所在的组。
+    unix_socket: Optional[Path] = None
+    unix_socket_mode: int = Field(0o660, ge=0, le=0o777)
+    unix_socket_group: Optional[str] = None
+    # [server.performance]：事件循环 / HTTP 解析实现与连接调优预设
+    performance: PerformanceModel = PerformanceModel()
+
+    @field_validator("trusted_proxies")
+    @classmethod
+    def _check_trusted_proxies(cls, v: list[str]) -> list[str]:
+        TrustedProxies(v)  # 非法网段在加载时即报错，而非首个请求时
+        return v
+
+    @field_validator("unix_socket_mode", mode="before")
+    @classmethod
+    def _parse_octal_mode(cls, v):
+        # 环境变量 / .env 里按 chmod 习惯写八进制（"0660"、"0o660"）；TOML 可直接写 0o660
+        if isinstance(v, str):
+            return int(v, 8)
+        return v
 
 
 class PathsModel(BaseModel):
@@ -93,6 +141,12 @@ class PathsModel(BaseModel):
     database: Path = Path("data/database.db")
     private_key: Path = Path("data/server_private.pem")
     public_key: Optional[Path] = None  # 可选，仅调试用
+    # 审计日志文件（[audit] 启用时使用；sink=sqlite 时为独立 SQLite 库）
+    audit_log: Path = Path("data/audit.ndjson")
+    # 只读目录快照（snapshot export 写出；[cluster] role="edge" 的节点据此应答）
+    snapshot: Path = Path("data/snapshot.bin")
+    # 离线授权令牌的 Ed25519 签名私钥（[license_token] 启用时使用；与 RSA 私钥共用口令）
+    license_signing_key: Path = Path("data/license_signing.pem")
 
 
 class SecurityModel(BaseModel):
@@ -100,6 +154,8 @@ class SecurityModel(BaseModel):
 
     timestamp_tolerance_seconds: int = Field(300, gt=0)
     replay_cache_size: int = Field(10000, gt=0)
+    # RSA 前重复包过滤的摘要集容量：逐字节重放在私钥解密前即被丢弃（见 duplicate_filter）。
+    duplicate_filter_size: int = Field(10000, gt=0)
     # 私钥落盘口令（LOW-001）：经 .env / 环境变量注入，绝不写入 sealium.toml。
     # SecretStr 的 repr / model_dump 不暴露明文，防止落日志或进调试端点。
     private_key_passphrase: Optional[SecretStr] = None
@@ -110,11 +166,122 @@ class SecurityModel(BaseModel):
 
 
 class RateLimitModel(BaseModel):
-    """进程内固定窗口限流。"""
+    """进程内令牌桶限流（容量 max_requests，每 window_seconds 补满）。"""
 
     enabled: bool = True
     max_requests: int = Field(60, ge=1)
     window_seconds: int = Field(60, ge=1)
+    # 限流键聚合前缀：同一网段共享一个桶（见 client_identity.rate_limit_key）。IPv4 默认
+    # 逐地址（NAT 后多用户共用地址已够聚合），可设 24；IPv6 默认 /56，防单个用户轮换
+    # 自己整段内的地址无限生成新桶。
+    ipv4_prefix: int = Field(32, ge=8, le=32)
+    ipv6_prefix: int = Field(56, ge=16, le=128)
+    # 按代价计费：失败请求按实际触达的阶段（RSA 解密 / 查库 / 绑定）追加扣费（见
+    # rate_limit.STAGE_COSTS）；成功激活只扣放行时的 1 个令牌。
+    cost_weighted: bool = True
+
+
+class AbuseModel(BaseModel):
+    """失败激活滥用追踪（固定内存 Count-Min Sketch，见 abuse_tracker）。"""
+
+    sketch_width: int = Field(2048, ge=16)
+    sketch_depth: int = Field(4, ge=1, le=16)
+    top_k: int = Field(32, ge=1)
+    decay_seconds: int = Field(600, ge=1)  # 每隔该时长全体计数减半
+    # 客户端（限流键）失败估计达到该值即临时封禁（早拒绝 429）；0 = 只统计不封禁。
+    block_threshold: int = Field(0, ge=0)
+    block_seconds: int = Field(600, ge=1)
+
+
+class AuditModel(BaseModel):
+    """结构化审计日志（有界队列 + 后台批量写入，见 audit_log）。
+
+    未启用时审计事件照旧经 ``logging`` 同步输出。
+    """
+
+    enabled: bool = False
+    sink: Literal["ndjson", "sqlite"] = "ndjson"
+    queue_size: int = Field(10000, ge=1)  # 队列满时丢弃新事件并计数
+    batch_size: int = Field(256, ge=1)
+    flush_interval_seconds: float = Field(1.0, gt=0)
+    max_bytes: int = Field(50 * 1024 * 1024, ge=1024)  # NDJSON 单文件轮转阈值
+    backups: int = Field(5, ge=0)
+
+
+class RedisModel(BaseModel):
+    """共享后端：多 worker / 多节点一致的限流与防重放（见 redis_backend）。
+
+    ``url`` 未设时使用进程内实现（单进程默认）。URL 可能含口令，按 SecretStr 处理，
+    经 ``SEALIUM_REDIS__URL`` 注入，不回显明文。
+    """
+
+    url: Optional[SecretStr] = None  # redis://[[user]:password@]host[:port][/db]
+    pool_size: int = Field(8, ge=1)
+    timeout_seconds: float = Field(1.0, gt=0)
+    breaker_seconds: float = Field(5.0, ge=0)  # 连接失败后熔断时长；0 关闭
+    key_prefix: str = "sealium:"
+
+
+class ClusterNodeModel(BaseModel):
+    """集群成员：节点 id 与其对内 HTTP 地址（``http://host:port``）。"""
+
+    id: str = Field(min_length=1)
+    url: str
+
+    @field_validator("url")
+    @classmethod
+    def _check_url(cls, v: str) -> str:
+        parsed = urlparse(v)
+        if parsed.scheme != "http" or not parsed.hostname:
+            raise ValueError(f"集群节点地址须为 http://host[:port]: {v!r}")
+        return v.rstrip("/")
+
+
+class ClusterModel(BaseModel):
+    """多节点集群：按 ``code_hash`` 一致性哈希分片激活码目录（见 cluster）。
+
+    各节点配置同一份 ``nodes`` 与 ``secret``，``node_id`` 各不相同。``secret`` 用于派生
+    节点间 AES-256-GCM 密钥，经 ``SEALIUM_CLUSTER__SECRET`` 注入，不回显明文。
+    ``role = "edge"`` 的节点不列入 ``nodes``，以 ``[paths] snapshot`` 只读快照应答。
+    """
+
+    enabled: bool = False
+    role: Literal["member", "edge"] = "member"
+    node_id: str = ""
+    nodes: list[ClusterNodeModel] = []
+    secret: Optional[SecretStr] = None
+    vnodes: int = Field(128, ge=1, le=4096)  # 每节点虚拟节点数：越多分布越均匀
+    pool_size: int = Field(8, ge=1)  # 每个对端的 keep-alive 连接上限
+    timeout_seconds: float = Field(5.0, gt=0)
+    snapshot_reload_seconds: float = Field(5.0, gt=0)  # 边缘节点检查快照轮换的间隔
+
+    @model_validator(mode="after")
+    def _check_membership(self) -> "ClusterModel":
+        if not self.enabled:
+            return self
+        ids = [node.id for node in self.nodes]
+        if len(set(ids)) != len(ids):
+            raise ValueError("[cluster] nodes 中的 id 重复")
+        if not ids:
+            raise ValueError("[cluster] nodes 不能为空")
+        if self.role == "member" and self.node_id not in ids:
+            raise ValueError(f"[cluster] node_id {self.node_id!r} 不在 nodes 中")
+        if self.role == "edge" and (not self.node_id or self.node_id in ids):
+            raise ValueError("[cluster] 边缘节点须设置不在 nodes 中的 node_id")
+        if self.secret is None or not self.secret.get_secret_value():
+            raise ValueError("[cluster] 启用时必须设置 secret（SEALIUM_CLUSTER__SECRET）")
+        return self
+
+
+class LicenseTokenModel(BaseModel):
+    """离线授权令牌（见 common.license_token）：成功响应附带 Ed25519 签名令牌。
+
+    集群各节点须使用同一把签名私钥（转发给属主处理的请求由属主签发）。
+    """
+
+    enabled: bool = False
+    # 令牌有效期；激活码本身更早到期时取较早者。亦是吊销 / 换机生效的最长延迟。
+    ttl_days: int = Field(30, ge=1, le=3650)
 
 
 class MachineIdModel(BaseModel):
@@ -186,6 +353,11 @@ class ServerConfig(BaseSettings):
     paths: PathsModel = PathsModel()
     security: SecurityModel = SecurityModel()
     rate_limit: RateLimitModel = RateLimitModel()
+    abuse: AbuseModel = AbuseModel()
+    audit: AuditModel = AuditModel()
+    redis: RedisModel = RedisModel()
+    cluster: ClusterModel = ClusterModel()
+    license_token: LicenseTokenModel = LicenseTokenModel()
     machine_id: MachineIdModel = MachineIdModel()
     logging: LoggingModel = LoggingModel()
     cors: CorsModel = CorsModel()
@@ -218,21 +390,32 @@ class ServerConfig(BaseSettings):
 
         self.paths.database = _abs(self.paths.database)
         self.paths.private_key = _abs(self.paths.private_key)
+        self.paths.audit_log = _abs(self.paths.audit_log)
+        self.paths.snapshot = _abs(self.paths.snapshot)
+        self.paths.license_signing_key = _abs(self.paths.license_signing_key)
         if self.paths.public_key is not None:
             self.paths.public_key = _abs(self.paths.public_key)
+        if self.server.unix_socket is not None:
+            self.server.unix_socket = _abs(self.server.unix_socket)
         return self
 
     # ---------- 便捷方法 ----------
     def ensure_directories(self) -> None:
-        """确保数据库与私钥的父目录存在。"""
+        """确保数据库、私钥（及启用时审计日志）的父目录存在。"""
         self.paths.database.parent.mkdir(parents=True, exist_ok=True)
         self.paths.private_key.parent.mkdir(parents=True, exist_ok=True)
+        if self.audit.enabled:
+            self.paths.audit_log.parent.mkdir(parents=True, exist_ok=True)
 
     def validate(self) -> None:
         """业务校验（必需文件存在等）。由应用 lifespan 在启动时显式调用。"""
         errors: list[str] = []
         if not self.paths.private_key.exists():
             errors.append(f"服务端私钥文件不存在: {self.paths.private_key}")
+        if self.cluster.enabled and self.cluster.role == "edge" and not self.paths.snapshot.exists():
+            errors.append(f"边缘节点的目录快照不存在: {self.paths.snapshot}")
+        if self.license_token.enabled and not self.paths.license_signing_key.exists():
+            errors.append(f"离线令牌签名私钥不存在: {self.paths.license_signing_key}")
         if errors:
             raise RuntimeError("配置验证失败:\n" + "\n".join(errors))
 
@@ -260,6 +443,18 @@ class ServerConfig(BaseSettings):
         cp = self.security.code_hash_pepper
         return cp.get_secret_value() if cp is not None else None
 
+    @property
+    def redis_url_secret(self) -> Optional[str]:
+        """共享后端 Redis URL 明文（仅供建立连接用）；未设返回 ``None``。"""
+        url = self.redis.url
+        return url.get_secret_value() if url is not None else None
+
+    @property
+    def cluster_secret(self) -> Optional[str]:
+        """集群节点间密钥明文（仅供派生密钥用）；未设返回 ``None``。"""
+        secret = self.cluster.secret
+        return secret.get_secret_value() if secret is not None else None
+
     def safe_dump(self) -> dict[str, Any]:
         """脱敏快照（用于 ``/debug/config`` 与 ``config_cli show``）。
 
@@ -283,19 +478,53 @@ class ServerConfig(BaseSettings):
                 "activation_route": self.activation_route(),
                 "trusted_proxies": list(self.server.trusted_proxies),
                 "allowed_hosts": list(self.server.allowed_hosts),
+                "body_read_timeout_seconds": self.server.body_read_timeout_seconds,
+                "profiling": self.server.profiling,
+                "workers": self.server.workers,
+                "graceful_timeout_seconds": self.server.graceful_timeout_seconds,
+                "fast_path": self.server.fast_path,
+                "unix_socket": _p(self.server.unix_socket),
+                "unix_socket_mode": oct(self.server.unix_socket_mode),
+                "unix_socket_group": self.server.unix_socket_group,
+                "performance": self.server.performance.model_dump(),
             },
             "paths": {
                 "database": _p(self.paths.database),
                 "private_key": _p(self.paths.private_key),
                 "public_key": _p(self.paths.public_key),
+                "audit_log": _p(self.paths.audit_log),
+                "snapshot": _p(self.paths.snapshot),
+                "license_signing_key": _p(self.paths.license_signing_key),
             },
             "security": {
                 "timestamp_tolerance_seconds": self.security.timestamp_tolerance_seconds,
                 "replay_cache_size": self.security.replay_cache_size,
+                "duplicate_filter_size": self.security.duplicate_filter_size,
                 "private_key_passphrase": "<set>" if ps is not None else "<unset>",
                 "code_hash_pepper": "<set>" if cp is not None else "<unset>",
             },
             "rate_limit": self.rate_limit.model_dump(),
+            "abuse": self.abuse.model_dump(),
+            "audit": self.audit.model_dump(),
+            "redis": {
+                "url": "<set>" if self.redis.url is not None else "<unset>",
+                "pool_size": self.redis.pool_size,
+                "timeout_seconds": self.redis.timeout_seconds,
+                "breaker_seconds": self.redis.breaker_seconds,
+                "key_prefix": self.redis.key_prefix,
+            },
+            "cluster": {
+                "enabled": self.cluster.enabled,
+                "role": self.cluster.role,
+                "node_id": self.cluster.node_id,
+                "nodes": [node.model_dump() for node in self.cluster.nodes],
+                "secret": "<set>" if self.cluster.secret is not None else "<unset>",
+                "vnodes": self.cluster.vnodes,
+                "pool_size": self.cluster.pool_size,
+                "timeout_seconds": self.cluster.timeout_seconds,
+                "snapshot_reload_seconds": self.cluster.snapshot_reload_seconds,
+            },
+            "license_token": self.license_token.model_dump(),
             "machine_id": self.machine_id.model_dump(),
             "logging": self.logging.model_dump(),
             "cors": self.cors.model_dump(),
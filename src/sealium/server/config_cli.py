@@ -67,26 +67,90 @@ api_prefix = "/v1"
 activation_path = "/activation"
 # 受信任的代理 IP（HIGH-001）：仅当请求的 TCP 对端在此列表内时，限流才采信其
 # 写入的 X-Forwarded-For 解析真实客户端 IP。默认仅回环（同机反代）；反向代理
-# 跨机/容器时务必加入反代所在 IP，否则限流仍按代理 IP 聚合退化为全局单桶。
+# 跨机/容器时务必加入反代所在 IP 或网段（CIDR，如 "172.16.0.0/12"），否则限流仍按
+# 代理 IP 聚合退化为全局单桶。
 trusted_proxies = ["127.0.0.1", "::1"]
 # Host 头白名单（LOW-006）：默认 ["*"] 不校验 Host；生产建议配具体域名（如
 # ["activation.example.com"]）防裸暴露下 Host 投毒 / 路由混淆。
 allowed_hosts = ["*"]
+# 激活请求体整体读取截止时间（秒）：慢速上传超时即 408，防 slowloris 占位。
+body_read_timeout_seconds = 10.0
+# 激活接口走纯 ASGI 快速路径（跳过路由与依赖解析；不附带 CORS 头）。
+fast_path = false
+# 同机旁挂：改为监听 Unix 域套接字（不再监听 host:port），访问由文件权限控制。
+# unix_socket = "/run/sealium/activation.sock"
+# unix_socket_mode = 0o660
+# unix_socket_group = "licgw"
+# 按需采样剖析端点 /debug/profile（仅本机回环）；debug 模式下自动开启。
+profiling = false
+# 预派生 worker 数（仅 POSIX；0 = CPU 核数）。多 worker 须配置 [redis] url。
+workers = 1
+graceful_timeout_seconds = 30.0
+
+# [server.performance]   # uvicorn 调优预设：default / throughput / latency / constrained
+# profile = "default"    # uvloop / httptools 需 pip install sealium[perf]，缺失时回退
+# limit_concurrency = 0  # 显式键覆盖预设；0 = 不限，超出返回 503
 
 [paths]
 database = "data/database.db"
 private_key = "data/server_private.pem"
 # public_key = "data/server_public.pem"   # 可选，仅调试用
+# audit_log = "data/audit.ndjson"         # [audit] 启用时的审计日志文件
+# snapshot = "data/snapshot.bin"          # 只读目录快照（[cluster] role = "edge" 时使用）
+# license_signing_key = "data/license_signing.pem"   # 离线令牌签名私钥（[license_token] 启用时）
 
 [security]
 timestamp_tolerance_seconds = 300
 replay_cache_size = 10000
+duplicate_filter_size = 10000   # RSA 前重复包过滤的摘要集容量（逐字节重放免私钥解密）
 # private_key_passphrase：用环境变量 SEALIUM_SECURITY__PRIVATE_KEY_PASSPHRASE，勿写此
 
 [rate_limit]
 enabled = true
 max_requests = 60
 window_seconds = 60
+ipv4_prefix = 32   # 限流键聚合前缀：同网段共享一个桶（IPv4 可设 24）
+ipv6_prefix = 56   # 防单用户轮换自有 IPv6 段内地址无限生成新桶
+cost_weighted = true   # 失败请求按实际开销（RSA 解密 / 查库）追加扣费
+
+[abuse]   # 失败激活滥用追踪（固定内存）；回环 GET /internal/abuse 查看 Top-K
+top_k = 32
+decay_seconds = 600
+block_threshold = 0   # >0 时失败估计达到该值的客户端临时封禁（429）
+block_seconds = 600
+
+# [audit]   # 结构化审计日志：请求路径只入队，后台线程批量写入 [paths] audit_log
+# enabled = false
+# sink = "ndjson"              # 或 "sqlite"
+# queue_size = 10000           # 队列满时丢弃新事件并计数（/metrics）
+# batch_size = 256
+# flush_interval_seconds = 1.0
+# max_bytes = 52428800         # NDJSON 轮转阈值
+# backups = 5
+
+# [redis]   # 共享后端（多 worker / 多节点）：设 url 后限流与防重放改用 Redis
+# url：可能含口令，用环境变量 SEALIUM_REDIS__URL，勿写此
+# pool_size = 8
+# timeout_seconds = 1.0
+# key_prefix = "sealium:"
+
+# [cluster]   # 多节点分片：按激活码哈希把目录分到各节点，非本节点的码解密后转发给属主
+# enabled = true
+# role = "member"   # "edge"：不在 nodes 中，只读 [paths] snapshot 应答，首次绑定转发给属主
+# node_id = "a"   # 各节点不同；其余键各节点相同
+# nodes = [
+#     { id = "a", url = "http://10.0.0.1:8000" },
+#     { id = "b", url = "http://10.0.0.2:8000" },
+# ]
+# secret：节点间共享密钥，用环境变量 SEALIUM_CLUSTER__SECRET，勿写此
+# vnodes = 128
+# pool_size = 8
+# timeout_seconds = 5.0
+# snapshot_reload_seconds = 5.0
+
+# [license_token]   # 离线授权令牌：成功响应附带 Ed25519 签名令牌（generate_keys --license 生成密钥）
+# enabled = true
+# ttl_days = 30     # 令牌有效期；亦是换机 / 吊销生效的最长延迟
 
 [machine_id]
 threshold = 0.70
@@ -141,15 +205,21 @@ SEALIUM_SECURITY__CODE_HASH_PEPPER=REPLACE_WITH_DEPLOY_UNIQUE_RANDOM
 # 调试模式（生产必须 false）
 # SEALIUM_SERVER__DEBUG=false
 
-# 受信任代理 IP（HIGH-001）：反代跨机/容器时加入反代所在 IP，限流才按真实客户端
-# IP 分桶（JSON 数组语法）。同机反代默认值 ["127.0.0.1","::1"] 无需设置。
-# SEALIUM_SERVER__TRUSTED_PROXIES=["10.0.0.5","127.0.0.1","::1"]
+# 受信任代理 IP / 网段（HIGH-001）：反代跨机/容器时加入反代所在 IP 或 CIDR，限流才按
+# 真实客户端 IP 分桶（JSON 数组语法）。同机反代默认值 ["127.0.0.1","::1"] 无需设置。
+# SEALIUM_SERVER__TRUSTED_PROXIES=["10.0.0.0/24","127.0.0.1","::1"]
 
 # 限流（默认 60 req / 60 s 每 IP）
 # SEALIUM_RATE_LIMIT__ENABLED=true
 # SEALIUM_RATE_LIMIT__MAX_REQUESTS=60
 # SEALIUM_RATE_LIMIT__WINDOW_SECONDS=60
 
+# 共享后端（多 worker / 多节点时设置；URL 可能含口令，只放这里）
+# SEALIUM_REDIS__URL=redis://:password@10.0.0.7:6379/0
+
+# 多节点集群的节点间共享密钥（各节点相同）
+# SEALIUM_CLUSTER__SECRET=
+
 # 时间戳容忍窗口（秒，默认 300）/ 防重放缓存容量（默认 10000）
 # SEALIUM_SECURITY__TIMESTAMP_TOLERANCE_SECONDS=300
 # SEALIUM_SECURITY__REPLAY_CACHE_SIZE=10000
@@ -44,17 +44,17 @@ def parse_encrypted_request(
     return encrypted_aes_key, nonce, ciphertext, tag
 
 
-def decrypt_request(
+def decrypt_plaintext(
     server_encryptor: RSAEncryptor,
     encrypted_aes_key: bytes,
     nonce: bytes,
     ciphertext: bytes,
     tag: bytes,
-) -> tuple[bytes, dict]:
+) -> tuple[bytes, bytes]:
     """
-    用服务端私钥解出 AES 密钥，再解密业务明文。
+    用服务端私钥解出 AES 密钥，再解密出业务明文（不做 JSON 解析）。
 
-    :return: ``(aes_key, request_dict)``。
+    :return: ``(aes_key, plaintext)``。
     """
     aes_key = server_encryptor.decrypt(encrypted_aes_key)
     plaintext = AESEncryptor.decrypt(aes_key, nonce, ciphertext, tag)
@@ -62,8 +62,25 @@ def decrypt_request(
     # 超大 JSON"的放大攻击。超限抛 ValueError，由路由映射为 400。
     if len(plaintext) > MAX_ACTIVATION_PLAINTEXT_BYTES:
         raise ValueError("请求明文过大")
-    request_dict = json.loads(plaintext.decode("utf-8"))
-    return aes_key, request_dict
+    return aes_key, plaintext
+
+
+def decrypt_request(
+    server_encryptor: RSAEncryptor,
+    encrypted_aes_key: bytes,
+    nonce: bytes,
+    ciphertext: bytes,
+    tag: bytes,
+) -> tuple[bytes, dict]:
+    """
+    用服务端私钥解出 AES 密钥，再解密并解析业务明文。
+
+    :return: ``(aes_key, request_dict)``。
+    """
+    aes_key, plaintext = decrypt_plaintext(
+        server_encryptor, encrypted_aes_key, nonce, ciphertext, tag
+    )
+    return aes_key, json.loads(plaintext.decode("utf-8"))
 
 
 def encrypt_response(response_dict: dict, aes_key: bytes) -> bytes:
@@ -223,6 +223,18 @@ class ActivationCodeStorage:
         )
         return self._row_to_model(row) if row else None
 
+    def get_by_codes(self, codes: list[str]) -> dict[str, ActivationCode]:
+        """批量查询（一次 ``IN`` 查询）；返回 激活码 → 记录，不存在的码不在结果中。"""
+        hashes = {self._hash(code): code for code in codes}
+        if not hashes:
+            return {}
+        placeholders = ", ".join("?" * len(hashes))
+        rows = self.db.fetch_all(
+            f"SELECT * FROM activation_codes WHERE code_hash IN ({placeholders})",
+            tuple(hashes),
+        )
+        return {hashes[row["code_hash"]]: self._row_to_model(row) for row in rows}
+
     def update_status(self, code: str, status: ActivationStatus) -> None:
         """更新激活码状态。"""
         with self.db.transaction():
@@ -280,3 +292,54 @@ class ActivationCodeStorage:
     def list_all(self) -> list[ActivationCode]:
         """列出所有激活码。"""
         return [self._row_to_model(row) for row in self.db.fetch_all("SELECT * FROM activation_codes")]
+
+    # ---------- 原始行（集群迁移，见 cluster） ----------
+    def hash_code(self, code: str) -> str:
+        """激活码 → ``code_hash``（DB 主键，亦为集群分片键）。"""
+        return self._hash(code)
+
+    def export_rows(self) -> list[dict[str, Any]]:
+        """导出全部原始行（``code_hash`` 已是哈希，不含明文激活码）。"""
+        return self.db.fetch_all("SELECT * FROM activation_codes")
+
+    def import_rows(self, rows: list[dict[str, Any]]) -> int:
+        """
+        导入原始行：新码插入；已存在时仅当本地未使用而导入行已使用才覆盖（已绑定优先，
+        迁移重放 / 重复推送幂等，绝不把已绑定的码回退为未使用）。
+
+        :return: 实际插入或覆盖的行数。
+        """
+        with self.db.transaction():
+            cursor = self.db.executemany(
+                """
+                INSERT INTO activation_codes (
+                    code_hash, bound_machine_code, activated_at, expires_at, features, status
+                ) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(code_hash) DO UPDATE SET
+                    bound_machine_code = excluded.bound_machine_code,
+                    activated_at = excluded.activated_at,
+                    status = excluded.status
+                WHERE activation_codes.status = ? AND excluded.status = ?
+                """,
+                [
+                    (
+                        row["code_hash"],
+                        row["bound_machine_code"],
+                        row["activated_at"],
+                        row["expires_at"],
+                        row["features"],
+                        row["status"],
+                        ActivationStatus.UNUSED.value,
+                        ActivationStatus.USED.value,
+                    )
+                    for row in rows
+                ],
+            )
+            return cursor.rowcount
+
+    def delete_hashes(self, code_hashes: list[str]) -> None:
+        """按 ``code_hash`` 批量删除（迁出后清理本地副本）。"""
+        with self.db.transaction():
+            self.db.executemany(
+                "DELETE FROM activation_codes WHERE code_hash = ?", [(h,) for h in code_hashes]
+            )
@@ -8,10 +8,16 @@ FastAPI 依赖：从应用状态取出运行时组件（私钥加密器、激活
 
 from __future__ import annotations
 
+from typing import Optional
+
 from fastapi import Depends, Request
 
 from sealium.common.crypto import RSAEncryptor
 from sealium.server.activation_service import ActivationService
+from sealium.server.cluster import Forwarder
+from sealium.server.database import ActivationCodeStorage
+from sealium.server.duplicate_filter import DuplicateFilter
+from sealium.server.metrics import ActivationMetrics
 from sealium.server.rate_limit import RateLimiter
 
 
@@ -30,6 +36,26 @@ def get_rate_limiter(request: Request) -> RateLimiter:
     return request.app.state.rate_limiter
 
 
+def get_duplicate_filter(request: Request) -> DuplicateFilter:
+    """获取 RSA 前的重复包过滤器。"""
+    return request.app.state.duplicate_filter
+
+
+def get_metrics(request: Request) -> ActivationMetrics:
+    """获取激活链路指标（分阶段直方图与计数器）。"""
+    return request.app.state.metrics
+
+
+def get_activation_storage(request: Request) -> ActivationCodeStorage:
+    """获取激活码存储（集群迁入行时直接写入）。"""
+    return request.app.state.storage
+
+
+def get_cluster(request: Request) -> Optional[Forwarder]:
+    """获取集群路由（边缘节点为 ``EdgeRouter``；未启用 ``[cluster]`` 时为 None）。"""
+    return request.app.state.cluster
+
+
 # 便于测试一次性取到三者
 def get_activation_dependencies(
     encryptor: RSAEncryptor = Depends(get_server_encryptor),
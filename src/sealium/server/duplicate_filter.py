@@ -0,0 +1,115 @@
+# src/sealium/server/duplicate_filter.py
+"""
+RSA 前的重复包过滤（防重放前置层）。
+
+问题
+----
+:class:`~sealium.server.replay_guard.ReplayGuard` 在业务第 4 步才拦截重放——此时
+已付出一次完整的 RSA-4096 私钥解密。攻击者反复回放抓到的合法包，每次都白耗服务端
+一次私钥运算（最贵的一步）。
+
+解法
+----
+请求包首段 ``encrypted_aes_key`` 是客户端每次随机生成的会话密钥经 RSA-OAEP 加密的
+结果，合法请求之间**逐字节唯一**。路由在 ``parse_encrypted_request`` 之后、任何私钥
+运算之前，以该段的短摘要查询一个 TTL 有界的摘要集：命中即为逐字节重放，直接 400。
+
+* 只存 16 字节 BLAKE2b 摘要，不存原始 512 字节密文；容量独立于防重放缓存。
+* 超限逐条驱逐最旧项（与 ``InMemoryReplayStore`` 同理，绝不整体清空）。被驱逐的
+  重放包只是回落到 ``ReplayGuard`` 兜底拦截，不削弱既有防线。
+* 暴露命中 / 未命中 / 驱逐计数，便于观测回放洪泛。
+
+.. note::
+   与防重放同理，本实现为进程内：多 worker 部署各进程各自一份。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Protocol
+
+# 默认 TTL 与防重放一致：覆盖两倍时间戳容忍窗口，窗口外的旧包本就会被时间戳校验拒绝。
+_DEFAULT_TTL_SECONDS = 600
+_DIGEST_SIZE = 16
+
+
+class DuplicateFilter(Protocol):
+    """重复包过滤协议。``seen`` 记录并返回该 RSA 密钥段是否已出现过。"""
+
+    def seen(self, encrypted_key: bytes) -> bool: ...
+
+
+class InMemoryDuplicateFilter:
+    """
+    内存重复包过滤：摘要集 LRU + TTL 逐条淘汰（线程安全）。
+
+    * 同一密钥段在 TTL 内再次出现 -> 视为逐字节重放（返回 True，计 ``hits``）。
+    * 超过 ``max_size`` 时驱逐最旧的一条（计 ``evictions``），绝不整体清空。
+    * 过期条目惰性回收。
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        ttl_seconds: Optional[int] = _DEFAULT_TTL_SECONDS,
+        now_provider: Optional[Callable[[], float]] = None,
+    ) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size 必须为正整数")
+        self._seen: "OrderedDict[bytes, float]" = OrderedDict()
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        self._now = now_provider or time.monotonic
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def seen(self, encrypted_key: bytes) -> bool:
+        digest = hashlib.blake2b(encrypted_key, digest_size=_DIGEST_SIZE).digest()
+        now = self._now()
+        with self._lock:
+            existing = self._seen.get(digest)
+            if existing is not None and (self._ttl is None or now - existing < self._ttl):
+                self.hits += 1
+                return True
+
+            self.misses += 1
+            self._seen[digest] = now
+            self._seen.move_to_end(digest)
+            self._evict_expired(now)
+            while len(self._seen) > self._max_size:
+                self._seen.popitem(last=False)
+                self.evictions += 1
+            return False
+
+    def _evict_expired(self, now: float) -> None:
+        if self._ttl is None:
+            return
+        # 按写入顺序排列：从头弹出过期项，遇到首个未过期即停
+        while self._seen:
+            ts = next(iter(self._seen.values()))
+            if now - ts < self._ttl:
+                break
+            self._seen.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def stats(self) -> dict[str, int]:
+        """命中统计快照（用于调试端点 / 指标导出）。"""
+        with self._lock:
+            return {
+                "size": len(self._seen),
+                "max_size": self._max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._seen.clear()
@@ -0,0 +1,130 @@
+# src/sealium/server/early_reject.py
+"""
+激活路径的早拒绝中间件（纯 ASGI）。
+
+限流（MEDIUM-002）与 Content-Length 上限（MEDIUM-001）原先在路由函数内判定：
+此时 Starlette 已构造 Request、跑完 TrustedHost / CORS 中间件并解析完依赖注入。
+洪泛下被拒请求同样付出整条栈的开销。
+
+本中间件注册在最外层，仅对 ``POST <激活路由>`` 生效，直接读 ASGI ``scope``：
+
+* 解析真实客户端 IP（与路由同一套 ``trusted_proxies`` 规则）并按前缀聚合后，先查
+  滥用追踪的临时封禁表，再查询 ``RateLimiter``，命中任一直接回 ``429`` + ``Retry-After``；
+* ``Content-Length`` 超过 ``MAX_ACTIVATION_BODY_BYTES`` 直接回 ``413``。
+
+两种拒绝都不分配 Request、不触碰 ``receive`` 通道（请求体一字节不读）。放行请求在
+启用快速路径时直接交给 ``state.activation_endpoint``（纯 ASGI，见
+``routes.fast_activation``），否则与其它路径一样原样交给内层应用。运行时组件（限流器、受信代理、指标）从 ``scope["app"].state``
+读取——限流器在 lifespan 中才装配，尚未装配时直接放行。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from sealium.common.constants import MAX_ACTIVATION_BODY_BYTES
+from sealium.server.client_identity import UNIX_PEER, rate_limit_key, resolve_peer_ip
+from sealium.server.metrics import ActivationMetrics
+
+# 放行请求在 ``scope["state"]`` 中留下的限流键名（路由经 ``request.state`` 读取）。
+RATE_LIMIT_KEY_STATE = "rate_limit_key"
+
+
+class EarlyRejectMiddleware:
+    """对激活路由在 ASGI 层先行执行限流与 Content-Length 检查。"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        path: str,
+        max_body_bytes: int = MAX_ACTIVATION_BODY_BYTES,
+    ) -> None:
+        self.app = app
+        self._path = path
+        self._max_body = max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] != self._path or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        state = scope["app"].state if "app" in scope else None
+        limiter = getattr(state, "rate_limiter", None)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = None
+        xff = None
+        for name, value in scope["headers"]:
+            if name == b"content-length" and content_length is None:
+                content_length = value
+            elif name == b"x-forwarded-for" and xff is None:
+                xff = value
+
+        client = scope.get("client")
+        if client:
+            peer = client[0]
+        else:
+            # Unix 域套接字无对端地址：以固定名标识（装配时并入受信代理，采信网关的 XFF）
+            peer = UNIX_PEER if state.config.server.unix_socket is not None else None
+        client_ip = resolve_peer_ip(
+            peer,
+            xff.decode("latin-1") if xff is not None else "",
+            state.trusted_proxies,
+        )
+        rl = state.config.rate_limit
+        key = rate_limit_key(client_ip, rl.ipv4_prefix, rl.ipv6_prefix)
+        tracker = getattr(state, "abuse_tracker", None)
+        blocked = tracker.blocked_for(key) if tracker is not None else 0.0
+        metrics = getattr(state, "metrics", None)
+        if blocked:
+            # 失败激活过多被临时封禁（abuse_tracker）：不消耗限流额度，直接 429
+            await _reject(send, 429, ((b"retry-after", str(math.ceil(blocked)).encode()),), metrics)
+            return
+        if getattr(limiter, "blocking", False):
+            # 共享后端（Redis）是阻塞 socket：放到线程池，不让网络往返卡住事件循环
+            allowed = await asyncio.to_thread(limiter.allow, key)
+        else:
+            allowed = limiter.allow(key)
+        if not allowed:
+            await _reject(send, 429, ((b"retry-after", str(limiter.window_seconds).encode()),), metrics)
+            return
+        # 放行：把限流键留给路由，失败请求结束后按实际代价追加扣费（request.state）
+        scope.setdefault("state", {})[RATE_LIMIT_KEY_STATE] = key
+
+        # 读前用 Content-Length 早拦截；非法 / 缺失交由路由按实际长度兜底
+        if content_length is not None:
+            try:
+                if int(content_length) > self._max_body:
+                    await _reject(send, 413, metrics=metrics)
+                    return
+            except ValueError:
+                pass
+
+        endpoint = getattr(state, "activation_endpoint", None)
+        if endpoint is not None:
+            await endpoint(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+async def _reject(
+    send: Send,
+    status: int,
+    headers: tuple[tuple[bytes, bytes], ...] = (),
+    metrics: Optional[ActivationMetrics] = None,
+) -> None:
+    if metrics is not None:
+        metrics.early_reject(status)
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-length", b"0"), *headers],
+        }
+    )
+    await send({"type": "http.response.body", "body": b""})
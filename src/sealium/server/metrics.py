@@ -0,0 +1,206 @@
+# src/sealium/server/metrics.py
+"""
+激活链路分阶段延迟直方图与计数器（Prometheus 文本格式导出）。
+
+p99 变高时此前无从判断耗时落在哪一段：读请求体、RSA 解密、JSON 解析、
+``get_by_code``、``matches`` 还是 ``bind_machine_code`` 提交。本模块为每个阶段维护一个
+**HDR 风格对数-线性直方图**：
+
+* 以微秒为单位，每个 2 的幂区间再等分 ``2**_SUB_BITS`` 个子桶，相对误差 ≤ 12.5%，
+  量程 1µs–60s，桶数固定（不随样本增长）；
+* 记录只做一次整数运算定位桶 + 两次加法，**不加锁**：激活路由是 ``async def``，
+  ``ActivationService.process`` 在其中同步调用，所有更新都发生在事件循环线程；
+* 导出时把细粒度桶聚合到一组固定的 Prometheus ``le`` 边界（见 ``_EXPORT_BOUNDS_US``），
+  跨次抓取边界稳定，可直接 ``histogram_quantile``。
+
+另有按拒绝原因 / 请求结果 / 早拒绝状态码的计数器；重放缓存大小、限流桶数、
+重复包过滤命中等"状态量"在抓取时由调用方采集后一并渲染（见 :meth:`ActivationMetrics.render`）。
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Iterable, Optional
+
+# 每个 2 的幂区间的子桶位数：3 -> 8 个子桶，相对误差 1/8
+_SUB_BITS = 3
+_SUB = 1 << _SUB_BITS
+# 小于该值的样本每微秒一个桶（线性段）
+_LINEAR = 2 * _SUB
+# 量程上限（微秒）：超出的样本计入最后一个桶
+_MAX_US = 60_000_000
+
+# 导出的 Prometheus 桶边界（微秒）
+_EXPORT_BOUNDS_US = (
+    50, 100, 250, 500,
+    1_000, 2_500, 5_000, 10_000, 25_000, 50_000,
+    100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000,
+)
+
+# 激活链路阶段（路由 + 服务层），按执行顺序
+STAGES = (
+    "body_read",
+    "decrypt",
+    "parse",
+    "forward",  # 集群：转发至属主节点的往返（见 cluster）
+    "get_by_code",
+    "replay_check",
+    "matches",
+    "bind",
+    "sign",  # 离线令牌签发（启用 [license_token] 时）
+    "encrypt",
+    "total",
+)
+
+
+def _bucket_index(us: int) -> int:
+    if us < _LINEAR:
+        return us if us > 0 else 0
+    shift = us.bit_length() - (_SUB_BITS + 1)
+    return (shift + 1) * _SUB + (us >> shift) - _SUB
+
+
+def _bucket_upper(index: int) -> int:
+    """桶内最大值（微秒，含）。"""
+    if index < _LINEAR:
+        return index
+    shift = index // _SUB - 1
+    mantissa = index % _SUB + _SUB
+    return ((mantissa + 1) << shift) - 1
+
+
+_NUM_BUCKETS = _bucket_index(_MAX_US) + 1
+_perf_counter_ns = time.perf_counter_ns
+
+
+class LatencyHistogram:
+    """HDR 风格对数-线性延迟直方图（微秒）。非线程安全，见模块说明。"""
+
+    __slots__ = ("counts", "count", "sum_us")
+
+    def __init__(self) -> None:
+        self.counts = [0] * _NUM_BUCKETS
+        self.count = 0
+        self.sum_us = 0
+
+    def record(self, us: int) -> None:
+        # 热路径：内联 _bucket_index，省一次函数调用
+        if us < _LINEAR:
+            index = us if us > 0 else 0
+        else:
+            if us > _MAX_US:
+                us = _MAX_US
+            shift = us.bit_length() - _SUB_BITS - 1
+            index = ((shift + 1) << _SUB_BITS) + (us >> shift) - _SUB
+        self.counts[index] += 1
+        self.count += 1
+        self.sum_us += us
+
+    def percentile(self, q: float) -> int:
+        """第 ``q`` 百分位（0–100）的上界估计（微秒）；无样本返回 ``0``。"""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * q // 100))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return _bucket_upper(index)
+        return _MAX_US
+
+    def cumulative(self, bounds_us: Iterable[int]) -> list[int]:
+        """按给定边界（微秒，升序）聚合的累计计数：桶上界 ≤ 边界即计入。"""
+        out = []
+        index = 0
+        running = 0
+        counts = self.counts
+        for bound in bounds_us:
+            while index < _NUM_BUCKETS and _bucket_upper(index) <= bound:
+                running += counts[index]
+                index += 1
+            out.append(running)
+        return out
+
+
+class ActivationMetrics:
+    """激活链路指标集合：分阶段直方图 + 计数器。"""
+
+    def __init__(self) -> None:
+        self.stages: dict[str, LatencyHistogram] = {s: LatencyHistogram() for s in STAGES}
+        self.rejects: dict[str, int] = {}
+        self.outcomes: dict[str, int] = {}
+        self.early_rejects: dict[int, int] = {}
+
+    def observe(self, stage: str, start_ns: int) -> int:
+        """记录 ``stage`` 自 ``start_ns`` 起的耗时，返回当前时刻（便于链式计时下一阶段）。"""
+        now = _perf_counter_ns()
+        self.stages[stage].record((now - start_ns) // 1000)
+        return now
+
+    def reject(self, reason: str) -> None:
+        self.rejects[reason] = self.rejects.get(reason, 0) + 1
+
+    def outcome(self, name: str) -> None:
+        self.outcomes[name] = self.outcomes.get(name, 0) + 1
+
+    def early_reject(self, status: int) -> None:
+        self.early_rejects[status] = self.early_rejects.get(status, 0) + 1
+
+    def render(self, gauges: Iterable[tuple[str, str, str, Optional[float]]] = ()) -> str:
+        """
+        渲染为 Prometheus 文本格式（0.0.4）。
+
+        :param gauges: 抓取时采集的附加指标 ``(name, type, help, value)``；``value`` 为
+            ``None`` 时跳过（如 Redis 后端无法廉价取得大小）。
+        """
+        lines = [
+            "# HELP sealium_activation_stage_seconds 激活链路各阶段耗时",
+            "# TYPE sealium_activation_stage_seconds histogram",
+        ]
+        les = [_format_seconds(b) for b in _EXPORT_BOUNDS_US]
+        for stage, hist in self.stages.items():
+            label = f'stage="{stage}"'
+            for le, n in zip(les, hist.cumulative(_EXPORT_BOUNDS_US)):
+                lines.append(f'sealium_activation_stage_seconds_bucket{{{label},le="{le}"}} {n}')
+            lines.append(f'sealium_activation_stage_seconds_bucket{{{label},le="+Inf"}} {hist.count}')
+            lines.append(f"sealium_activation_stage_seconds_sum{{{label}}} {hist.sum_us / 1e6:.6f}")
+            lines.append(f"sealium_activation_stage_seconds_count{{{label}}} {hist.count}")
+
+        _counter(lines, "sealium_activation_rejects_total", "激活拒绝次数（按原因）",
+                 "reason", self.rejects)
+        _counter(lines, "sealium_activation_requests_total", "到达路由的激活请求（按结果）",
+                 "outcome", self.outcomes)
+        _counter(lines, "sealium_early_rejects_total", "早拒绝中间件直接回写的请求（按状态码）",
+                 "status", self.early_rejects)
+
+        for name, kind, help_text, value in gauges:
+            if value is None:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _counter(lines: list[str], name: str, help_text: str, label: str, values: dict) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for key, n in sorted(values.items()):
+        lines.append(f'{name}{{{label}="{key}"}} {n}')
+
+
+def _format_value(value: float) -> str:
+    """样本值：整数原样输出（``:g`` 只保留 6 位有效数字，百万级计数器会看似停滞），
+    浮点取 ``repr`` 的最短往返表示。"""
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def _format_seconds(us: int) -> str:
+    return f"{us / 1e6:g}"
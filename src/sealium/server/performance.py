@@ -0,0 +1,110 @@
+# src/sealium/server/performance.py
+"""
+uvicorn 运行时调优预设（``[server.performance]``）。
+
+运维不必手调 uvicorn 参数，只需选一个预设，个别键再按需覆盖：
+
+============  ========  =========  =======  ==========  ===========  ============
+预设           事件循环   HTTP 解析   backlog  keep-alive  并发上限      h11 缓冲
+============  ========  =========  =======  ==========  ===========  ============
+default       auto      auto       2048     5 s         不限          16 KiB
+throughput    uvloop    httptools  4096     75 s        不限          16 KiB
+latency       uvloop    httptools  512      5 s         32            16 KiB
+constrained   asyncio   h11        128      2 s         16            8 KiB
+============  ========  =========  =======  ==========  ===========  ============
+
+* ``throughput``：反代长连接复用；keep-alive 长于常见反代上游空闲超时（60 s），避免
+  服务端先关连接与反代复用竞态；
+* ``latency``：超出并发上限立即 ``503``，而不是排在 RSA 解密后面拖长尾延迟；
+* ``constrained``：小内存 / 单核环境，限制连接与缓冲占用。
+
+``uvloop`` / ``httptools`` 为可选依赖（``pip install sealium[perf]``）；未安装时
+回退为 ``asyncio`` / ``h11`` 并给出提示，不阻止启动。在目标机器上对比各预设用
+``benchmarks/server_profiles.py``。
+"""
+
+from __future__ import annotations
+
+import importlib.util
+from typing import Any, Optional
+
+# 预设：键与 PerformanceModel 字段一致；limit_concurrency 0 = 不限
+PROFILES: dict[str, dict[str, Any]] = {
+    "default": {
+        "loop": "auto",
+        "http": "auto",
+        "backlog": 2048,
+        "keep_alive_seconds": 5,
+        "limit_concurrency": 0,
+        "h11_max_incomplete_event_size": 16 * 1024,
+    },
+    "throughput": {
+        "loop": "uvloop",
+        "http": "httptools",
+        "backlog": 4096,
+        "keep_alive_seconds": 75,
+        "limit_concurrency": 0,
+        "h11_max_incomplete_event_size": 16 * 1024,
+    },
+    "latency": {
+        "loop": "uvloop",
+        "http": "httptools",
+        "backlog": 512,
+        "keep_alive_seconds": 5,
+        "limit_concurrency": 32,
+        "h11_max_incomplete_event_size": 16 * 1024,
+    },
+    "constrained": {
+        "loop": "asyncio",
+        "http": "h11",
+        "backlog": 128,
+        "keep_alive_seconds": 2,
+        "limit_concurrency": 16,
+        "h11_max_incomplete_event_size": 8 * 1024,
+    },
+}
+
+# 可选实现 → 未安装时的回退
+_FALLBACK = {"uvloop": ("asyncio", "uvloop"), "httptools": ("h11", "httptools")}
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def resolve(perf) -> tuple[dict[str, Any], list[str]]:
+    """
+    合并预设与显式覆盖，返回 ``(uvicorn 关键字参数, 提示列表)``。
+
+    :param perf: :class:`~sealium.server.config.PerformanceModel`；字段为 ``None`` 时取预设。
+    """
+    merged = dict(PROFILES[perf.profile])
+    for key in merged:
+        value = getattr(perf, key)
+        if value is not None:
+            merged[key] = value
+
+    notes: list[str] = []
+    for key in ("loop", "http"):
+        choice = merged[key]
+        if choice in _FALLBACK:
+            fallback, module = _FALLBACK[choice]
+            if not _available(module):
+                notes.append(
+                    f"{key}={choice} 不可用（未安装 {module}，可 pip install sealium[perf]），"
+                    f"回退为 {fallback}"
+                )
+                merged[key] = fallback
+
+    limit: Optional[int] = merged["limit_concurrency"] or None
+    return (
+        {
+            "loop": merged["loop"],
+            "http": merged["http"],
+            "backlog": merged["backlog"],
+            "timeout_keep_alive": merged["keep_alive_seconds"],
+            "limit_concurrency": limit,
+            "h11_max_incomplete_event_size": merged["h11_max_incomplete_event_size"],
+        },
+        notes,
+    )
@@ -0,0 +1,278 @@
+# src/sealium/server/prefork.py
+"""
+预派生（pre-fork）多 worker 模式（仅 POSIX）。
+
+``uvicorn --workers N`` 的每个 worker 都是全新解释器：各自重新导入模块、解析 TOML、
+读取并（可能）用口令解密私钥，启动慢且每份都占独立内存。本模块改为**主进程预加载、
+fork 派生**：
+
+* **主进程**：加载配置与私钥、导入全部模块、构建 ASGI 应用并绑定监听套接字，随后
+  ``gc.freeze()`` 把已有对象移出 GC 追踪（避免子进程 GC 写引用计数头把共享页面逐页
+  复制），再 fork N 个 worker。这些只读状态以写时复制（copy-on-write）方式共享；
+* **worker**：继承监听套接字，各自运行 uvicorn 事件循环；lifespan 在 fork **之后**
+  执行，数据库连接、Redis 连接、审计写线程等不可跨 fork 的资源由每个 worker 自行
+  打开。lifespan 完成后经管道向主进程报告就绪；
+* **监管**：``SIGTERM`` / ``SIGINT`` 转发给全部 worker 并等待其优雅退出（超时
+  ``SIGKILL``）；``SIGHUP`` 逐个滚动重启（先派生替身、就绪后再停旧 worker，容量不
+  降）；运行中异常退出的 worker 自动补派，启动即失败的 worker 使整体退出（避免崩溃
+  循环）。
+
+全部 worker 就绪后输出启动报告（各预加载阶段耗时与 worker 就绪耗时）。滚动重启沿用
+主进程已加载的配置与私钥；改配置 / 换密钥需重启主进程。
+
+防重放与限流仍为进程内实现，多 worker 下须配置 ``[redis] url`` 才全局一致。
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import os
+import select
+import signal
+import socket
+import struct
+import sys
+import time
+from typing import Optional
+
+import uvicorn
+
+logger = logging.getLogger("sealium.server.prefork")
+
+# 就绪消息：worker pid（4 字节，小于 PIPE_BUF，多 worker 并发写入仍原子）
+_READY = struct.Struct("!I")
+_POLL_SECONDS = 0.5
+
+
+class _ReadyServer(uvicorn.Server):
+    """lifespan 启动成功后向主进程报告就绪的 uvicorn Server。"""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int) -> None:
+        super().__init__(config)
+        self._ready_fd = ready_fd
+
+    async def startup(self, sockets: Optional[list[socket.socket]] = None) -> None:
+        await super().startup(sockets=sockets)
+        if not self.should_exit:
+            os.write(self._ready_fd, _READY.pack(os.getpid()))
+
+
+class PreforkMaster:
+    """预派生主进程：持有监听套接字，派生并监管 worker。"""
+
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        workers: int,
+        *,
+        graceful_timeout: float = 30.0,
+        preload: Optional[list[tuple[str, float]]] = None,
+        listener: Optional[socket.socket] = None,
+    ) -> None:
+        """
+        :param listener: 已绑定的监听套接字（如 Unix 域套接字，见 unix_socket）；
+            为 ``None`` 时由 ``config.bind_socket()`` 按 host / port 绑定。
+        """
+        if workers < 1:
+            raise ValueError("workers 必须 >= 1")
+        self._config = config
+        self._workers = workers
+        self._graceful_timeout = graceful_timeout
+        self._preload = list(preload or [])
+        self._sock: Optional[socket.socket] = listener
+        self._ready_r = self._ready_w = -1
+        self._children: dict[int, float] = {}  # pid -> 派生时刻（monotonic）
+        self._ready: dict[int, float] = {}  # pid -> 派生到就绪耗时（秒）
+        self._retiring: set[int] = set()
+        self._exited: list[tuple[int, int]] = []  # 非主动停止而退出的 (pid, status)
+        self._stopping = False
+        self._reload = False
+
+    # ---------- 入口 ----------
+    def run(self) -> int:
+        """绑定、派生并监管直至收到停止信号；返回进程退出码。"""
+        began = time.perf_counter()
+        self._config.load()
+        if self._sock is None:
+            self._sock = self._config.bind_socket()
+        self._preload.append(("监听", time.perf_counter() - began))
+        self._ready_r, self._ready_w = os.pipe()
+        os.set_blocking(self._ready_r, False)
+
+        # 预加载对象移出 GC 追踪：子进程的分代回收不再触碰（写入）这些共享页面
+        gc.collect()
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+
+        for _ in range(self._workers):
+            self._spawn()
+        if not self._wait_ready(set(self._children), self._graceful_timeout):
+            if self._stopping:
+                self._shutdown()
+                return 0
+            logger.error("worker 启动失败或未能在 %.0f 秒内就绪，退出", self._graceful_timeout)
+            self._shutdown()
+            return 1
+        self._report()
+
+        exit_code = 0
+        while not self._stopping:
+            if self._reload:
+                self._reload = False
+                if not self._rolling_restart():
+                    exit_code = 1
+                    break
+            self._drain_ready(_POLL_SECONDS)
+            if not self._reap_and_respawn():
+                exit_code = 1
+                break
+        self._shutdown()
+        return exit_code
+
+    # ---------- 信号 ----------
+    def _on_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _on_reload(self, signum, frame) -> None:
+        self._reload = True
+
+    # ---------- 派生 ----------
+    def _spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - 子进程路径（由集成测试经子进程覆盖）
+            self._worker_main()
+        self._children[pid] = time.monotonic()
+        return pid
+
+    def _worker_main(self) -> None:  # pragma: no cover - 仅在子进程执行
+        code = 0
+        try:
+            for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+                signal.signal(sig, signal.SIG_DFL)
+            os.close(self._ready_r)
+            _ReadyServer(self._config, self._ready_w).run(sockets=[self._sock])
+        except BaseException:
+            logger.exception("worker 异常退出")
+            code = 1
+        finally:
+            # 绝不返回主进程代码路径
+            os._exit(code)
+
+    # ---------- 就绪 / 回收 ----------
+    def _drain_ready(self, timeout: float) -> None:
+        readable, _, _ = select.select([self._ready_r], [], [], timeout)
+        if not readable:
+            return
+        try:
+            data = os.read(self._ready_r, _READY.size * 64)
+        except BlockingIOError:
+            return
+        for (pid,) in _READY.iter_unpack(data[: len(data) - len(data) % _READY.size]):
+            spawned = self._children.get(pid)
+            if spawned is not None:
+                self._ready[pid] = time.monotonic() - spawned
+
+    def _wait_ready(self, pids: set[int], timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while not pids <= self._ready.keys():
+            if self._stopping or time.monotonic() >= deadline:
+                return False
+            self._drain_ready(min(_POLL_SECONDS, max(deadline - time.monotonic(), 0)))
+            self._reap()
+            if any(pid in pids for pid, _ in self._exited):
+                return False
+        return True
+
+    def _reap(self) -> None:
+        """非阻塞回收已退出的 worker；非主动停止的记入 ``_exited`` 待处理。"""
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            self._children.pop(pid, None)
+            if pid in self._retiring:
+                self._retiring.discard(pid)
+            else:
+                self._exited.append((pid, status))
+
+    def _reap_and_respawn(self) -> bool:
+        """回收意外退出的 worker 并补派；就绪前即退出视为配置性故障，返回 False。"""
+        self._reap()
+        while self._exited:
+            pid, status = self._exited.pop(0)
+            if self._ready.pop(pid, None) is None:
+                logger.error("worker %d 启动失败（status=%d），退出", pid, status)
+                return False
+            logger.warning("worker %d 意外退出（status=%d），补派", pid, status)
+            if not self._wait_ready({self._spawn()}, self._graceful_timeout):
+                return False
+        return True
+
+    # ---------- 滚动重启 / 停止 ----------
+    def _rolling_restart(self) -> bool:
+        old = [pid for pid in self._children if pid not in self._retiring]
+        logger.info("SIGHUP：滚动重启 %d 个 worker", len(old))
+        for pid in old:
+            if self._stopping:
+                return True
+            if not self._wait_ready({self._spawn()}, self._graceful_timeout):
+                if self._stopping:
+                    return True
+                logger.error("替身 worker 未就绪，中止滚动重启")
+                return False
+            self._retire([pid])
+        logger.info("滚动重启完成")
+        return True
+
+    def _retire(self, pids: list[int]) -> None:
+        """向 worker 发 SIGTERM 并等待其优雅退出，超时 SIGKILL。"""
+        for pid in pids:
+            self._retiring.add(pid)
+            self._ready.pop(pid, None)
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self._graceful_timeout
+        while self._retiring and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+        for pid in list(self._retiring):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            os.waitpid(pid, 0)
+            self._children.pop(pid, None)
+            self._retiring.discard(pid)
+
+    def _shutdown(self) -> None:
+        self._retire(list(self._children))
+        os.close(self._ready_r)
+        os.close(self._ready_w)
+        if self._sock is not None:
+            self._sock.close()
+
+    # ---------- 报告 ----------
+    def _report(self) -> None:
+        phases = "，".join(f"{name} {secs * 1000:.1f} ms" for name, secs in self._preload)
+        ready = sorted(self._ready.values())
+        print(
+            f"Sealium 预派生模式：{len(ready)} 个 worker 已就绪"
+            f"（派生→就绪 最快 {ready[0] * 1000:.0f} ms / 最慢 {ready[-1] * 1000:.0f} ms）；"
+            f"主进程预加载：{phases}",
+            file=sys.stderr,
+            flush=True,
+        )
+
+
+def supported() -> bool:
+    """当前平台是否支持预派生（需 ``os.fork``）。"""
+    return hasattr(os, "fork")
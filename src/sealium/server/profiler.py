@@ -0,0 +1,161 @@
+# src/sealium/server/profiler.py
+"""
+按需采样剖析（运行中服务的原位性能诊断）。
+
+线上延迟抖动时，重启挂 profiler 或加日志都会改变现场。本模块在**运行中的进程内**按需
+开启一个采样线程，剖析 N 秒后自动停止：
+
+* **采样**：每 ``interval`` 秒经 ``sys._current_frames()`` 取一次所有线程（含事件循环
+  线程）的调用栈，按「根 → 叶」折叠为 ``线程;模块:函数;...`` 并计数。不设 trace /
+  profile 钩子，被剖析代码零插桩，开销只在采样线程每次短暂持有 GIL；
+* **输出**：折叠栈（collapsed stacks）格式，每行 ``栈 次数``，可直接交给
+  ``flamegraph.pl`` / speedscope / inferno 生成火焰图；
+* **分配追踪（可选）**：同一时段开启 ``tracemalloc``，结束时按源码行汇总 Top-N 分配点
+  （若进程此前已在追踪则不关闭，不干扰既有诊断）。
+
+同一时刻只允许一次剖析（:class:`ProfilerBusy`）。端点装配见 ``app.py``（仅回环）。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Optional
+
+# 单次剖析时长 / 采样间隔的安全范围
+MAX_SECONDS = 60.0
+MIN_INTERVAL = 0.001
+_MAX_STACK_DEPTH = 128
+
+
+class ProfilerBusy(RuntimeError):
+    """已有一次剖析在进行。"""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{code.co_name}"
+
+
+def _collapse(frame) -> str:
+    labels = []
+    while frame is not None and len(labels) < _MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+class SamplingProfiler:
+    """采样线程：定时抓取所有线程调用栈并折叠计数。"""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self._interval = max(interval, MIN_INTERVAL)
+        self._stacks: Counter[str] = Counter()
+        self._samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="sealium-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not self._stop.wait(self._interval):
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                name = names.get(ident)
+                if name is None:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                    name = names.get(ident, f"thread-{ident}")
+                self._stacks[f"{name};{_collapse(frame)}"] += 1
+            self._samples += 1
+            del frames
+
+    @property
+    def samples(self) -> int:
+        return self._samples
+
+    def collapsed(self) -> list[str]:
+        """折叠栈行（``栈 次数``），按次数降序。"""
+        return [f"{stack} {count}" for stack, count in self._stacks.most_common()]
+
+
+def _top_allocations(limit: int) -> list[dict]:
+    """取快照并汇总 Top-``limit`` 分配点（遍历全部 trace，耗时随分配数增长，勿在事件循环上调用）。"""
+    stats = tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__),)
+    ).statistics("lineno")
+    return [
+        {
+            "location": f"{s.traceback[0].filename}:{s.traceback[0].lineno}",
+            "size_bytes": s.size,
+            "count": s.count,
+        }
+        for s in stats[:limit]
+    ]
+
+
+_lock = threading.Lock()
+
+
+async def profile(
+    seconds: float,
+    *,
+    interval: float = 0.005,
+    allocations: bool = False,
+    top: int = 25,
+) -> dict:
+    """
+    剖析当前进程 ``seconds`` 秒（期间事件循环照常处理请求）。
+
+    :param allocations: 同时追踪内存分配，返回 Top-``top`` 分配点。
+    :raises ProfilerBusy: 已有剖析在进行。
+    :raises ValueError: 参数越界。
+    """
+    if not 0 < seconds <= MAX_SECONDS:
+        raise ValueError(f"seconds 须在 (0, {MAX_SECONDS:g}] 内")
+    if interval < MIN_INTERVAL:
+        raise ValueError(f"interval 不得小于 {MIN_INTERVAL}")
+    if not _lock.acquire(blocking=False):
+        raise ProfilerBusy("已有剖析在进行")
+    started_tracing = False
+    try:
+        if allocations and not tracemalloc.is_tracing():
+            tracemalloc.start(8)
+            started_tracing = True
+        sampler = SamplingProfiler(interval)
+        began = time.perf_counter()
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            # 停止需 join 采样线程（最长一个采样间隔），放到线程池避免阻塞事件循环
+            await asyncio.to_thread(sampler.stop)
+        result: dict = {
+            "seconds": round(time.perf_counter() - began, 3),
+            "interval": interval,
+            "samples": sampler.samples,
+            "collapsed": sampler.collapsed(),
+        }
+        if allocations:
+            result["allocations"] = await asyncio.to_thread(_top_allocations, top)
+        return result
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        _lock.release()
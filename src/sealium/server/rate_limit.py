@@ -2,13 +2,35 @@
 """
 请求速率限制。
 
-采用固定窗口计数器（按 key 聚合，默认 key 为客户端 IP）。设计上与
+采用令牌桶（GCRA 形式，按 key 聚合，默认 key 为客户端 IP）。设计上与
 ``replay_guard`` 保持一致：小型、可注入、进程内、可注入 ``now_provider`` 便于
 测试。默认对所有激活请求生效，抑制滥用与重放缓存冲刷攻击（MEDIUM-002）。
 
+为什么不是固定窗口
+------------------
+旧实现是固定窗口计数，并在桶数超过 4096 时持锁用推导式重建整个 dict：宽范围 IP
+喷洒下每次调用都是一次 O(n) 停顿；且窗口边界两侧各放满一次，瞬时可达 2 倍突发。
+
+现实现：
+
+* **GCRA 令牌桶**：每个 key 只存一个浮点数（理论到达时间 TAT），平滑限流、无窗口
+  边界突发；桶容量 ``max_requests``，每 ``window_seconds`` 补满。
+* **分层时间轮过期**：key 在其桶重新补满（TAT 到期）时即可丢弃。到期时刻登记在
+  分层时间轮上，随调用推进，均摊 O(1)，不再全表扫描。
+* **分片锁**：按 key 哈希分到若干分片，各持独立锁、dict 与时间轮，降低争用。
+
+按代价计费
+----------
+放行时统一扣 1 个令牌，但各请求的真实开销相差几个数量级：解析阶段即失败的包只需
+微秒，能走到 RSA 私钥解密与数据库查询的包要毫秒。路由用 :class:`RequestCost` 记下
+请求实际到达的阶段，**失败**请求结束后经 ``charge`` 按 :data:`STAGE_COSTS` 追加扣费；
+成功的激活（含同机幂等重激活）不加收。反复逼服务端做无效解密的客户端因此远早于
+正常客户端被限流。
+
 .. note::
    与防重放同理，本实现为进程内：多 worker 部署各进程独立计数。若需全局精确
-   限流，可注入共享后端（如 Redis）。对当前单实例或弱一致限流场景已足够。
+   限流，配置 ``[redis] url`` 改用 ``redis_backend.RedisRateLimiter``。对当前单实例
+   或弱一致限流场景已足够。
 """
 
 from __future__ import annotations
@@ -17,21 +39,173 @@ import threading
 import time
 from typing import Callable, Optional, Protocol
 
+# 浮点累加误差容忍：避免 ``now + k*T - now`` 的末位误差把恰好用满额度判为超限。
+_EPSILON = 1e-9
+
+# 失败请求各阶段的附加代价（单位：令牌，放行本身已扣 1）。取值刻意保守于实测耗时比，
+# 使输错激活码的正常用户仍有余量重试，而批量无效解密很快耗尽额度。
+STAGE_COSTS: dict[str, float] = {
+    "rsa": 4.0,  # RSA 私钥解密（含失败的解密尝试）
+    "db": 1.0,  # 按激活码查库
+    "bind": 1.0,  # 绑定写库
+}
+# 读入请求体的附加代价：每 16 KiB 计 1 个令牌。
+_BODY_BYTES_PER_TOKEN = 16 * 1024
+
+# 追加扣费的欠额上限（以窗口计）：限制共享出口 IP 下被连带锁定的最长时间。
+_MAX_DEBT_WINDOWS = 2
+
 
 class RateLimiter(Protocol):
-    """速率限制器协议。``allow`` 返回该 key 是否仍可在当前窗口内放行。"""
+    """速率限制器协议。``allow`` 返回该 key 是否仍可在当前窗口内放行。
+
+    可选的 ``charge(key, cost)`` 在请求结束后按实际开销追加扣除 ``cost`` 个令牌（不做
+    放行判定）；未实现它的限流器（仅 ``allow`` / ``window_seconds``）照常可用，只是不按
+    代价计费。
+
+    做阻塞网络 I/O 的实现（如 Redis）应声明类属性 ``blocking = True``：中间件与路由
+    据此把调用放到线程池，不在事件循环上等待网络往返。"""
 
     window_seconds: int
 
     def allow(self, key: str) -> bool: ...
 
 
+class RequestCost:
+    """单个请求实际到达的处理阶段所累计的附加代价（见 :data:`STAGE_COSTS`）。"""
+
+    __slots__ = ("units", "stages")
+
+    def __init__(self) -> None:
+        self.units = 0.0
+        self.stages: list[str] = []
+
+    def add(self, stage: str) -> None:
+        self.units += STAGE_COSTS[stage]
+        self.stages.append(stage)
+
+    def add_body(self, nbytes: int) -> None:
+        self.units += nbytes / _BODY_BYTES_PER_TOKEN
+
+
+class _TimingWheel:
+    """
+    分层时间轮（惰性级联），登记 key 的过期时刻。
+
+    每层 ``2**slot_bits`` 个槽；第 ``L`` 层一个槽跨 ``64**L`` 个 tick。到期 tick 距当前
+    越远放得越高，指针跨过高层槽边界时把该槽内 key 级联到低层，第 0 层槽到点即触发。
+    槽内只存 key；真实到期时刻在触发 / 级联时经 ``deadline_of`` 回查——key 的到期
+    时刻后移时无需从轮上摘除，触发时发现未到期再重新登记即可（每个 key 轮上恒只一条）。
+    """
+
+    def __init__(
+        self,
+        tick_seconds: float,
+        deadline_of: Callable[[str], Optional[float]],
+        start: float,
+        slot_bits: int = 6,
+        levels: int = 3,
+    ) -> None:
+        self._tick = tick_seconds
+        self._deadline_of = deadline_of
+        self._bits = slot_bits
+        self._mask = (1 << slot_bits) - 1
+        self._levels = levels
+        self._span = 1 << (slot_bits * levels)  # 顶层可表示的最大 tick 距离
+        self._current = int(start // tick_seconds)
+        self._slots: list[list[list[str]]] = [
+            [[] for _ in range(1 << slot_bits)] for _ in range(levels)
+        ]
+        self._counts = [0] * levels
+        self._pending = 0
+
+    def schedule(self, key: str, deadline: float) -> None:
+        """登记 ``key`` 在 ``deadline`` 之后过期（至少推迟到下一 tick）。"""
+        t = max(int(deadline // self._tick) + 1, self._current + 1)
+        delta = t - self._current
+        if delta >= self._span:
+            t = self._current + self._span - 1  # 超出表示范围：先挂顶层，级联时按真实时刻重排
+            delta = self._span - 1
+        level = 0
+        while delta >= (1 << (self._bits * (level + 1))):
+            level += 1
+        self._slots[level][(t >> (self._bits * level)) & self._mask].append(key)
+        self._counts[level] += 1
+        self._pending += 1
+
+    def advance(self, now: float) -> list[str]:
+        """推进到 ``now``，返回已确认过期的 key。"""
+        target = int(now // self._tick)
+        expired: list[str] = []
+        while self._current < target:
+            if self._pending == 0:
+                self._current = target
+                break
+            # 低层全空时直接跳到最低非空层的下一个槽边界，长时间空闲不逐 tick 空转
+            lowest = 0
+            while self._counts[lowest] == 0:
+                lowest += 1
+            if lowest > 0:
+                shift = self._bits * lowest
+                boundary = ((self._current >> shift) + 1) << shift
+                if boundary > target:
+                    self._current = target
+                    break
+                self._current = boundary - 1
+            self._current += 1
+            # 高层先级联，使落入低层的 key 能在同一 tick 内继续下沉 / 触发
+            for level in range(self._levels - 1, 0, -1):
+                if self._current & ((1 << (self._bits * level)) - 1) == 0:
+                    self._cascade(level)
+            self._fire(now, expired)
+        return expired
+
+    def _take(self, level: int, index: int) -> list[str]:
+        keys = self._slots[level][index]
+        self._slots[level][index] = []
+        self._pending -= len(keys)
+        self._counts[level] -= len(keys)
+        return keys
+
+    def _cascade(self, level: int) -> None:
+        index = (self._current >> (self._bits * level)) & self._mask
+        for key in self._take(level, index):
+            deadline = self._deadline_of(key)
+            if deadline is not None:
+                self.schedule(key, deadline)
+
+    def _fire(self, now: float, expired: list[str]) -> None:
+        for key in self._take(0, self._current & self._mask):
+            deadline = self._deadline_of(key)
+            if deadline is None:
+                continue
+            if deadline <= now:
+                expired.append(key)
+            else:
+                self.schedule(key, deadline)  # 期间又被使用，到期时刻后移
+
+    def __len__(self) -> int:
+        return self._pending
+
+
+class _Shard:
+    """单个分片：独立锁 + ``key -> TAT`` + 过期时间轮。"""
+
+    __slots__ = ("lock", "tats", "wheel")
+
+    def __init__(self, tick_seconds: float, start: float) -> None:
+        self.lock = threading.Lock()
+        self.tats: dict[str, float] = {}
+        self.wheel = _TimingWheel(tick_seconds, self.tats.get, start)
+
+
 class InMemoryRateLimiter:
     """
-    固定窗口速率限制器（线程安全）。
+    令牌桶速率限制器（GCRA，线程安全）。
 
-    每个 key 在 ``window_seconds`` 窗口内最多放行 ``max_requests`` 次；窗口
-    滚动后计数重置。过期窗口惰性回收。
+    每个 key 的桶容量为 ``max_requests``，以 ``max_requests / window_seconds`` 的速率
+    补充：空闲 key 可一次突发 ``max_requests`` 次，之后每 ``window_seconds / max_requests``
+    秒放行一次。桶补满即等价于无状态，届时由时间轮回收该 key。
     """
 
     def __init__(
@@ -39,29 +213,65 @@ class InMemoryRateLimiter:
         max_requests: int,
         window_seconds: int,
         now_provider: Optional[Callable[[], float]] = None,
+        *,
+        shards: int = 16,
+        tick_seconds: float = 1.0,
     ) -> None:
         if max_requests <= 0 or window_seconds <= 0:
             raise ValueError("max_requests 与 window_seconds 必须为正整数")
+        if shards <= 0 or tick_seconds <= 0:
+            raise ValueError("shards 与 tick_seconds 必须为正数")
         self._max = max_requests
         self.window_seconds = window_seconds
+        self._interval = window_seconds / max_requests  # 每个令牌的补充间隔 T
+        self._burst = window_seconds - self._interval  # 突发容忍 τ = (max - 1) * T
         self._now = now_provider or time.monotonic
-        self._buckets: dict[str, tuple[float, int]] = {}
-        self._lock = threading.Lock()
+        start = self._now()
+        self._shards = tuple(_Shard(tick_seconds, start) for _ in range(shards))
 
     def allow(self, key: str) -> bool:
         now = self._now()
-        with self._lock:
-            window_start, count = self._buckets.get(key, (now, 0))
-            if now - window_start >= self.window_seconds:
-                window_start, count = now, 0
-            count += 1
-            self._buckets[key] = (window_start, count)
-            # 惰性回收：桶数过多时丢弃已过期项，避免长期累积
-            if len(self._buckets) > 4096:
-                self._buckets = {
-                    k: v for k, v in self._buckets.items() if now - v[0] < self.window_seconds
-                }
-            return count <= self._max
+        shard = self._shards[hash(key) % len(self._shards)]
+        with shard.lock:
+            tats = shard.tats
+            for expired in shard.wheel.advance(now):
+                del tats[expired]
+
+            tat = tats.get(key)
+            if tat is None:
+                tat = now
+                fresh = True
+            else:
+                fresh = False
+                if tat < now:
+                    tat = now
+            if tat - now > self._burst + _EPSILON:
+                return False  # 桶空：不扣令牌、不改状态
+            tats[key] = tat + self._interval
+            if fresh:
+                shard.wheel.schedule(key, tat + self._interval)
+            return True
+
+    def charge(self, key: str, cost: float) -> None:
+        """追加扣除 ``cost`` 个令牌；欠额至多 ``_MAX_DEBT_WINDOWS`` 个窗口。"""
+        if cost <= 0:
+            return
+        now = self._now()
+        shard = self._shards[hash(key) % len(self._shards)]
+        with shard.lock:
+            tats = shard.tats
+            tat = tats.get(key)
+            fresh = tat is None
+            if tat is None or tat < now:
+                tat = now
+            tat = min(tat + cost * self._interval, now + _MAX_DEBT_WINDOWS * self.window_seconds)
+            tats[key] = tat
+            if fresh:
+                shard.wheel.schedule(key, tat)
+
+    def __len__(self) -> int:
+        """当前持有状态的 key 数（桶未补满的 key）。"""
+        return sum(len(s.tats) for s in self._shards)
 
 
 class NullRateLimiter:
@@ -71,3 +281,6 @@ class NullRateLimiter:
 
     def allow(self, key: str) -> bool:  # noqa: D401 - 始终放行
         return True
+
+    def charge(self, key: str, cost: float) -> None:
+        return None
@@ -0,0 +1,426 @@
+# src/sealium/server/redis_backend.py
+"""
+Redis 共享后端：跨进程 / 跨节点一致的限流与防重放。
+
+``rate_limit`` 与 ``replay_guard`` 的进程内实现在多 worker / 多节点部署下各自计数，
+攻击者轮询命中不同进程即可绕过单进程额度。本模块提供两者协议的 Redis 实现，多个
+服务节点共享同一份额度与 nonce 集合。
+
+设计要点
+--------
+* **零额外依赖**：自带最小 RESP2 客户端（标准库 ``socket``），不引入 redis-py。
+* **连接池**：线程安全、LIFO 复用热连接；异常连接直接丢弃不回池。
+* **每次检查一个往返**：限流用 Lua 脚本（``EVALSHA``，``NOSCRIPT`` 时回退 ``EVAL``）
+  原子完成「读 TAT → 判定 → 写回」；防重放用单条 ``SET NX EX``。时钟取 Redis
+  ``TIME``，各节点本地时钟偏差不影响判定。
+* **批量流水线**：``allow_many`` / ``seen_many`` 一次写出全部命令再依次读回，突发
+  场景下 N 次检查只付一次网络往返。
+* **不占事件循环**：客户端是阻塞 socket，两个协议实现声明 ``blocking = True``；中间件
+  与服务的协程路径据此经 ``asyncio.to_thread`` 调用，Redis 慢或不可达时只占线程池。
+* **熔断**：连接 / 读写失败（含超时）后 ``breaker_seconds`` 秒内不再尝试连接，直接按
+  后端不可用处理，避免每个请求都等满一次超时；到期后下一次调用重新试探。
+* **不落原始敏感值**：防重放 key 为 ``(code, nonce)`` 的 SHA-256 摘要，Redis 中
+  不出现明文激活码。
+
+故障语义
+--------
+* 限流：Redis 不可用时默认 **fail-open**（放行并记录告警）——限流是滥用抑制而非
+  安全边界，不应因缓存故障拒绝全部合法激活。
+* 防重放：Redis 不可用时抛 :class:`~sealium.common.exceptions.BackendError`，由路由
+  的兜底映射为通用失败响应（**fail-closed**），绝不在无法去重时放行。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator, Optional, Sequence, Union
+from urllib.parse import unquote, urlparse
+
+from sealium.common.exceptions import BackendError
+from sealium.server.rate_limit import _MAX_DEBT_WINDOWS
+from sealium.server.replay_guard import _DEFAULT_TTL_SECONDS, ReplayKey
+
+logger = logging.getLogger("sealium.server.redis")
+
+_DEFAULT_PORT = 6379
+
+RespValue = Union[None, int, bytes, str, list, BackendError]
+
+# GCRA 限流脚本（与 InMemoryRateLimiter 同一算法）。时间单位微秒，取 Redis TIME，
+# 使多节点共用同一时钟。KEYS[1] = 桶 key；ARGV[1] = 补充间隔 T；ARGV[2] = 突发容忍 τ。
+# 返回 1 放行 / 0 拒绝。桶补满即过期（PX），Redis 自行回收。
+GCRA_SCRIPT = """\
+if redis.replicate_commands then redis.replicate_commands() end
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+if tat - now > burst then return 0 end
+local new_tat = tat + interval
+redis.call('SET', KEYS[1], string.format('%d', new_tat), 'PX', math.ceil((new_tat - now) / 1000))
+return 1
+"""
+
+# 追加扣费脚本（对应 RateLimiter.charge）：TAT 后移 ARGV[1] 微秒，欠额封顶 ARGV[2] 微秒。
+CHARGE_SCRIPT = """\
+if redis.replicate_commands then redis.replicate_commands() end
+local cost = tonumber(ARGV[1])
+local cap = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = math.min(tat + cost, now + cap)
+redis.call('SET', KEYS[1], string.format('%d', new_tat), 'PX', math.ceil((new_tat - now) / 1000))
+return 1
+"""
+
+
+# ---------------------------------------------------------------------------
+# RESP2 编解码与连接
+# ---------------------------------------------------------------------------
+def _encode_command(args: Sequence[Union[str, bytes, int, float]]) -> bytes:
+    """编码为 RESP 数组（bulk string 元素）。"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, str):
+            data = arg.encode("utf-8")
+        else:
+            data = str(arg).encode("ascii")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+class _Connection:
+    """单条 RESP 连接（阻塞 socket + 缓冲读）。"""
+
+    def __init__(self, host: str, port: int, timeout: float) -> None:
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+
+    def send(self, payload: bytes) -> None:
+        self._sock.sendall(payload)
+
+    def read_reply(self) -> RespValue:
+        """读一条回复。服务端错误（``-ERR``）以 :class:`BackendError` 实例返回而非抛出，
+        便于流水线中单条失败不打断其余回复的读取。"""
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise BackendError("Redis 连接被关闭")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode("utf-8")
+        if kind == b"-":
+            return BackendError(body.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            size = int(body)
+            if size < 0:
+                return None
+            data = self._reader.read(size + 2)
+            if len(data) != size + 2:
+                raise BackendError("Redis 回复不完整")
+            return data[:-2]
+        if kind == b"*":
+            count = int(body)
+            if count < 0:
+                return None
+            return [self.read_reply() for _ in range(count)]
+        raise BackendError(f"无法解析的 RESP 回复: {line[:32]!r}")
+
+    def close(self) -> None:
+        try:
+            self._reader.close()
+        finally:
+            self._sock.close()
+
+
+class RedisClient:
+    """
+    最小 Redis 客户端：连接池 + 单命令 / 流水线 / 脚本执行。
+
+    :param host: Redis 主机。
+    :param port: 端口。
+    :param db: 库序号（非 0 时连接建立后 ``SELECT``）。
+    :param password: 口令（非空时连接建立后 ``AUTH``）。
+    :param username: ACL 用户名（Redis 6+，与 ``password`` 同用）。
+    :param pool_size: 连接池上限；满时借用方阻塞至超时。
+    :param timeout: 连接 / 读写 / 借用超时（秒）。
+    :param breaker_seconds: 连接 / 读写失败后熔断的秒数：期间调用直接抛
+        :class:`BackendError`、不做任何 I/O；``0`` 关闭熔断。
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = _DEFAULT_PORT,
+        *,
+        db: int = 0,
+        password: Optional[str] = None,
+        username: Optional[str] = None,
+        pool_size: int = 8,
+        timeout: float = 1.0,
+        breaker_seconds: float = 5.0,
+    ) -> None:
+        if pool_size <= 0:
+            raise ValueError("pool_size 必须为正整数")
+        if breaker_seconds < 0:
+            raise ValueError("breaker_seconds 不能为负")
+        self._host = host
+        self._port = port
+        self._db = db
+        self._password = password
+        self._username = username
+        self._timeout = timeout
+        self._idle: deque[_Connection] = deque()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._script_shas: dict[str, str] = {}
+        self._breaker_seconds = breaker_seconds
+        self._open_until = 0.0  # 熔断截止（monotonic）；单个浮点读写，无需加锁
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisClient":
+        """``redis://[[user]:password@]host[:port][/db]`` → 客户端。"""
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"不支持的 Redis URL scheme: {parsed.scheme!r}")
+        db_part = parsed.path.lstrip("/")
+        return cls(
+            parsed.hostname or "127.0.0.1",
+            parsed.port or _DEFAULT_PORT,
+            db=int(db_part) if db_part else 0,
+            password=unquote(parsed.password) if parsed.password else None,
+            username=unquote(parsed.username) if parsed.username else None,
+            **kwargs,
+        )
+
+    # ---------- 连接池 ----------
+    def _open(self) -> _Connection:
+        conn = _Connection(self._host, self._port, self._timeout)
+        try:
+            if self._password:
+                auth = (
+                    ("AUTH", self._username, self._password)
+                    if self._username
+                    else ("AUTH", self._password)
+                )
+                self._roundtrip(conn, [auth])
+            if self._db:
+                self._roundtrip(conn, [("SELECT", self._db)])
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def _trip(self, exc: OSError) -> None:
+        if not self._breaker_seconds:
+            return
+        if time.monotonic() >= self._open_until:
+            logger.warning(
+                "Redis 不可达，熔断 %.1f 秒: %s", self._breaker_seconds, exc
+            )
+        self._open_until = time.monotonic() + self._breaker_seconds
+
+    @contextmanager
+    def _connection(self) -> Iterator[_Connection]:
+        if time.monotonic() < self._open_until:
+            raise BackendError("Redis 熔断中，跳过本次调用")
+        if not self._slots.acquire(timeout=self._timeout):
+            raise BackendError("Redis 连接池耗尽")
+        conn: Optional[_Connection] = None
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self._open()
+            yield conn
+        except (OSError, ValueError) as exc:
+            if conn is not None:
+                conn.close()
+                conn = None
+            if isinstance(exc, OSError):
+                self._trip(exc)
+            raise BackendError(f"Redis 通信失败: {exc}") from exc
+        except BackendError:
+            if conn is not None:
+                conn.close()  # 协议层错误后连接状态不可信，丢弃
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                with self._lock:
+                    self._idle.append(conn)
+            self._slots.release()
+
+    @staticmethod
+    def _roundtrip(conn: _Connection, commands: Sequence[Sequence]) -> list[RespValue]:
+        conn.send(b"".join(_encode_command(c) for c in commands))
+        return [conn.read_reply() for _ in commands]
+
+    # ---------- 命令 ----------
+    def pipeline(self, commands: Sequence[Sequence]) -> list[RespValue]:
+        """一次写出全部命令再依次读回（单次往返）。单条服务端错误以异常实例出现在结果中。"""
+        if not commands:
+            return []
+        with self._connection() as conn:
+            return self._roundtrip(conn, commands)
+
+    def execute(self, *args) -> RespValue:
+        """执行单条命令；服务端错误抛 :class:`BackendError`。"""
+        reply = self.pipeline([args])[0]
+        if isinstance(reply, BackendError):
+            raise reply
+        return reply
+
+    def eval_many(
+        self, script: str, calls: Sequence[tuple[Sequence[str], Sequence]]
+    ) -> list[RespValue]:
+        """以 ``EVALSHA`` 流水线执行同一脚本多次；脚本未缓存时加载后整体重试一次。"""
+        sha = self._script_shas.get(script)
+        if sha is None:
+            sha = hashlib.sha1(script.encode("utf-8")).hexdigest()
+            self._script_shas[script] = sha
+        commands = [("EVALSHA", sha, len(keys), *keys, *args) for keys, args in calls]
+        replies = self.pipeline(commands)
+        if any(isinstance(r, BackendError) and str(r).startswith("NOSCRIPT") for r in replies):
+            # 服务端脚本缓存被清空（重启 / SCRIPT FLUSH）：加载后重试
+            self.execute("SCRIPT", "LOAD", script)
+            replies = self.pipeline(commands)
+        return replies
+
+    def ping(self) -> bool:
+        return self.execute("PING") == "PONG"
+
+    def close(self) -> None:
+        """关闭全部空闲连接。"""
+        with self._lock:
+            while self._idle:
+                self._idle.pop().close()
+
+
+# ---------------------------------------------------------------------------
+# 协议实现
+# ---------------------------------------------------------------------------
+class RedisRateLimiter:
+    """
+    Redis GCRA 令牌桶（实现 :class:`~sealium.server.rate_limit.RateLimiter`）。
+
+    语义与 :class:`~sealium.server.rate_limit.InMemoryRateLimiter` 一致：桶容量
+    ``max_requests``，每 ``window_seconds`` 补满；所有节点共享同一份额度。
+    """
+
+    blocking = True  # 阻塞 socket：协程调用方须放到线程池
+
+    def __init__(
+        self,
+        client: RedisClient,
+        max_requests: int,
+        window_seconds: int,
+        *,
+        key_prefix: str = "sealium:",
+        fail_open: bool = True,
+    ) -> None:
+        if max_requests <= 0 or window_seconds <= 0:
+            raise ValueError("max_requests 与 window_seconds 必须为正整数")
+        self._client = client
+        self.window_seconds = window_seconds
+        interval_us = window_seconds * 1_000_000 // max_requests
+        self._interval_us = interval_us
+        self._args = (interval_us, window_seconds * 1_000_000 - interval_us)
+        self._max_debt_us = _MAX_DEBT_WINDOWS * window_seconds * 1_000_000
+        self._prefix = f"{key_prefix}rl:"
+        self._fail_open = fail_open
+
+    def allow(self, key: str) -> bool:
+        return self.allow_many([key])[0]
+
+    def allow_many(self, keys: Sequence[str]) -> list[bool]:
+        """批量检查（单次往返）。返回与 ``keys`` 一一对应的放行结果。"""
+        try:
+            replies = self._client.eval_many(
+                GCRA_SCRIPT, [((self._prefix + k,), self._args) for k in keys]
+            )
+        except BackendError:
+            if not self._fail_open:
+                raise
+            logger.warning("Redis 限流后端不可用，按 fail-open 放行", exc_info=True)
+            return [True] * len(keys)
+        results = []
+        for reply in replies:
+            if isinstance(reply, BackendError):
+                if not self._fail_open:
+                    raise reply
+                logger.warning("Redis 限流脚本执行失败，按 fail-open 放行: %s", reply)
+                results.append(True)
+            else:
+                results.append(reply == 1)
+        return results
+
+    def charge(self, key: str, cost: float) -> None:
+        """追加扣费（尽力而为：后端异常只记录告警，不影响已生成的响应）。"""
+        if cost <= 0:
+            return
+        args = (int(cost * self._interval_us), self._max_debt_us)
+        try:
+            reply = self._client.eval_many(CHARGE_SCRIPT, [((self._prefix + key,), args)])[0]
+        except BackendError:
+            logger.warning("Redis 限流后端不可用，跳过追加扣费", exc_info=True)
+            return
+        if isinstance(reply, BackendError):
+            logger.warning("Redis 追加扣费脚本执行失败: %s", reply)
+
+
+class RedisReplayStore:
+    """
+    Redis 防重放存储（实现 :class:`~sealium.server.replay_guard.ReplayStore`）。
+
+    ``SET <digest> 1 NX EX ttl`` 单命令原子完成「检查 + 记录」：写入成功即首次出现，
+    key 已存在即重放。TTL 到期由 Redis 自行回收。
+    """
+
+    blocking = True  # 阻塞 socket：协程调用方须放到线程池
+
+    def __init__(
+        self,
+        client: RedisClient,
+        ttl_seconds: int = _DEFAULT_TTL_SECONDS,
+        *,
+        key_prefix: str = "sealium:",
+    ) -> None:
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds 必须为正整数")
+        self._client = client
+        self._ttl = ttl_seconds
+        self._prefix = f"{key_prefix}rp:"
+
+    def _redis_key(self, key: ReplayKey) -> str:
+        code, nonce = key
+        digest = hashlib.sha256(f"{code}\x00{nonce}".encode("utf-8")).hexdigest()
+        return self._prefix + digest
+
+    def seen(self, key: ReplayKey) -> bool:
+        return self.seen_many([key])[0]
+
+    def seen_many(self, keys: Sequence[ReplayKey]) -> list[bool]:
+        """批量检查并记录（单次往返）。"""
+        replies = self._client.pipeline(
+            [("SET", self._redis_key(k), "1", "NX", "EX", self._ttl) for k in keys]
+        )
+        for reply in replies:
+            if isinstance(reply, BackendError):
+                raise reply
+        # 写入成功回 "OK"；NX 未写入回 nil → 已出现过
+        return [reply is None for reply in replies]
@@ -9,13 +9,15 @@ nonce 瞬间重新可重放，攻击者只需灌满缓存即可击穿防重放
 
 .. note::
    内存存储按进程隔离：多 worker 部署下各进程各自一份，重启即丢失。生产环境
-   若需跨进程一致的防重放，应注入共享后端（如 Redis）。
+   若需跨进程一致的防重放，配置 ``[redis] url`` 改用
+   ``redis_backend.RedisReplayStore``。
 """
 
 from __future__ import annotations
 
 import time
 from collections import OrderedDict
+from collections.abc import Sequence
 from typing import Callable, Optional, Protocol
 
 ReplayKey = tuple[str, str]
@@ -25,7 +27,12 @@ _DEFAULT_TTL_SECONDS = 600
 
 
 class ReplayStore(Protocol):
-    """防重放存储协议。``seen`` 记录并返回该 key 是否已出现过。"""
+    """防重放存储协议。``seen`` 记录并返回该 key 是否已出现过。
+
+    存储可另提供 ``seen_many(keys) -> list[bool]`` 批量版本（如 Redis 单次管道往返），
+    :meth:`ReplayGuard.is_replay_many` 会优先使用；做阻塞网络 I/O 的存储应声明类属性
+    ``blocking = True``，协程路径（:meth:`ActivationService.aprocess`）会把检查放到线程池。
+    """
 
     def seen(self, key: ReplayKey) -> bool: ...
 
@@ -82,6 +89,9 @@ class InMemoryReplayStore:
         for k in stale:
             self._seen.pop(k, None)
 
+    def __len__(self) -> int:
+        return len(self._seen)
+
     def clear(self) -> None:
         self._seen.clear()
 
@@ -104,3 +114,23 @@ class ReplayGuard:
     def is_replay(self, activation_code: str, nonce: str) -> bool:
         """检查并记录该 (activation_code, nonce) 是否为重放。"""
         return self._store.seen((activation_code, nonce))
+
+    def is_replay_many(self, activation_codes: Sequence[str], nonce: str) -> list[bool]:
+        """批量检查并记录（共享 ``nonce``），结果与 ``activation_codes`` 一一对应。
+
+        存储提供 ``seen_many`` 时一次调用完成（共享后端只需一次往返），否则逐条 ``seen``。
+        """
+        keys = [(code, nonce) for code in activation_codes]
+        seen_many = getattr(self._store, "seen_many", None)
+        if seen_many is not None:
+            return list(seen_many(keys))
+        return [self._store.seen(key) for key in keys]
+
+    @property
+    def blocking(self) -> bool:
+        """存储是否做阻塞网络 I/O（如 Redis）；协程调用方据此把检查放到线程池。"""
+        return getattr(self._store, "blocking", False)
+
+    def size(self) -> Optional[int]:
+        """当前缓存条目数（指标导出）；共享后端无法廉价统计时返回 ``None``。"""
+        return len(self._store) if hasattr(self._store, "__len__") else None
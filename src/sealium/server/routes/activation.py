@@ -2,33 +2,65 @@
 """
 激活接口路由（薄 HTTP 层）。
 
-只负责：限流 -> 读取请求体 -> 解密 -> 交给 ActivationService -> 加密响应。
+只负责：读取请求体 -> 重复包过滤 -> 解密 -> 交给 ActivationService -> 加密响应。
+明文含 ``activation_codes`` 时为批量激活：一次 RSA 解封、逐码判定，响应逐码给出结果。
+该流程由与框架无关的 :func:`handle_activation` / :func:`settle_activation` 实现，
+路由与纯 ASGI 快速路径（``routes.fast_activation``）共用，语义一致。
+限流与 Content-Length 上限已在外层 ASGI 中间件（``early_reject``）先行判定；失败
+请求结束后再按实际开销追加扣费（见 ``rate_limit.RequestCost``）。各阶段耗时与请求结果
+计入 :class:`~sealium.server.metrics.ActivationMetrics`（``/metrics`` 导出）。
 业务规则全部在 :class:`ActivationService`，加密拆包在 ``crypto_transport``。
+集群模式下属主不是本节点的激活码在解密后转发给属主处理（见 ``sealium.server.cluster``）。
 RSA 包长度从实际加载的私钥位数推导，而非硬编码 4096（HOTSPOT-001）。
 """
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+import time
+from typing import Optional
 
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import Response
+from starlette.types import Receive
 
 from sealium.common.constants import MAX_ACTIVATION_BODY_BYTES
 from sealium.common.crypto import RSAEncryptor
-from sealium.common.models import ActivationRequest, ActivationResponse
+from sealium.common.exceptions import BackendError
+from sealium.common.models import (
+    ActivationRequest,
+    ActivationResponse,
+    BatchActivationRequest,
+    BatchActivationResponse,
+)
 from sealium.server.activation_service import ActivationService
-from sealium.server.client_identity import resolve_client_ip
+from sealium.server.body_reader import BodyReadError, read_bounded_body, request_capacity
+from sealium.server.cluster import Forwarder
 from sealium.server.crypto_transport import (
-    decrypt_request,
+    decrypt_plaintext,
     encrypt_response,
     parse_encrypted_request,
 )
-from sealium.server.deps import get_activation_service, get_rate_limiter, get_server_encryptor
-from sealium.server.rate_limit import RateLimiter
+from sealium.server.deps import (
+    get_activation_service,
+    get_cluster,
+    get_duplicate_filter,
+    get_metrics,
+    get_rate_limiter,
+    get_server_encryptor,
+)
+from sealium.server.duplicate_filter import DuplicateFilter
+from sealium.server.early_reject import RATE_LIMIT_KEY_STATE
+from sealium.server.metrics import ActivationMetrics
+from sealium.server.rate_limit import RateLimiter, RequestCost
 
 logger = logging.getLogger("sealium.server.routes.activation")
 
+# 未激活成功的请求按 HTTP 状态归类（200 为加密的业务错误响应）
+_OUTCOMES = {200: "rejected", 400: "bad_request", 408: "timeout", 413: "too_large"}
+
 
 def create_router(activation_path: str = "/activation") -> APIRouter:
     """创建激活路由（不含前缀，前缀由 ``app.include_router`` 注入）。"""
@@ -40,71 +72,226 @@ def create_router(activation_path: str = "/activation") -> APIRouter:
         encryptor: RSAEncryptor = Depends(get_server_encryptor),
         service: ActivationService = Depends(get_activation_service),
         rate_limiter: RateLimiter = Depends(get_rate_limiter),
+        duplicate_filter: DuplicateFilter = Depends(get_duplicate_filter),
+        metrics: ActivationMetrics = Depends(get_metrics),
+        cluster: Optional[Forwarder] = Depends(get_cluster),
     ) -> Response:
-        # 0. 速率限制（MEDIUM-002）：按真实客户端 IP 聚合，超限直接 429。
-        #    HIGH-001：反代部署下经 trusted_proxies 受控解析 X-Forwarded-For，
-        #    否则 TCP 对端恒为代理 IP、所有限流并入全局单桶。
-        client_ip = resolve_client_ip(request, request.app.state.config.server.trusted_proxies)
-        if not rate_limiter.allow(client_ip):
-            return Response(
-                content=b"",
-                status_code=429,
-                headers={"Retry-After": str(rate_limiter.window_seconds)},
-            )
+        cost = RequestCost()
+        start = time.perf_counter_ns()
+        key = getattr(request.state, RATE_LIMIT_KEY_STATE, None)
+        cfg = request.app.state.config
+        status, body, succeeded = await handle_activation(
+            request.receive,
+            request.headers.get("content-length"),
+            key,
+            encryptor,
+            service,
+            duplicate_filter,
+            cost,
+            metrics,
+            timeout=cfg.server.body_read_timeout_seconds,
+            cluster=cluster,
+        )
+        settle_activation(
+            status, succeeded, cost, key, rate_limiter, metrics, start,
+            cost_weighted=cfg.rate_limit.cost_weighted,
+        )
+        if body:
+            return Response(content=body, media_type="application/octet-stream")
+        return Response(content=b"", status_code=status)
 
-        # 请求体大小硬上限（MEDIUM-001）：合法激活包 < 8KB，设 64KB 上限防内存耗尽 DoS。
-        # 读前用 Content-Length 早拦截（不读入内存），读后用实际长度复检（防伪造/缺失头）。
-        content_length = request.headers.get("content-length")
-        if content_length is not None:
-            try:
-                if int(content_length) > MAX_ACTIVATION_BODY_BYTES:
-                    return Response(content=b"", status_code=413)
-            except ValueError:
-                pass  # 非法 Content-Length，交由下方实际长度检查兜底
-        raw_data = await request.body()
-        if not raw_data:
-            return Response(content=b"", status_code=400)
-        if len(raw_data) > MAX_ACTIVATION_BODY_BYTES:
-            return Response(content=b"", status_code=413)
-
-        # 解密前的错误无法加密响应（尚无 AES 密钥），直接返回 400 空体
-        try:
-            # 包结构按实际私钥位数解析，避免硬编码 4096（HOTSPOT-001 / SMELL-001）
-            parts = parse_encrypted_request(raw_data, rsa_key_size=encryptor.key_size)
-        except ValueError:
-            return Response(content=b"", status_code=400)
-
-        try:
-            aes_key, req_dict = decrypt_request(encryptor, *parts)
-        except Exception:
-            return Response(content=b"", status_code=400)
-
-        try:
-            activation_req = ActivationRequest.from_dict(req_dict)
-        except Exception as e:
-            # LOW-008：对外固定通用消息，不回显内部异常细节（字段名 / 类型校验等），
-            # 与服务层对齐；详情写入 DEBUG 服务端日志而非加密响应。
-            logger.debug("请求格式错误: %s", e)
-            return _encrypted_response(
-                ActivationResponse.error("请求格式错误", nonce=None), aes_key
-            )
+    return router
 
-        # 业务处理：兜底捕获意外异常，避免 500 泄漏堆栈 / 破坏协议（MEDIUM-004）
-        try:
-            result = service.process(activation_req)
-        except Exception:
-            logger.exception("激活处理发生未预期异常")
-            return _encrypted_response(
-                ActivationResponse.error("激活处理失败，请稍后重试", nonce=activation_req.nonce),
-                aes_key,
-            )
-        return _encrypted_response(result, aes_key)
 
-    return router
+def settle_activation(
+    status: int,
+    succeeded: bool,
+    cost: RequestCost,
+    key: Optional[str],
+    rate_limiter: RateLimiter,
+    metrics: ActivationMetrics,
+    start_ns: int,
+    *,
+    cost_weighted: bool,
+) -> None:
+    """请求结束：记录总耗时与结果，失败请求按实际开销追加扣费。"""
+    metrics.observe("total", start_ns)
+    metrics.outcome("success" if succeeded else _OUTCOMES.get(status, "other"))
+    # 按代价计费：失败请求按实际触达的阶段（读包 / RSA / 查库 / 绑定）追加扣费，
+    # 反复逼服务端做无效解密的客户端远早于正常重激活的客户端被限流。
+    # 自定义限流器可能只实现 allow：没有 charge 时跳过追加扣费。
+    charge = getattr(rate_limiter, "charge", None)
+    if charge is not None and not succeeded and cost.units and cost_weighted and key is not None:
+        if getattr(rate_limiter, "blocking", False):
+            # 共享后端：扣费本就尽力而为，交给线程池执行，不等待网络往返
+            asyncio.get_running_loop().run_in_executor(None, charge, key, cost.units)
+        else:
+            charge(key, cost.units)
+
+
+async def handle_activation(
+    receive: Receive,
+    content_length: Optional[str],
+    client: Optional[str],
+    encryptor: RSAEncryptor,
+    service: ActivationService,
+    duplicate_filter: DuplicateFilter,
+    cost: RequestCost,
+    metrics: ActivationMetrics,
+    *,
+    timeout: float,
+    cluster: Optional[Forwarder] = None,
+) -> tuple[int, bytes, bool]:
+    """
+    处理一次激活请求（与 HTTP 框架无关，路由与 ASGI 快速路径共用）。
+
+    :param cluster: 集群路由；激活码属主不是本节点时转发给属主处理。
 
+    :returns: ``(状态码, 响应体, 是否激活成功)``；响应体非空时为加密的
+        ``application/octet-stream``，否则为空体错误响应。实际开销记入 ``cost``。
+    """
+    t = time.perf_counter_ns()
+    # 限流（MEDIUM-002 / HIGH-001）与 Content-Length 早拦截（MEDIUM-001）由
+    # EarlyRejectMiddleware 在 ASGI 层完成；此处按实际到达字节流式读取：超限即停
+    # （防伪造/缺失头的 chunked 上传），并受整体截止时间约束（防慢速客户端占位）。
+    try:
+        raw_data = await read_bounded_body(
+            receive,
+            limit=MAX_ACTIVATION_BODY_BYTES,
+            timeout=timeout,
+            capacity=request_capacity(
+                encryptor.key_size, content_length, MAX_ACTIVATION_BODY_BYTES
+            ),
+        )
+    except BodyReadError as e:
+        return e.status_code, b"", False
+    t = metrics.observe("body_read", t)
+    cost.add_body(len(raw_data))
+    if not raw_data:
+        return 400, b"", False
 
-def _encrypted_response(response: ActivationResponse, aes_key: bytes) -> Response:
-    return Response(
-        content=encrypt_response(response.to_dict(), aes_key),
-        media_type="application/octet-stream",
-    )
+    # 解密前的错误无法加密响应（尚无 AES 密钥），直接返回 400 空体
+    try:
+        # 包结构按实际私钥位数解析，避免硬编码 4096（HOTSPOT-001 / SMELL-001）
+        parts = parse_encrypted_request(raw_data, rsa_key_size=encryptor.key_size)
+    except ValueError:
+        return 400, b"", False
+
+    # 逐字节重放在私钥运算前丢弃：RSA 密钥段每个合法请求唯一，命中即回放包，
+    # 无需再付一次 RSA 解密才由 ReplayGuard 拦截。
+    if duplicate_filter.seen(parts[0]):
+        return 400, b"", False
+
+    cost.add("rsa")
+    t = time.perf_counter_ns()
+    try:
+        aes_key, plaintext = decrypt_plaintext(encryptor, *parts)
+    except Exception:
+        return 400, b"", False
+    t = metrics.observe("decrypt", t)
+
+    try:
+        req_dict = json.loads(plaintext.decode("utf-8"))
+    except ValueError:
+        return 400, b"", False
+
+    if isinstance(req_dict, dict) and "activation_codes" in req_dict:
+        return await _handle_batch(req_dict, aes_key, client, service, cost, metrics, t, cluster)
+
+    try:
+        activation_req = ActivationRequest.from_dict(req_dict)
+    except Exception as e:
+        # LOW-008：对外固定通用消息，不回显内部异常细节（字段名 / 类型校验等），
+        # 与服务层对齐；详情写入 DEBUG 服务端日志而非加密响应。
+        logger.debug("请求格式错误: %s", e)
+        error = ActivationResponse.error("请求格式错误", nonce=None)
+        return 200, encrypt_response(error.to_dict(), aes_key), False
+    t = metrics.observe("parse", t)
+
+    # 业务处理：兜底捕获意外异常，避免 500 泄漏堆栈 / 破坏协议（MEDIUM-004）
+    owner = cluster.owner_of(activation_req.activation_code) if cluster is not None else None
+    try:
+        if owner is not None:
+            result = await cluster.forward(owner, activation_req, cost, client=client)
+            metrics.observe("forward", t)
+        else:
+            result = await service.aprocess(activation_req, cost, client=client)
+    except BackendError as e:
+        # 属主不可达：不回退为本地处理，避免同一个码在两个节点各绑一次
+        logger.warning("转发至节点 %s 失败: %s", owner, e)
+        error = ActivationResponse.error("激活处理失败，请稍后重试", nonce=activation_req.nonce)
+        return 200, encrypt_response(error.to_dict(), aes_key), False
+    except Exception:
+        logger.exception("激活处理发生未预期异常")
+        error = ActivationResponse.error("激活处理失败，请稍后重试", nonce=activation_req.nonce)
+        return 200, encrypt_response(error.to_dict(), aes_key), False
+    t = time.perf_counter_ns()
+    body = encrypt_response(result.to_dict(), aes_key)
+    metrics.observe("encrypt", t)
+    return 200, body, result.result == "success"
+
+
+async def _handle_batch(
+    req_dict: dict,
+    aes_key: bytes,
+    client: Optional[str],
+    service: ActivationService,
+    cost: RequestCost,
+    metrics: ActivationMetrics,
+    t: int,
+    cluster: Optional[Forwarder],
+) -> tuple[int, bytes, bool]:
+    """
+    批量激活（明文含 ``activation_codes``）：读包 / RSA / 解密已由调用方做完一次，
+    此处逐码给出结果。集群模式下属主在别的节点的码逐个转发（并发），其余码在本地
+    一次批量查询后处理；某一项转发失败只影响该项。
+    """
+    try:
+        batch = BatchActivationRequest.from_dict(req_dict)
+    except Exception as e:
+        logger.debug("批量请求格式错误: %s", e)
+        error = ActivationResponse.error("请求格式错误", nonce=None)
+        return 200, encrypt_response(error.to_dict(), aes_key), False
+    t = metrics.observe("parse", t)
+
+    items = batch.items()
+    owners = [
+        cluster.owner_of(item.activation_code) if cluster is not None else None
+        for item in items
+    ]
+    results: list[Optional[ActivationResponse]] = [None] * len(items)
+    try:
+        remote = [i for i, owner in enumerate(owners) if owner is not None]
+        if remote:
+            forwarded = await asyncio.gather(
+                *(cluster.forward(owners[i], items[i], cost, client=client) for i in remote),
+                return_exceptions=True,
+            )
+            metrics.observe("forward", t)
+            for i, outcome in zip(remote, forwarded):
+                if isinstance(outcome, BaseException):
+                    if not isinstance(outcome, BackendError):
+                        raise outcome
+                    logger.warning("转发至节点 %s 失败: %s", owners[i], outcome)
+                    outcome = ActivationResponse.error("激活处理失败，请稍后重试", nonce=batch.nonce)
+                results[i] = outcome
+        local = [i for i, owner in enumerate(owners) if owner is None]
+        if local:
+            local_batch = BatchActivationRequest(
+                activation_codes=[batch.activation_codes[i] for i in local],
+                machine_code=batch.machine_code,
+                timestamp=batch.timestamp,
+                nonce=batch.nonce,
+            )
+            outcomes = await service.aprocess_many(local_batch, cost, client=client)
+            for i, outcome in zip(local, outcomes):
+                results[i] = outcome
+    except Exception:
+        logger.exception("批量激活处理发生未预期异常")
+        error = ActivationResponse.error("激活处理失败，请稍后重试", nonce=batch.nonce)
+        return 200, encrypt_response(error.to_dict(), aes_key), False
+    response = BatchActivationResponse(results=results, nonce=batch.nonce)
+    t = time.perf_counter_ns()
+    body = encrypt_response(response.to_dict(), aes_key)
+    metrics.observe("encrypt", t)
+    return 200, body, response.succeeded
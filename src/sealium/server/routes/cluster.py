@@ -0,0 +1,113 @@
+# src/sealium/server/routes/cluster.py
+"""
+集群内部接口（``[cluster] enabled = true`` 时挂载，不进 OpenAPI）。
+
+* ``/cluster/v1/activate``：属主侧处理入口节点转发来的已解密激活请求；
+* ``/cluster/v1/import``：rebalance 时接收迁入的原始行。
+
+请求与响应都是节点间密钥封装的二进制消息（见 :mod:`sealium.server.cluster`），
+认证失败一律 403 空体；业务层错误照常封装在回复里，由入口节点加密给客户端。
+属主只处理、不再转发：成员配置在滚动变更期间不一致时，也不会在节点间来回弹。
+"""
+
+from __future__ import annotations
+
+import logging
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import Response
+
+from sealium.common.models import ActivationRequest, ActivationResponse
+from sealium.server.activation_service import ActivationService
+from sealium.server.body_reader import BodyReadError, read_bounded_body
+from sealium.server.cluster import (
+    ACTIVATE_PATH,
+    IMPORT_PATH,
+    MAX_ACTIVATE_BYTES,
+    MAX_IMPORT_BYTES,
+    PURPOSE_ACTIVATE,
+    PURPOSE_ACTIVATE_REPLY,
+    PURPOSE_IMPORT,
+    PURPOSE_IMPORT_REPLY,
+    ClusterRouter,
+)
+from sealium.server.database import ActivationCodeStorage
+from sealium.server.deps import get_activation_service, get_activation_storage, get_cluster
+from sealium.server.rate_limit import RequestCost
+
+logger = logging.getLogger("sealium.server.routes.cluster")
+
+
+async def _open(request: Request, cluster: ClusterRouter, limit: int, purpose: bytes):
+    """读包并解封；失败时返回应直接回给对端的空体响应。"""
+    try:
+        data = await read_bounded_body(
+            request.receive,
+            limit=limit,
+            timeout=request.app.state.config.server.body_read_timeout_seconds,
+        )
+    except BodyReadError as e:
+        return None, Response(content=b"", status_code=e.status_code)
+    try:
+        return cluster.open_request(data, purpose), None
+    except ValueError as e:
+        logger.warning("拒绝无法认证的集群消息: %s", e)
+        return None, Response(content=b"", status_code=403)
+
+
+def create_cluster_router() -> APIRouter:
+    """创建集群内部路由。"""
+    router = APIRouter(tags=["cluster"], include_in_schema=False)
+
+    @router.post(ACTIVATE_PATH)
+    async def cluster_activate(
+        request: Request,
+        cluster: ClusterRouter = Depends(get_cluster),
+        service: ActivationService = Depends(get_activation_service),
+    ) -> Response:
+        payload, rejection = await _open(request, cluster, MAX_ACTIVATE_BYTES, PURPOSE_ACTIVATE)
+        if rejection is not None:
+            return rejection
+        try:
+            activation_req = ActivationRequest.from_dict(payload["request"])
+        except Exception as e:
+            # 入口节点已解析过同一请求，到这里只可能是版本不一致
+            logger.warning("节点 %s 转发的请求无法解析: %s", payload.get("from"), e)
+            return Response(content=b"", status_code=400)
+
+        cost = RequestCost()
+        try:
+            result = await service.aprocess(activation_req, cost, client=payload.get("client"))
+        except Exception:
+            logger.exception("处理转发的激活请求时发生未预期异常")
+            result = ActivationResponse.error("激活处理失败，请稍后重试", nonce=activation_req.nonce)
+        body = cluster.seal_reply(
+            payload, {"response": result.to_dict(), "stages": cost.stages}, PURPOSE_ACTIVATE_REPLY
+        )
+        return Response(content=body, media_type="application/octet-stream")
+
+    @router.post(IMPORT_PATH)
+    async def cluster_import(
+        request: Request,
+        cluster: ClusterRouter = Depends(get_cluster),
+        storage: ActivationCodeStorage = Depends(get_activation_storage),
+    ) -> Response:
+        payload, rejection = await _open(request, cluster, MAX_IMPORT_BYTES, PURPOSE_IMPORT)
+        if rejection is not None:
+            return rejection
+        owned, rejected = [], []
+        for row in payload.get("rows", ()):
+            (owned if cluster.owns_hash(row["code_hash"]) else rejected).append(row)
+        imported = storage.import_rows(owned)
+        logger.info(
+            "自节点 %s 迁入 %d 行（写入 %d，拒收 %d）",
+            payload.get("from"), len(owned), imported, len(rejected),
+        )
+        body = cluster.seal_reply(
+            payload,
+            {"imported": imported, "rejected": [row["code_hash"] for row in rejected]},
+            PURPOSE_IMPORT_REPLY,
+        )
+        return Response(content=body, media_type="application/octet-stream")
+
+    return router
@@ -0,0 +1,124 @@
+# src/sealium/server/routes/fast_activation.py
+"""
+激活接口的纯 ASGI 快速路径（``[server] fast_path = true`` 时启用）。
+
+激活接口是二进制 octet-stream API，却要为每个请求付 FastAPI 整条栈的开销：
+TrustedHost / CORS 中间件、路由匹配、五个 ``Depends`` 从 ``app.state`` 取组件、
+构造 ``Request`` 与 ``Response``。快速路径在 lifespan 中以组件**直接引用**构建
+:class:`ActivationEndpoint`，由最外层 ``EarlyRejectMiddleware`` 在限流放行后直接调用：
+
+* 读包 → 重复包过滤 → 解密 → ``ActivationService`` → 加密响应，与路由共用
+  :func:`~sealium.server.routes.activation.handle_activation`，语义逐字节一致；
+* 不构造 Request / Response，响应以两条 ASGI 消息直接发出；
+* 绕过的 TrustedHost 由本端点就地校验（``allowed_hosts`` 非 ``["*"]`` 时）；CORS 对
+  原生客户端无意义，快速路径不附带 CORS 头。
+
+其余路径（``/health``、``/metrics`` 等）照常经 FastAPI 处理。
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from starlette.types import Receive, Scope, Send
+
+from sealium.common.crypto import RSAEncryptor
+from sealium.server.activation_service import ActivationService
+from sealium.server.cluster import Forwarder
+from sealium.server.duplicate_filter import DuplicateFilter
+from sealium.server.early_reject import RATE_LIMIT_KEY_STATE
+from sealium.server.metrics import ActivationMetrics
+from sealium.server.rate_limit import RateLimiter, RequestCost
+from sealium.server.routes.activation import handle_activation, settle_activation
+
+_EMPTY_HEADERS = [(b"content-length", b"0")]
+_INVALID_HOST_BODY = b"Invalid host header"
+
+
+class ActivationEndpoint:
+    """激活接口的纯 ASGI 实现（组件直接注入，不经依赖解析）。"""
+
+    def __init__(
+        self,
+        encryptor: RSAEncryptor,
+        service: ActivationService,
+        rate_limiter: RateLimiter,
+        duplicate_filter: DuplicateFilter,
+        metrics: ActivationMetrics,
+        *,
+        body_read_timeout: float,
+        cost_weighted: bool = True,
+        allowed_hosts: Optional[list[str]] = None,
+        cluster: Optional[Forwarder] = None,
+    ) -> None:
+        self._encryptor = encryptor
+        self._service = service
+        self._limiter = rate_limiter
+        self._duplicate_filter = duplicate_filter
+        self._metrics = metrics
+        self._timeout = body_read_timeout
+        self._cost_weighted = cost_weighted
+        self._cluster = cluster
+        hosts = list(allowed_hosts or ["*"])
+        self._any_host = "*" in hosts
+        self._hosts = frozenset(h for h in hosts if not h.startswith("*"))
+        self._host_suffixes = tuple(h[1:] for h in hosts if h.startswith("*") and h != "*")
+
+    def _host_allowed(self, host: Optional[bytes]) -> bool:
+        # 与 Starlette TrustedHostMiddleware 相同的匹配规则：去端口后精确或 "*.域名" 后缀
+        if host is None:
+            return False
+        name = host.decode("latin-1").split(":")[0]
+        return name in self._hosts or name.endswith(self._host_suffixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        content_length = None
+        host = None
+        for name, value in scope["headers"]:
+            if name == b"content-length" and content_length is None:
+                content_length = value
+            elif name == b"host" and host is None:
+                host = value
+        if not self._any_host and not self._host_allowed(host):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 400,
+                    "headers": [
+                        (b"content-type", b"text/plain; charset=utf-8"),
+                        (b"content-length", str(len(_INVALID_HOST_BODY)).encode()),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": _INVALID_HOST_BODY})
+            return
+
+        cost = RequestCost()
+        start = time.perf_counter_ns()
+        key = scope.get("state", {}).get(RATE_LIMIT_KEY_STATE)
+        status, body, succeeded = await handle_activation(
+            receive,
+            content_length.decode("latin-1") if content_length is not None else None,
+            key,
+            self._encryptor,
+            self._service,
+            self._duplicate_filter,
+            cost,
+            self._metrics,
+            timeout=self._timeout,
+            cluster=self._cluster,
+        )
+        settle_activation(
+            status, succeeded, cost, key, self._limiter, self._metrics, start,
+            cost_weighted=self._cost_weighted,
+        )
+        if body:
+            headers = [
+                (b"content-type", b"application/octet-stream"),
+                (b"content-length", str(len(body)).encode()),
+            ]
+        else:
+            headers = _EMPTY_HEADERS
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
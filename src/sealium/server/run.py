@@ -6,6 +6,8 @@
 
     python -m sealium.server.run
     python -m sealium.server.run --config /etc/sealium/sealium.toml
+    python -m sealium.server.run --workers 4     # 预派生多 worker（见 prefork）
+    python -m sealium.server.run --unix-socket /run/sealium/activation.sock  # 同机旁挂（见 unix_socket）
 
 部署安全提示（MEDIUM-005 / MEDIUM-006）
 ---------------------------------------
@@ -14,19 +16,25 @@
   ``[server] host = "0.0.0.0"``（或内网 IP），并务必置于反代 + TLS 之后。
 * 本进程默认为明文 HTTP；业务负载已由 RSA+AES 混合加密端到端保护，但元信息（时序
   / 状态码 / 包大小）仍明文可见，应在上游反向代理终止 TLS（并加 HSTS）隐藏。
-* 多 worker 部署（``uvicorn --workers N`` / gunicorn）时，防重放与限流均为进程内
-  计数；若需全局一致，**必须**注入共享后端（如 Redis）。
+* 多 worker 部署（``[server] workers`` / ``--workers``、``uvicorn --workers N`` /
+  gunicorn）时，防重放与限流均为进程内计数；若需全局一致，**必须**配置共享后端
+  ``SEALIUM_REDIS__URL``。
 """
 
 from __future__ import annotations
 
 import argparse
+import logging
 import os
+import socket
 import sys
+import time
+from pathlib import Path
 
 import uvicorn
 
-from sealium.server.config import get_config
+from sealium.server import performance, prefork, unix_socket
+from sealium.server.config import ServerConfig, get_config
 
 
 # 视为回环的 host：不出网卡，无需"裸暴露"告警（MEDIUM-005）。
@@ -36,7 +44,7 @@ _LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
 def _warn_bare_exposure(cfg) -> None:
     """host 显式放开到非回环时，显著告警明文 HTTP 裸暴露风险（MEDIUM-005）。"""
     host = cfg.server.host
-    if cfg.server.debug or host in _LOOPBACK_HOSTS:
+    if cfg.server.debug or cfg.server.unix_socket is not None or host in _LOOPBACK_HOSTS:
         return
     print(
         f"⚠️  WARNING: 监听 {host}（非回环）且本进程为明文 HTTP。请确保已置于反向代理"
@@ -46,6 +54,124 @@ def _warn_bare_exposure(cfg) -> None:
     )
 
 
+def _resolve_workers(cfg: ServerConfig, requested: int | None) -> int:
+    """生效 worker 数：``0`` 取 CPU 核数；debug（热重载）或无 fork 的平台回退单进程。"""
+    workers = cfg.server.workers if requested is None else requested
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        return 1
+    if cfg.server.debug:
+        print("⚠️  debug 模式（热重载）不支持多 worker，按单进程启动。", file=sys.stderr, flush=True)
+        return 1
+    if not prefork.supported():
+        print("⚠️  当前平台不支持 fork，预派生多 worker 不可用，按单进程启动。", file=sys.stderr, flush=True)
+        return 1
+    return workers
+
+
+def _uvicorn_options(cfg: ServerConfig) -> dict:
+    """``[server.performance]`` 预设解析为 uvicorn 参数；可选实现缺失时提示回退。"""
+    options, notes = performance.resolve(cfg.server.performance)
+    for note in notes:
+        print(f"⚠️  {note}", file=sys.stderr, flush=True)
+    return options
+
+
+def _listen_options(cfg: ServerConfig) -> dict:
+    """监听参数：Unix 域套接字或 host / port（二者择一）。"""
+    if cfg.server.unix_socket is not None:
+        return {"uds": str(cfg.server.unix_socket)}
+    return {"host": cfg.server.host, "port": cfg.server.port}
+
+
+def _bind_unix_socket(cfg: ServerConfig) -> socket.socket:
+    """按 ``[server] unix_socket*`` 自行绑定（uvicorn 的 ``--uds`` 固定 0666 权限）。"""
+    return unix_socket.bind_unix_socket(
+        cfg.server.unix_socket, cfg.server.unix_socket_mode, cfg.server.unix_socket_group
+    )
+
+
+def _run_unix_socket(cfg: ServerConfig) -> None:
+    """单进程监听 Unix 域套接字；退出时删除套接字文件。"""
+    if cfg.server.debug:
+        print("⚠️  Unix 域套接字监听不支持热重载，按普通单进程启动。", file=sys.stderr, flush=True)
+    sock = _bind_unix_socket(cfg)
+    config = uvicorn.Config(
+        "sealium.server.app:app",
+        log_level=cfg.logging.level.lower(),
+        proxy_headers=True,
+        forwarded_allow_ips=",".join(cfg.server.trusted_proxies),
+        **_listen_options(cfg),
+        **_uvicorn_options(cfg),
+    )
+    try:
+        uvicorn.Server(config).run(sockets=[sock])
+    finally:
+        sock.close()
+        unix_socket.remove_unix_socket(cfg.server.unix_socket)
+
+
+def _run_prefork(cfg: ServerConfig, workers: int, config_seconds: float) -> int:
+    """主进程一次性加载私钥与应用，fork ``workers`` 个 worker 共享（见 prefork）。"""
+    logging.basicConfig(
+        level=getattr(logging, cfg.logging.level.upper(), logging.INFO),
+        format=cfg.logging.format,
+    )
+    # worker 的 lifespan 拿到预建的加密器，不会再调用 cfg.validate()：在主进程 fork 前校验
+    try:
+        cfg.validate()
+    except RuntimeError as e:
+        print(e, file=sys.stderr, flush=True)
+        return 1
+    if cfg.redis.url is None:
+        print(
+            f"⚠️  WARNING: {workers} 个 worker 但未配置 SEALIUM_REDIS__URL，防重放与限流按进程"
+            "独立计数（轮询不同 worker 即可绕过单进程额度）。",
+            file=sys.stderr,
+            flush=True,
+        )
+    began = time.perf_counter()
+    # 延迟导入：模块级 app 会加载配置，单进程路径由 uvicorn 按字符串导入
+    from sealium.server.app import create_app, load_server_encryptor
+
+    import_seconds = time.perf_counter() - began
+    began = time.perf_counter()
+    encryptor = load_server_encryptor(cfg)
+    key_seconds = time.perf_counter() - began
+    began = time.perf_counter()
+    app = create_app(config=cfg, encryptor=encryptor)
+    app_seconds = time.perf_counter() - began
+
+    uv_config = uvicorn.Config(
+        app,
+        log_level=cfg.logging.level.lower(),
+        proxy_headers=True,
+        forwarded_allow_ips=",".join(cfg.server.trusted_proxies),
+        timeout_graceful_shutdown=int(cfg.server.graceful_timeout_seconds),
+        **_listen_options(cfg),
+        **_uvicorn_options(cfg),
+    )
+    listener = _bind_unix_socket(cfg) if cfg.server.unix_socket is not None else None
+    master = prefork.PreforkMaster(
+        uv_config,
+        workers,
+        graceful_timeout=cfg.server.graceful_timeout_seconds,
+        preload=[
+            ("配置", config_seconds),
+            ("导入", import_seconds),
+            ("私钥", key_seconds),
+            ("应用", app_seconds),
+        ],
+        listener=listener,
+    )
+    try:
+        return master.run()
+    finally:
+        if listener is not None:
+            unix_socket.remove_unix_socket(cfg.server.unix_socket)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="启动 Sealium 激活服务")
     parser.add_argument(
@@ -54,22 +180,48 @@ def main() -> None:
         default=None,
         help="TOML 配置文件路径（默认 ./sealium.toml；等价于设 SEALIUM_CONFIG 环境变量）",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="预派生 worker 数（覆盖 [server] workers；0 = CPU 核数；仅 POSIX）",
+    )
+    parser.add_argument(
+        "--unix-socket",
+        type=str,
+        default=None,
+        help="改为监听 Unix 域套接字（覆盖 [server] unix_socket；仅 POSIX）",
+    )
     args = parser.parse_args()
 
     if args.config:
         # 必须在 get_config() 首次调用前设置，确保加载指定文件
         os.environ["SEALIUM_CONFIG"] = args.config
         get_config.cache_clear()
+    if args.unix_socket:
+        # 同样经环境变量：单进程路径由 uvicorn 导入模块级 app，须读到同一份配置
+        os.environ["SEALIUM_SERVER__UNIX_SOCKET"] = str(Path(args.unix_socket).resolve())
+        get_config.cache_clear()
 
+    began = time.perf_counter()
     cfg = get_config()
+    config_seconds = time.perf_counter() - began
+    if cfg.server.unix_socket is not None and not unix_socket.supported():
+        sys.exit("当前平台不支持 Unix 域套接字监听，请改用 host / port。")
     _warn_bare_exposure(cfg)
+    workers = _resolve_workers(cfg, args.workers)
+    if workers > 1:
+        sys.exit(_run_prefork(cfg, workers, config_seconds))
+    if cfg.server.unix_socket is not None:
+        _run_unix_socket(cfg)
+        return
     # 注：请求体大小上限（MEDIUM-001）不在 uvicorn 配置——uvicorn 无此参数，body 大小限制
-    # 本属 ASGI 应用层职责（见 https://uvicorn.dev/settings/）。已在路由层 activation.py 用
-    # Content-Length 头 + 实际长度双重 413 拦截实现，并由 test_oversized_body_returns_413 守护。
+    # 本属 ASGI 应用层职责（见 https://uvicorn.dev/settings/）。已由 early_reject 中间件按
+    # Content-Length 头 + 路由按实际长度双重 413 拦截实现，并由 test_oversized_body_returns_413 守护。
     # HIGH-001：启用代理头解析，使 uvicorn 自身（访问日志/连接记录）也按受信代理解析
     # X-Forwarded-For，与应用层 resolve_client_ip 共用同一份 trusted_proxies 配置（纵深防御）。
     # 仅当 TCP 对端在 forwarded_allow_ips 内时，uvicorn 才用 XFF 覆盖 client.host，
-    # 避免直接信任可伪造头（HOTSPOT-005）。
+    # 避免直接信任可伪造头（HOTSPOT-005）。CIDR 条目需 uvicorn >= 0.29 才被识别。
     uvicorn.run(
         "sealium.server.app:app",
         host=cfg.server.host,
@@ -78,6 +230,7 @@ def main() -> None:
         log_level=cfg.logging.level.lower(),
         proxy_headers=True,
         forwarded_allow_ips=",".join(cfg.server.trusted_proxies),
+        **_uvicorn_options(cfg),
     )
 
 
@@ -0,0 +1,399 @@
+# src/sealium/server/snapshot.py
+"""
+只读激活码目录快照（内存映射），供无状态边缘节点应答。
+
+重激活远多于首次绑定，但每个节点都要带完整 SQLite 才能应答。快照把 ``activation_codes``
+导出为一个不可变文件，边缘节点 ``mmap`` 后直接查询：
+
+* **布局**（小端）：定长文件头 → 按首字节分桶的 256 项扇出表 → 按 ``code_hash`` 排序的
+  64 字节定长记录（摘要 / 状态 / 截止时间 / 功能与指纹在数据区的偏移）→ 数据区（功能列表与
+  绑定指纹的原始 DB 文本）；
+* **查询**：扇出表把范围缩到约 ``N/256`` 条后二分，只切出 32 字节摘要比较；命中后按定长
+  结构取状态与截止时间。功能列表与绑定指纹**按需**解码——未知码、未使用码不做任何反序列化，
+  只有重激活的指纹比对才解析指纹；
+* **原子轮换**：导出写临时文件、``fsync`` 后 ``os.replace``；读端每隔
+  ``reload_seconds`` 比对文件 inode / mtime，变化即映射新文件（校验失败则继续用旧快照）。
+  旧映射由最后一个引用释放，进行中的请求不受影响。
+
+边缘节点（``[cluster] role = "edge"``）以 :class:`SnapshotStorage` 代替 SQLite 交给
+``ActivationService``：未知码、已使用码（同机幂等 / 异机拒绝）在本地应答；快照中未使用的码
+由 :class:`EdgeRouter` 按集群环转发给属主完成首次绑定。快照只是某一时刻的目录：导出后才
+生成的码在下次轮换前会被边缘节点当作不存在，导出后才绑定的码仍会转发给属主（由属主判定），
+不会绑错机器。
+
+导出::
+
+    python -m sealium.server.snapshot export                      # [paths] database → [paths] snapshot
+    python -m sealium.server.snapshot export --database a.db --database b.db   # 合并分片目录
+    python -m sealium.server.snapshot info
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+from sealium.common.fingerprint import MachineFingerprint
+from sealium.common.models import ActivationRequest, ActivationResponse, ActivationStatus
+from sealium.server.cluster import ClusterRouter
+from sealium.server.database import ActivationCodeStorage
+from sealium.server.rate_limit import RequestCost
+
+logger = logging.getLogger("sealium.server.snapshot")
+
+MAGIC = b"SLMSNAP1"
+VERSION = 1
+
+# 文件头：magic / 版本 / 保留 / 记录数 / 导出时间（Unix 秒）/ pepper 探针
+_HEADER = struct.Struct("<8sHHIq16s")
+_FANOUT = struct.Struct("<256I")
+# 记录：code_hash 摘要 / 状态 / 标志（bit0 有截止时间）/ 截止时间（微秒，naive）/
+# 功能偏移、长度 / 指纹偏移、长度（长度 0 即无）
+_RECORD = struct.Struct("<32sBBxxqIIII4x")
+_HAS_EXPIRY = 0x01
+_RECORDS_AT = _HEADER.size + _FANOUT.size
+
+_EPOCH = datetime(1970, 1, 1)
+_US = timedelta(microseconds=1)
+# 以 pepper 哈希该固定串写入文件头：边缘节点 pepper 不一致时拒绝加载（否则全部查不到）
+_PROBE = "sealium-snapshot-probe"
+
+
+def _probe(code_hasher: Callable[[str], str]) -> bytes:
+    return bytes.fromhex(code_hasher(_PROBE))[:16]
+
+
+# ---------------------------------------------------------------------------
+# 导出
+# ---------------------------------------------------------------------------
+def write_snapshot(rows: Iterable[dict[str, Any]], path: Path, code_hasher: Callable[[str], str]) -> int:
+    """
+    把原始行（``ActivationCodeStorage.export_rows``）写为快照并原子替换 ``path``。
+
+    同一 ``code_hash`` 出现多次（合并多个分片库）时已使用的行优先。
+
+    :return: 写入的记录数。
+    """
+    merged: dict[bytes, dict[str, Any]] = {}
+    for row in rows:
+        digest = bytes.fromhex(row["code_hash"])
+        current = merged.get(digest)
+        if current is None or (
+            current["status"] != ActivationStatus.USED.value and row["status"] == ActivationStatus.USED.value
+        ):
+            merged[digest] = row
+
+    records = bytearray()
+    blob = bytearray()
+    fanout = [0] * 256
+    for digest in sorted(merged):
+        row = merged[digest]
+        features = (row["features"] or "").encode("utf-8")
+        bound = (row["bound_machine_code"] or "").encode("utf-8")
+        feat_off = len(blob)
+        blob += features
+        fp_off = len(blob)
+        blob += bound
+        expires = row["expires_at"]
+        records += _RECORD.pack(
+            digest,
+            row["status"],
+            _HAS_EXPIRY if expires else 0,
+            (datetime.fromisoformat(expires) - _EPOCH) // _US if expires else 0,
+            feat_off,
+            len(features),
+            fp_off,
+            len(bound),
+        )
+        fanout[digest[0]] += 1
+    for i in range(1, 256):
+        fanout[i] += fanout[i - 1]
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, 0, len(merged), int(time.time()), _probe(code_hasher)))
+            f.write(_FANOUT.pack(*fanout))
+            f.write(records)
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)  # 读端要么看到旧文件，要么看到完整的新文件
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    if hasattr(os, "O_DIRECTORY"):  # 持久化目录项（POSIX）
+        fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    return len(merged)
+
+
+# ---------------------------------------------------------------------------
+# 读取
+# ---------------------------------------------------------------------------
+class SnapshotRecord:
+    """快照中的一条记录；``features`` / ``bound_machine_code`` 首次访问时才解码。"""
+
+    __slots__ = ("activation_code", "status", "expires_at", "activated_at", "_features", "_bound")
+
+    def __init__(
+        self,
+        code_hash: str,
+        status: ActivationStatus,
+        expires_at: Optional[datetime],
+        features: bytes,
+        bound: bytes,
+    ) -> None:
+        self.activation_code = code_hash  # 与 DB 读回一致：哈希，明文不可得
+        self.status = status
+        self.expires_at = expires_at
+        self.activated_at = None  # 快照不携带（应答不需要）
+        self._features: Any = features
+        self._bound: Any = bound
+
+    @property
+    def features(self) -> list[str]:
+        if isinstance(self._features, bytes):
+            self._features = ActivationCodeStorage._deserialize_features(self._features.decode("utf-8"))
+        return self._features
+
+    @property
+    def bound_machine_code(self) -> Optional[MachineFingerprint]:
+        if isinstance(self._bound, bytes):
+            self._bound = ActivationCodeStorage._decode_bound(self._bound.decode("utf-8") or None)
+        return self._bound
+
+    def is_used(self) -> bool:
+        return self.status == ActivationStatus.USED
+
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        if self.expires_at is None:
+            return False
+        return (now if now is not None else datetime.now()) > self.expires_at
+
+
+class _Mapping:
+    """一个已映射并校验过的快照文件。"""
+
+    def __init__(self, path: Path, probe: bytes) -> None:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if st.st_size < _RECORDS_AT:
+                raise ValueError(f"快照文件过短: {path}")
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identity = (st.st_ino, st.st_mtime_ns, st.st_size)
+        magic, version, _, count, created, file_probe = _HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"不是受支持的快照文件: {path}")
+        if file_probe != probe:
+            raise ValueError("快照与本节点的 code_hash_pepper 不一致")
+        self.blob_at = _RECORDS_AT + count * _RECORD.size
+        if st.st_size < self.blob_at:
+            raise ValueError(f"快照文件被截断: {path}")
+        self.count = count
+        self.created = created
+        self.fanout = (0,) + _FANOUT.unpack_from(self.mm, _HEADER.size)
+
+    def find(self, digest: bytes) -> Optional[SnapshotRecord]:
+        mm = self.mm
+        lo, hi = self.fanout[digest[0]], self.fanout[digest[0] + 1]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            off = _RECORDS_AT + mid * _RECORD.size
+            key = mm[off : off + 32]
+            if key < digest:
+                lo = mid + 1
+            elif key > digest:
+                hi = mid
+            else:
+                _, status, flags, expires, feat_off, feat_len, fp_off, fp_len = _RECORD.unpack_from(mm, off)
+                blob = self.blob_at
+                return SnapshotRecord(
+                    digest.hex(),
+                    ActivationStatus(status),
+                    _EPOCH + expires * _US if flags & _HAS_EXPIRY else None,
+                    mm[blob + feat_off : blob + feat_off + feat_len],
+                    mm[blob + fp_off : blob + fp_off + fp_len],
+                )
+        return None
+
+
+class SnapshotStorage:
+    """
+    快照上的只读 ``ActivationCodeStorage``（仅 ``get_by_code`` / ``get_by_codes`` / ``hash_code``）。
+
+    :param path: 快照文件。
+    :param code_hasher: 激活码 → ``code_hash``（须与导出端同一 pepper）。
+    :param reload_seconds: 检查文件是否被轮换的最小间隔。
+    :raises ValueError: 文件不是快照、被截断或 pepper 不一致。
+    """
+
+    def __init__(self, path: Path, code_hasher: Callable[[str], str], *, reload_seconds: float = 5.0) -> None:
+        self.path = Path(path)
+        self._hash = code_hasher
+        self._probe = _probe(code_hasher)
+        self._reload_seconds = reload_seconds
+        self._current = _Mapping(self.path, self._probe)
+        self._next_check = time.monotonic() + reload_seconds
+        self._memo: tuple[Optional[str], Optional[SnapshotRecord]] = (None, None)
+        self.reloads = 0
+
+    def hash_code(self, code: str) -> str:
+        return self._hash(code)
+
+    def get_by_code(self, code: str) -> Optional[SnapshotRecord]:
+        """按激活码查询；同一激活码连续查询（路由判定后紧接服务查询）复用上次结果。"""
+        self._maybe_reload()
+        if self._memo[0] == code:
+            return self._memo[1]
+        record = self._current.find(bytes.fromhex(self._hash(code)))
+        self._memo = (code, record)
+        return record
+
+    def get_by_codes(self, codes: list[str]) -> dict[str, SnapshotRecord]:
+        """批量查询：快照内逐码二分即可，无往返开销可省。"""
+        self._maybe_reload()
+        mapping = self._current
+        found = {}
+        for code in codes:
+            record = mapping.find(bytes.fromhex(self._hash(code)))
+            if record is not None:
+                found[code] = record
+        return found
+
+    def bind_machine_code(self, code: str, machine_code: str, activated_at: datetime) -> bool:
+        # 首次绑定由 EdgeRouter 转发给属主；走到这里说明路由与快照判定不一致
+        raise RuntimeError("快照只读：首次绑定须转发给属主节点")
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self._reload_seconds
+        try:
+            st = os.stat(self.path)
+        except OSError as e:
+            logger.warning("无法检查快照 %s，继续使用当前快照: %s", self.path, e)
+            return
+        if (st.st_ino, st.st_mtime_ns, st.st_size) == self._current.identity:
+            return
+        try:
+            fresh = _Mapping(self.path, self._probe)
+        except (OSError, ValueError) as e:
+            logger.warning("新快照无法加载，继续使用当前快照: %s", e)
+            return
+        self._current = fresh  # 旧映射随最后一个引用释放
+        self._memo = (None, None)
+        self.reloads += 1
+        logger.info("已切换到新快照（%d 条记录）", fresh.count)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "records": self._current.count,
+            "created": self._current.created,
+            "reloads": self.reloads,
+        }
+
+    def close(self) -> None:
+        self._memo = (None, None)
+
+
+class EdgeRouter:
+    """
+    边缘节点的转发钩子：快照中**未使用**的码转发给属主完成首次绑定，其余本地应答。
+
+    与 :class:`~sealium.server.cluster.ClusterRouter` 同一接口（``Forwarder``），交给
+    激活链路的 ``cluster`` 参数即可。
+    """
+
+    def __init__(self, cluster: ClusterRouter, snapshot: SnapshotStorage) -> None:
+        self._cluster = cluster
+        self._snapshot = snapshot
+
+    def owner_of(self, code: str) -> Optional[str]:
+        record = self._snapshot.get_by_code(code)
+        if record is None or record.is_used():
+            return None
+        return self._cluster.ring.owner(self._snapshot.hash_code(code))
+
+    async def forward(
+        self, owner: str, request: ActivationRequest, cost: RequestCost, *, client: Optional[str] = None
+    ) -> ActivationResponse:
+        return await self._cluster.forward(owner, request, cost, client=client)
+
+    def stats(self) -> dict[str, int]:
+        stats = self._cluster.stats()
+        snapshot = self._snapshot.stats()
+        stats["snapshot_records"] = snapshot["records"]
+        stats["snapshot_reloads"] = snapshot["reloads"]
+        return stats
+
+    def close(self) -> None:
+        self._cluster.close()
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def main(argv: Optional[list[str]] = None) -> int:
+    from sealium.server.app import _code_hasher, _open_storage
+    from sealium.server.config import get_config
+    from sealium.server.database import SQLiteDatabase
+
+    parser = argparse.ArgumentParser(description="Sealium 只读目录快照")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="导出激活码目录为快照（原子替换）")
+    export.add_argument(
+        "--database", type=Path, action="append", help="源数据库（可多次，合并分片目录；默认 [paths] database）"
+    )
+    export.add_argument("--output", type=Path, help="快照路径（默认 [paths] snapshot）")
+    info = sub.add_parser("info", help="查看快照文件头")
+    info.add_argument("path", type=Path, nargs="?", help="快照路径（默认 [paths] snapshot）")
+    args = parser.parse_args(argv)
+
+    cfg = get_config()
+    hasher = _code_hasher(cfg)
+    if args.command == "info":
+        path = args.path or cfg.paths.snapshot
+        try:
+            stats = SnapshotStorage(path, hasher).stats()
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        print(json.dumps({"path": str(path), **stats}, ensure_ascii=False, indent=2))
+        return 0
+
+    rows: list[dict[str, Any]] = []
+    for source in args.database or [None]:
+        if source is None:
+            db, storage = _open_storage(cfg)
+        else:
+            db = SQLiteDatabase(source)
+            db.connect()
+            storage = ActivationCodeStorage(db, code_hasher=hasher)
+        try:
+            rows.extend(storage.export_rows())
+        finally:
+            db.close()
+    output = args.output or cfg.paths.snapshot
+    count = write_snapshot(rows, output, hasher)
+    print(json.dumps({"path": str(output), "records": count}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# src/sealium/server/unix_socket.py
+"""
+Unix 域套接字监听（``[server] unix_socket``，仅 POSIX）。
+
+授权网关与激活服务同机部署时，经回环 TCP + 反代转发会白付 TCP 握手、Nagle / 延迟
+确认与反代一跳的开销。设置 ``unix_socket`` 后服务改为监听该路径（不再监听
+``host:port``），同一个 ``create_app``，单进程与预派生模式均适用。
+
+访问控制交给文件权限：
+* 套接字在收紧的 ``umask`` 下创建，再 ``chmod`` 为 ``unix_socket_mode``（默认
+  ``0660``），创建到授权之间不存在全员可连的窗口；uvicorn 自带的 ``--uds`` 会固定
+  ``chmod 0666``，故由本模块自行绑定后把套接字交给 uvicorn；
+* ``unix_socket_group`` 把套接字属组改为网关进程所在的组，只有属主与该组可连接。
+
+Unix 套接字对端没有网络地址，早拒绝层以 :data:`~sealium.server.client_identity.UNIX_PEER`
+作对端名；连接已由文件权限限定为本机受信调用方，装配时该名并入受信代理，网关写入的
+``X-Forwarded-For`` 即被限流采信（未写时全部调用方共用一个限流桶）。
+"""
+
+from __future__ import annotations
+
+import errno
+import os
+import socket
+import stat
+from pathlib import Path
+from typing import Optional
+
+# sockaddr_un.sun_path 长度上限（Linux 108 字节，含结尾 NUL；macOS 更短为 104）
+_MAX_PATH_BYTES = 107
+
+
+def supported() -> bool:
+    """当前平台是否支持 Unix 域套接字监听。"""
+    return hasattr(socket, "AF_UNIX") and os.name == "posix"
+
+
+def _gid(group: str) -> int:
+    import grp  # 仅 POSIX
+
+    if group.isdigit():
+        return int(group)
+    return grp.getgrnam(group).gr_gid
+
+
+def _clear_stale(path: Path) -> None:
+    """移除上次未清理的套接字文件；仍有进程在监听或不是套接字则报错。"""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise FileExistsError(f"{path} 已存在且不是套接字文件")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+    except OSError:
+        path.unlink(missing_ok=True)  # 无人监听：残留文件
+    else:
+        raise OSError(errno.EADDRINUSE, f"{path} 已有进程在监听")
+    finally:
+        probe.close()
+
+
+def bind_unix_socket(path: Path, mode: int = 0o660, group: Optional[str] = None) -> socket.socket:
+    """
+    绑定 Unix 域监听套接字并设置文件权限，返回交给 uvicorn 的套接字（尚未 ``listen``）。
+
+    :param path: 套接字路径；父目录不存在时创建。
+    :param mode: 套接字文件权限位。
+    :param group: 可选属组（组名或 gid）。
+    :raises ValueError: 路径超出 ``sun_path`` 长度上限。
+    :raises OSError: 已有进程在该路径监听，或路径被非套接字文件占用。
+    """
+    if len(os.fsencode(path)) > _MAX_PATH_BYTES:
+        raise ValueError(f"Unix 套接字路径过长（上限 {_MAX_PATH_BYTES} 字节）: {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _clear_stale(path)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        previous = os.umask(0o777 & ~mode)  # 启动阶段单线程，进程级 umask 可临时改
+        try:
+            sock.bind(str(path))
+        finally:
+            os.umask(previous)
+        if group is not None:
+            os.chown(path, -1, _gid(group))
+        os.chmod(path, mode)
+    except BaseException:
+        sock.close()
+        path.unlink(missing_ok=True)
+        raise
+    sock.set_inheritable(True)
+    return sock
+
+
+def remove_unix_socket(path: Path) -> None:
+    """服务退出后删除套接字文件（仅当它仍是套接字）。"""
+    try:
+        if stat.S_ISSOCK(path.stat().st_mode):
+            path.unlink()
+    except FileNotFoundError:
+        pass
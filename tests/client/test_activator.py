@@ -4,10 +4,15 @@
 from __future__ import annotations
 
 import json
+from urllib.parse import urlparse
 
 import pytest
+import requests
+from fastapi.testclient import TestClient
 
 from sealium.client.activator import Activator, ActivationError
+from sealium.client.license_store import LicenseStore
+from sealium.common.license_token import LicenseSigner, LicenseVerifier
 from sealium.common.models import ActivationStatus
 
 
@@ -116,3 +121,69 @@ def test_parse_response_failure(client, make_activator, unused_code, monkeypatch
 def test_invalid_public_key_raises():
     with pytest.raises(Exception):
         Activator("http://localhost/v1/activation", "not a valid pem")
+
+
+def test_activate_many_checks_nonces_and_shape(client, make_activator, unused_code, monkeypatch):
+    activator = make_activator(client)
+    with pytest.raises(ActivationError):
+        activator.activate_many([unused_code, unused_code])
+
+    wrong = json.dumps({"results": [{"result": "success", "nonce": "WRONG"}], "nonce": "WRONG"}).encode()
+    monkeypatch.setattr(activator.key_manager, "decrypt_response", lambda data: wrong)
+    with pytest.raises(ActivationError, match="nonce"):
+        activator.activate_many([unused_code])
+
+    rejected = json.dumps({"result": "error", "error_msg": "请求格式错误"}).encode()
+    monkeypatch.setattr(activator.key_manager, "decrypt_response", lambda data: rejected)
+    with pytest.raises(ActivationError, match="请求格式错误"):
+        activator.activate_many([unused_code])
+
+
+def test_check_prefers_offline_token(
+    make_app, storage, unused_code, server_public_pem, make_fingerprint, fixed_timestamp, tmp_path
+):
+    signer = LicenseSigner.generate()
+    state = {"now": fixed_timestamp, "fp": make_fingerprint(), "down": False, "posts": 0}
+    with TestClient(make_app(storage, license_signer=signer)) as test_client:
+
+        def poster(url, data, headers, timeout):
+            state["posts"] += 1
+            if state["down"]:
+                raise requests.ConnectionError("server down")
+            return test_client.post(urlparse(url).path, content=data, headers=headers)
+
+        activator = Activator(
+            "http://localhost/v1/activation",
+            server_public_pem,
+            timestamp_provider=lambda: fixed_timestamp,
+            machine_code_provider=lambda: state["fp"],
+            http_poster=poster,
+            license_verifier=LicenseVerifier.from_public_key_pem(signer.export_public_key()),
+            license_store=LicenseStore(tmp_path / "licenses.json"),
+            clock=lambda: state["now"],
+        )
+        # 无令牌：在线激活并保存令牌
+        first = activator.check(unused_code)
+        assert first.result == "success" and first.nonce and state["posts"] == 1
+        expires_at = signer.verify(first.token).expires_at
+
+        # 有令牌：本地验签 + 指纹比对（容忍外围漂移），不发请求
+        state["fp"] = make_fingerprint(drift=True)
+        offline = activator.check(unused_code)
+        assert (offline.result, offline.nonce, offline.features) == ("success", None, ["pro"])
+        assert state["posts"] == 1
+
+        # 临近到期：在线续期；服务端不可用时沿用未过期的令牌
+        state["now"] = expires_at - 3600
+        assert activator.check(unused_code).nonce is not None and state["posts"] == 2
+        state["down"] = True
+        assert activator.check(unused_code).nonce is None and state["posts"] == 3
+
+        # 已过期：必须在线
+        state["now"] = expires_at + 1
+        with pytest.raises(ActivationError):
+            activator.check(unused_code)
+
+        # 换机：令牌不匹配，回到在线激活并被服务端拒绝
+        state.update(now=fixed_timestamp, down=False, fp=make_fingerprint("other"))
+        assert activator.check(unused_code).result == "error"
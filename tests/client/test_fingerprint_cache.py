@@ -0,0 +1,89 @@
+"""客户端指纹缓存测试：进程内记忆、按变更指示复用磁盘缓存、后台重采、换机不可解密。"""
+
+from __future__ import annotations
+
+from sealium.client.fingerprint_cache import FingerprintCache
+
+
+class _Collector:
+    def __init__(self, make_fingerprint):
+        self.make_fingerprint = make_fingerprint
+        self.seed = "m"
+        self.calls = 0
+        self.fail = False
+
+    def __call__(self):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("采集失败")
+        return self.make_fingerprint(self.seed)
+
+
+def _cache(path, collector, indicator="boot:1", salt="machine-a", **kwargs) -> FingerprintCache:
+    return FingerprintCache(path, collect=collector, indicator=lambda: indicator, salt=lambda: salt, **kwargs)
+
+
+def test_memo_and_disk_reuse_under_same_indicator(tmp_path, make_fingerprint):
+    collector = _Collector(make_fingerprint)
+    path = tmp_path / "fp.bin"
+    first = _cache(path, collector)
+    assert first() == first() == make_fingerprint("m")
+    assert collector.calls == 1
+    assert b"core-m" not in path.read_bytes()  # 落盘加密
+
+    # 新进程（新实例）同一开机：直接读缓存，不采集
+    assert _cache(path, collector)() == make_fingerprint("m")
+    assert collector.calls == 1
+
+
+def test_indicator_change_serves_cached_and_refreshes_in_background(tmp_path, make_fingerprint):
+    collector = _Collector(make_fingerprint)
+    path = tmp_path / "fp.bin"
+    _cache(path, collector)()
+    collector.seed = "changed"
+
+    rebooted = _cache(path, collector, indicator="boot:2")
+    assert rebooted() == make_fingerprint("m")  # 先用旧指纹
+    rebooted.wait(5)
+    assert collector.calls == 2
+    assert rebooted() == make_fingerprint("changed")
+    assert _cache(path, collector, indicator="boot:2")() == make_fingerprint("changed")
+    assert collector.calls == 2
+
+    # 后台采集失败：沿用旧指纹，缓存不变
+    collector.fail = True
+    failing = _cache(path, collector, indicator="boot:3")
+    assert failing() == make_fingerprint("changed")
+    failing.wait(5)
+    assert failing() == make_fingerprint("changed")
+
+
+def test_blocking_refresh_foreign_machine_and_corruption(tmp_path, make_fingerprint):
+    collector = _Collector(make_fingerprint)
+    path = tmp_path / "fp.bin"
+    _cache(path, collector)()
+    collector.seed = "changed"
+    assert _cache(path, collector, indicator="boot:2", background=False)() == make_fingerprint("changed")
+    assert collector.calls == 2
+
+    # 拷到别的机器：密钥不同，按无缓存处理
+    assert _cache(path, collector, indicator="boot:2", salt="machine-b")() == make_fingerprint("changed")
+    assert collector.calls == 3
+
+    path.write_bytes(b"garbage")
+    _cache(path, collector)()
+    assert collector.calls == 4
+
+    # 无变更指示：只做进程内记忆，不读写磁盘
+    path.unlink()
+    memo_only = _cache(path, collector, indicator="")
+    memo_only()
+    memo_only()
+    assert collector.calls == 5 and not path.exists()
+
+    cache = _cache(path, collector)
+    cache()
+    cache.invalidate()
+    assert not path.exists()
+    cache()
+    assert collector.calls == 7
@@ -0,0 +1,85 @@
+"""UnixSocketPoster 测试：经 Unix 域套接字对真实 uvicorn 服务端完成激活。"""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import requests
+import uvicorn
+
+from sealium.client.activator import Activator
+from sealium.client.transport import UnixSocketPoster
+from sealium.server import unix_socket
+from sealium.server.config import RateLimitModel
+
+pytestmark = pytest.mark.skipif(not unix_socket.supported(), reason="需要 Unix 域套接字")
+
+
+@pytest.fixture
+def serve_unix(make_app, storage):
+    """在后台线程以 Unix 域套接字运行应用，返回套接字路径。"""
+    servers = []
+
+    def _serve(**config_updates) -> Path:
+        path = Path(storage.db.db_path).parent / "activation.sock"
+        cfg = make_app(storage).state.config.model_copy(deep=True)
+        cfg.server.unix_socket = path
+        for name, value in config_updates.items():
+            setattr(cfg, name, value)
+        sock = unix_socket.bind_unix_socket(path, 0o600)
+        server = uvicorn.Server(uvicorn.Config(make_app(storage, config=cfg), log_level="warning"))
+        thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+        thread.start()
+        deadline = time.monotonic() + 10
+        while not server.started and time.monotonic() < deadline:
+            time.sleep(0.01)
+        servers.append((server, thread, sock))
+        return path
+
+    yield _serve
+    for server, thread, sock in servers:
+        server.should_exit = True
+        thread.join(timeout=10)
+        sock.close()
+
+
+def test_activate_over_unix_socket_reuses_connection(
+    serve_unix, server_public_pem, make_fingerprint, unused_code, fixed_timestamp
+):
+    poster = UnixSocketPoster(serve_unix())
+    activator = Activator(
+        "http://localhost/v1/activation",
+        server_public_pem,
+        timestamp_provider=lambda: fixed_timestamp,
+        machine_code_provider=make_fingerprint,
+        http_poster=poster,
+    )
+    assert activator.activate(unused_code).result == "success"
+    first = poster._conn.sock
+    assert activator.activate(unused_code).result == "success"  # 同机重激活幂等
+    assert poster._conn.sock is first
+    poster.close()
+
+
+def test_gateway_forwarded_for_used_as_rate_limit_key(serve_unix):
+    path = serve_unix(rate_limit=RateLimitModel(enabled=True, max_requests=1, window_seconds=60))
+    poster = UnixSocketPoster(path)
+
+    def post(client_ip: str) -> int:
+        headers = {"Content-Type": "application/octet-stream", "X-Forwarded-For": client_ip}
+        return poster("http://localhost/v1/activation", b"", headers, 5).status_code
+
+    # Unix 对端视同受信代理：按网关写入的真实客户端分桶，而非全体共用一个桶
+    assert post("203.0.113.1") == 400
+    assert post("203.0.113.2") == 400
+    assert post("203.0.113.1") == 429
+    poster.close()
+
+
+def test_connection_errors_surface_as_requests_errors(tmp_path):
+    poster = UnixSocketPoster(str(tmp_path / "absent.sock"))
+    with pytest.raises(requests.ConnectionError):
+        poster("http://localhost/v1/activation", b"x", {}, 1)
@@ -132,6 +132,7 @@ def make_app(server_keypair: RSAEncryptor):
         replay_guard=None,
         now_provider=None,
         config: ServerConfig | None = None,
+        license_signer=None,
     ):
         cfg = config or isolated_config(Path(storage.db.db_path).parent)
         return create_app(
@@ -140,6 +141,7 @@ def make_app(server_keypair: RSAEncryptor):
             storage=storage,
             replay_guard=replay_guard,
             now_provider=now_provider or (lambda: FIXED_DT),
+            license_signer=license_signer,
         )
 
     return _make
@@ -0,0 +1,274 @@
+# tests/e2e/test_cluster_flow.py
+"""
+端到端测试：本机多进程集群。
+
+``cluster`` fixture 以真实 ``python -m sealium.server.run`` 启动三个节点（各自的
+SQLite、同一把 RSA 私钥与 pepper、同一份成员配置），验证：码先全部写入一个节点，
+``python -m sealium.server.cluster rebalance`` 按环分发到各属主；从任一节点入口激活
+都由属主绑定，且只有属主持有该行；跨入口重激活幂等、异机仍被拒。边缘节点只持有导出的
+只读快照，本地应答重激活与未知码，首次绑定转发给属主。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from sealium.client.activator import Activator
+from sealium.common.crypto import hash_activation_code
+from sealium.common.models import ActivationCode, ActivationStatus
+from sealium.server.cluster import HashRing
+from sealium.server.database import ActivationCodeStorage, SQLiteDatabase
+
+_PEPPER = "sealium-cluster-test-pepper"
+_NODE_IDS = ("a", "b", "c")
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="多进程集群测试仅在 POSIX 上运行")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_healthy(port: int, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"节点进程提前退出: {proc.stderr.read()}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("节点未在限定时间内就绪")
+
+
+def _open(db_path: Path) -> tuple[SQLiteDatabase, ActivationCodeStorage]:
+    db = SQLiteDatabase(db_path)
+    db.connect()
+    db.init_tables()
+    return db, ActivationCodeStorage(db, code_hasher=lambda c: hash_activation_code(c, _PEPPER))
+
+
+@dataclass
+class Node:
+    id: str
+    port: int
+    db_path: Path
+    env: dict[str, str]
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+
+class Cluster:
+    """本机多进程集群：每节点一个 ``sealium.server.run`` 子进程。"""
+
+    def __init__(self, base: Path, private_pem: bytes) -> None:
+        key_path = base / "server_private.pem"
+        key_path.write_bytes(private_pem)
+        ports = {node_id: _free_port() for node_id in _NODE_IDS}
+        members = json.dumps([{"id": n, "url": f"http://127.0.0.1:{p}"} for n, p in ports.items()])
+        self.ring = HashRing(_NODE_IDS)
+        self.nodes: dict[str, Node] = {}
+        for node_id, port in ports.items():
+            db_path = base / node_id / "database.db"
+            env = {
+                **os.environ,
+                "SEALIUM_CONFIG": str(base / "absent.toml"),
+                "SEALIUM_SERVER__HOST": "127.0.0.1",
+                "SEALIUM_SERVER__PORT": str(port),
+                "SEALIUM_SERVER__WORKERS": "1",
+                "SEALIUM_PATHS__DATABASE": str(db_path),
+                "SEALIUM_PATHS__PRIVATE_KEY": str(key_path),
+                "SEALIUM_SECURITY__CODE_HASH_PEPPER": _PEPPER,
+                "SEALIUM_RATE_LIMIT__ENABLED": "false",
+                "SEALIUM_LOGGING__LEVEL": "WARNING",
+                "SEALIUM_CLUSTER__ENABLED": "true",
+                "SEALIUM_CLUSTER__NODE_ID": node_id,
+                "SEALIUM_CLUSTER__NODES": members,
+                "SEALIUM_CLUSTER__SECRET": "cluster-test-secret",
+            }
+            self.nodes[node_id] = Node(node_id, port, db_path, env)
+        self._procs: list[subprocess.Popen] = []
+
+    def start(self) -> None:
+        for node in self.nodes.values():
+            _open(node.db_path)[0].close()  # 预建库表，便于测试直接写入种子数据
+            self._spawn(node)
+
+    def start_edge(self, snapshot: Path) -> Node:
+        """以 ``role = "edge"`` 启动一个不在成员列表中的节点，只读 ``snapshot`` 应答。"""
+        port = _free_port()
+        env = {
+            **self.nodes[_NODE_IDS[0]].env,
+            "SEALIUM_SERVER__PORT": str(port),
+            "SEALIUM_PATHS__DATABASE": str(snapshot.with_name("unused.db")),
+            "SEALIUM_PATHS__SNAPSHOT": str(snapshot),
+            "SEALIUM_CLUSTER__ROLE": "edge",
+            "SEALIUM_CLUSTER__NODE_ID": "edge",
+        }
+        node = Node("edge", port, snapshot, env)
+        self._spawn(node)
+        return node
+
+    def _spawn(self, node: Node) -> None:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "sealium.server.run"],
+            env=node.env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        self._procs.append(proc)
+        _wait_healthy(node.port, proc)
+
+    def stop(self) -> None:
+        for proc in self._procs:
+            proc.terminate()
+        for proc in self._procs:
+            try:
+                proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+            proc.stderr.close()
+
+    def seed(self, node_id: str, codes: list[str]) -> None:
+        db, storage = _open(self.nodes[node_id].db_path)
+        try:
+            for code in codes:
+                storage.create(
+                    ActivationCode(
+                        activation_code=code,
+                        status=ActivationStatus.UNUSED,
+                        features=["pro"],
+                        expires_at=datetime(2099, 12, 31),
+                    )
+                )
+        finally:
+            db.close()
+
+    def cli(self, node_id: str, *args: str) -> dict:
+        out = subprocess.run(
+            [sys.executable, "-m", "sealium.server.cluster", *args],
+            env=self.nodes[node_id].env,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        assert out.returncode == 0, out.stderr
+        return json.loads(out.stdout)
+
+    def rows(self, node_id: str) -> dict[str, dict]:
+        db, storage = _open(self.nodes[node_id].db_path)
+        try:
+            return {row["code_hash"]: row for row in storage.export_rows()}
+        finally:
+            db.close()
+
+
+@pytest.fixture
+def cluster(tmp_path: Path, server_private_pem: bytes):
+    c = Cluster(tmp_path, server_private_pem)
+    c.start()
+    try:
+        yield c
+    finally:
+        c.stop()
+
+
+def _activator(node: Node, public_pem: str, fingerprint) -> Activator:
+    return Activator(
+        f"{node.url}/v1/activation",
+        public_pem,
+        timestamp_provider=lambda: int(time.time()),
+        machine_code_provider=lambda: fingerprint,
+    )
+
+
+class TestClusterFlow:
+    def test_rebalance_then_activate_through_any_entry(self, cluster, server_public_pem, make_fingerprint):
+        codes = [f"{i:032x}" for i in range(24)]
+        cluster.seed("a", codes)
+
+        status = cluster.cli("a", "status")
+        assert status["local_rows"] == 24
+        moved = cluster.cli("a", "rebalance", "--batch-size", "5")["moved"]
+        assert sum(moved.values()) == sum(status["to_move"].values())
+        assert cluster.cli("a", "status")["to_move"] == {}
+
+        owners = {code: cluster.ring.owner(hash_activation_code(code, _PEPPER)) for code in codes}
+        assert set(owners.values()) == set(_NODE_IDS)
+        for node_id in _NODE_IDS:
+            held = set(cluster.rows(node_id))
+            assert held == {hash_activation_code(c, _PEPPER) for c, o in owners.items() if o == node_id}
+
+        machine = make_fingerprint("m1")
+        for i, code in enumerate(codes):
+            entry = cluster.nodes[_NODE_IDS[i % 3]]
+            result = _activator(entry, server_public_pem, machine).activate(code)
+            assert result.result == "success", (code, result.error_msg)
+
+        for code, owner in owners.items():
+            code_hash = hash_activation_code(code, _PEPPER)
+            assert cluster.rows(owner)[code_hash]["status"] == ActivationStatus.USED.value
+            assert all(code_hash not in cluster.rows(n) for n in _NODE_IDS if n != owner)
+
+        # 换入口重激活：同机幂等成功，异机仍被属主拒绝
+        code = codes[0]
+        other_entry = cluster.nodes[next(n for n in _NODE_IDS if n != owners[code])]
+        assert _activator(other_entry, server_public_pem, machine).activate(code).result == "success"
+        stranger = _activator(other_entry, server_public_pem, make_fingerprint("m2")).activate(code)
+        assert stranger.result == "error"
+
+    def test_edge_answers_from_snapshot_and_forwards_first_binds(
+        self, cluster, tmp_path, server_public_pem, make_fingerprint
+    ):
+        codes = [f"{i:032x}" for i in range(12)]
+        cluster.seed("a", codes)
+        cluster.cli("a", "rebalance")
+        machine = make_fingerprint("m1")
+        entry = cluster.nodes["a"]
+        for code in codes[:6]:
+            assert _activator(entry, server_public_pem, machine).activate(code).result == "success"
+
+        snapshot = tmp_path / "edge" / "snapshot.bin"
+        out = subprocess.run(
+            [sys.executable, "-m", "sealium.server.snapshot", "export", "--output", str(snapshot)]
+            + [arg for n in _NODE_IDS for arg in ("--database", str(cluster.nodes[n].db_path))],
+            env=cluster.nodes["a"].env,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        assert out.returncode == 0, out.stderr
+        assert json.loads(out.stdout)["records"] == 12
+        edge = cluster.start_edge(snapshot)
+        assert not snapshot.with_name("unused.db").exists()  # 边缘节点不开 SQLite
+
+        # 已绑定：快照本地应答（同机成功、异机拒绝）；未知码本地拒绝
+        assert _activator(edge, server_public_pem, machine).activate(codes[0]).result == "success"
+        assert _activator(edge, server_public_pem, make_fingerprint("m2")).activate(codes[0]).result == "error"
+        assert _activator(edge, server_public_pem, machine).activate("f" * 32).result == "error"
+        # 快照中未使用：转发给属主完成首次绑定，属主库落盘
+        for code in codes[6:]:
+            assert _activator(edge, server_public_pem, machine).activate(code).result == "success"
+            owner = cluster.ring.owner(hash_activation_code(code, _PEPPER))
+            row = cluster.rows(owner)[hash_activation_code(code, _PEPPER)]
+            assert row["status"] == ActivationStatus.USED.value
+        # 快照仍记为未使用的码被他机抢绑：属主判定拒绝
+        assert _activator(edge, server_public_pem, make_fingerprint("m2")).activate(codes[6]).result == "error"
@@ -1,7 +1,8 @@
 # tests/server/test_activation_api.py
 """激活接口 HTTP 层测试（FastAPI TestClient，进程内）。
 
-直接构造加密请求包打到接口，校验状态码、Content-Type 与加密响应。
+直接构造加密请求包打到接口，校验状态码、Content-Type 与加密响应。常规路由与
+``[server] fast_path`` 纯 ASGI 快速路径共用同一组用例。
 """
 
 from __future__ import annotations
@@ -9,11 +10,24 @@ from __future__ import annotations
 import json
 
 import pytest
+from fastapi.testclient import TestClient
 
 from sealium.client.key_manager import ClientKeyManager
 from sealium.common.constants import AES_GCM_NONCE_SIZE, AES_GCM_TAG_SIZE, RSA_KEY_SIZE
 
 
+@pytest.fixture(params=["route", "fast_path"])
+def client(request, make_app, storage):
+    """常规 FastAPI 路由与纯 ASGI 快速路径各跑一遍，保证两者语义一致。"""
+    app = make_app(storage)
+    if request.param == "fast_path":
+        cfg = app.state.config.model_copy(deep=True)
+        cfg.server.fast_path = True
+        app = make_app(storage, config=cfg)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
 def build_packet(server_public_pem: str, request_dict: dict):
     """用客户端密钥管理器构建加密请求包，返回 (packet, key_manager)。"""
     km = ClientKeyManager(server_public_pem)
@@ -61,6 +75,18 @@ class TestHealthAndErrors:
         assert resp.status_code == 413
         assert resp.content == b""
 
+    def test_chunked_oversized_body_returns_413(self, client):
+        """无 Content-Length 的 chunked 上传：流式读取越限即 413，不整体缓冲。"""
+        from sealium.common.constants import MAX_ACTIVATION_BODY_BYTES
+
+        def chunks():
+            for _ in range(MAX_ACTIVATION_BODY_BYTES // 4096 + 2):
+                yield b"x" * 4096
+
+        resp = client.post("/v1/activation", content=chunks())
+        assert resp.status_code == 413
+        assert resp.content == b""
+
 
 class TestActivationRoundtrip:
     def test_successful_activation(
@@ -146,3 +172,53 @@ class TestActivationRoundtrip:
         # 加密响应是随机二进制，按字节内容抛 JSONDecodeError 或 UnicodeDecodeError
         with pytest.raises((json.JSONDecodeError, UnicodeDecodeError)):
             json.loads(resp.content)
+
+
+class TestBatchActivation:
+    def test_one_envelope_many_codes(self, client, make_activator, storage, unused_code, make_fingerprint):
+        from sealium.common.models import ActivationCode
+
+        storage.create(ActivationCode(activation_code="b" * 32, features=["addon"]))
+        results = make_activator(client).activate_many([unused_code, "b" * 32, "f" * 32])
+        assert [r.result for r in results] == ["success", "success", "error"]
+        assert results[1].features == ["addon"]
+        assert storage.get_by_code("b" * 32).bound_machine_code == make_fingerprint()
+
+    def test_invalid_batch_returns_encrypted_error(
+        self, client, server_public_pem, fixed_timestamp, make_fingerprint
+    ):
+        request_dict = {
+            "activation_codes": ["a", "a"],
+            "machine_code": make_fingerprint().to_dict(),
+            "timestamp": fixed_timestamp,
+            "nonce": "n1",
+        }
+        packet, km = build_packet(server_public_pem, request_dict)
+        resp = client.post("/v1/activation", content=packet)
+        assert resp.status_code == 200
+        assert decrypt(km, resp.content) == {"result": "error", "error_msg": "请求格式错误"}
+
+
+class TestFastPath:
+    def _app(self, make_app, storage, **server):
+        cfg = make_app(storage).state.config.model_copy(deep=True)
+        cfg.server.fast_path = True
+        for name, value in server.items():
+            setattr(cfg.server, name, value)
+        return make_app(storage, config=cfg)
+
+    def test_endpoint_used_and_counted(self, make_app, storage):
+        app = self._app(make_app, storage)
+        with TestClient(app) as test_client:
+            assert app.state.activation_endpoint is not None
+            assert test_client.post("/v1/activation", content=b"").status_code == 400
+            assert app.state.metrics.outcomes["bad_request"] == 1
+
+    def test_allowed_hosts_still_enforced(self, make_app, storage):
+        app = self._app(make_app, storage, allowed_hosts=["*.example.com"])
+        with TestClient(app, base_url="http://evil.test") as test_client:
+            resp = test_client.post("/v1/activation", content=b"")
+            assert resp.status_code == 400 and resp.content == b"Invalid host header"
+        with TestClient(app, base_url="http://api.example.com") as test_client:
+            resp = test_client.post("/v1/activation", content=b"")
+            assert resp.status_code == 400 and resp.content == b""
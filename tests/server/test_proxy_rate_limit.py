@@ -126,3 +126,22 @@ class TestUntrustedProxyNoSpoofing:
             )
         assert r1.status_code != 429  # 对端桶首次
         assert r2.status_code == 429  # XFF 被忽略 → 同一对端桶超限
+
+
+class TestSubnetAggregation:
+    def test_rotating_ipv6_within_prefix_shares_bucket(self, server_keypair, tmp_path):
+        """同一 /56 内轮换 IPv6 源地址不能刷出新桶；相邻 /56 仍独立。"""
+        limiter = InMemoryRateLimiter(max_requests=1, window_seconds=60)
+        app = _build_proxy_app(server_keypair, tmp_path, [_PROXY_PEER], limiter)
+        pub = server_keypair.export_public_key().decode()
+        with TestClient(app) as c:
+            codes = [
+                c.post(
+                    "/v1/activation", content=_packet(pub),
+                    headers={"x-forwarded-for": xff},
+                ).status_code
+                for xff in ("2001:db8:0:1::a", "2001:db8:0:2::b", "2001:db8:0:100::c")
+            ]
+        assert codes[0] != 429
+        assert codes[1] == 429  # 同一 2001:db8::/56
+        assert codes[2] != 429  # 2001:db8:0:100::/56 独立
@@ -3,17 +3,25 @@
 原生表面采集的解析逻辑测试（SMBIOS 固件表 / 磁盘 IOCTL 结构解析）。
 
 用固定字节 fixture 验证解析算法，不依赖真机；真机采集仅 Windows 冒烟。
+
+``smbios_corpus/`` 存放完整的 RawSMBIOSData 转储（``*.bin``）与期望解析结果（``*.json``），
+覆盖台式机 / 笔记本 / 虚拟机 / 双路服务器 / 缺终止符的截断表。新增样本：Windows 上保存
+``GetSystemFirmwareTable('RSMB')`` 的返回；Linux 上以 root 读 ``/sys/firmware/dmi/tables/DMI``
+并在前面补 8 字节头 ``struct.pack("<BBBBI", 0, major, minor, 0, len(table))``。
 """
 
 from __future__ import annotations
 
+import json
 import os
 import uuid
+from pathlib import Path
 
 import pytest
 
 from sealium.common.hardware.native_surfaces import (
     _iter_smbios_structures,
+    _parse_raw_smbios,
     _parse_smbios,
     _processor_id,
     _read_ansi,
@@ -85,6 +93,31 @@ class TestSmbiosParsing:
         assert by_cat["cpu"].source == "smbios"
 
 
+_CORPUS = sorted((Path(__file__).parent / "smbios_corpus").glob("*.bin"))
+
+
+class TestSmbiosCorpus:
+    @pytest.mark.parametrize("dump", _CORPUS, ids=lambda p: p.stem)
+    def test_parses_recorded_table(self, dump: Path):
+        expected = json.loads(dump.with_suffix(".json").read_text(encoding="utf-8"))
+        raw = dump.read_bytes()
+        surfaces = _parse_raw_smbios(raw)
+        assert [[s.category, s.raw] for s in surfaces] == expected["surfaces"]
+        assert all(s.source == "smbios" for s in surfaces)
+        assert len(list(_iter_smbios_structures(raw[8:]))) == expected["structures"]
+
+    def test_type_filter_skips_unused_structures(self):
+        raw = (Path(__file__).parent / "smbios_corpus" / "server_dell_2s.bin").read_bytes()
+        structs = list(_iter_smbios_structures(raw[8:], frozenset({4})))
+        assert [s[0] for s in structs] == [4, 4]
+        # formatted 为原表上的零拷贝视图；string-set 按需解码
+        assert isinstance(structs[0][1], memoryview)
+        assert structs[1][2][0] == "CPU2" and len(structs[1][2]) == 3
+
+    def test_truncated_header_is_empty(self):
+        assert _parse_raw_smbios(b"\x00\x03") == []
+
+
 # --------------------------------------------------------------------------- IOCTL
 class TestReadAnsi:
     def test_reads_until_null(self):
@@ -0,0 +1,123 @@
+# tests/unit/hardware/test_runner.py
+"""采集器并行调度测试：截止时间、部分结果、fail-soft 与平台错误上抛。"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from sealium.common.hardware.cross_validate import scrub_and_score
+from sealium.common.hardware.runner import CollectorRegistry, CollectorSpec, run_collectors
+from sealium.common.hardware.types import RawSurface
+
+
+def _sleepy(seconds: float, *surfaces: RawSurface):
+    def collect() -> list[RawSurface]:
+        time.sleep(seconds)
+        return list(surfaces)
+
+    return collect
+
+
+class TestRunCollectors:
+    def test_runs_concurrently_and_drops_hung_source(self):
+        hang = threading.Event()
+        specs = [
+            CollectorSpec("smbios", _sleepy(0.2, RawSurface("cpu", "c", "smbios")), 1.0),
+            CollectorSpec("storage_ioctl", _sleepy(0.2, RawSurface("disk", "d", "storage_ioctl", "0")), 1.0),
+            CollectorSpec("wmi", lambda: [RawSurface("cpu", "x", "wmi")] if hang.wait(5) else [], 0.4),
+        ]
+        start = time.monotonic()
+        report = run_collectors(specs, budget=2.0)
+        took = time.monotonic() - start
+        hang.set()
+
+        assert took < 0.39 + 0.2  # 最慢的按时来源 + 截止时间，而非三者之和
+        assert report.status == {"smbios": "ok", "storage_ioctl": "ok", "wmi": "timeout"}
+        assert report.timed_out == ("wmi",)
+        # 部分结果照常清洗：缺少 WMI 交叉源不计 spoof
+        clean, spoof = scrub_and_score(report.surfaces)
+        assert {s.category for s in clean} == {"cpu", "disk"} and spoof == 0.0
+
+    def test_budget_caps_deadlines_and_overrides_apply(self):
+        specs = [CollectorSpec("smbios", _sleepy(0.3), 10.0), CollectorSpec("wmi", _sleepy(0.3), 10.0)]
+        start = time.monotonic()
+        report = run_collectors(specs, budget=0.1, deadlines={"wmi": 0.05})
+        assert time.monotonic() - start < 0.25
+        assert report.timed_out == ("smbios", "wmi")
+
+    def test_errors_are_fail_soft_but_platform_errors_propagate(self):
+        def broken() -> list[RawSurface]:
+            raise OSError("provider failure")
+
+        def wrong_platform() -> list[RawSurface]:
+            raise RuntimeError("仅支持 Windows")
+
+        report = run_collectors(
+            [
+                CollectorSpec("wmi", broken, 1.0),
+                CollectorSpec("smbios", _sleepy(0, RawSurface("bios", "b", "smbios")), 1.0),
+            ],
+            budget=1.0,
+        )
+        assert report.status == {"wmi": "error", "smbios": "ok"}
+        assert [s.raw for s in report.surfaces] == ["b"]
+        with pytest.raises(RuntimeError):
+            run_collectors([CollectorSpec("smbios", wrong_platform, 1.0)], budget=1.0)
+
+
+_CORE = [
+    RawSurface("cpu", "c", "smbios"),
+    RawSurface("board", "b", "smbios"),
+    RawSurface("bios", "v", "smbios"),
+    RawSurface("system_uuid", "u", "smbios"),
+]
+
+
+class TestCollectorRegistry:
+    def _registry(self, native: list[RawSurface], calls: list[str]) -> CollectorRegistry:
+        def wmi() -> list[RawSurface]:
+            calls.append("wmi")
+            return [RawSurface("mac", "m", "wmi", "m")]
+
+        return CollectorRegistry(
+            [
+                CollectorSpec("wmi", wmi, 1.0, cost=2.0),
+                CollectorSpec("storage_ioctl", lambda: [RawSurface("disk", "d", "storage_ioctl", "0")], 1.0),
+                CollectorSpec("smbios", lambda: list(native), 1.0, cost=0.05),
+            ]
+        )
+
+    def test_skips_cross_source_once_core_is_covered(self):
+        calls: list[str] = []
+        registry = self._registry(_CORE, calls)
+        assert [s.name for s in registry.ordered()] == ["smbios", "storage_ioctl", "wmi"]
+
+        report = registry.collect(budget=1.0, core_target=4, cross_check_rate=0.1, rng=lambda: 0.5)
+        assert calls == [] and report.status["wmi"] == "skipped"
+        assert {s.category for s in report.surfaces} == {"cpu", "board", "bios", "system_uuid", "disk"}
+        # 抽中交叉验证 → WMI 照常执行
+        report = registry.collect(budget=1.0, core_target=4, cross_check_rate=0.1, rng=lambda: 0.05)
+        assert calls == ["wmi"] and report.status["wmi"] == "ok"
+
+    def test_runs_cross_source_when_core_is_missing(self):
+        calls: list[str] = []
+        # 占位符不算覆盖：只剩 3 个有效核心类
+        native = _CORE[:3] + [RawSurface("system_uuid", "00000000-0000-0000-0000-000000000000", "smbios")]
+        report = self._registry(native, calls).collect(
+            budget=1.0, core_target=4, cross_check_rate=0.0, rng=lambda: 0.99
+        )
+        assert calls == ["wmi"] and set(report.status.values()) == {"ok"}
+
+    def test_measured_timings_replace_estimates(self):
+        registry = CollectorRegistry(
+            [
+                CollectorSpec("smbios", _sleepy(0.05), 1.0, cost=0.0),
+                CollectorSpec("storage_ioctl", list, 1.0, cost=9.0),
+            ]
+        )
+        registry.collect(budget=1.0, core_target=0, cross_check_rate=1.0)
+        timings = registry.timings()
+        assert timings["smbios"] >= 0.05 and timings["storage_ioctl"] < 0.05
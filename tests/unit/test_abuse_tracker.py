@@ -0,0 +1,169 @@
+"""失败激活滥用追踪单元测试：Count-Min Sketch、Top-K、衰减、临时封禁与服务 / 中间件接入。"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from sealium.common.fingerprint import Component, MachineFingerprint
+from sealium.common.models import ActivationCode, ActivationRequest, ActivationStatus
+from sealium.server.abuse_tracker import AbuseTracker, CountMinSketch
+from sealium.server.activation_service import ActivationService
+from sealium.server.replay_guard import ReplayGuard
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+class TestCountMinSketch:
+    def test_estimates_never_undercount(self):
+        sketch = CountMinSketch(width=64, depth=4)
+        truth = {f"k{i}": i % 7 + 1 for i in range(500)}
+        for key, n in truth.items():
+            for _ in range(n):
+                sketch.add(key)
+        assert all(sketch.estimate(k) >= n for k, n in truth.items())
+
+    def test_heavy_hitters_surface_in_top(self):
+        sketch = CountMinSketch(width=256, depth=4, top_k=3)
+        for i in range(2000):
+            sketch.add(f"noise-{i}")
+        for _ in range(50):
+            sketch.add("attacker")
+        for _ in range(30):
+            sketch.add("sharer")
+        top = dict(sketch.top())
+        assert top["attacker"] >= 50 and top["sharer"] >= 30
+        assert sketch.top(1)[0][0] == "attacker"
+
+    def test_memory_independent_of_cardinality(self):
+        sketch = CountMinSketch(width=128, depth=4, top_k=8)
+        for i in range(20_000):
+            sketch.add(f"spray-{i}")
+        assert len(sketch._rows) == 4 and all(len(r) == 128 for r in sketch._rows)
+        assert len(sketch.top()) == 8
+
+    def test_halve_decays_and_drops_zeroed(self):
+        sketch = CountMinSketch(width=64, depth=2, top_k=4)
+        for _ in range(4):
+            sketch.add("a")
+        sketch.add("b")
+        sketch.halve()
+        assert sketch.estimate("a") == 2
+        assert dict(sketch.top()) == {"a": 2}
+
+    def test_invalid_args(self):
+        with pytest.raises(ValueError):
+            CountMinSketch(width=0)
+
+
+class TestAbuseTracker:
+    def test_report_counts_reasons_and_top_clients(self):
+        tracker = AbuseTracker(width=256)
+        for _ in range(5):
+            tracker.record("nonexistent", client="198.51.100.7", code="abc123")
+        tracker.record("replay", client="203.0.113.1", code="def456")
+        report = tracker.report()
+        assert report["reasons"]["nonexistent"] == 5
+        assert report["reasons"]["replay"] == 1
+        assert report["clients"][0] == ("198.51.100.7", 5)
+        assert report["codes"][0] == ("abc123", 5)
+        assert report["blocked"] == 0
+
+    def test_unknown_reason_rejected(self):
+        with pytest.raises(ValueError):
+            AbuseTracker().record("bogus")
+
+    def test_block_after_threshold_then_expires(self):
+        clock = [0.0]
+        tracker = AbuseTracker(
+            block_threshold=3, block_seconds=60, decay_seconds=10_000, now_provider=lambda: clock[0]
+        )
+        for _ in range(2):
+            tracker.record("nonexistent", client="ip")
+        assert tracker.blocked_for("ip") == 0
+        tracker.record("nonexistent", client="ip")
+        assert tracker.blocked_for("ip") == 60
+        assert tracker.blocked_for("other") == 0
+        clock[0] = 61
+        assert tracker.blocked_for("ip") == 0
+
+    def test_decay_forgets_old_failures(self):
+        clock = [0.0]
+        tracker = AbuseTracker(decay_seconds=100, now_provider=lambda: clock[0])
+        for _ in range(8):
+            tracker.record("expired", client="ip")
+        clock[0] = 250  # 两次减半
+        assert tracker.report()["clients"] == [("ip", 2)]
+
+    def test_long_idle_decays_in_one_step(self, monkeypatch):
+        clock = [0.0]
+        tracker = AbuseTracker(decay_seconds=600, now_provider=lambda: clock[0])
+        tracker.record("expired", client="ip")
+        halvings = []
+        monkeypatch.setattr(tracker._clients, "halve", lambda times=1: halvings.append(times))
+        clock[0] = 7 * 86400  # 空闲一周 ≈ 1008 个周期
+        assert tracker.report()["clients"] == []
+        assert halvings == []  # 直接清零，未逐周期减半
+        clock[0] += 600 * 3 + 1
+        tracker.report()
+        assert halvings == [3]  # 之后按经过的周期数一次衰减
+
+
+def _fp(seed: str) -> MachineFingerprint:
+    core = f"core-{seed}"
+    return MachineFingerprint(
+        components=tuple(Component(n, core, True) for n in ("cpu", "board", "bios", "system_uuid"))
+    )
+
+
+class TestServiceFeedsTracker:
+    def test_reject_reasons_recorded_with_hashed_code(self, storage):
+        tracker = AbuseTracker()
+        service = ActivationService(
+            storage, ReplayGuard(), 300, now_provider=lambda: NOW, abuse_tracker=tracker
+        )
+        storage.create(
+            ActivationCode(
+                activation_code="used", bound_machine_code=_fp("m"), status=ActivationStatus.USED
+            )
+        )
+        storage.create(ActivationCode(activation_code="old", expires_at=datetime(2020, 1, 1)))
+
+        def req(code, seed="x", nonce="n"):
+            return ActivationRequest(
+                activation_code=code, machine_code=_fp(seed), timestamp=int(NOW.timestamp()), nonce=nonce
+            )
+
+        service.process(req("ghost"), client="ip-a")
+        service.process(req("used", seed="other"), client="ip-a")
+        service.process(req("old"), client="ip-b")
+        service.process(req("used", seed="m", nonce="r"), client="ip-c")  # 同机幂等成功
+        service.process(req("used", seed="m", nonce="r"), client="ip-c")  # 重放
+
+        report = tracker.report()
+        assert report["reasons"] == {
+            "nonexistent": 1, "other_machine": 1, "expired": 1, "replay": 1,
+        }
+        assert dict(report["clients"]) == {"ip-a": 2, "ip-b": 1, "ip-c": 1}
+        assert all(code not in ("ghost", "used", "old") for code, _ in report["codes"])
+
+
+class TestEarlyBlockAndReport:
+    def test_blocked_client_gets_429_and_report_is_loopback_only(
+        self, make_app, storage, server_keypair
+    ):
+        app = make_app(storage)
+        with TestClient(app) as c:
+            tracker = AbuseTracker(block_threshold=1, block_seconds=30)
+            app.state.abuse_tracker = tracker
+            tracker.record("nonexistent", client="testclient")
+            resp = c.post("/v1/activation", content=b"\x00" * 10)
+            assert resp.status_code == 429
+            assert resp.headers["retry-after"] == "30"
+            assert c.get("/internal/abuse").status_code == 403
+        with TestClient(app, client=("127.0.0.1", 0)) as local:
+            app.state.abuse_tracker = tracker
+            body = local.get("/internal/abuse").json()
+            assert body["reasons"]["nonexistent"] == 1
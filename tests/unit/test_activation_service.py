@@ -9,7 +9,13 @@ from datetime import datetime
 import pytest
 
 from sealium.common.fingerprint import Component, MachineFingerprint
-from sealium.common.models import ActivationCode, ActivationRequest, ActivationStatus
+from sealium.common.models import (
+    ActivationCode,
+    ActivationRequest,
+    ActivationStatus,
+    BatchActivationRequest,
+)
+from sealium.common.license_token import LicenseSigner
 from sealium.server.activation_service import ActivationService
 from sealium.server.replay_guard import ReplayGuard
 
@@ -245,3 +251,83 @@ class TestReplayCacheFlushResistance:
         second = svc.process(make_request(code="real", nonce="once"))
         assert second.result == "error"
         assert "重复" in second.error_msg
+
+
+class TestBatchActivation:
+    def _batch(self, codes, machine=None, timestamp=NOW_TS) -> BatchActivationRequest:
+        return BatchActivationRequest(
+            activation_codes=codes, machine_code=machine or _fp(), timestamp=timestamp, nonce="n"
+        )
+
+    def test_per_item_results_with_single_lookup(self, service: ActivationService, storage, monkeypatch):
+        storage.create(ActivationCode(activation_code="new", features=["addon"]))
+        storage.create(
+            ActivationCode(
+                activation_code="mine", bound_machine_code=_fp(), status=ActivationStatus.USED, features=["pro"]
+            )
+        )
+        storage.create(
+            ActivationCode(activation_code="theirs", bound_machine_code=_fp("other"), status=ActivationStatus.USED)
+        )
+        lookups = []
+        monkeypatch.setattr(storage, "get_by_code", lambda code: lookups.append(code))
+        results = service.process_many(self._batch(["mine", "new", "missing", "theirs"]))
+
+        assert [r.result for r in results] == ["success", "success", "error", "error"]
+        assert results[0].features == ["pro"] and results[1].features == ["addon"]
+        assert all(r.nonce == "n" for r in results)
+        assert lookups == []  # 全部来自一次批量查询
+        assert storage.get_by_codes(["new"])["new"].bound_machine_code == _fp()
+        # 已处理的码在同一 nonce 下不能再来一遍
+        again = service.process_many(self._batch(["new"]))
+        assert "请勿重复发送" in again[0].error_msg
+
+    def test_replay_checked_once_for_existing_codes(self, service: ActivationService, storage, monkeypatch):
+        storage.create(ActivationCode(activation_code="a"))
+        storage.create(ActivationCode(activation_code="b"))
+        guard = service._replay_guard
+        batches = []
+        monkeypatch.setattr(guard, "is_replay", lambda *a: pytest.fail("批量路径不应逐码检查"))
+        real = guard.is_replay_many
+        monkeypatch.setattr(guard, "is_replay_many", lambda codes, nonce: batches.append(codes) or real(codes, nonce))
+
+        results = service.process_many(self._batch(["a", "missing", "b"]))
+        assert [r.result for r in results] == ["success", "error", "success"]
+        assert batches == [["a", "b"]]  # 不存在的码不进重放缓存
+
+    def test_stale_timestamp_rejects_every_item(self, service: ActivationService, storage):
+        storage.create(ActivationCode(activation_code="c"))
+        results = service.process_many(self._batch(["c", "d"], timestamp=NOW_TS - 1000))
+        assert [r.result for r in results] == ["error", "error"]
+        assert storage.get_by_code("c").status == ActivationStatus.UNUSED
+
+
+class TestLicenseToken:
+    def test_success_carries_token_bound_to_stored_fingerprint(self, storage):
+        signer = LicenseSigner.generate()
+        service = ActivationService(
+            storage, ReplayGuard(), 300, now_provider=lambda: NOW,
+            license_signer=signer, license_ttl_seconds=86400,
+        )
+        storage.create(ActivationCode(activation_code="c", features=["pro"], expires_at=datetime(2026, 1, 1, 18)))
+        storage.create(ActivationCode(activation_code="p", features=["pro"]))
+
+        first = service.process(make_request(code="p", machine=_fp("m")))
+        token = signer.verify(first.token)
+        assert token.covers("p") and token.machine_code == _fp("m")
+        assert (token.issued_at, token.expires_at) == (NOW_TS, NOW_TS + 86400)
+        assert token.features == ("pro",) and token.authorized_until == "永久"
+
+        # 同机漂移重激活：令牌绑定的是已绑定指纹，而非本次上报的漂移指纹
+        again = service.process(make_request(code="p", machine=_fp("m", drift=True), nonce="n2"))
+        assert signer.verify(again.token).machine_code == _fp("m")
+
+        # 激活码先于 TTL 到期：令牌随之到期
+        short = service.process(make_request(code="c"))
+        assert signer.verify(short.token).expires_at == int(datetime(2026, 1, 1, 18).timestamp())
+
+        # 失败响应不带令牌；未配置签发器时成功响应也不带
+        assert service.process(make_request(code="missing")).token is None
+        storage.create(ActivationCode(activation_code="q"))
+        plain = ActivationService(storage, ReplayGuard(), 300, now_provider=lambda: NOW)
+        assert plain.process(make_request(code="q")).token is None
@@ -0,0 +1,148 @@
+"""结构化审计日志测试：有界队列背压、批量落盘（NDJSON 轮转 / SQLite）与服务 / 应用接入。"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from sealium.common.models import ActivationCode, ActivationRequest
+from sealium.server.activation_service import ActivationService
+from sealium.server.audit_log import AuditLog, NdjsonSink, SQLiteSink, short_digest
+from sealium.server.replay_guard import ReplayGuard
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+class _ListSink:
+    def __init__(self, fail: bool = False) -> None:
+        self.batches: list[list] = []
+        self.fail = fail
+        self.closed = False
+
+    def write(self, records):
+        if self.fail:
+            raise OSError("disk full")
+        self.batches.append(list(records))
+
+    def close(self):
+        self.closed = True
+
+
+def _read_ndjson(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestAuditLog:
+    def test_full_queue_drops_and_counts(self):
+        audit = AuditLog(_ListSink(), queue_size=3, batch_size=10)
+        for i in range(5):
+            audit.emit("reject", "nonexistent", f"code-{i}")
+        assert audit.stats()["queued"] == 3
+        assert audit.stats()["dropped"] == 2
+
+    def test_close_flushes_in_batches_with_digests(self, make_fingerprint):
+        sink = _ListSink()
+        audit = AuditLog(sink, batch_size=2, flush_interval=60)
+        audit.start()
+        fp = make_fingerprint("a")
+        audit.emit("success", "new_bind", "secret-code", fp, "10.0.0.1")
+        audit.emit("reject", "replay", "secret-code")
+        audit.emit("reject", "expired", "other")
+        audit.close()
+
+        assert [len(b) for b in sink.batches] == [2, 1] and sink.closed
+        _, outcome, reason, code, machine, client = sink.batches[0][0]
+        assert (outcome, reason, client) == ("success", "new_bind", "10.0.0.1")
+        assert code == short_digest("secret-code") and machine == short_digest(fp)
+        assert sink.batches[0][1][4] is None
+        assert audit.stats() == {
+            "queued": 0, "enqueued": 3, "written": 3, "dropped": 0, "failed": 0,
+        }
+
+    def test_sink_failure_counted_not_raised(self):
+        audit = AuditLog(_ListSink(fail=True))
+        audit.emit("reject", "replay", "c")
+        audit.close()
+        assert audit.stats()["failed"] == 1 and audit.stats()["written"] == 0
+
+
+class TestSinks:
+    def test_ndjson_rotates_and_keeps_backups(self, tmp_path):
+        path = tmp_path / "audit.ndjson"
+        sink = NdjsonSink(path, max_bytes=1024, backups=2)
+        record = (1.0, "reject", "nonexistent", "0" * 12, None, "1.2.3.4")
+        for _ in range(4):
+            sink.write([record] * 12)
+        sink.close()
+        assert (tmp_path / "audit.ndjson.1").exists()
+        assert (tmp_path / "audit.ndjson.2").exists()
+        assert not (tmp_path / "audit.ndjson.3").exists()
+        rows = _read_ndjson(tmp_path / "audit.ndjson.1")
+        assert rows[0] == {
+            "ts": 1.0, "outcome": "reject", "reason": "nonexistent",
+            "code": "0" * 12, "machine": None, "client": "1.2.3.4",
+        }
+
+    def test_sqlite_batch_insert(self, tmp_path):
+        path = tmp_path / "audit.db"
+        audit = AuditLog(SQLiteSink(path), batch_size=4)
+        audit.start()
+        for i in range(10):
+            audit.emit("reject", "nonexistent", f"c{i}")
+        audit.close()
+        with sqlite3.connect(path) as conn:
+            rows = conn.execute("SELECT outcome, reason, code FROM audit_events").fetchall()
+        assert len(rows) == 10
+        assert rows[0] == ("reject", "nonexistent", short_digest("c0"))
+
+
+class TestIntegration:
+    def test_service_emits_events_instead_of_logging(self, storage, make_fingerprint, caplog):
+        sink = _ListSink()
+        audit = AuditLog(sink)
+        service = ActivationService(
+            storage, ReplayGuard(), 300, now_provider=lambda: NOW, audit_log=audit
+        )
+        storage.create(ActivationCode(activation_code="fresh"))
+        ts = int(NOW.timestamp())
+        fp = make_fingerprint("m")
+        with caplog.at_level("INFO", logger="sealium.server.activation"):
+            service.process(
+                ActivationRequest(activation_code="fresh", machine_code=fp, timestamp=ts, nonce="1"),
+                client="c1",
+            )
+            service.process(
+                ActivationRequest(activation_code="nope", machine_code=fp, timestamp=ts, nonce="2"),
+                client="c1",
+            )
+        audit.close()
+        assert not caplog.records
+        events = [(r[1], r[2], r[5]) for r in sink.batches[0]]
+        assert events == [("success", "new_bind", "c1"), ("reject", "nonexistent", "c1")]
+
+    def test_fallback_keeps_sync_log_text(self, storage, make_fingerprint, caplog):
+        service = ActivationService(storage, ReplayGuard(), 300, now_provider=lambda: NOW)
+        with caplog.at_level("INFO", logger="sealium.server.activation"):
+            service.process(
+                ActivationRequest(
+                    activation_code="nope",
+                    machine_code=make_fingerprint(),
+                    timestamp=int(NOW.timestamp()),
+                    nonce="n",
+                )
+            )
+        assert caplog.messages == [f"激活拒绝(不存在) code={short_digest('nope')}"]
+
+    def test_app_writes_ndjson_and_exports_counters(self, make_app, storage, tmp_path):
+        cfg = make_app(storage).state.config.model_copy(deep=True)
+        cfg.audit.enabled = True
+        cfg.paths.audit_log = tmp_path / "logs" / "audit.ndjson"
+        app = make_app(storage, config=cfg)
+        with TestClient(app, client=("127.0.0.1", 0)) as local:
+            app.state.activation_service._audit("reject", "replay", "c", client="x")
+            assert "sealium_audit_dropped_total 0" in local.get("/metrics").text
+        rows = _read_ndjson(cfg.paths.audit_log)
+        assert [(r["outcome"], r["reason"]) for r in rows] == [("reject", "replay")]
@@ -0,0 +1,54 @@
+# tests/unit/test_bench.py
+"""端到端压测工具单元测试：场景比例解析与一次小规模进程内压测。"""
+
+from __future__ import annotations
+
+import pytest
+
+from sealium.scripts.bench import _split, main, parse_mix, run_in_process
+from sealium.server.config import PathsModel, ServerConfig
+
+
+class TestMix:
+    def test_parse_normalizes_and_fills_missing(self):
+        assert parse_mix("new=3,unknown=1") == {
+            "new": 0.75, "reactivate": 0.0, "unknown": 0.25, "replay": 0.0,
+        }
+
+    @pytest.mark.parametrize("text", ["bogus=1", "new=0", "new=-1,unknown=2"])
+    def test_invalid_mix(self, text):
+        with pytest.raises(ValueError):
+            parse_mix(text)
+
+    def test_split_sums_exactly(self):
+        counts = _split(7, parse_mix("new=1,reactivate=1,unknown=1"))
+        assert sum(counts.values()) == 7
+        assert counts["replay"] == 0
+
+    def test_cli_rejects_new_beyond_unused_codes(self, capsys):
+        assert main(["--codes", "2", "--requests", "10", "--mix", "new=1", "--key-bits", "2048"]) == 1
+        assert "未使用码" in capsys.readouterr().err
+
+
+class TestInProcessRun:
+    def test_all_scenarios_behave_as_expected(self, tmp_path, server_keypair):
+        cfg = ServerConfig(
+            paths=PathsModel(database=tmp_path / "unused.db", private_key=tmp_path / "p.pem")
+        )
+        report = run_in_process(
+            codes=20,
+            requests=24,
+            concurrency=4,
+            mix=parse_mix("new=1,reactivate=1,unknown=1,replay=1"),
+            config=cfg,
+            encryptor=server_keypair,
+        )
+        assert report["mode"] == "in-process"
+        assert report["throughput_rps"] > 0
+        assert report["accepted_rps"] == report["throughput_rps"] and report["shed_rps"] == 0
+        assert "503" not in report["status_counts"]
+        assert set(report["scenarios"]) == {"new", "reactivate", "unknown", "replay"}
+        for stats in report["scenarios"].values():
+            assert stats["requests"] == 6
+            assert stats["unexpected"] == 0
+            assert 0 < stats["p50_ms"] <= stats["p99_ms"] <= stats["p999_ms"]
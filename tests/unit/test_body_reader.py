@@ -0,0 +1,74 @@
+"""有界限时请求体读取单元测试（流式判长 / 截止时间 / 断开 / 预分配容量）。"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from sealium.server.body_reader import BodyReadError, read_bounded_body, request_capacity
+
+
+def _receiver(chunks, delay: float = 0.0):
+    """按序吐出 chunks 的 ASGI receive；记录被调用次数。"""
+    state = {"calls": 0}
+
+    async def receive():
+        i = state["calls"]
+        state["calls"] += 1
+        if delay:
+            await asyncio.sleep(delay)
+        if i >= len(chunks):
+            return {"type": "http.disconnect"}
+        return {"type": "http.request", "body": chunks[i], "more_body": i < len(chunks) - 1}
+
+    return receive, state
+
+
+def _read(receive, **kw):
+    kw.setdefault("limit", 100)
+    kw.setdefault("timeout", 5.0)
+    return asyncio.run(read_bounded_body(receive, **kw))
+
+
+class TestReadBoundedBody:
+    def test_concatenates_chunks(self):
+        receive, _ = _receiver([b"ab", b"", b"cde"])
+        assert _read(receive, capacity=4) == b"abcde"  # 超出预分配时自动扩容
+
+    def test_shorter_than_capacity_is_trimmed(self):
+        receive, _ = _receiver([b"xyz"])
+        assert _read(receive, capacity=64) == b"xyz"
+
+    def test_aborts_at_limit_without_draining(self):
+        receive, state = _receiver([b"x" * 60, b"x" * 60, b"x" * 60])
+        with pytest.raises(BodyReadError) as exc:
+            _read(receive, limit=100)
+        assert exc.value.status_code == 413
+        assert state["calls"] == 2  # 第二块越限即停，不再读第三块
+
+    def test_slow_client_hits_deadline(self):
+        receive, _ = _receiver([b"x"] * 50, delay=0.02)
+        with pytest.raises(BodyReadError) as exc:
+            _read(receive, timeout=0.1)
+        assert exc.value.status_code == 408
+
+    def test_disconnect_mid_body(self):
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        with pytest.raises(BodyReadError) as exc:
+            _read(receive)
+        assert exc.value.status_code == 400
+
+
+class TestRequestCapacity:
+    def test_trusts_declared_length_within_limit(self):
+        assert request_capacity(4096, "700", 65536) == 700
+
+    def test_falls_back_to_typical_packet(self):
+        typical = request_capacity(4096, None, 65536)
+        assert 512 + 12 + 16 < typical < 65536
+        assert request_capacity(4096, "999999", 65536) == typical
+        assert request_capacity(4096, "abc", 65536) == typical
+        assert request_capacity(4096, None, 100) == 100
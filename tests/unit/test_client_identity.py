@@ -6,9 +6,10 @@
 
 from __future__ import annotations
 
+import pytest
 from starlette.datastructures import Headers
 
-from sealium.server.client_identity import resolve_client_ip
+from sealium.server.client_identity import TrustedProxies, rate_limit_key, resolve_client_ip
 
 
 class _Client:
@@ -79,3 +80,47 @@ class TestDefaultTrustedProxies:
         assert resolve_client_ip(_FakeRequest("127.0.0.1", xff="203.0.113.20")) == "203.0.113.20"
         # 非回环代理不被默认信任：XFF 被忽略，返回对端
         assert resolve_client_ip(_FakeRequest("10.0.0.5", xff="203.0.113.20")) == "10.0.0.5"
+
+
+class TestCidrTrustedProxies:
+    def test_cidr_range_trusted(self):
+        trusted = TrustedProxies(["10.0.0.0/8", "fd00::/8"])
+        assert resolve_client_ip(_FakeRequest("10.42.7.1", xff="203.0.113.30"), trusted) == "203.0.113.30"
+        assert resolve_client_ip(_FakeRequest("fd12::1", xff="203.0.113.31"), trusted) == "203.0.113.31"
+        assert resolve_client_ip(_FakeRequest("11.0.0.1", xff="203.0.113.32"), trusted) == "11.0.0.1"
+
+    def test_cidr_hops_stripped_from_xff(self):
+        req = _FakeRequest("127.0.0.1", xff="203.0.113.40, 172.18.0.3, 172.18.0.2")
+        assert resolve_client_ip(req, ["127.0.0.1", "172.18.0.0/16"]) == "203.0.113.40"
+
+    def test_membership_edges(self):
+        trusted = TrustedProxies(["192.168.1.0/24", "::1"])
+        assert "192.168.1.0" in trusted and "192.168.1.255" in trusted
+        assert "192.168.2.0" not in trusted
+        assert "::ffff:192.168.1.9" in trusted  # IPv4 映射的 IPv6 按 IPv4 匹配
+        assert "::2" not in trusted
+        assert "not-an-ip" not in trusted
+
+    def test_non_ip_entry_matches_literally(self):
+        trusted = TrustedProxies(["testclient"])
+        assert "testclient" in trusted and "10.0.0.1" not in trusted
+
+    def test_invalid_network_raises(self):
+        with pytest.raises(ValueError):
+            TrustedProxies(["10.0.0.0/33"])
+
+
+class TestRateLimitKey:
+    def test_full_prefix_keeps_address(self):
+        assert rate_limit_key("203.0.113.9") == "203.0.113.9"
+        assert rate_limit_key("2001:db8::1") == "2001:db8::1"
+
+    def test_aggregates_to_prefix(self):
+        assert rate_limit_key("203.0.113.9", 24, 56) == "203.0.113.0/24"
+        a = rate_limit_key("2001:db8:0:12::1", 32, 56)
+        b = rate_limit_key("2001:db8:0:ff:dead::beef", 32, 56)
+        assert a == b == "2001:db8::/56"
+        assert rate_limit_key("2001:db8:0:100::1", 32, 56) != a
+
+    def test_unparseable_passthrough(self):
+        assert rate_limit_key("unknown", 24, 56) == "unknown"
@@ -0,0 +1,209 @@
+"""集群分片测试：一致性哈希环、节点间封装、原始行迁入合并、配置校验与属主不可达。"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import socket
+from collections import Counter
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from sealium.common.fingerprint import to_storage
+from sealium.common.exceptions import BackendError
+from sealium.common.models import ActivationCode, ActivationRequest, ActivationResponse, ActivationStatus
+from sealium.server.cluster import (
+    PURPOSE_ACTIVATE,
+    PURPOSE_ACTIVATE_REPLY,
+    PURPOSE_IMPORT,
+    ClusterRouter,
+    HashRing,
+    derive_key,
+    plan,
+    seal,
+    unseal,
+)
+from sealium.server.config import ClusterModel
+from sealium.server.rate_limit import RequestCost
+
+_NODES = {"a": "http://127.0.0.1:9001", "b": "http://127.0.0.1:9002", "c": "http://127.0.0.1:9003"}
+
+
+def _hashes(n: int) -> list[str]:
+    return [hashlib.sha256(str(i).encode()).hexdigest() for i in range(n)]
+
+
+def _router(node_id: str, nodes: dict[str, str] = _NODES, secret: str = "s3cret") -> ClusterRouter:
+    return ClusterRouter(node_id, nodes, secret, lambda code: hashlib.sha256(code.encode()).hexdigest())
+
+
+class TestHashRing:
+    def test_balanced_and_deterministic(self):
+        hashes = _hashes(6000)
+        ring = HashRing(["a", "b", "c"])
+        counts = Counter(ring.owner(h) for h in hashes)
+        assert set(counts) == {"a", "b", "c"}
+        assert all(1400 < n < 2600 for n in counts.values())
+        # 节点顺序不影响归属
+        assert [ring.owner(h) for h in hashes[:50]] == [HashRing(["c", "a", "b"]).owner(h) for h in hashes[:50]]
+
+    def test_adding_node_moves_only_its_share(self):
+        hashes = _hashes(6000)
+        before = HashRing(["a", "b", "c"])
+        after = HashRing(["a", "b", "c", "d"])
+        moved = [h for h in hashes if before.owner(h) != after.owner(h)]
+        # 只迁移约 1/4，且全部迁往新节点
+        assert 900 < len(moved) < 2100
+        assert {after.owner(h) for h in moved} == {"d"}
+
+    def test_plan_groups_foreign_rows_by_owner(self):
+        ring = HashRing(["a", "b", "c"])
+        rows = [{"code_hash": h} for h in _hashes(300)]
+        moves = plan(rows, ring, "a")
+        assert "a" not in moves
+        assert sum(len(r) for r in moves.values()) == sum(ring.owner(r["code_hash"]) != "a" for r in rows)
+        assert all(ring.owner(r["code_hash"]) == owner for owner, rs in moves.items() for r in rs)
+
+
+class TestSealing:
+    def test_roundtrip_and_purpose_binding(self):
+        key = derive_key("s3cret")
+        data = seal(key, PURPOSE_ACTIVATE, {"to": "b", "n": 1})
+        assert unseal(key, PURPOSE_ACTIVATE, data) == {"to": "b", "n": 1}
+        with pytest.raises(ValueError):
+            unseal(key, PURPOSE_IMPORT, data)  # 不同接口的消息不可互换
+        with pytest.raises(ValueError):
+            unseal(derive_key("other"), PURPOSE_ACTIVATE, data)
+        with pytest.raises(ValueError):
+            unseal(key, PURPOSE_ACTIVATE, data[:-1] + bytes([data[-1] ^ 1]))
+        with pytest.raises(ValueError):
+            unseal(key, PURPOSE_ACTIVATE, b"short")
+
+    def test_open_request_checks_target_node(self):
+        a, b, c = _router("a"), _router("b"), _router("c")
+        data = seal(derive_key("s3cret"), PURPOSE_ACTIVATE, {"to": "b", "from": "a"})
+        assert b.open_request(data, PURPOSE_ACTIVATE)["from"] == "a"
+        with pytest.raises(ValueError):
+            c.open_request(data, PURPOSE_ACTIVATE)  # 发给 b 的消息不能在 c 上重放
+        assert a.owner_of("x") in (None, "b", "c")
+        owned = [h for h in _hashes(100) if b.owns_hash(h)]
+        assert owned and all(b.ring.owner(h) == "b" for h in owned)
+
+    def test_forward_rejects_reply_to_another_request(self, make_fingerprint):
+        a, b = _router("a"), _router("b")
+        replies = []
+
+        async def owner_b(path, body):
+            request = b.open_request(body, PURPOSE_ACTIVATE)
+            response = ActivationResponse.success("永久", ["pro"], request["request"]["nonce"])
+            reply = {"response": response.to_dict(), "stages": []}
+            replies.append(b.seal_reply(request, reply, PURPOSE_ACTIVATE_REPLY))
+            return 200, replies[-1]
+
+        def req(nonce):
+            return ActivationRequest(
+                activation_code="x", machine_code=make_fingerprint(), timestamp=0, nonce=nonce
+            )
+
+        a._peers["b"].post = owner_b
+        assert asyncio.run(a.forward("b", req("n1"), RequestCost())).nonce == "n1"
+
+        async def stale(path, body):
+            return 200, replies[0]  # 链路上换成先前合法的回复
+
+        a._peers["b"].post = stale
+        with pytest.raises(BackendError, match="不匹配"):
+            asyncio.run(a.forward("b", req("n2"), RequestCost()))
+        assert a.failures["b"] == 1
+
+    def test_router_requires_membership(self):
+        with pytest.raises(ValueError):
+            _router("z")
+
+
+class TestImportRows:
+    def _code(self, code: str, status: ActivationStatus) -> ActivationCode:
+        return ActivationCode(
+            activation_code=code,
+            status=status,
+            features=["pro"],
+            expires_at=datetime(2026, 12, 31),
+        )
+
+    def test_used_wins_and_reimport_is_idempotent(self, storage, make_fingerprint):
+        storage.create(self._code("u" * 32, ActivationStatus.UNUSED))
+        storage.create(self._code("v" * 32, ActivationStatus.UNUSED))
+        storage.bind_machine_code("v" * 32, to_storage(make_fingerprint("m")), datetime(2026, 1, 2))
+        used_row = next(r for r in storage.export_rows() if r["code_hash"] == storage.hash_code("v" * 32))
+        unused_row = dict(used_row, status=ActivationStatus.UNUSED.value, bound_machine_code=None)
+
+        # 导入端本地未使用 → 被导入的已绑定行覆盖
+        target_rows = [dict(r) for r in storage.export_rows()]
+        storage.delete_hashes([r["code_hash"] for r in target_rows])
+        assert storage.export_rows() == []
+        assert storage.import_rows([unused_row]) == 1
+        assert storage.import_rows([used_row]) == 1
+        assert storage.get_by_code("v" * 32).status == ActivationStatus.USED
+        # 已绑定的本地行绝不被未使用行回退；重复推送幂等
+        assert storage.import_rows([unused_row, used_row]) == 0
+        assert storage.get_by_code("v" * 32).bound_machine_code == make_fingerprint("m")
+        assert storage.import_rows(target_rows) == 1  # 仅 "u" 为新行
+        assert storage.get_by_code("u" * 32).status == ActivationStatus.UNUSED
+
+
+class TestClusterConfig:
+    def test_enabled_requires_consistent_membership(self):
+        nodes = [{"id": "a", "url": "http://10.0.0.1:8000/"}, {"id": "b", "url": "http://10.0.0.2:8000"}]
+        ok = ClusterModel(enabled=True, node_id="a", nodes=nodes, secret="x")
+        assert ok.nodes[0].url == "http://10.0.0.1:8000"
+        assert ClusterModel().enabled is False  # 未启用时不校验成员
+        with pytest.raises(ValidationError):
+            ClusterModel(enabled=True, node_id="z", nodes=nodes, secret="x")
+        with pytest.raises(ValidationError):
+            ClusterModel(enabled=True, node_id="a", nodes=nodes)
+        with pytest.raises(ValidationError):
+            ClusterModel(enabled=True, node_id="a", nodes=nodes + [nodes[0]], secret="x")
+        with pytest.raises(ValidationError):
+            ClusterModel(nodes=[{"id": "a", "url": "https://10.0.0.1"}])
+        # 边缘节点：node_id 必填且不能是成员
+        assert ClusterModel(enabled=True, role="edge", node_id="e", nodes=nodes, secret="x").role == "edge"
+        for node_id in ("", "a"):
+            with pytest.raises(ValidationError):
+                ClusterModel(enabled=True, role="edge", node_id=node_id, nodes=nodes, secret="x")
+
+
+def _closed_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TestUnreachableOwner:
+    def test_generic_error_without_local_fallback(self, make_app, storage, make_activator):
+        app = make_app(storage)
+        cfg = app.state.config.model_copy(deep=True)
+        cfg.cluster = ClusterModel(
+            enabled=True,
+            node_id="a",
+            nodes=[
+                {"id": "a", "url": "http://127.0.0.1:1"},
+                {"id": "b", "url": f"http://127.0.0.1:{_closed_port()}"},
+            ],
+            secret="x",
+            timeout_seconds=2.0,
+        )
+        ring = HashRing(["a", "b"], cfg.cluster.vnodes)
+        code = next(f"{i:032d}" for i in range(1000) if ring.owner(storage.hash_code(f"{i:032d}")) == "b")
+        storage.create(
+            ActivationCode(activation_code=code, status=ActivationStatus.UNUSED, features=[], expires_at=None)
+        )
+        app = make_app(storage, config=cfg)
+        with TestClient(app, client=("127.0.0.1", 0)) as client:
+            resp = make_activator(client).activate(code)
+            metrics = client.get("/metrics").text
+        assert resp.result == "error" and resp.error_msg == "激活处理失败，请稍后重试"
+        assert storage.get_by_code(code).status == ActivationStatus.UNUSED  # 未在入口节点本地绑定
+        assert "sealium_cluster_forward_failures_total 1" in metrics
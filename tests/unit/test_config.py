@@ -142,6 +142,11 @@ class TestPriority:
         # safe_dump 暴露 trusted_proxies（/debug/config 可审计）
         assert cfg.safe_dump()["server"]["trusted_proxies"] == ["10.0.0.5", "127.0.0.1"]
 
+    def test_trusted_proxies_cidr_validated_at_load(self, clean_sealium_env):
+        assert ServerModel(trusted_proxies=["10.0.0.0/8", "::1"]).trusted_proxies[0] == "10.0.0.0/8"
+        with pytest.raises(ValidationError):
+            ServerModel(trusted_proxies=["10.0.0.0/33"])
+
 
 class TestSecretStr:
     def test_passphrase_via_env_not_leaked(self, monkeypatch, clean_sealium_env):
@@ -0,0 +1,79 @@
+"""RSA 前重复包过滤单元测试 + 路由集成测试。"""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from sealium.client.key_manager import ClientKeyManager
+from sealium.server.duplicate_filter import InMemoryDuplicateFilter
+
+
+class TestInMemoryDuplicateFilter:
+    def test_first_seen_is_new_then_hit(self):
+        f = InMemoryDuplicateFilter()
+        assert f.seen(b"k" * 512) is False
+        assert f.seen(b"k" * 512) is True
+        assert f.stats()["hits"] == 1
+        assert f.stats()["misses"] == 1
+
+    def test_stores_digest_not_blob(self):
+        f = InMemoryDuplicateFilter()
+        f.seen(b"k" * 512)
+        (digest,) = f._seen.keys()
+        assert len(digest) == 16
+
+    def test_overflow_evicts_oldest_only(self):
+        f = InMemoryDuplicateFilter(max_size=2)
+        f.seen(b"a")
+        f.seen(b"b")
+        f.seen(b"c")  # 超限 -> 仅驱逐最旧的 a
+        assert len(f) == 2
+        assert f.stats()["evictions"] == 1
+        assert f.seen(b"c") is True
+        assert f.seen(b"a") is False  # 已被驱逐，回落为新
+
+    def test_ttl_expiry(self):
+        clock = [0.0]
+        f = InMemoryDuplicateFilter(ttl_seconds=10, now_provider=lambda: clock[0])
+        assert f.seen(b"a") is False
+        clock[0] += 11
+        assert f.seen(b"a") is False  # 过期后视为新
+        assert len(f) == 1
+
+    def test_invalid_size_raises(self):
+        with pytest.raises(ValueError):
+            InMemoryDuplicateFilter(max_size=0)
+
+
+class TestRouteIntegration:
+    def test_byte_identical_replay_skips_rsa(
+        self, make_app, storage, server_public_pem, server_keypair, make_fingerprint,
+        unused_code, fixed_timestamp,
+    ):
+        """同一字节包第二次到达：400 空体，且不触发私钥解密。"""
+        app = make_app(storage)
+        km = ClientKeyManager(server_public_pem)
+        packet = km.build_encrypted_request(
+            json.dumps(
+                {
+                    "activation_code": unused_code,
+                    "machine_code": make_fingerprint().to_dict(),
+                    "timestamp": fixed_timestamp,
+                    "nonce": "n1",
+                }
+            ).encode()
+        )
+        with TestClient(app) as c:
+            first = c.post("/v1/activation", content=packet)
+            assert first.status_code == 200
+            with patch.object(
+                server_keypair, "decrypt", side_effect=AssertionError("不应解密")
+            ):
+                second = c.post("/v1/activation", content=packet)
+            assert second.status_code == 400
+            assert second.content == b""
+            assert app.state.duplicate_filter.stats()["hits"] == 1
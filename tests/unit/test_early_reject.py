@@ -0,0 +1,124 @@
+"""早拒绝中间件单元测试：直接驱动 ASGI 接口，断言拒绝路径不读请求体、不进内层应用。"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from sealium.server.client_identity import TrustedProxies
+from sealium.server.config import RateLimitModel
+from sealium.server.early_reject import EarlyRejectMiddleware
+from sealium.server.rate_limit import InMemoryRateLimiter
+
+PATH = "/v1/activation"
+
+
+class _Inner:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _no_receive():
+    raise AssertionError("拒绝路径不应读取请求体")
+
+
+def _state(limiter, trusted=("127.0.0.1",), **rate_limit):
+    return SimpleNamespace(
+        rate_limiter=limiter,
+        trusted_proxies=TrustedProxies(trusted),
+        config=SimpleNamespace(rate_limit=RateLimitModel(**rate_limit)),
+    )
+
+
+def _call(mw, state, *, path=PATH, method="POST", peer="203.0.113.9", headers=()):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": list(headers),
+        "client": (peer, 5000),
+        "app": SimpleNamespace(state=state),
+    }
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(mw(scope, _no_receive, send))
+    status = sent[0]["status"]
+    return status, dict(sent[0]["headers"])
+
+
+class TestEarlyReject:
+    def test_over_limit_429_without_reaching_app(self):
+        inner = _Inner()
+        mw = EarlyRejectMiddleware(inner, PATH)
+        state = _state(InMemoryRateLimiter(max_requests=1, window_seconds=30))
+        assert _call(mw, state)[0] == 200
+        status, headers = _call(mw, state)
+        assert status == 429
+        assert headers[b"retry-after"] == b"30"
+        assert inner.calls == 1
+
+    def test_oversized_content_length_413(self):
+        inner = _Inner()
+        mw = EarlyRejectMiddleware(inner, PATH, max_body_bytes=100)
+        state = _state(InMemoryRateLimiter(max_requests=10, window_seconds=60))
+        assert _call(mw, state, headers=[(b"content-length", b"101")])[0] == 413
+        assert inner.calls == 0
+
+    def test_bad_content_length_passes_through(self):
+        inner = _Inner()
+        mw = EarlyRejectMiddleware(inner, PATH)
+        state = _state(InMemoryRateLimiter(max_requests=10, window_seconds=60))
+        assert _call(mw, state, headers=[(b"content-length", b"abc")])[0] == 200
+
+    def test_trusted_proxy_xff_and_prefix_bucketing(self):
+        inner = _Inner()
+        mw = EarlyRejectMiddleware(inner, PATH)
+        state = _state(
+            InMemoryRateLimiter(max_requests=1, window_seconds=60),
+            trusted=("10.0.0.0/8",),
+            ipv4_prefix=24,
+        )
+        xff = lambda ip: [(b"x-forwarded-for", ip)]  # noqa: E731
+        assert _call(mw, state, peer="10.1.2.3", headers=xff(b"198.51.100.7"))[0] == 200
+        assert _call(mw, state, peer="10.1.2.3", headers=xff(b"198.51.100.8"))[0] == 429
+        assert _call(mw, state, peer="10.1.2.3", headers=xff(b"198.51.101.7"))[0] == 200
+
+    def test_other_paths_and_methods_untouched(self):
+        inner = _Inner()
+        mw = EarlyRejectMiddleware(inner, PATH)
+        state = _state(InMemoryRateLimiter(max_requests=1, window_seconds=60))
+        _call(mw, state)
+        assert _call(mw, state, path="/health", method="GET")[0] == 200
+        assert _call(mw, state, method="OPTIONS")[0] == 200
+        assert inner.calls == 3
+
+    def test_passes_through_before_lifespan(self):
+        inner = _Inner()
+        mw = EarlyRejectMiddleware(inner, PATH)
+        assert _call(mw, SimpleNamespace())[0] == 200
+
+    def test_blocking_limiter_is_called_off_the_event_loop(self):
+        class _Blocking:
+            blocking = True
+            window_seconds = 60
+
+            def __init__(self) -> None:
+                self.threads = []
+
+            def allow(self, key):
+                self.threads.append(threading.get_ident())
+                return False
+
+        limiter = _Blocking()
+        mw = EarlyRejectMiddleware(_Inner(), PATH)
+        assert _call(mw, _state(limiter))[0] == 429
+        assert limiter.threads and threading.get_ident() not in limiter.threads
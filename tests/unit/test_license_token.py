@@ -0,0 +1,78 @@
+"""离线授权令牌测试：签发 / 验签往返、篡改与换钥拒绝、本地存储。"""
+
+from __future__ import annotations
+
+import pytest
+
+from sealium.client.license_store import LicenseStore
+from sealium.common.crypto import RSAEncryptor
+from sealium.common.exceptions import CryptoError
+from sealium.common.license_token import LicenseSigner, LicenseToken, LicenseVerifier, code_digest
+
+
+def _token(make_fingerprint, code: str = "a" * 32) -> LicenseToken:
+    return LicenseToken(
+        code_digest=code_digest(code),
+        machine_code=make_fingerprint(),
+        features=("pro",),
+        authorized_until="2026-12-31",
+        issued_at=1_700_000_000,
+        expires_at=1_702_592_000,
+    )
+
+
+class TestSignVerify:
+    def test_roundtrip_via_public_pem(self, make_fingerprint):
+        signer = LicenseSigner.generate()
+        token = _token(make_fingerprint)
+        raw = signer.sign(token)
+        verifier = LicenseVerifier.from_public_key_pem(signer.export_public_key().decode())
+        assert verifier.verify(raw) == token
+        assert token.covers("a" * 32) and not token.covers("b" * 32)
+        assert len(raw) < 1024  # 紧凑：可直接放进响应与本地文件
+
+        reloaded = LicenseSigner.from_private_key_pem(signer.export_private_key())
+        assert verifier.verify(reloaded.sign(token)) == token
+
+    def test_tampered_foreign_and_garbage_rejected(self, make_fingerprint):
+        signer = LicenseSigner.generate()
+        raw = signer.sign(_token(make_fingerprint))
+        prefix, payload, signature = raw.split(".")
+        forged = signer.sign(_token(make_fingerprint, code="b" * 32)).split(".")[1]
+        for bad in (
+            f"{prefix}.{forged}.{signature}",  # 换载荷
+            f"slt2.{payload}.{signature}",  # 换版本
+            raw[:-2],
+            "not-a-token",
+            None,
+        ):
+            with pytest.raises(CryptoError):
+                signer.verify(bad)
+        with pytest.raises(CryptoError):
+            LicenseSigner.generate().verify(raw)  # 别的部署签发的令牌
+
+    def test_rejects_non_ed25519_keys(self):
+        rsa = RSAEncryptor.generate(key_size=2048)
+        with pytest.raises(CryptoError):
+            LicenseVerifier.from_public_key_pem(rsa.export_public_key())
+        with pytest.raises(CryptoError):
+            LicenseSigner.from_private_key_pem(rsa.export_private_key())
+
+
+class TestLicenseStore:
+    def test_put_get_discard_and_corrupt_file(self, tmp_path):
+        store = LicenseStore(tmp_path / "sub" / "licenses.json")
+        main, addon = "main-code", "addon-code"
+        assert store.get(main) is None
+        store.put(main, "t1")
+        store.put(addon, "t2")
+        assert (store.get(main), store.get(addon)) == ("t1", "t2")
+        assert main not in store.path.read_text()  # 不落明文激活码
+        store.discard(main)
+        assert store.get(main) is None and store.get(addon) == "t2"
+        assert not list(store.path.parent.glob("*.tmp"))
+
+        store.path.write_text("{broken")
+        assert store.get(addon) is None
+        store.put(main, "t3")
+        assert store.get(main) == "t3"
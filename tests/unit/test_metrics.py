@@ -0,0 +1,119 @@
+"""激活链路指标测试：直方图分桶精度、Prometheus 文本渲染、服务层 / 路由计时与 /metrics 端点。"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from sealium.common.models import ActivationRequest
+from sealium.server.activation_service import ActivationService
+from sealium.server.metrics import STAGES, ActivationMetrics, LatencyHistogram
+from sealium.server.replay_guard import ReplayGuard
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+class TestLatencyHistogram:
+    def test_bucket_relative_error_bounded(self):
+        for us in (0, 1, 15, 16, 17, 100, 999, 1_234, 65_535, 3_000_000):
+            hist = LatencyHistogram()
+            hist.record(us)
+            upper = hist.percentile(100)
+            assert us <= upper <= max(us, us + us // 8)
+
+    def test_percentiles_and_sum(self):
+        hist = LatencyHistogram()
+        for us in range(1, 1001):
+            hist.record(us)
+        assert hist.count == 1000
+        assert hist.sum_us == 500_500
+        assert 500 <= hist.percentile(50) <= 500 * 9 // 8
+        assert 990 <= hist.percentile(99) <= 990 * 9 // 8
+        assert LatencyHistogram().percentile(99) == 0
+
+    def test_cumulative_monotonic_and_clamped(self):
+        hist = LatencyHistogram()
+        for us in (10, 200, 200, 5_000, 10**9):
+            hist.record(us)
+        # 超量程样本只计入 +Inf（count），不落入任何有限边界
+        assert hist.cumulative([100, 1_000, 10_000, 60_000_000]) == [1, 3, 4, 4]
+        assert hist.count == 5
+
+
+class TestRender:
+    def test_prometheus_text_format(self):
+        metrics = ActivationMetrics()
+        metrics.stages["decrypt"].record(1_500)
+        metrics.reject("nonexistent")
+        metrics.outcome("success")
+        metrics.early_reject(429)
+        text = metrics.render(
+            [("sealium_rate_limiter_buckets", "gauge", "桶数", 3), ("skipped", "gauge", "x", None)]
+        )
+        assert "# TYPE sealium_activation_stage_seconds histogram" in text
+        assert 'sealium_activation_stage_seconds_bucket{stage="decrypt",le="0.001"} 0' in text
+        assert 'sealium_activation_stage_seconds_bucket{stage="decrypt",le="0.0025"} 1' in text
+        assert 'sealium_activation_stage_seconds_count{stage="decrypt"} 1' in text
+        assert 'sealium_activation_rejects_total{reason="nonexistent"} 1' in text
+        assert 'sealium_activation_requests_total{outcome="success"} 1' in text
+        assert 'sealium_early_rejects_total{status="429"} 1' in text
+        assert "sealium_rate_limiter_buckets 3" in text
+        assert "skipped" not in text
+        assert text.endswith("\n")
+
+    def test_large_gauge_values_are_exact(self):
+        text = ActivationMetrics().render(
+            [
+                ("sealium_duplicate_filter_hits_total", "counter", "x", 1_234_567),
+                ("ratio", "gauge", "y", 1234567.25),
+            ]
+        )
+        assert "sealium_duplicate_filter_hits_total 1234567\n" in text
+        assert "ratio 1234567.25\n" in text
+
+
+class TestServiceInstrumentation:
+    def test_stages_timed_and_rejects_counted(self, storage, unused_code, make_fingerprint):
+        metrics = ActivationMetrics()
+        service = ActivationService(
+            storage, ReplayGuard(), 300, now_provider=lambda: NOW, metrics=metrics
+        )
+        ts = int(NOW.timestamp())
+
+        def req(code, nonce, timestamp=ts):
+            return ActivationRequest(
+                activation_code=code, machine_code=make_fingerprint(), timestamp=timestamp, nonce=nonce
+            )
+
+        assert service.process(req(unused_code, "n1")).result == "success"
+        service.process(req(unused_code, "n2"))  # 同机幂等：走 matches
+        service.process(req("ghost", "n3"))
+        service.process(req(unused_code, "n4", timestamp=0))
+
+        assert metrics.stages["get_by_code"].count == 3
+        assert metrics.stages["bind"].count == 1
+        assert metrics.stages["matches"].count == 1
+        assert metrics.stages["replay_check"].count == 2
+        assert metrics.rejects == {"nonexistent": 1, "timestamp": 1}
+
+
+class TestMetricsEndpoint:
+    def test_activation_populates_all_stages_and_loopback_only(
+        self, make_app, storage, unused_code, make_activator
+    ):
+        app = make_app(storage)
+        with TestClient(app) as remote:
+            assert remote.get("/metrics").status_code == 403
+        with TestClient(app, client=("127.0.0.1", 0)) as local:
+            assert make_activator(local).activate(unused_code).result == "success"
+            resp = local.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = resp.text
+        # 首次激活不走指纹比对；单节点不转发；未启用离线令牌
+        for stage in set(STAGES) - {"matches", "forward", "sign"}:
+            assert f'sealium_activation_stage_seconds_count{{stage="{stage}"}} 1' in text
+        assert 'sealium_activation_requests_total{outcome="success"} 1' in text
+        assert "sealium_replay_cache_entries 1" in text
+        assert "sealium_duplicate_filter_hits_total 0" in text
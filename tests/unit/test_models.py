@@ -7,12 +7,15 @@ from datetime import datetime
 
 import pytest
 
+from sealium.common.constants import MAX_BATCH_CODES
 from sealium.common.fingerprint import Component, MachineFingerprint
 from sealium.common.models import (
     ActivationCode,
     ActivationRequest,
     ActivationResponse,
     ActivationStatus,
+    BatchActivationRequest,
+    BatchActivationResponse,
 )
 
 
@@ -136,3 +139,31 @@ class TestActivationResponse:
         resp = ActivationResponse.from_dict({"result": "error", "error_msg": "x"})
         assert resp.result == "error"
         assert resp.error_msg == "x"
+
+
+class TestBatchActivation:
+    def _data(self, codes) -> dict:
+        return {"activation_codes": codes, "machine_code": _fp().to_dict(), "timestamp": 7, "nonce": "n"}
+
+    def test_roundtrip_and_items_share_envelope(self):
+        req = BatchActivationRequest.from_dict(self._data(["a", "b"]))
+        assert BatchActivationRequest.from_dict(req.to_dict()) == req
+        items = req.items()
+        assert [i.activation_code for i in items] == ["a", "b"]
+        assert all(i.nonce == "n" and i.timestamp == 7 and i.machine_code == _fp() for i in items)
+
+    @pytest.mark.parametrize(
+        "codes",
+        [[], "a", ["a", ""], ["a", 1], ["a", "a"], [f"c{i}" for i in range(MAX_BATCH_CODES + 1)]],
+    )
+    def test_rejects_bad_code_lists(self, codes):
+        with pytest.raises(ValueError):
+            BatchActivationRequest.from_dict(self._data(codes))
+
+    def test_response_roundtrip(self):
+        resp = BatchActivationResponse(
+            results=[ActivationResponse.success("d", ["f"], "n"), ActivationResponse.error("x", "n")],
+            nonce="n",
+        )
+        assert not resp.succeeded
+        assert BatchActivationResponse.from_dict(resp.to_dict()) == resp
@@ -0,0 +1,47 @@
+"""[server.performance] 预设解析测试：预设合并、显式覆盖与可选实现缺失时的回退。"""
+
+from __future__ import annotations
+
+import pytest
+
+from sealium.server import performance
+from sealium.server.config import PerformanceModel, ServerConfig
+
+
+class TestResolve:
+    def test_default_matches_uvicorn_defaults(self):
+        options, notes = performance.resolve(PerformanceModel())
+        assert options == {
+            "loop": "auto",
+            "http": "auto",
+            "backlog": 2048,
+            "timeout_keep_alive": 5,
+            "limit_concurrency": None,
+            "h11_max_incomplete_event_size": 16 * 1024,
+        }
+        assert notes == []
+
+    def test_explicit_keys_override_profile(self):
+        options, _ = performance.resolve(
+            PerformanceModel(profile="latency", limit_concurrency=0, backlog=100, loop="asyncio")
+        )
+        assert options["limit_concurrency"] is None
+        assert options["backlog"] == 100
+        assert options["loop"] == "asyncio"
+        assert options["timeout_keep_alive"] == 5
+
+    def test_missing_optional_implementations_fall_back(self, monkeypatch):
+        monkeypatch.setattr(performance, "_available", lambda module: False)
+        options, notes = performance.resolve(PerformanceModel(profile="throughput"))
+        assert (options["loop"], options["http"]) == ("asyncio", "h11")
+        assert len(notes) == 2 and "uvloop" in notes[0]
+
+    def test_nested_env_selects_profile(self, monkeypatch):
+        monkeypatch.setenv("SEALIUM_SERVER__PERFORMANCE__PROFILE", "constrained")
+        monkeypatch.setenv("SEALIUM_SERVER__PERFORMANCE__BACKLOG", "64")
+        perf = ServerConfig().server.performance
+        assert (perf.profile, perf.backlog) == ("constrained", 64)
+
+    def test_unknown_profile_rejected(self):
+        with pytest.raises(ValueError):
+            PerformanceModel(profile="turbo")
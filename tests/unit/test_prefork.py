@@ -0,0 +1,124 @@
+"""预派生多 worker 测试：子进程内运行主进程，验证就绪报告、共享监听、滚动重启与优雅停止。"""
+
+from __future__ import annotations
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import textwrap
+import time
+import urllib.request
+
+import pytest
+
+from sealium.server import prefork
+from sealium.server.config import LicenseTokenModel, PathsModel, ServerConfig, ServerModel
+from sealium.server.run import _resolve_workers, _run_prefork
+
+pytestmark = pytest.mark.skipif(not prefork.supported(), reason="预派生需 os.fork")
+
+# 最小 ASGI 应用：响应体为 worker pid，便于区分请求落在哪个进程
+_SCRIPT = textwrap.dedent(
+    """
+    import os, sys, uvicorn
+    from sealium.server.prefork import PreforkMaster
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                msg = await receive()
+                await send({"type": msg["type"] + ".complete"})
+                if msg["type"] == "lifespan.shutdown":
+                    return
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": str(os.getpid()).encode()})
+
+    cfg = uvicorn.Config(app, host="127.0.0.1", port=int(sys.argv[1]), log_level="warning")
+    sys.exit(PreforkMaster(cfg, 2, graceful_timeout=5, preload=[("配置", 0.001)]).run())
+    """
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _pids(port: int, attempts: int = 40) -> set[str]:
+    seen = set()
+    for _ in range(attempts):
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5) as resp:
+            seen.add(resp.read().decode())
+    return seen
+
+
+def _children(pid: int) -> set[int]:
+    path = f"/proc/{pid}/task/{pid}/children"
+    if not os.path.exists(path):
+        pytest.skip("需要 /proc 子进程列表")
+    with open(path) as f:
+        return {int(p) for p in f.read().split()}
+
+
+class TestResolveWorkers:
+    def test_zero_means_cpu_count_and_debug_forces_single(self):
+        cfg = ServerConfig(server=ServerModel(workers=0))
+        assert _resolve_workers(cfg, None) == max(os.cpu_count() or 1, 1)
+        assert _resolve_workers(cfg, 1) == 1
+        debug = ServerConfig(server=ServerModel(debug=True, workers=4))
+        assert _resolve_workers(debug, None) == 1
+
+
+class TestRunPrefork:
+    def test_master_validates_config_before_forking(self, tmp_path, monkeypatch, capsys):
+        key = tmp_path / "p.pem"
+        key.write_text("unused")
+        cfg = ServerConfig(
+            paths=PathsModel(private_key=key, license_signing_key=tmp_path / "missing.pem"),
+            license_token=LicenseTokenModel(enabled=True),
+        )
+
+        def unexpected(*args, **kwargs):
+            raise AssertionError("校验失败时不应加载私钥")
+
+        monkeypatch.setattr("sealium.server.app.load_server_encryptor", unexpected)
+        assert _run_prefork(cfg, 2, 0.0) == 1
+        assert "离线令牌签名私钥不存在" in capsys.readouterr().err
+
+
+class TestPreforkMaster:
+    def test_report_rolling_restart_and_graceful_stop(self):
+        port = _free_port()
+        proc = subprocess.Popen(
+            [sys.executable, "-c", _SCRIPT, str(port)],
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            report = proc.stderr.readline()
+            assert "2 个 worker 已就绪" in report and "配置" in report
+
+            before = _children(proc.pid)
+            assert len(before) == 2
+            assert _pids(port) <= {str(p) for p in before}
+
+            proc.send_signal(signal.SIGHUP)
+            deadline = time.monotonic() + 20
+            while time.monotonic() < deadline:
+                after = _children(proc.pid)
+                if len(after) == 2 and not after & before:
+                    break
+                time.sleep(0.1)
+            assert len(after) == 2 and not after & before
+            assert _pids(port) <= {str(p) for p in after}
+
+            proc.send_signal(signal.SIGTERM)
+            assert proc.wait(timeout=20) == 0
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stderr.close()
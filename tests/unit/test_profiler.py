@@ -0,0 +1,91 @@
+"""按需采样剖析测试：采样线程、分配追踪、并发互斥与 /debug/profile 端点门控。"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+
+from sealium.server.profiler import ProfilerBusy, SamplingProfiler, profile
+
+
+def _busy_marker_function(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestSamplingProfiler:
+    def test_samples_other_threads_as_collapsed_stacks(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy_marker_function, args=(stop,), name="busy")
+        worker.start()
+        sampler = SamplingProfiler(interval=0.002)
+        sampler.start()
+        time.sleep(0.1)
+        sampler.stop()
+        stop.set()
+        worker.join()
+
+        assert sampler.samples > 0
+        lines = sampler.collapsed()
+        busy = [line for line in lines if line.startswith("busy;")]
+        assert busy and "_busy_marker_function" in busy[0]
+        _, count = busy[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert not any("sealium-profiler" in line for line in lines)
+
+
+class TestProfile:
+    def test_allocations_and_tracemalloc_restored(self):
+        assert not tracemalloc.is_tracing()
+
+        async def run():
+            task = asyncio.ensure_future(profile(0.1, interval=0.002, allocations=True))
+            junk = []
+            for _ in range(50):
+                junk.append(bytearray(10_000))
+                await asyncio.sleep(0.001)
+            return await task
+
+        result = asyncio.run(run())
+        assert result["samples"] > 0
+        assert result["allocations"]
+        assert {"location", "size_bytes", "count"} <= set(result["allocations"][0])
+        assert not tracemalloc.is_tracing()
+
+    def test_concurrent_profile_rejected(self):
+        async def run():
+            first = asyncio.ensure_future(profile(0.1))
+            await asyncio.sleep(0.01)
+            with pytest.raises(ProfilerBusy):
+                await profile(0.1)
+            await first
+
+        asyncio.run(run())
+
+    @pytest.mark.parametrize("seconds,interval", [(0, 0.005), (61, 0.005), (1, 0.0001)])
+    def test_out_of_range_rejected(self, seconds, interval):
+        with pytest.raises(ValueError):
+            asyncio.run(profile(seconds, interval=interval))
+
+
+class TestProfileEndpoint:
+    def test_not_registered_by_default(self, client):
+        assert client.get("/debug/profile").status_code == 404
+
+    def test_profiling_flag_serves_collapsed_stacks(self, make_app, storage):
+        cfg = make_app(storage).state.config.model_copy(deep=True)
+        cfg.server.profiling = True
+        app = make_app(storage, config=cfg)
+        with TestClient(app) as remote:
+            assert remote.get("/debug/profile?seconds=0.05").status_code == 403
+        with TestClient(app, client=("127.0.0.1", 0)) as local:
+            resp = local.get("/debug/profile?seconds=0.1&interval_ms=2&format=collapsed")
+            assert resp.status_code == 200
+            assert resp.headers["content-type"].startswith("text/plain")
+            assert resp.text.strip()
+            assert local.get("/debug/profile?seconds=120").status_code == 422
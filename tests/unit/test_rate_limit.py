@@ -14,9 +14,9 @@ from fastapi.testclient import TestClient
 from sealium.client.key_manager import ClientKeyManager
 from sealium.common.crypto import RSAEncryptor
 from sealium.server.app import create_app
-from sealium.server.config import ServerConfig
+from sealium.server.config import RateLimitModel, ServerConfig
 from sealium.server.database import SQLiteDatabase, ActivationCodeStorage
-from sealium.server.rate_limit import InMemoryRateLimiter, NullRateLimiter
+from sealium.server.rate_limit import STAGE_COSTS, InMemoryRateLimiter, NullRateLimiter, RequestCost
 
 
 class TestInMemoryRateLimiter:
@@ -44,20 +44,82 @@ class TestInMemoryRateLimiter:
         clock[0] += 11  # 跨越窗口 -> 计数重置
         assert limiter.allow("ip") is True
 
+    def test_no_double_burst_at_window_edge(self):
+        """令牌桶无窗口边界：用满额度后紧接着只按补充速率放行，而非再放满一窗。"""
+        clock = [0.0]
+        limiter = InMemoryRateLimiter(
+            max_requests=10, window_seconds=10, now_provider=lambda: clock[0]
+        )
+        assert all(limiter.allow("ip") for _ in range(10))
+        clock[0] += 1.0  # 仅补回 1 个令牌
+        assert limiter.allow("ip") is True
+        assert limiter.allow("ip") is False
+
+    def test_idle_keys_expire_via_timing_wheel(self):
+        """桶补满后 key 被时间轮回收，不再长期占用内存。"""
+        clock = [0.0]
+        limiter = InMemoryRateLimiter(
+            max_requests=5, window_seconds=60, now_provider=lambda: clock[0], shards=1
+        )
+        for i in range(1000):
+            limiter.allow(f"spray-{i}")
+        assert len(limiter) == 1000
+        clock[0] += 61
+        limiter.allow("probe")
+        assert len(limiter) == 1
+
+    def test_far_deadline_beyond_wheel_range(self):
+        """到期时刻超出时间轮表示范围时仍按真实时刻限流与回收。"""
+        clock = [0.0]
+        limiter = InMemoryRateLimiter(
+            max_requests=1, window_seconds=1_000_000, now_provider=lambda: clock[0], shards=1
+        )
+        assert limiter.allow("a") is True
+        clock[0] = 500_000
+        assert limiter.allow("a") is False
+        assert len(limiter) == 1
+        clock[0] = 1_000_001
+        assert limiter.allow("b") is True
+        assert len(limiter) == 1  # "a" 已回收
+
     def test_invalid_args_raise(self):
         with pytest.raises(ValueError):
             InMemoryRateLimiter(max_requests=0, window_seconds=10)
         with pytest.raises(ValueError):
             InMemoryRateLimiter(max_requests=10, window_seconds=0)
+        with pytest.raises(ValueError):
+            InMemoryRateLimiter(max_requests=10, window_seconds=10, shards=0)
+
+    def test_charge_consumes_tokens_and_caps_debt(self):
+        clock = [0.0]
+        limiter = InMemoryRateLimiter(
+            max_requests=10, window_seconds=10, now_provider=lambda: clock[0]
+        )
+        assert limiter.allow("ip") is True
+        limiter.charge("ip", 8)  # 共用掉 9 个令牌，仅剩 1
+        assert limiter.allow("ip") is True
+        assert limiter.allow("ip") is False
+        limiter.charge("other", 1000)  # 欠额封顶 2 个窗口
+        clock[0] = 20.0
+        assert limiter.allow("other") is True
+
+    def test_request_cost_accumulates_stages(self):
+        cost = RequestCost()
+        cost.add_body(16 * 1024)
+        cost.add("rsa")
+        cost.add("db")
+        assert cost.units == 1 + STAGE_COSTS["rsa"] + STAGE_COSTS["db"]
+        assert cost.stages == ["rsa", "db"]
 
     def test_null_limiter_always_allows(self):
         nl = NullRateLimiter()
         assert all(nl.allow("ip") for _ in range(1000))
 
 
-def _build_app_with_limiter(server_keypair, storage, limiter):
+def _build_app_with_limiter(server_keypair, storage, limiter, *, cost_weighted=False):
     tmp = pathlib.Path(tempfile.mkdtemp())
     cfg = ServerConfig(
+        rate_limit=RateLimitModel(cost_weighted=cost_weighted),
         project_root=tmp,
         database_path=tmp / "t.db",
         server_private_key_path=tmp / "p.pem",
@@ -108,3 +170,53 @@ class TestRateLimitIntegration:
         assert r2.status_code in (200, 400)
         assert r3.status_code == 429
         assert r3.headers.get("retry-after") == "60"
+
+    def test_limiter_without_charge_still_works(self, server_keypair, storage, make_fingerprint):
+        """只实现 allow / window_seconds 的自定义限流器：失败请求不报 500，只是不追加扣费。"""
+
+        class AllowOnly:
+            window_seconds = 60
+
+            def allow(self, key: str) -> bool:
+                return True
+
+        app = _build_app_with_limiter(server_keypair, storage, AllowOnly(), cost_weighted=True)
+        req = {
+            "activation_code": "ghost",
+            "machine_code": make_fingerprint().to_dict(),
+            "timestamp": int(datetime(2026, 1, 1).timestamp()),
+            "nonce": "n",
+        }
+        pkt = ClientKeyManager(server_keypair.export_public_key().decode()).build_encrypted_request(
+            json.dumps(req).encode()
+        )
+        with TestClient(app) as c:
+            assert c.post("/v1/activation", content=pkt).status_code == 200
+
+    def test_failed_decrypt_charged_more_than_success(
+        self, server_keypair, storage, make_fingerprint, unused_code
+    ):
+        """按代价计费：强制 RSA + 查库的失败请求比成功重激活更快耗尽额度。"""
+        pub = server_keypair.export_public_key().decode()
+        mc = make_fingerprint().to_dict()
+
+        def run(activation_code, n):
+            limiter = InMemoryRateLimiter(max_requests=10, window_seconds=60)
+            app = _build_app_with_limiter(server_keypair, storage, limiter, cost_weighted=True)
+            statuses = []
+            with TestClient(app) as c:
+                for i in range(n):
+                    req = {
+                        "activation_code": activation_code,
+                        "machine_code": mc,
+                        "timestamp": int(datetime(2026, 1, 1).timestamp()),
+                        "nonce": f"n{i}",
+                    }
+                    pkt = ClientKeyManager(pub).build_encrypted_request(json.dumps(req).encode())
+                    statuses.append(c.post("/v1/activation", content=pkt).status_code)
+            return statuses
+
+        assert run(unused_code, 10).count(429) == 0  # 成功（含同机重激活）只扣 1
+        ghost = run("ghost", 10)
+        assert ghost[:2] == [200, 200]  # 失败响应仍是加密 200
+        assert ghost.count(429) >= 7  # 每次失败 ≈ 1 + rsa 4 + db 1
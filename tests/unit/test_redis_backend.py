@@ -0,0 +1,378 @@
+"""Redis 共享后端测试：对本地 RESP 替身服务端运行，无需真实 Redis。
+
+替身服务端实现本模块用到的命令子集（PING / AUTH / SELECT / GET / SET NX EX PX /
+TIME / EVALSHA / EVAL / SCRIPT LOAD|FLUSH），Lua 脚本按 SHA1 映射到等价的 Python
+实现（GCRA），时钟可注入。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import pathlib
+import socketserver
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from sealium.common.exceptions import BackendError
+from sealium.common.fingerprint import Component, MachineFingerprint
+from sealium.common.models import ActivationCode, BatchActivationRequest
+from sealium.server.activation_service import ActivationService
+from sealium.server.config import PathsModel, RateLimitModel, RedisModel, ServerConfig
+from sealium.server.redis_backend import (
+    CHARGE_SCRIPT,
+    GCRA_SCRIPT,
+    RedisClient,
+    RedisRateLimiter,
+    RedisReplayStore,
+)
+from sealium.server.replay_guard import ReplayGuard
+
+
+class _StandInRedis:
+    """进程内 RESP2 替身服务端（线程化 TCP）。"""
+
+    def __init__(self, password: str | None = None) -> None:
+        self.password = password
+        self.clock_us = 1_700_000_000_000_000
+        self.data: dict[bytes, tuple[bytes, float | None]] = {}
+        self.scripts: dict[str, str] = {}
+        self.commands: list[list[bytes]] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._python_scripts = {
+            hashlib.sha1(GCRA_SCRIPT.encode()).hexdigest(): self._gcra,
+            hashlib.sha1(CHARGE_SCRIPT.encode()).hexdigest(): self._charge,
+        }
+        stand_in = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                stand_in.connections += 1
+                authed = stand_in.password is None
+                while True:
+                    cmd = _read_command(self.rfile)
+                    if cmd is None:
+                        return
+                    with stand_in._lock:
+                        stand_in.commands.append(cmd)
+                        if cmd[0].upper() == b"AUTH":
+                            authed = cmd[-1].decode() == stand_in.password
+                            reply = b"+OK\r\n" if authed else b"-WRONGPASS invalid\r\n"
+                        elif not authed:
+                            reply = b"-NOAUTH Authentication required.\r\n"
+                        else:
+                            reply = stand_in._dispatch(cmd)
+                    self.wfile.write(reply)
+
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def shutdown(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ---------- 存储 ----------
+    def _get(self, key: bytes) -> bytes | None:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires <= self.clock_us:
+            del self.data[key]
+            return None
+        return value
+
+    def _set(self, args: list[bytes]) -> bytes:
+        key, value, opts = args[0], args[1], [a.upper() for a in args[2:]]
+        nx = b"NX" in opts
+        expires = None
+        for unit, scale in ((b"EX", 1_000_000), (b"PX", 1_000)):
+            if unit in opts:
+                expires = self.clock_us + int(args[2 + opts.index(unit) + 1]) * scale
+        if nx and self._get(key) is not None:
+            return b"$-1\r\n"
+        self.data[key] = (value, expires)
+        return b"+OK\r\n"
+
+    # ---------- 脚本 ----------
+    def _gcra(self, keys: list[bytes], argv: list[bytes]) -> bytes:
+        interval, burst = int(argv[0]), int(argv[1])
+        now = self.clock_us
+        raw = self._get(keys[0])
+        tat = int(raw) if raw is not None else now
+        tat = max(tat, now)
+        if tat - now > burst:
+            return b":0\r\n"
+        new_tat = tat + interval
+        ms = math.ceil((new_tat - now) / 1000)
+        self._set([keys[0], str(new_tat).encode(), b"PX", str(ms).encode()])
+        return b":1\r\n"
+
+    def _charge(self, keys: list[bytes], argv: list[bytes]) -> bytes:
+        cost, cap = int(argv[0]), int(argv[1])
+        now = self.clock_us
+        raw = self._get(keys[0])
+        tat = max(int(raw) if raw is not None else now, now)
+        new_tat = min(tat + cost, now + cap)
+        ms = math.ceil((new_tat - now) / 1000)
+        self._set([keys[0], str(new_tat).encode(), b"PX", str(ms).encode()])
+        return b":1\r\n"
+
+    def _dispatch(self, cmd: list[bytes]) -> bytes:
+        name, args = cmd[0].upper(), cmd[1:]
+        if name == b"PING":
+            return b"+PONG\r\n"
+        if name == b"SELECT":
+            return b"+OK\r\n"
+        if name == b"GET":
+            value = self._get(args[0])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if name == b"SET":
+            return self._set(args)
+        if name == b"TIME":
+            sec, usec = divmod(self.clock_us, 1_000_000)
+            s, u = str(sec).encode(), str(usec).encode()
+            return b"*2\r\n$%d\r\n%s\r\n$%d\r\n%s\r\n" % (len(s), s, len(u), u)
+        if name == b"SCRIPT":
+            if args[0].upper() == b"FLUSH":
+                self.scripts.clear()
+                return b"+OK\r\n"
+            source = args[1].decode()
+            sha = hashlib.sha1(source.encode()).hexdigest()
+            self.scripts[sha] = source
+            return b"$40\r\n%s\r\n" % sha.encode()
+        if name in (b"EVALSHA", b"EVAL"):
+            if name == b"EVAL":
+                sha = hashlib.sha1(args[0]).hexdigest()
+                self.scripts[sha] = args[0].decode()
+            else:
+                sha = args[0].decode()
+                if sha not in self.scripts:
+                    return b"-NOSCRIPT No matching script.\r\n"
+            numkeys = int(args[1])
+            return self._python_scripts[sha](args[2 : 2 + numkeys], args[2 + numkeys :])
+        return b"-ERR unknown command\r\n"
+
+
+def _read_command(rfile) -> list[bytes] | None:
+    line = rfile.readline()
+    if not line:
+        return None
+    count = int(line[1:-2])
+    parts = []
+    for _ in range(count):
+        size = int(rfile.readline()[1:-2])
+        parts.append(rfile.read(size + 2)[:-2])
+    return parts
+
+
+def _fingerprint() -> MachineFingerprint:
+    return MachineFingerprint(
+        components=tuple(Component(c, "core", True) for c in ("cpu", "board", "bios", "system_uuid"))
+    )
+
+
+@pytest.fixture
+def redis_server():
+    server = _StandInRedis()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def redis_client(redis_server):
+    client = RedisClient("127.0.0.1", redis_server.port, pool_size=4)
+    yield client
+    client.close()
+
+
+class TestRedisClient:
+    def test_ping_and_connection_reuse(self, redis_server, redis_client):
+        assert redis_client.ping() is True
+        assert redis_client.ping() is True
+        assert redis_server.connections == 1  # 连接池复用热连接
+
+    def test_from_url_auth_and_select(self):
+        server = _StandInRedis(password="s3cret")
+        try:
+            client = RedisClient.from_url(f"redis://:s3cret@127.0.0.1:{server.port}/2")
+            assert client.ping() is True
+            names = [c[0].upper() for c in server.commands]
+            assert names[:2] == [b"AUTH", b"SELECT"]
+            client.close()
+        finally:
+            server.shutdown()
+
+    def test_wrong_password_raises_backend_error(self):
+        server = _StandInRedis(password="s3cret")
+        try:
+            client = RedisClient.from_url(f"redis://:nope@127.0.0.1:{server.port}")
+            with pytest.raises(BackendError):
+                client.ping()
+        finally:
+            server.shutdown()
+
+    def test_unreachable_server_raises_backend_error(self, redis_server):
+        port = redis_server.port
+        redis_server.shutdown()
+        client = RedisClient("127.0.0.1", port, timeout=0.2)
+        with pytest.raises(BackendError):
+            client.ping()
+
+    def test_breaker_skips_io_until_window_expires(self, redis_server, monkeypatch):
+        port = redis_server.port
+        redis_server.shutdown()
+        client = RedisClient("127.0.0.1", port, timeout=0.2, breaker_seconds=0.2)
+        attempts = []
+        real_open = client._open
+        monkeypatch.setattr(client, "_open", lambda: attempts.append(1) or real_open())
+        with pytest.raises(BackendError):
+            client.ping()
+        with pytest.raises(BackendError, match="熔断"):
+            client.ping()
+        assert len(attempts) == 1  # 熔断期间不再尝试连接
+        time.sleep(0.25)
+        with pytest.raises(BackendError):
+            client.ping()
+        assert len(attempts) == 2  # 到期后重新试探
+
+    def test_breaker_disabled_with_zero(self, redis_server):
+        port = redis_server.port
+        redis_server.shutdown()
+        client = RedisClient("127.0.0.1", port, timeout=0.2, breaker_seconds=0)
+        for _ in range(2):
+            with pytest.raises(BackendError) as exc:
+                client.ping()
+            assert "熔断" not in str(exc.value)
+
+    def test_rejects_non_redis_url(self):
+        with pytest.raises(ValueError):
+            RedisClient.from_url("http://127.0.0.1:6379")
+
+
+class TestRedisRateLimiter:
+    def test_gcra_semantics_match_in_memory(self, redis_server, redis_client):
+        limiter = RedisRateLimiter(redis_client, max_requests=3, window_seconds=60)
+        assert [limiter.allow("ip") for _ in range(4)] == [True, True, True, False]
+        redis_server.clock_us += 20_000_000  # 补回 1 个令牌
+        assert limiter.allow("ip") is True
+        assert limiter.allow("ip") is False
+
+    def test_two_nodes_share_one_budget(self, redis_server):
+        """两个节点（各自客户端）共享同一份额度。"""
+        node_a = RedisRateLimiter(RedisClient("127.0.0.1", redis_server.port), 2, 60)
+        node_b = RedisRateLimiter(RedisClient("127.0.0.1", redis_server.port), 2, 60)
+        assert node_a.allow("ip") is True
+        assert node_b.allow("ip") is True
+        assert node_a.allow("ip") is False
+        assert node_b.allow("ip") is False
+
+    def test_allow_many_is_one_pipeline(self, redis_server, redis_client):
+        limiter = RedisRateLimiter(redis_client, max_requests=1, window_seconds=60)
+        assert limiter.allow_many(["a", "b", "a"]) == [True, True, False]
+        redis_server.commands.clear()
+        assert limiter.allow_many(["c", "d"]) == [True, True]
+        # 脚本已缓存：一次往返只含两条 EVALSHA，且复用同一连接
+        assert [c[0] for c in redis_server.commands] == [b"EVALSHA", b"EVALSHA"]
+        assert redis_server.connections == 1
+
+    def test_reloads_script_after_flush(self, redis_server, redis_client):
+        limiter = RedisRateLimiter(redis_client, max_requests=5, window_seconds=60)
+        assert limiter.allow("ip") is True
+        redis_client.execute("SCRIPT", "FLUSH")
+        assert limiter.allow("ip") is True
+
+    def test_charge_shares_cost_across_nodes(self, redis_server, redis_client):
+        limiter = RedisRateLimiter(redis_client, max_requests=10, window_seconds=10)
+        assert limiter.allow("ip") is True
+        limiter.charge("ip", 8)
+        assert limiter.allow("ip") is True
+        assert limiter.allow("ip") is False
+        redis_server.clock_us += 1_000_000
+        assert limiter.allow("ip") is True
+
+    def test_fail_open_when_backend_down(self, redis_server):
+        port = redis_server.port
+        redis_server.shutdown()
+        client = RedisClient("127.0.0.1", port, timeout=0.2)
+        assert RedisRateLimiter(client, 1, 60).allow("ip") is True
+        RedisRateLimiter(client, 1, 60).charge("ip", 5)  # 追加扣费尽力而为，不抛
+        with pytest.raises(BackendError):
+            RedisRateLimiter(client, 1, 60, fail_open=False).allow("ip")
+
+
+class TestRedisReplayStore:
+    def test_seen_and_ttl(self, redis_server, redis_client):
+        store = RedisReplayStore(redis_client, ttl_seconds=10)
+        assert store.seen(("code", "n1")) is False
+        assert store.seen(("code", "n1")) is True
+        assert store.seen(("code", "n2")) is False
+        redis_server.clock_us += 11_000_000
+        assert store.seen(("code", "n1")) is False
+
+    def test_keys_do_not_contain_plaintext_code(self, redis_server, redis_client):
+        store = RedisReplayStore(redis_client)
+        store.seen(("secret-activation-code", "n"))
+        assert all(b"secret-activation-code" not in k for k in redis_server.data)
+
+    def test_seen_many(self, redis_client):
+        store = RedisReplayStore(redis_client)
+        assert store.seen_many([("c", "1"), ("c", "2"), ("c", "1")]) == [False, False, True]
+
+    def test_fail_closed_when_backend_down(self, redis_server):
+        port = redis_server.port
+        redis_server.shutdown()
+        store = RedisReplayStore(RedisClient("127.0.0.1", port, timeout=0.2))
+        with pytest.raises(BackendError):
+            store.seen(("c", "n"))
+
+
+class TestServiceOffLoop:
+    def test_batch_replay_is_one_pipeline_off_the_loop(self, redis_server, redis_client, storage):
+        for code in ("a", "b"):
+            storage.create(ActivationCode(activation_code=code))
+        store = RedisReplayStore(redis_client)
+        threads = []
+        real_seen_many = store.seen_many
+
+        def seen_many(keys):
+            threads.append(threading.get_ident())
+            return real_seen_many(keys)
+
+        store.seen_many = seen_many
+        service = ActivationService(storage, ReplayGuard(store=store))
+        batch = BatchActivationRequest(
+            activation_codes=["a", "missing", "b"],
+            machine_code=_fingerprint(),
+            timestamp=int(time.time()),
+            nonce="n",
+        )
+        redis_server.commands.clear()
+        results = asyncio.run(service.aprocess_many(batch))
+        assert [r.result for r in results] == ["success", "error", "success"]
+        assert [c[0] for c in redis_server.commands] == [b"SET", b"SET"]  # 一次管道、仅已存在的码
+        assert threads and threading.get_ident() not in threads
+
+
+class TestAppWiring:
+    def test_redis_url_switches_shared_backends(self, make_app, storage, redis_server):
+        base = pathlib.Path(storage.db.db_path).parent
+        cfg = ServerConfig(
+            paths=PathsModel(database=base / "t.db", private_key=base / "p.pem"),
+            rate_limit=RateLimitModel(enabled=True),
+            redis=RedisModel(url=f"redis://127.0.0.1:{redis_server.port}/0"),
+        )
+        app = make_app(storage, config=cfg)
+        with TestClient(app):
+            assert isinstance(app.state.rate_limiter, RedisRateLimiter)
+            guard = app.state.activation_service._replay_guard
+            assert isinstance(guard._store, RedisReplayStore)
+            assert app.state.config.safe_dump()["redis"]["url"] == "<set>"
+            assert app.state.config.safe_dump()["redis"]["breaker_seconds"] == 5.0
@@ -64,3 +64,23 @@ class TestReplayGuard:
         guard = ReplayGuard(store=SpyStore())
         guard.is_replay("c", "n")
         assert ("c", "n") in seen_keys
+
+    def test_is_replay_many_prefers_batch_store(self):
+        calls = []
+
+        class BatchStore:
+            def seen(self, key):
+                raise AssertionError("应走 seen_many")
+
+            def seen_many(self, keys):
+                calls.append(list(keys))
+                return [k[0] == "old" for k in keys]
+
+        guard = ReplayGuard(store=BatchStore())
+        assert guard.is_replay_many(["old", "new"], "n") == [True, False]
+        assert calls == [[("old", "n"), ("new", "n")]]
+
+    def test_is_replay_many_falls_back_to_seen(self):
+        guard = ReplayGuard()
+        guard.is_replay("a", "n")
+        assert guard.is_replay_many(["a", "b", "b"], "n") == [True, False, True]
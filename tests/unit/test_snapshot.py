@@ -0,0 +1,138 @@
+"""只读快照测试：导出 / 查询往返、按需解码、原子轮换、校验失败回退与边缘路由判定。"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime
+
+import pytest
+
+from sealium.common.crypto import hash_activation_code
+from sealium.common.fingerprint import to_storage
+from sealium.common.models import ActivationCode, ActivationRequest, ActivationStatus
+from sealium.server.activation_service import ActivationService
+from sealium.server.cluster import ClusterRouter
+from sealium.server.replay_guard import ReplayGuard
+from sealium.server.snapshot import EdgeRouter, SnapshotRecord, SnapshotStorage, write_snapshot
+
+FIXED = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _hasher(code: str) -> str:
+    return hash_activation_code(code, "snapshot-test-pepper")
+
+
+@pytest.fixture
+def catalogue(db, make_fingerprint):
+    """未使用 / 已使用 / 永久码各若干的源库（与快照同一 pepper）。"""
+    from sealium.server.database import ActivationCodeStorage
+
+    storage = ActivationCodeStorage(db, code_hasher=_hasher)
+    for i in range(300):
+        storage.create(
+            ActivationCode(
+                activation_code=f"{i:032x}",
+                features=["pro", f"f{i}"],
+                expires_at=datetime(2026, 12, 31, 23, 59, 59, 123456) if i % 3 else None,
+            )
+        )
+    storage.bind_machine_code(f"{1:032x}", to_storage(make_fingerprint("m1")), FIXED)
+    return storage
+
+
+def _request(code: str, fp, nonce: str = "ab" * 16) -> ActivationRequest:
+    return ActivationRequest(
+        activation_code=code, machine_code=fp, timestamp=int(FIXED.timestamp()), nonce=nonce
+    )
+
+
+class TestSnapshotFile:
+    def test_roundtrip_lookup_and_lazy_decode(self, catalogue, tmp_path, make_fingerprint):
+        path = tmp_path / "snap.bin"
+        assert write_snapshot(catalogue.export_rows(), path, _hasher) == 300
+        snap = SnapshotStorage(path, _hasher)
+        assert snap.stats()["records"] == 300
+
+        for i in (0, 1, 2, 299):
+            expected = catalogue.get_by_code(f"{i:032x}")
+            record = snap.get_by_code(f"{i:032x}")
+            assert isinstance(record, SnapshotRecord)
+            assert record.activation_code == expected.activation_code
+            assert record.status == expected.status
+            assert record.expires_at == expected.expires_at
+            assert isinstance(record._features, bytes)  # 未访问前不解码
+            assert record.features == expected.features
+            assert record.bound_machine_code == expected.bound_machine_code
+        assert snap.get_by_code(f"{1:032x}").bound_machine_code == make_fingerprint("m1")
+        assert snap.get_by_code("f" * 32) is None
+        with pytest.raises(RuntimeError):
+            snap.bind_machine_code(f"{0:032x}", "{}", FIXED)
+
+    def test_empty_snapshot_and_merge_prefers_used(self, catalogue, tmp_path):
+        empty = tmp_path / "empty.bin"
+        write_snapshot([], empty, _hasher)
+        assert SnapshotStorage(empty, _hasher).get_by_code(f"{0:032x}") is None
+
+        rows = catalogue.export_rows()
+        stale = [dict(r, status=ActivationStatus.UNUSED.value, bound_machine_code=None) for r in rows]
+        merged = tmp_path / "merged.bin"
+        assert write_snapshot(rows + stale, merged, _hasher) == 300
+        assert SnapshotStorage(merged, _hasher).get_by_code(f"{1:032x}").is_used()
+
+    def test_rejects_foreign_pepper_and_garbage(self, catalogue, tmp_path):
+        path = tmp_path / "snap.bin"
+        write_snapshot(catalogue.export_rows(), path, _hasher)
+        with pytest.raises(ValueError):
+            SnapshotStorage(path, lambda c: hash_activation_code(c, "other"))
+        path.write_bytes(b"not a snapshot" * 100)
+        with pytest.raises(ValueError):
+            SnapshotStorage(path, _hasher)
+
+    def test_atomic_rotation_and_bad_replacement(self, catalogue, tmp_path):
+        path = tmp_path / "snap.bin"
+        rows = catalogue.export_rows()
+        write_snapshot(rows[:10], path, _hasher)
+        snap = SnapshotStorage(path, _hasher, reload_seconds=60)
+        code = next(f"{i:032x}" for i in range(300) if snap.get_by_code(f"{i:032x}") is None)
+
+        write_snapshot(rows, path, _hasher)
+        assert snap.get_by_code(code) is None  # 检查间隔内沿用旧快照
+        snap._next_check = 0
+        assert snap.get_by_code(code) is not None
+        assert snap.stats()["reloads"] == 1
+        assert not [p for p in os.listdir(tmp_path) if p.endswith(".tmp")]
+
+        # 坏文件替换：继续使用当前快照
+        bad = tmp_path / "bad.bin"
+        bad.write_bytes(b"\0" * 2048)
+        os.replace(bad, path)
+        snap._next_check = 0
+        assert snap.get_by_code(code) is not None
+        assert snap.stats() == {"records": 300, "created": snap.stats()["created"], "reloads": 1}
+
+
+class TestEdgeAnswers:
+    def test_service_answers_reactivation_and_unknown_from_snapshot(self, catalogue, tmp_path, make_fingerprint):
+        path = tmp_path / "snap.bin"
+        write_snapshot(catalogue.export_rows(), path, _hasher)
+        snap = SnapshotStorage(path, _hasher)
+        service = ActivationService(snap, ReplayGuard(), now_provider=lambda: FIXED)
+
+        ok = service.process(_request(f"{1:032x}", make_fingerprint("m1", drift=True)))
+        assert ok.result == "success" and ok.features == ["pro", "f1"]
+        assert service.process(_request(f"{1:032x}", make_fingerprint("m2"), "cd" * 16)).result == "error"
+        assert service.process(_request("f" * 32, make_fingerprint("m1"))).result == "error"
+
+    def test_edge_router_forwards_only_first_binds(self, catalogue, tmp_path):
+        path = tmp_path / "snap.bin"
+        write_snapshot(catalogue.export_rows(), path, _hasher)
+        snap = SnapshotStorage(path, _hasher)
+        nodes = {"a": "http://127.0.0.1:9001", "b": "http://127.0.0.1:9002"}
+        router = EdgeRouter(ClusterRouter("edge", nodes, "s", _hasher, edge=True), snap)
+
+        assert router.owner_of(f"{1:032x}") is None  # 已使用：本地应答
+        assert router.owner_of("f" * 32) is None  # 未知：本地拒绝
+        assert router.owner_of(f"{0:032x}") == router._cluster.ring.owner(_hasher(f"{0:032x}"))
+        assert router.stats() == {"forwarded": 0, "failures": 0, "snapshot_records": 300, "snapshot_reloads": 0}
+        with pytest.raises(ValueError):
+            ClusterRouter("a", nodes, "s", _hasher, edge=True)  # 成员不能兼任边缘节点
@@ -0,0 +1,52 @@
+"""Unix 域套接字监听测试：文件权限、残留清理、占用检测与路径长度。"""
+
+from __future__ import annotations
+
+import stat
+
+import pytest
+
+from sealium.server import unix_socket
+from sealium.server.config import ServerConfig, ServerModel
+
+pytestmark = pytest.mark.skipif(not unix_socket.supported(), reason="需要 Unix 域套接字")
+
+
+class TestBindUnixSocket:
+    def test_mode_applied_and_file_removed(self, tmp_path):
+        path = tmp_path / "run" / "a.sock"
+        sock = unix_socket.bind_unix_socket(path, 0o600)
+        try:
+            st = path.stat()
+            assert stat.S_ISSOCK(st.st_mode)
+            assert stat.S_IMODE(st.st_mode) == 0o600
+        finally:
+            sock.close()
+        unix_socket.remove_unix_socket(path)
+        assert not path.exists()
+
+    def test_stale_socket_replaced_live_socket_refused(self, tmp_path):
+        path = tmp_path / "a.sock"
+        stale = unix_socket.bind_unix_socket(path)
+        stale.close()  # 文件残留、无人监听
+        live = unix_socket.bind_unix_socket(path)
+        live.listen()
+        try:
+            with pytest.raises(OSError, match="已有进程在监听"):
+                unix_socket.bind_unix_socket(path)
+        finally:
+            live.close()
+
+    def test_rejects_regular_file_and_long_path(self, tmp_path):
+        regular = tmp_path / "a.sock"
+        regular.write_text("x")
+        with pytest.raises(FileExistsError):
+            unix_socket.bind_unix_socket(regular)
+        with pytest.raises(ValueError):
+            unix_socket.bind_unix_socket(tmp_path / ("x" * 120))
+
+
+def test_mode_accepts_octal_string():
+    assert ServerModel(unix_socket_mode="0600").unix_socket_mode == 0o600
+    cfg = ServerConfig(server=ServerModel(unix_socket="s.sock"))
+    assert cfg.server.unix_socket.is_absolute()